@@ -0,0 +1,196 @@
+########################################################
+########################################################
+
+# GUI created by: martinja
+# Contact: javier.martinez.samblas@cern.ch
+
+########################################################
+########################################################
+
+# IMPORTS
+
+import numpy as np
+import hashlib
+
+########################################################
+########################################################
+
+# GLOBALS
+
+# two bunches closer than this (in samples) read or write the same samples when fixing the edges
+EDGE_INTERACTION_DISTANCE = 5
+
+########################################################
+########################################################
+
+# CLASSES
+
+# last expanded pattern (unscaled, the scaling of each capture commutes with the edge fixing since both curves use the same line equation)
+class FillingPatternCache:
+
+    def __init__(self):
+
+        self.key = None
+        self.y_filling_pattern_full = None
+
+        return
+
+    def getKey(self, y_filling_pattern, time_vector, idx_turns, idx_bunches):
+
+        # hash of the pattern and of the turn and bunch flag layout
+        hash_object = hashlib.sha1()
+        for array in [y_filling_pattern, idx_turns, idx_bunches]:
+            array = np.ascontiguousarray(array)
+            hash_object.update(str((array.dtype, array.shape)).encode("utf-8"))
+            hash_object.update(array.tobytes())
+
+        return (hash_object.hexdigest(), len(time_vector))
+
+    def getPattern(self, y_filling_pattern, time_vector, idx_turns, idx_bunches):
+
+        # expand the pattern again only if one of the inputs changed
+        key = self.getKey(y_filling_pattern, time_vector, idx_turns, idx_bunches)
+        if key != self.key:
+            flags_bunch = np.zeros(len(time_vector))
+            flags_bunch[idx_bunches] = 1
+            y_filling_pattern_full = mapPatternOnTurns(time_vector, idx_turns, y_filling_pattern)
+            self.y_filling_pattern_full = fixPatternEdges(y_filling_pattern_full, idx_bunches, flags_bunch)
+            self.key = key
+
+        return self.y_filling_pattern_full
+
+    def clear(self):
+
+        self.key = None
+        self.y_filling_pattern_full = None
+
+        return
+
+########################################################
+########################################################
+
+# FUNCTIONS
+
+def getLinspaceValues(start, stop, num, index):
+
+    # element-wise value of np.linspace(start, stop, num)[index] (same floating point operations so that the results are bit-identical)
+    div = np.maximum(num - 1, 1)
+    delta = stop - start
+    step = delta / div
+    values = np.where(step == 0, (index / div) * delta, index * step) + start
+    values = np.where((num > 1) & (index == num - 1), stop, values)
+
+    return values
+
+def mapPatternOnTurns(time_vector, idx_turns, y_filling_pattern):
+
+    # init pattern for the whole sequence of data
+    y_filling_pattern_full = np.zeros(len(time_vector), dtype=int)
+
+    # nothing to do without at least one full turn
+    idx_turns = np.asarray(idx_turns)
+    if len(idx_turns) < 2:
+        return y_filling_pattern_full
+
+    # the values are interpolated as floats (like interp1d) and truncated when stored in the int sequence
+    y_filling_pattern = np.asarray(y_filling_pattern)
+    if not np.issubdtype(y_filling_pattern.dtype, np.inexact):
+        y_filling_pattern = y_filling_pattern.astype(np.float64)
+    n_slots = len(y_filling_pattern)
+
+    # limits of each turn
+    time_vector = np.asarray(time_vector)
+    n_samples = np.diff(idx_turns)
+    first_turn_ms = time_vector[idx_turns[:-1]]
+    second_turn_ms = time_vector[idx_turns[1:]]
+
+    # turn of every sample and its position inside the turn
+    turn_of_sample = np.repeat(np.arange(0, len(n_samples)), n_samples)
+    sample_in_turn = np.arange(0, len(turn_of_sample)) - np.repeat(np.cumsum(n_samples) - n_samples, n_samples)
+    start = first_turn_ms[turn_of_sample]
+    stop = second_turn_ms[turn_of_sample]
+    x_samples = getLinspaceValues(start, stop, n_samples[turn_of_sample], sample_in_turn)
+
+    # first guess of the slot of every sample (the last slot whose start is not after the sample)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slot = np.floor((x_samples - start) / (stop - start) * (n_slots - 1))
+    slot = np.where(stop == start, n_slots - 1, np.nan_to_num(slot))
+    slot = np.clip(slot, 0, n_slots - 1).astype(int)
+
+    # correct the rounding errors of the guess comparing against the exact slot limits (same as interp1d kind='previous')
+    while True:
+        too_high = (slot > 0) & (getLinspaceValues(start, stop, n_slots, slot) > x_samples)
+        too_low = (slot < n_slots - 1) & (getLinspaceValues(start, stop, n_slots, np.minimum(slot + 1, n_slots - 1)) <= x_samples)
+        if not too_high.any() and not too_low.any():
+            break
+        slot = slot - too_high + too_low
+
+    # fill the full sequence
+    y_filling_pattern_full[idx_turns[0]:idx_turns[-1]] = y_filling_pattern[slot]
+
+    return y_filling_pattern_full
+
+# fix 1-sample error in the interpolation curve
+# case 1: perfect overlapping (no error) at the start of the slope
+# case 2: perfect overlapping (no error) at the end of the slope
+# case 3: slope starts too early
+# case 4: slope ends too late
+# case 5: slope starts too late (+1)
+# case 6: slope ends too early (-1)
+# case 7: slope starts too late (+2)
+# case 8: slope ends too early (-2)
+# case 9: slope starts too late (+3)
+# case 10: slope ends too early (-3)
+def fixPatternEdges(y_filling_pattern_full, idx_bunches, flags_bunch):
+
+    # skip over limits
+    idx_bunches = np.asarray(idx_bunches)
+    idx_bunches = idx_bunches[(idx_bunches - 3 >= 0) & (idx_bunches + 3 < len(flags_bunch))]
+    if len(idx_bunches) == 0:
+        return y_filling_pattern_full
+
+    # the bunches are fixed in order, so a bunch has to see the samples already fixed by the close bunches before it
+    # (rank of each bunch inside its group of close bunches, all the bunches with the same rank are independent)
+    is_group_start = np.concatenate(([True], np.diff(idx_bunches) > EDGE_INTERACTION_DISTANCE))
+    positions = np.arange(0, len(idx_bunches))
+    rank = positions - np.maximum.accumulate(np.where(is_group_start, positions, 0))
+
+    # iterate over the ranks
+    for current_rank in range(0, int(rank.max()) + 1):
+
+        # get the samples around the bunches (columns are the offsets -3 to +3)
+        idx_bunch = idx_bunches[rank == current_rank]
+        f = np.asarray(flags_bunch)[idx_bunch]
+        window = y_filling_pattern_full[idx_bunch[:, None] + np.arange(-3, 4)]
+        ym3, ym2, ym1, y0, yp1, yp2, yp3 = window.T
+        new_window = window.copy()
+
+        # cases 1,2,3 and 4
+        is_overlapping = y0 == f
+        case_3 = is_overlapping & (ym1 == f) & (ym2 != f)
+        case_3_two = is_overlapping & (ym1 == f) & (ym2 == f) & (ym3 != f)
+        is_overlapping = is_overlapping & ~case_3 & ~case_3_two
+        case_4 = is_overlapping & (yp1 == f) & (yp2 != f)
+        case_4_two = is_overlapping & (yp1 == f) & (yp2 == f) & (yp3 != f)
+        new_window[case_3, 2] = ym2[case_3]
+        new_window[case_3_two, 1] = ym3[case_3_two]
+        new_window[case_3_two, 2] = ym3[case_3_two]
+        new_window[case_4, 4] = yp2[case_4]
+        new_window[case_4_two, 5] = yp3[case_4_two]
+        new_window[case_4_two, 4] = yp3[case_4_two]
+
+        # cases 5 to 10 (the first one that matches)
+        is_pending = y0 != f
+        for column, fixed_columns in [(4, [3]), (2, [3]), (5, [3, 4]), (1, [3, 2]), (6, [3, 4, 5]), (0, [3, 2, 1])]:
+            is_case = is_pending & (window[:, column] == f)
+            for fixed_column in fixed_columns:
+                new_window[is_case, fixed_column] = f[is_case]
+            is_pending = is_pending & ~is_case
+
+        # write back the samples that can change (-2 to +2)
+        y_filling_pattern_full[idx_bunch[:, None] + np.arange(-2, 3)] = new_window[:, 1:6]
+
+    return y_filling_pattern_full
+
+########################################################
+########################################################
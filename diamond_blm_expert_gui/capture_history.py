@@ -0,0 +1,146 @@
+########################################################
+########################################################
+
+# GUI created by: martinja
+# Contact: javier.martinez.samblas@cern.ch
+
+########################################################
+########################################################
+
+# IMPORTS
+
+import numpy as np
+
+########################################################
+########################################################
+
+# GLOBALS
+
+# array fields of a capture (stored in preallocated 2d arrays, one row per capture)
+ARRAY_FIELD_LIST = ["rawBuf0", "rawBuf1", "rawBufFlags0", "rawBufFlags1"]
+
+# scalar fields of a capture
+SCALAR_FIELD_LIST = ["acqStamp", "cycleName"]
+
+########################################################
+########################################################
+
+# CLASSES
+
+# fixed-memory ring of the last captures (each capture gets a sequence number that keeps growing, so an old capture can be found until it is overwritten)
+class CaptureRingBuffer:
+
+    def __init__(self, max_bytes, max_captures = 100):
+
+        # memory budget
+        self.max_bytes = int(max_bytes)
+        self.max_captures = max(1, int(max_captures))
+
+        # the arrays are allocated with the first capture (the length and the types of the buffers are not known before)
+        self.capacity = 0
+        self.array_dict = {}
+        self.scalar_dict = {}
+        self.first_sequence = 0
+        self.next_sequence = 0
+
+        return
+
+    def allocate(self, capture_frame):
+
+        # number of captures that fit in the budget (at least one)
+        bytes_per_capture = sum(np.asarray(capture_frame[field]).nbytes for field in ARRAY_FIELD_LIST)
+        self.capacity = max(1, min(self.max_captures, self.max_bytes // max(1, bytes_per_capture)))
+
+        # preallocate the arrays
+        self.array_dict = {}
+        for field in ARRAY_FIELD_LIST:
+            array = np.asarray(capture_frame[field])
+            self.array_dict[field] = np.empty((self.capacity, len(array)), dtype=array.dtype)
+        self.scalar_dict = {}
+        for field in SCALAR_FIELD_LIST:
+            self.scalar_dict[field] = np.empty(self.capacity, dtype=object)
+
+        # the history starts again
+        self.first_sequence = self.next_sequence
+
+        return
+
+    def isCompatible(self, capture_frame):
+
+        # the buffers must have the same length and type as the allocated ones
+        for field in ARRAY_FIELD_LIST:
+            array = np.asarray(capture_frame[field])
+            if array.ndim != 1 or array.shape[0] != self.array_dict[field].shape[1] or array.dtype != self.array_dict[field].dtype:
+                return False
+
+        return True
+
+    def isNewest(self, capture_frame):
+
+        # check the stamp first and the arrays only if it is the same
+        if len(self) == 0:
+            return False
+        newest_capture = self.getCapture(self.next_sequence - 1, copy = False)
+        if newest_capture["acqStamp"] != capture_frame["acqStamp"]:
+            return False
+        for field in ARRAY_FIELD_LIST:
+            if not np.array_equal(newest_capture[field], capture_frame[field]):
+                return False
+
+        return True
+
+    def push(self, capture_frame):
+
+        # skip the capture if it is the last one again
+        if self.isNewest(capture_frame):
+            return None
+
+        # (re)allocate if the buffers changed (e.g. a new number of turns)
+        if self.capacity == 0 or not self.isCompatible(capture_frame):
+            self.allocate(capture_frame)
+
+        # overwrite the oldest capture when the ring is full
+        sequence = self.next_sequence
+        row = sequence % self.capacity
+        for field in ARRAY_FIELD_LIST:
+            self.array_dict[field][row] = capture_frame[field]
+        for field in SCALAR_FIELD_LIST:
+            self.scalar_dict[field][row] = capture_frame[field]
+        self.next_sequence += 1
+        self.first_sequence = max(self.first_sequence, self.next_sequence - self.capacity)
+
+        return sequence
+
+    def getCapture(self, sequence, copy = True):
+
+        # return None if the capture was overwritten (or never existed)
+        if sequence < self.first_sequence or sequence >= self.next_sequence:
+            return None
+
+        # copy the arrays by default so that overwriting the ring does not change a plotted capture
+        row = sequence % self.capacity
+        capture_frame = {}
+        for field in ARRAY_FIELD_LIST:
+            if copy:
+                capture_frame[field] = self.array_dict[field][row].copy()
+            else:
+                capture_frame[field] = self.array_dict[field][row]
+        for field in SCALAR_FIELD_LIST:
+            capture_frame[field] = self.scalar_dict[field][row]
+
+        return capture_frame
+
+    def getFirstSequence(self):
+
+        return self.first_sequence
+
+    def getLastSequence(self):
+
+        return self.next_sequence - 1
+
+    def __len__(self):
+
+        return self.next_sequence - self.first_sequence
+
+########################################################
+########################################################
@@ -0,0 +1,357 @@
+########################################################
+########################################################
+
+# GUI created by: martinja
+# Contact: javier.martinez.samblas@cern.ch
+
+########################################################
+########################################################
+
+# IMPORTS
+
+import time
+import heapq
+import queue
+import threading
+import itertools
+from collections import OrderedDict
+
+########################################################
+########################################################
+
+# GLOBALS
+
+# pools of probe threads by name (see getProbePool)
+PROBE_POOL_DICT = {}
+PROBE_POOL_LOCK = threading.Lock()
+
+########################################################
+########################################################
+
+# CLASSES
+
+class ProbeTimeoutError(Exception):
+
+    pass
+
+# fixed set of daemon threads shared by all the sweeps of probes (a device is never probed twice at the same time)
+# the threads of the hung devices are never joined, they finish on their own or die with the process
+class ProbePool:
+
+    def __init__(self, max_workers = 16, name = "ProbeWorker"):
+
+        self.max_workers = max(1, int(max_workers))
+        self.name = name
+        self.task_queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread_list = []
+        self.n_idle = 0
+        self.n_queued = 0
+
+        # device -> [event of the sweep that submitted it, start time of its probe (None while queued)]
+        self.busy_dict = {}
+
+        return
+
+    def submit(self, device, probe_function, result_queue, is_cancelled):
+
+        # the device is skipped if its previous probe did not finish (returns False)
+        with self.lock:
+            if device in self.busy_dict:
+                return False
+            self.busy_dict[device] = [is_cancelled, None]
+            self.n_queued += 1
+
+            # start a thread only if there are more queued devices than idle threads (never more than max_workers)
+            if self.n_queued > self.n_idle and len(self.thread_list) < self.max_workers:
+                thread = threading.Thread(target = self.run, name = self.name, daemon = True)
+                self.thread_list.append(thread)
+                self.n_idle += 1
+                thread.start()
+
+        self.task_queue.put((device, probe_function, result_queue, is_cancelled))
+
+        return True
+
+    def getStartTime(self, device, is_cancelled):
+
+        # start time of the probe of the device submitted by the sweep (None if it is still queued)
+        with self.lock:
+            busy_entry = self.busy_dict.get(device)
+            if busy_entry is None or busy_entry[0] is not is_cancelled:
+                return None
+
+            return busy_entry[1]
+
+    def dropCancelled(self, is_cancelled):
+
+        # release the devices of a finished sweep that are still queued (their task is skipped when a thread takes it)
+        with self.lock:
+            for device, busy_entry in list(self.busy_dict.items()):
+                if busy_entry[0] is is_cancelled and busy_entry[1] is None:
+                    del self.busy_dict[device]
+
+        return
+
+    def release(self, device, is_cancelled):
+
+        # the device can be probed again (unless a newer sweep already owns it)
+        busy_entry = self.busy_dict.get(device)
+        if busy_entry is not None and busy_entry[0] is is_cancelled:
+            del self.busy_dict[device]
+
+        return
+
+    def run(self):
+
+        # probe devices forever
+        while True:
+            device, probe_function, result_queue, is_cancelled = self.task_queue.get()
+
+            # skip the devices of the finished sweeps
+            with self.lock:
+                self.n_queued -= 1
+                if is_cancelled.is_set():
+                    self.release(device, is_cancelled)
+                    continue
+                self.n_idle -= 1
+                self.busy_dict[device][1] = time.monotonic()
+
+            # probe it
+            try:
+                probe_function(device)
+                result_queue.put((device, ""))
+            except Exception as xcp:
+                result_queue.put((device, xcp))
+
+            # the thread is free again
+            with self.lock:
+                self.release(device, is_cancelled)
+                self.n_idle += 1
+
+        return
+
+# heap of periodic deadlines (the entries of rescheduled or removed keys are discarded lazily when they reach the top)
+class DeadlineScheduler:
+
+    def __init__(self):
+
+        self.heap = []
+        self.interval_dict = {}
+        self.generation_dict = {}
+        self.counter = itertools.count()
+
+        return
+
+    def schedule(self, key, interval, now, first_deadline = None):
+
+        # (re)schedule the key, removing it if the interval is not positive
+        generation = self.generation_dict.get(key, 0) + 1
+        self.generation_dict[key] = generation
+        if not interval or interval <= 0:
+            self.interval_dict.pop(key, None)
+            return
+        self.interval_dict[key] = interval
+        if first_deadline is None:
+            first_deadline = now + interval
+        heapq.heappush(self.heap, (first_deadline, next(self.counter), generation, key))
+
+        return
+
+    def unschedule(self, key):
+
+        self.schedule(key, 0, None)
+
+        return
+
+    def getNextDeadline(self):
+
+        # drop outdated entries
+        while self.heap and self.heap[0][2] != self.generation_dict.get(self.heap[0][3]):
+            heapq.heappop(self.heap)
+
+        if self.heap:
+            return self.heap[0][0]
+
+        return None
+
+    def popDue(self, now):
+
+        # get all the keys whose deadline is due and schedule their next deadline
+        due_keys = []
+        while self.getNextDeadline() is not None and self.heap[0][0] <= now:
+            deadline, _, generation, key = heapq.heappop(self.heap)
+            due_keys.append(key)
+            interval = self.interval_dict[key]
+            next_deadline = deadline + interval
+            if next_deadline <= now:
+                next_deadline = now + interval
+            heapq.heappush(self.heap, (next_deadline, next(self.counter), generation, key))
+
+        return due_keys
+
+    def __len__(self):
+
+        return len(self.interval_dict)
+
+# two streams of frames keyed by acqStamp (the capture and the fft of the same acquisition are returned together as soon as both are received)
+class AcqStampJoinBuffer:
+
+    def __init__(self, max_size = 8, max_wait = 5.0):
+
+        self.max_size = max(1, int(max_size))
+        self.max_wait = max_wait
+        self.capture_dict = OrderedDict()
+        self.fft_dict = OrderedDict()
+
+        return
+
+    def add(self, frame_dict, other_frame_dict, stamp, frame, now):
+
+        # join the frame with the other half of the stamp
+        if stamp in other_frame_dict:
+
+            # the frames received before the other half are older and will never be painted (drop them)
+            while next(iter(other_frame_dict)) != stamp:
+                other_frame_dict.popitem(last = False)
+            other_frame = other_frame_dict.popitem(last = False)[1][1]
+            while frame_dict:
+                frame_dict.popitem(last = False)
+
+            return frame, other_frame
+
+        # keep the frame (a repeated stamp keeps its first arrival time) and evict the oldest ones
+        if stamp in frame_dict:
+            frame_dict[stamp] = (frame_dict[stamp][0], frame)
+        else:
+            frame_dict[stamp] = (now, frame)
+        while len(frame_dict) > self.max_size:
+            frame_dict.popitem(last = False)
+
+        return None
+
+    def addCapture(self, stamp, frame, now):
+
+        # returns (capture, fft) if the fft of the stamp was already received
+        joined_frames = self.add(self.capture_dict, self.fft_dict, stamp, frame, now)
+
+        return joined_frames
+
+    def addFFT(self, stamp, frame, now):
+
+        # returns (capture, fft) if the capture of the stamp was already received
+        joined_frames = self.add(self.fft_dict, self.capture_dict, stamp, frame, now)
+        if joined_frames is not None:
+            return joined_frames[1], joined_frames[0]
+
+        return None
+
+    def popExpired(self, now):
+
+        # drop the frames that waited too long for their other half and return the expired captures (oldest first)
+        expired_captures = []
+        for frame_dict in [self.capture_dict, self.fft_dict]:
+            while frame_dict and now - next(iter(frame_dict.values()))[0] >= self.max_wait:
+                frame = frame_dict.popitem(last = False)[1][1]
+                if frame_dict is self.capture_dict:
+                    expired_captures.append(frame)
+
+        return expired_captures
+
+    def getNextDeadline(self):
+
+        # the oldest frame of each stream is the first one to expire
+        deadlines = [next(iter(frame_dict.values()))[0] + self.max_wait for frame_dict in [self.capture_dict, self.fft_dict] if frame_dict]
+        if deadlines:
+            return min(deadlines)
+
+        return None
+
+    def clear(self):
+
+        self.capture_dict.clear()
+        self.fft_dict.clear()
+
+        return
+
+########################################################
+########################################################
+
+# FUNCTIONS
+
+def getProbePool(name, max_workers = 16):
+
+    # process-wide pools (the size is fixed by the first caller)
+    with PROBE_POOL_LOCK:
+        if name not in PROBE_POOL_DICT:
+            PROBE_POOL_DICT[name] = ProbePool(max_workers = max_workers, name = name)
+
+        return PROBE_POOL_DICT[name]
+
+def iterProbeResults(device_list, probe_function, max_workers = 16, timeout = 10.0, poll_period = 0.1, timeout_error_name = "PROBE_TIMEOUT", pool_name = "probes"):
+
+    # nothing to do if there are no devices
+    if not device_list:
+        return
+
+    # every sweep shares the same bounded pool, so a hung device holds at most one thread no matter how many sweeps run
+    pool = getProbePool(pool_name, max_workers)
+    result_queue = queue.Queue()
+    is_cancelled = threading.Event()
+
+    # queue the devices (the ones whose previous probe is still running are reported as timed out straight away)
+    pending_devices = set()
+    try:
+        for device in device_list:
+            if pool.submit(device, probe_function, result_queue, is_cancelled):
+                pending_devices.add(device)
+            else:
+                yield device, ProbeTimeoutError("custom.message.error: {}: {} is still busy with a previous call that did not answer".format(timeout_error_name, device))
+
+        # stream the results as soon as each device answers
+        while pending_devices:
+
+            # wait for the next answer
+            try:
+                device, xcp = result_queue.get(timeout = poll_period)
+                if device in pending_devices:
+                    pending_devices.discard(device)
+                    yield device, xcp
+            except queue.Empty:
+                pass
+
+            # give up on the devices that exceeded the timeout (the timeout starts when the probe actually starts, not when it is queued)
+            current_time = time.monotonic()
+            for device in list(pending_devices):
+                start_time = pool.getStartTime(device, is_cancelled)
+                if start_time is not None and current_time - start_time > timeout:
+                    pending_devices.discard(device)
+                    yield device, ProbeTimeoutError("custom.message.error: {}: {} did not answer within {} seconds".format(timeout_error_name, device, timeout))
+
+    # the devices of the sweep that did not start yet are dropped (the running ones keep their thread until they answer)
+    finally:
+        is_cancelled.set()
+        pool.dropCancelled(is_cancelled)
+
+    return
+
+def callWithRetries(function, argument, retries = 0, retry_delay = 0.5, deadline = None, is_retryable = None):
+
+    # try once plus the number of retries and raise the last exception if all the attempts failed
+    # the exceptions rejected by is_retryable are raised straight away and no retry starts after the deadline (time.monotonic)
+    for attempt in range(0, int(retries) + 1):
+        try:
+            return function(argument)
+        except Exception as xcp:
+            if attempt == int(retries):
+                raise
+            if is_retryable is not None and not is_retryable(xcp):
+                raise
+            if deadline is not None and time.monotonic() + retry_delay >= deadline:
+                raise
+            time.sleep(retry_delay)
+
+    return
+
+########################################################
+########################################################
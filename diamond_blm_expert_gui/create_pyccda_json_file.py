@@ -9,10 +9,12 @@
 
 # IMPORTS
 
-import pyccda
 import pprint
 import json
 import os
+import time
+import hashlib
+from japc_backend import isSimulatorBackend, getSimulatedPyCCDADictionary
 
 ########################################################
 ########################################################
@@ -21,6 +23,9 @@ import os
 
 QUERY = '((global==false) and (deviceClassInfo.name=="BLMDIAMONDVFC") and (timingDomain=="LHC" or timingDomain=="SPS")) or (name=="*dBLM.TEST*")'
 
+# bump this number whenever the structure of the output dictionary changes so that old caches are discarded
+CACHE_FORMAT_VERSION = 1
+
 ########################################################
 ########################################################
 
@@ -32,6 +37,17 @@ def create_pyccda_json_file(query = QUERY, name_json_file = "pyccda_config.json"
     # and the device-query-related instructions here:
     # https://gitlab.cern.ch/controls-configuration-service/controls-configuration-data-api/accsoft-ccs-ccda/-/blob/dev/accsoft-ccs-ccda-client-domain/src/main/java/cern/accsoft/ccs/ccda/client/model/device/query/DeviceQueryField.java
 
+    # the simulated devices do not need ccda
+    if isSimulatorBackend():
+        output_dict = getSimulatedPyCCDADictionary()
+        if verbose:
+            pprint.pprint(output_dict)
+        write_pyccda_json_file(output_dict, name_json_file = name_json_file, dir_json = dir_json)
+        return output_dict
+
+    # pyccda is only imported for the live devices (the simulator runs without ccda)
+    import pyccda
+
     # instantiate the api
     api = pyccda.SyncAPI()
 
@@ -41,6 +57,9 @@ def create_pyccda_json_file(query = QUERY, name_json_file = "pyccda_config.json"
     # create the output dictionary
     output_dict = {}
 
+    # cache of parsed property dictionaries (most devices share the same fesa class so each class/version is only resolved once)
+    class_property_dict = {}
+
     # iterate over all devices
     for device in device_list:
 
@@ -48,14 +67,17 @@ def create_pyccda_json_file(query = QUERY, name_json_file = "pyccda_config.json"
         if device.accelerator_name not in output_dict:
             output_dict[device.accelerator_name] = {}
 
-        # get the property info
-        fesa_class_property = api.FesaClassProperty().find(device.device_class_info)
+        # get the property info (only once per class and version)
+        class_key = (device.device_class_info.name, device.device_class_info.version)
+        if class_key not in class_property_dict:
+            fesa_class_property = api.FesaClassProperty().find(device.device_class_info)
+            class_property_dict[class_key] = parse_fesa_class_property(fesa_class_property)
 
-        # create the device dictionary
+        # create the device dictionary (the property dictionaries are shared between all devices of the same class)
         dict_device_info = {}
-        dict_device_info["acquisition"] = {}
-        dict_device_info["command"] = {}
-        dict_device_info["setting"] = {}
+        dict_device_info["acquisition"] = class_property_dict[class_key]["acquisition"]
+        dict_device_info["command"] = class_property_dict[class_key]["command"]
+        dict_device_info["setting"] = class_property_dict[class_key]["setting"]
         dict_device_info["cycle_bound"] = ""
 
         # check cycle bound (e.g. LHC devices usually have no cycle data)
@@ -64,71 +86,183 @@ def create_pyccda_json_file(query = QUERY, name_json_file = "pyccda_config.json"
         else:
             dict_device_info["cycle_bound"] = "False"
 
-        # iterate over all properties
-        for property in fesa_class_property:
-
-            # determine if the property type
-            if property.sub_scope == "acquisition":
-                property_type = "acquisition"
-            elif property.sub_scope == "setting":
-                if property.property_fields:
-                    property_type = "setting"
-                else:
-                    property_type = "command"
-
-            # ignore non-subscribable weird cases (e.g. DiagnosticSetting)
-            if not property.is_subscribable and property_type != "command":
-                continue
-
-            # create the property dictionary
-            dict_device_info[property_type][property.name] = {}
-            dict_device_info[property_type][property.name]["array"] = {}
-            dict_device_info[property_type][property.name]["scalar"] = {}
-            dict_device_info[property_type][property.name]["other"] = {}
-            dict_device_info[property_type][property.name]["mux"] = ""
-
-            # check if the property is multiplexed
-            if property.is_multiplexed:
-                dict_device_info[property_type][property.name]["mux"] = "True"
+        # save the dictionary
+        output_dict[device.accelerator_name][device.name] = dict_device_info
+
+    # print the output dictionary
+    if verbose:
+        pprint.pprint(output_dict)
+
+    # store the json file
+    write_pyccda_json_file(output_dict, name_json_file = name_json_file, dir_json = dir_json)
+
+    return output_dict
+
+########################################################
+########################################################
+
+# this function parses the properties of a fesa class into the acquisition/command/setting dictionaries
+def parse_fesa_class_property(fesa_class_property):
+
+    # create the class dictionary
+    dict_class_info = {}
+    dict_class_info["acquisition"] = {}
+    dict_class_info["command"] = {}
+    dict_class_info["setting"] = {}
+
+    # iterate over all properties
+    for property in fesa_class_property:
+
+        # determine if the property type
+        if property.sub_scope == "acquisition":
+            property_type = "acquisition"
+        elif property.sub_scope == "setting":
+            if property.property_fields:
+                property_type = "setting"
             else:
-                dict_device_info[property_type][property.name]["mux"] = "False"
+                property_type = "command"
+
+        # ignore non-subscribable weird cases (e.g. DiagnosticSetting)
+        if not property.is_subscribable and property_type != "command":
+            continue
+
+        # create the property dictionary
+        dict_class_info[property_type][property.name] = {}
+        dict_class_info[property_type][property.name]["array"] = {}
+        dict_class_info[property_type][property.name]["scalar"] = {}
+        dict_class_info[property_type][property.name]["other"] = {}
+        dict_class_info[property_type][property.name]["mux"] = ""
+
+        # check if the property is multiplexed
+        if property.is_multiplexed:
+            dict_class_info[property_type][property.name]["mux"] = "True"
+        else:
+            dict_class_info[property_type][property.name]["mux"] = "False"
 
-            # iterate over all fields
-            for field in property.property_fields:
+        # iterate over all fields
+        for field in property.property_fields:
 
-                # check if field makes sense
-                if field.primitive_data_type != None:
+            # check if field makes sense
+            if field.primitive_data_type != None:
 
-                    # ignore common fields such as acqStamp or cycleStamp
-                    if field.name not in ["acqStamp", "cycleStamp", "cycleName"]:
+                # ignore common fields such as acqStamp or cycleStamp
+                if field.name not in ["acqStamp", "cycleStamp", "cycleName"]:
 
-                        # determine field type
-                        if field.item_type == "scalar":
-                            field_type = "scalar"
-                        elif field.item_type == "array":
-                            field_type = "array"
-                        else:
-                            field_type = "other"
+                    # determine field type
+                    if field.item_type == "scalar":
+                        field_type = "scalar"
+                    elif field.item_type == "array":
+                        field_type = "array"
+                    else:
+                        field_type = "other"
 
-                        # add the field to the dictionary
-                        dict_device_info[property_type][property.name][field_type][field.name] = {}
+                    # add the field to the dictionary
+                    dict_class_info[property_type][property.name][field_type][field.name] = {}
 
-        # save the dictionary
-        output_dict[device.accelerator_name][device.name] = dict_device_info
+    return dict_class_info
 
-    # print the output dictionary
-    if verbose:
-        pprint.pprint(output_dict)
+########################################################
+########################################################
+
+# this function stores the pyccda dictionary in the aux_jsons folder so that the other windows can read it
+def write_pyccda_json_file(output_dict, name_json_file = "pyccda_config.json", dir_json = ""):
 
     # create the saving dir in case it does not exist
     if not os.path.exists(os.path.join(dir_json, "aux_jsons")):
         os.mkdir(os.path.join(dir_json, "aux_jsons"))
 
-    # store the json file
-    with open(os.path.join(dir_json, "aux_jsons", name_json_file), 'w') as fp:
+    # write to a temporary file first and rename it afterwards so that readers never see a half-written file
+    path_json_file = os.path.join(dir_json, "aux_jsons", name_json_file)
+    with open(path_json_file + ".tmp", 'w') as fp:
         json.dump(output_dict, fp, sort_keys=True, indent=4)
+    os.replace(path_json_file + ".tmp", path_json_file)
 
-    return output_dict
+    return
+
+########################################################
+########################################################
+
+# this function returns the path of the persistent cache file associated to a given query
+def get_pyccda_cache_file_path(query = QUERY, dir_cache = ""):
+
+    # hash the query so that different queries do not overwrite each other
+    query_hash = hashlib.md5(query.encode("utf-8")).hexdigest()[0:12]
+
+    return os.path.join(dir_cache, "pyccda_cache_{}.json".format(query_hash))
+
+# this function reads the persistent cache and returns the dictionary plus its age in seconds (or None if it is not usable)
+def read_pyccda_cache_file(query = QUERY, dir_cache = ""):
+
+    # check the cache exists
+    path_cache_file = get_pyccda_cache_file_path(query = query, dir_cache = dir_cache)
+    if not os.path.exists(path_cache_file):
+        return None, None
+
+    # read the cache (a corrupted file is treated as a missing one)
+    try:
+        with open(path_cache_file) as f:
+            cache_dict = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+
+    # discard caches written by other versions of the app or for other queries
+    if cache_dict.get("version") != CACHE_FORMAT_VERSION or cache_dict.get("query") != query:
+        return None, None
+
+    # compute the age of the cache
+    cache_age = max(0.0, time.time() - float(cache_dict["timestamp"]))
+
+    return cache_dict["catalog"], cache_age
+
+# this function stores the pyccda dictionary in the persistent cache
+def write_pyccda_cache_file(output_dict, query = QUERY, dir_cache = ""):
+
+    # create the cache dict
+    cache_dict = {}
+    cache_dict["version"] = CACHE_FORMAT_VERSION
+    cache_dict["query"] = query
+    cache_dict["timestamp"] = time.time()
+    cache_dict["catalog"] = output_dict
+
+    # write to a temporary file first and rename it afterwards so that other instances never read a half-written cache
+    path_cache_file = get_pyccda_cache_file_path(query = query, dir_cache = dir_cache)
+    with open(path_cache_file + ".tmp", 'w') as fp:
+        json.dump(cache_dict, fp, sort_keys=True)
+    os.replace(path_cache_file + ".tmp", path_cache_file)
+
+    return
+
+# this function loads the pyccda dictionary from the cache (querying ccda only if there is no usable cache) and says if it needs a revalidation
+def load_pyccda_json_file(query = QUERY, name_json_file = "pyccda_config.json", dir_json = "", dir_cache = "", ttl = 86400, verbose = False):
+
+    # the simulated catalog is never cached (it must not overwrite nor be mistaken for the real one)
+    if isSimulatorBackend():
+        return create_pyccda_json_file(query = query, name_json_file = name_json_file, dir_json = dir_json, verbose = verbose), False
+
+    # try to read the cache
+    output_dict, cache_age = read_pyccda_cache_file(query = query, dir_cache = dir_cache)
+
+    # if there is no cache we have no choice but to query ccda
+    if output_dict is None:
+
+        # print message
+        if verbose:
+            print("No valid CCDA cache found, querying CCDA...")
+
+        # query ccda and store the cache
+        output_dict = create_pyccda_json_file(query = query, name_json_file = name_json_file, dir_json = dir_json, verbose = verbose)
+        write_pyccda_cache_file(output_dict, query = query, dir_cache = dir_cache)
+
+        return output_dict, False
+
+    # print message
+    if verbose:
+        print("Using the CCDA cache ({:.0f} seconds old)...".format(cache_age))
+
+    # store the json file for the other windows
+    write_pyccda_json_file(output_dict, name_json_file = name_json_file, dir_json = dir_json)
+
+    return output_dict, cache_age > ttl
 
 ########################################################
 ########################################################
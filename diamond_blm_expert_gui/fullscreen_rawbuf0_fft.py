@@ -21,7 +21,12 @@ import os
 import time
 import numpy as np
 import math
-from general_utils import createCustomTempDir, getSystemTempDir
+from general_utils import createCustomTempDir, getSystemTempDir, readJSONConfigFile
+from message_bus import getMessageBus, TOPIC_SELECTION, TOPIC_FFT_PLOTTED
+from spectrum_utils import FFT_SOURCE_LOCAL, FFT_SOURCE_UCAP
+from spectrum_worker import LocalFFTRunner
+from japc_backend import isSimulatorBackend
+from simulator_feed import SimulatedChannelFeed
 
 ########################################################
 ########################################################
@@ -55,6 +60,14 @@ UI_FILENAME = "fullscreen_rawbuf0_fft.ui"
 # paths
 TEMP_DIR_NAME = "temp_diamond_blm_expert_gui"
 
+# constants
+JSON_CONFIG_DICT = readJSONConfigFile(os.path.join(REAL_PATH, "config_file.json"))
+TURN_TIME_LHC = float(JSON_CONFIG_DICT["TURN_TIME_LHC"]) # microseconds
+TURN_TIME_SPS = float(JSON_CONFIG_DICT["TURN_TIME_SPS"]) # microseconds
+FFT_SOURCE = JSON_CONFIG_DICT["FFT_SOURCE"] # local, UCAP or both
+LOCAL_FFT_WINDOW = JSON_CONFIG_DICT["LOCAL_FFT_WINDOW"] # hann, hamming, blackman or rectangular
+LOCAL_FFT_SEGMENT_SIZE = int(JSON_CONFIG_DICT["LOCAL_FFT_SEGMENT_SIZE"]) # samples per welch segment (0 to use the whole buffer)
+
 ########################################################
 ########################################################
 
@@ -102,6 +115,10 @@ class MyDisplay(CDisplay):
         # get temp dir
         self.app_temp_dir = os.path.join(getSystemTempDir(), TEMP_DIR_NAME)
 
+        # get the message bus (connect to the one of premain in case this window runs in another process)
+        self.message_bus = getMessageBus()
+        self.message_bus.connectToServer()
+
         # init aux booleans and variables
         self.data_aux_time = math.inf
         self.bufferFirstPlotsPainted = False
@@ -131,7 +148,8 @@ class MyDisplay(CDisplay):
 
         # set current device
         self.current_device = "SP.BA1.BLMDIAMOND.2"
-        self.LoadDeviceFromTxt()
+        self.current_accelerator = "SPS"
+        self.LoadDeviceFromMain()
 
         # retrieve the app CApplication variable
         self.app = CApplication.instance()
@@ -244,6 +262,12 @@ class MyDisplay(CDisplay):
         self.verticalLayout_Capture_FFT.addWidget(self.plot_rawbuf0_fft)
         self.verticalLayout_Capture_FFT.addItem(self.horizontalLayout)
 
+        # persistent plot items (updated in place with setData and shown or hidden by the checkboxes)
+        self.scatter_peaks0 = self.plot_rawbuf0_fft.plot(pen=None, symbolBrush=(255, 255, 0), symbol='x', symbolPen=(255, 255, 0), symbolSize=8, name="rawBuf0_peaks")
+        self.curve = self.plot_rawbuf0_fft.plot(pen=(255, 255, 255), name="rawBuf0_FFT")
+        self.scatter_peaks0.setVisible(False)
+        self.plot_rawbuf0_fft.scene().sigMouseMoved.connect(self.onMouseMoved)
+
         # aggregator for Capture FFT (UCAP)
         self.CValueAggregator_Capture_FFT = CValueAggregator(self)
         self.CValueAggregator_Capture_FFT.setProperty("inputChannels", ['UCAP.VD.{}/bufferFFT'.format(self.current_device)])
@@ -254,6 +278,24 @@ class MyDisplay(CDisplay):
                                                              "    output(0)")
         self.horizontalLayout_CValueAggregators.addWidget(self.CValueAggregator_Capture_FFT)
 
+        # aggregator for Capture (to compute the fft locally)
+        if FFT_SOURCE != FFT_SOURCE_UCAP:
+            self.CValueAggregator_Capture = CValueAggregator(self)
+            self.CValueAggregator_Capture.setProperty("inputChannels", ['{}/Capture'.format(self.current_device)])
+            self.CValueAggregator_Capture.setObjectName("CValueAggregator_Capture")
+            self.CValueAggregator_Capture.setValueTransformation("try:\n"
+                                                                 "    output(next(iter(values.values())))\n"
+                                                                 "except:\n"
+                                                                 "    output(0)")
+            self.horizontalLayout_CValueAggregators.addWidget(self.CValueAggregator_Capture)
+
+        # feed the aggregators from the simulated device
+        if isSimulatorBackend():
+            self.simulated_channel_feed = SimulatedChannelFeed(parent = self)
+            self.simulated_channel_feed.addAggregator(self.CValueAggregator_Capture_FFT, "UCAP.VD.{}/bufferFFT".format(self.current_device))
+            if FFT_SOURCE != FFT_SOURCE_UCAP:
+                self.simulated_channel_feed.addAggregator(self.CValueAggregator_Capture, "{}/Capture".format(self.current_device))
+
         return
 
     #----------------------------------------------#
@@ -277,8 +319,19 @@ class MyDisplay(CDisplay):
                                            " For example, if it is checked and the freezing option is enabled in the main window, none of the plots will be updated to new values."
                                            " When unchecked, data will be plotted as soon as it is received no matter what the current plot is shown in the main, which can be convenient when adjusting the phase of the signal or when using the TriggerCapture and ResetCapture commands.")
 
+        # local fft of the captures (the frames are saved as if they came from ucap)
+        self.local_fft_runner = LocalFFTRunner(window = LOCAL_FFT_WINDOW, segment_size = LOCAL_FFT_SEGMENT_SIZE, parent = self)
+        self.local_fft_runner.processed.connect(self.receiveDataFromCaptureFFT)
+
         # capture tab aggregator signals
-        self.CValueAggregator_Capture_FFT.updateTriggered['PyQt_PyObject'].connect(self.receiveDataFromCaptureFFT)
+        if FFT_SOURCE != FFT_SOURCE_LOCAL:
+            self.CValueAggregator_Capture_FFT.updateTriggered['PyQt_PyObject'].connect(self.receiveDataFromCaptureFFT)
+        if FFT_SOURCE != FFT_SOURCE_UCAP:
+            self.CValueAggregator_Capture.updateTriggered['PyQt_PyObject'].connect(self.receiveDataFromCapture)
+
+        # start the simulated deliveries once the slots are connected
+        if isSimulatorBackend():
+            self.simulated_channel_feed.start()
 
         # init qtimer to check if the fft is plotted in the main window
         self.timer_to_check_if_the_fft_is_plotted_in_the_main_window = QTimer(self)
@@ -336,6 +389,10 @@ class MyDisplay(CDisplay):
     # connect function
     def receiveDataFromCaptureFFT(self, data, verbose = False):
 
+        # with both sources the ucap and the local frames of the same stamp are received (keep the first one)
+        if self.data_save and data['acqStamp'] == self.data_save['acqStamp']:
+            return
+
         # save the received data
         self.data_save = data
 
@@ -343,6 +400,40 @@ class MyDisplay(CDisplay):
 
     #----------------------------------------------#
 
+    # connect function
+    def receiveDataFromCapture(self, data, verbose = False):
+
+        # if the arrays are empty just return
+        if data['rawBuf0'].size == 0 or data['rawBuf1'].size == 0:
+            return
+
+        # compute the fft locally
+        capture_frame = {"acqStamp": data['acqStamp'],
+                         "cycleName": data['cycleName'],
+                         "rawBuf0": data['rawBuf0'],
+                         "rawBuf1": data['rawBuf1']}
+        self.startLocalFFT(capture_frame)
+
+        return
+
+    #----------------------------------------------#
+
+    # function that computes the fft of a capture on a thread
+    def startLocalFFT(self, capture_frame):
+
+        # the overtones are the harmonics of the revolution frequency (kHz)
+        if self.current_accelerator == "LHC":
+            fundamental = 1000 / TURN_TIME_LHC
+        else:
+            fundamental = 1000 / TURN_TIME_SPS
+
+        # only the last capture is kept while the previous one is being computed
+        self.local_fft_runner.compute(capture_frame, fundamental = fundamental)
+
+        return
+
+    #----------------------------------------------#
+
     # connect function (aux)
     def auxReceiveDataFromCaptureFFT(self, data, verbose = False):
 
@@ -396,12 +487,10 @@ class MyDisplay(CDisplay):
         if not self.freeze_everything:
 
             # plot the data for buf0_fft
-            self.plot_rawbuf0_fft.getPlotItem().clear()
-            if self.data_peaks_freq0_xplots.size != 0 and self.is_peaks0_checked:
-                self.plot_rawbuf0_fft.plot(x=self.data_peaks_freq0_xplots[1], y=self.data_peaks_freq0_xplots[0], pen=None, symbolBrush=(255, 255, 0), symbol='x', symbolPen=(255, 255, 0), symbolSize=8, name="rawBuf0_peaks")
-            self.curve = self.plot_rawbuf0_fft.plot(x=self.data_rawBuffer0_FFT[1, :], y=self.data_rawBuffer0_FFT[0, :], pen=(255, 255, 255), name="rawBuf0_FFT")
-            self.mouseHoverFirstTime = False
-            self.curve.scene().sigMouseMoved.connect(self.onMouseMoved)
+            if self.data_peaks_freq0_xplots.size != 0:
+                self.scatter_peaks0.setData(x=self.data_peaks_freq0_xplots[1], y=self.data_peaks_freq0_xplots[0])
+            self.scatter_peaks0.setVisible(self.data_peaks_freq0_xplots.size != 0 and self.is_peaks0_checked)
+            self.curve.setData(x=self.data_rawBuffer0_FFT[1, :], y=self.data_rawBuffer0_FFT[0, :])
             self.plot_rawbuf0_fft.show()
 
             # set cycle information
@@ -463,12 +552,14 @@ class MyDisplay(CDisplay):
 
     #----------------------------------------------#
 
-    # function that loads the device from the aux txt file
-    def LoadDeviceFromTxt(self):
+    # function that loads the device published by premain
+    def LoadDeviceFromMain(self):
 
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "current_device.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "current_device.txt"), "r") as f:
-                self.current_device = f.read()
+        # load current device
+        selection = self.message_bus.getRetained(TOPIC_SELECTION)
+        if selection:
+            self.current_device = selection["device"]
+            self.current_accelerator = selection["accelerator"]
 
         return
 
@@ -480,54 +571,41 @@ class MyDisplay(CDisplay):
         # if the button is checked
         if state == Qt.Checked:
 
-            # clear plot and add the new flags
+            # show the peaks
             print("{} - Peaks0 button checked...".format(UI_FILENAME))
             self.current_check_dict["peaks0"] = True
             self.is_peaks0_checked = True
             if self.bufferFirstPlotsPainted:
-                self.plot_rawbuf0_fft.getPlotItem().clear()
-                if self.data_peaks_freq0_xplots.size != 0:
-                    self.plot_rawbuf0_fft.plot(x=self.current_data_peaks_freq0_xplots[1], y=self.current_data_peaks_freq0_xplots[0], pen=None, symbolBrush=(255, 255, 0), symbol='x', symbolPen=(255, 255, 0), symbolSize=8, name="rawBuf0_peaks")
-                if self.current_check_dict["peaks0"]:
-                    self.plot_rawbuf0_fft.plot(x=self.current_data_rawBuffer0_FFT[1, :], y=self.current_data_rawBuffer0_FFT[0, :], pen=(255, 255, 255), name="rawBuf0_FFT")
-                self.mouseHoverFirstTime = False
-                self.plot_rawbuf0_fft.show()
+                self.scatter_peaks0.setVisible(self.data_peaks_freq0_xplots.size != 0)
 
         # if not
         else:
 
-            # remove the peaks
+            # hide the peaks
             print("{} - Peaks0 button unchecked...".format(UI_FILENAME))
             self.current_check_dict["peaks0"] = False
             self.is_peaks0_checked = False
-            if self.bufferFirstPlotsPainted:
-                self.plot_rawbuf0_fft.getPlotItem().clear()
-                self.plot_rawbuf0_fft.plot(x=self.current_data_rawBuffer0_FFT[1, :], y=self.current_data_rawBuffer0_FFT[0, :], pen=(255, 255, 255), name="rawBuf0_FFT")
-                self.mouseHoverFirstTime = False
-                self.plot_rawbuf0_fft.show()
+            self.scatter_peaks0.setVisible(False)
 
         return
 
     #----------------------------------------------#
 
-    # read aux txt
+    # read the plotted boolean of the main window
     def readAuxFFTFileForFullscreen(self):
 
         # if you want to sync the main with the fullscreen
         if self.sync_wrt_main:
 
-            # read fft boolean
-            if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "is_fft_plotted_0.txt")):
-                with open(os.path.join(self.app_temp_dir, "aux_txts", "is_fft_plotted_0.txt"), "r") as f:
-                    self.is_fft_plotted_in_the_main_window = f.read()
+            # read fft boolean (published by the main window)
+            self.is_fft_plotted_in_the_main_window = str(bool(self.message_bus.getRetained(TOPIC_FFT_PLOTTED, key = "0", default = False)))
 
             # call plot function if fft is plotted in the main window and we received the data
             if self.is_fft_plotted_in_the_main_window == "True":
 
-                # set the txt to false
+                # set the boolean to false
                 if self.bufferFirstPlotsPainted:
-                    with open(os.path.join(self.app_temp_dir, "aux_txts", "is_fft_plotted_0.txt"), "w") as f:
-                        f.write("False")
+                    self.message_bus.publish(TOPIC_FFT_PLOTTED, False, key = "0")
 
                 # call the plot function
                 if self.data_save:
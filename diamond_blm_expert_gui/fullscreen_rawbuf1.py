@@ -12,10 +12,11 @@
 from comrad import (CContextFrame, CCommandButton, CApplication, CValueAggregator, CDisplay, PyDMChannelDataSource, CurveData, PointData, PlottingItemData, TimestampMarkerData, TimestampMarkerCollectionData, rbac)
 from PyQt5.QtGui import (QIcon, QColor, QGuiApplication, QCursor, QStandardItemModel, QStandardItem, QBrush, QPixmap, QFont, QDoubleValidator, QIntValidator)
 from PyQt5.QtCore import (QSize, Qt, QTimer, QThread, pyqtSignal, QObject, QEventLoop, QCoreApplication, QRect, QAbstractTableModel, QPoint)
-from PyQt5.QtWidgets import (QStyledItemDelegate, QComboBox, QSplitter, QLineEdit, QHeaderView, QTableView, QGroupBox, QDialogButtonBox, QSpacerItem, QFrame, QSizePolicy, QMessageBox, QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QWidget, QProgressDialog, QScrollArea, QPushButton, QAbstractItemView, QAbstractScrollArea)
+from PyQt5.QtWidgets import (QStyledItemDelegate, QComboBox, QSplitter, QLineEdit, QHeaderView, QTableView, QGroupBox, QDialogButtonBox, QSpacerItem, QFrame, QSizePolicy, QMessageBox, QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QWidget, QProgressDialog, QScrollArea, QPushButton, QAbstractItemView, QAbstractScrollArea, QSlider)
 from PyQt5.Qt import QItemSelectionModel, QMenu, QPalette
 import pyqtgraph as pg
-import pyjapc
+from japc_backend import createJapc, isSimulatorBackend
+from simulator_feed import SimulatedChannelFeed
 
 # OTHER IMPORTS
 
@@ -24,10 +25,14 @@ import os
 import time
 import numpy as np
 import math
-from general_utils import createCustomTempDir, getSystemTempDir
+from general_utils import createCustomTempDir, getSystemTempDir, readJSONConfigFile
+from message_bus import getMessageBus, TOPIC_SELECTION, TOPIC_BUFFER_PLOTTED
 import json
 from copy import deepcopy
-from scipy.interpolate import interp1d
+from bct_utils import FillingPatternCache
+from signal_utils import thresholding_algo
+from plot_items import TurnMarkersItem, DecimatedCurveItem
+from capture_history import CaptureRingBuffer
 
 ########################################################
 ########################################################
@@ -61,43 +66,14 @@ UI_FILENAME = "fullscreen_rawbuf1.ui"
 # paths
 TEMP_DIR_NAME = "temp_diamond_blm_expert_gui"
 
+# constants
+JSON_CONFIG_DICT = readJSONConfigFile(os.path.join(REAL_PATH, "config_file.json"))
+CAPTURE_HISTORY_MEMORY_MB = float(JSON_CONFIG_DICT["CAPTURE_HISTORY_MEMORY_MB"]) # memory budget of the capture history
+CAPTURE_HISTORY_MAX_CAPTURES = int(JSON_CONFIG_DICT["CAPTURE_HISTORY_MAX_CAPTURES"]) # captures kept if they fit in the budget
+
 ########################################################
 ########################################################
 
-# peak detector
-def thresholding_algo(y, lag, threshold, influence):
-
-    signals = np.zeros(len(y))
-    filteredY = np.array(y)
-    avgFilter = [0] * len(y)
-    stdFilter = [0] * len(y)
-    avgFilter[lag - 1] = np.mean(y[0:lag])
-    stdFilter[lag - 1] = np.std(y[0:lag])
-
-    for i in range(lag, len(y)):
-
-        if abs(y[i] - avgFilter[i - 1]) > threshold * stdFilter[i - 1]:
-
-            if y[i] > avgFilter[i - 1]:
-                signals[i] = 1
-            else:
-                signals[i] = -1
-
-            filteredY[i] = influence * y[i] + (1 - influence) * filteredY[i - 1]
-            avgFilter[i] = np.mean(filteredY[(i - lag + 1):i + 1])
-            stdFilter[i] = np.std(filteredY[(i - lag + 1):i + 1])
-
-        else:
-
-            signals[i] = 0
-            filteredY[i] = y[i]
-            avgFilter[i] = np.mean(filteredY[(i - lag + 1):i + 1])
-            stdFilter[i] = np.std(filteredY[(i - lag + 1):i + 1])
-
-    return dict(signals=np.asarray(signals),
-                avgFilter=np.asarray(avgFilter),
-                stdFilter=np.asarray(stdFilter))
-
 # util function
 def can_be_converted_to_float(value):
     try:
@@ -312,16 +288,22 @@ class MyDisplay(CDisplay):
         # get temp dir
         self.app_temp_dir = os.path.join(getSystemTempDir(), TEMP_DIR_NAME)
 
+        # get the message bus (connect to the one of premain in case this window runs in another process)
+        self.message_bus = getMessageBus()
+        self.message_bus.connectToServer()
+
         # init aux booleans and variables
         self.data_aux_time = math.inf
         self.bufferFirstPlotsPainted = False
         self.compute_time_vector_first_time = True
+        self.filling_pattern_cache = FillingPatternCache()
         self.firstTimeUcap = False
         self.firstTimeCapture = False
         self.data_rawBuf0 = np.array([0])
         self.data_rawBuf1 = np.array([0])
         self.is_turn0_checked = True
         self.is_turn1_checked = True
+        self.turn_markers_1 = TurnMarkersItem(pen={'color': (255, 255, 0), 'width': 1.5})
         self.is_bunch0_checked = False
         self.is_bunch1_checked = False
         self.is_peaks0_checked = True
@@ -351,6 +333,9 @@ class MyDisplay(CDisplay):
         self.mouseHoverFirstTime = False
         self.color_indexes_for_combobox = []
         self.old_data_for_autophasing = np.array([])
+        self.capture_history = CaptureRingBuffer(max_bytes = CAPTURE_HISTORY_MEMORY_MB * 1024 * 1024, max_captures = CAPTURE_HISTORY_MAX_CAPTURES)
+        self.is_history_live = True
+        self.history_sequence = -1
 
         # BCT items for the combobox
         self.items_combobox = ["LHC.BCTFR.A6R4.B1", "LHC.BCTFR.A6R4.B2", "RANDOM.SEQUENCE.0", "RANDOM.SEQUENCE.1", "CUSTOM.SEQUENCE.0"]
@@ -367,7 +352,7 @@ class MyDisplay(CDisplay):
 
         # set current device
         self.current_device = "SP.BA2.BLMDIAMOND.2"
-        self.LoadDeviceFromTxt()
+        self.LoadDeviceFromMain()
 
         # retrieve the pyccda json info file
         self.readPyCCDAJsonFile()
@@ -383,7 +368,7 @@ class MyDisplay(CDisplay):
         self.app.main_window.statusBar().repaint()
 
         # create japc object
-        self.japc = pyjapc.PyJapc()
+        self.japc = createJapc()
 
         # load the file
         print("{} - Loading the GUI file...".format(UI_FILENAME))
@@ -530,6 +515,25 @@ class MyDisplay(CDisplay):
         self.verticalLayout_Capture.addWidget(self.plot_rawbuf1)
         self.verticalLayout_Capture.addItem(self.horizontalLayout)
 
+        # persistent plot items (updated in place with setData and shown or hidden by the checkboxes)
+        self.curve_bunch_flags1 = self.plot_rawbuf1.plot(pen=QColor("#EF476F"), name="rawBuf1_bunch_flags")
+        self.curve_filling_pattern = self.plot_rawbuf1.plot(pen=(0, 0, 255), name="filling_pattern_full")
+        self.curve = DecimatedCurveItem(pen=(255, 255, 255), name="rawBuf1")
+        self.plot_rawbuf1.addItem(self.curve)
+        self.plot_rawbuf1.addItem(self.turn_markers_1)
+        self.curve_bunch_flags1.setVisible(False)
+        self.curve_filling_pattern.setVisible(False)
+        self.plot_rawbuf1.scene().sigMouseMoved.connect(self.onMouseMoved)
+
+        # scrubber for the history of captures (the right end is the live capture)
+        self.label_history = QLabel("History: -")
+        self.slider_history = QSlider(Qt.Horizontal)
+        self.slider_history.setMinimumWidth(200)
+        self.slider_history.setRange(0, 0)
+        self.slider_history.setToolTip("Drag it to re-plot one of the last captures. New captures are only plotted again when the handle is back at the right end.")
+        self.horizontalLayout.addWidget(self.label_history)
+        self.horizontalLayout.addWidget(self.slider_history)
+
         # aggregator for Capture
         self.CValueAggregator_Capture = CValueAggregator(self)
         self.CValueAggregator_Capture.setProperty("inputChannels", ['{}/Capture'.format(self.current_device)])
@@ -540,6 +544,11 @@ class MyDisplay(CDisplay):
                                                              "    output(0)")
         self.horizontalLayout_CValueAggregators.addWidget(self.CValueAggregator_Capture)
 
+        # feed the aggregator from the simulated device
+        if isSimulatorBackend():
+            self.simulated_channel_feed = SimulatedChannelFeed(parent = self)
+            self.simulated_channel_feed.addAggregator(self.CValueAggregator_Capture, "{}/Capture".format(self.current_device))
+
         # splitter to separate both panels
         self.splitter = QSplitter(Qt.Horizontal)
         self.splitter.addWidget(self.frame_left)
@@ -1354,6 +1363,10 @@ class MyDisplay(CDisplay):
         self.checkBox_hover.setEnabled(False)
         self.checkBox_sync_main.setEnabled(False)
         self.groupbox_zooming.setEnabled(False)
+        self.slider_history.setEnabled(False)
+
+        # history scrubber
+        self.slider_history.valueChanged.connect(self.scrubCaptureHistory)
 
         # checkbox for sync signal
         self.checkBox_sync_main.stateChanged.connect(self.syncWithMainWindowFunction)
@@ -1366,6 +1379,10 @@ class MyDisplay(CDisplay):
         # capture tab aggregator signals
         self.CValueAggregator_Capture.updateTriggered['PyQt_PyObject'].connect(self.receiveDataFromCapture)
 
+        # start the simulated deliveries once the slots are connected
+        if isSimulatorBackend():
+            self.simulated_channel_feed.start()
+
         # init qtimer to check if the buffer is plotted in the main window
         self.timer_to_check_if_the_buffer_is_plotted_in_the_main_window = QTimer(self)
         self.timer_to_check_if_the_buffer_is_plotted_in_the_main_window.setInterval(250)
@@ -1542,8 +1559,6 @@ class MyDisplay(CDisplay):
 
         # init pattern for the whole sequence of data
         x_filling_pattern_full = deepcopy(self.time_vector)
-        y_filling_pattern_full = [0] * len(self.time_vector)
-        y_filling_pattern_full = np.array(y_filling_pattern_full)
 
         # generate random filling sequence
         if self.bct_use_random:
@@ -1580,111 +1595,13 @@ class MyDisplay(CDisplay):
         # if it is empty, do not plot the pattern
         if self.y_filling_pattern_not_empty:
 
-            # iterate over turns to loop the pattern
-            for idx_turn in range(0, len(self.idx_flags_five_six)-1):
-
-                # get lower and upper turn limits
-                first_turn_ms = self.time_vector[self.idx_flags_five_six[idx_turn]]
-                second_turn_ms = self.time_vector[self.idx_flags_five_six[idx_turn + 1]]
-                n_samples = self.idx_flags_five_six[idx_turn + 1] - self.idx_flags_five_six[idx_turn]
-
-                # the x filling pattern
-                x_filling_pattern = np.linspace(first_turn_ms, second_turn_ms, num=3565)
-
-                # interpolate
-                interpolation_function = interp1d(x_filling_pattern, y_filling_pattern, kind='previous')
-                x_filling_pattern_interpolated = np.linspace(first_turn_ms, second_turn_ms, num=n_samples)
-                y_filling_pattern_interpolated = interpolation_function(x_filling_pattern_interpolated)
-
-                # fill the full sequence
-                y_filling_pattern_full[self.idx_flags_five_six[idx_turn]:self.idx_flags_five_six[idx_turn + 1]] = y_filling_pattern_interpolated
+            # map the pattern onto all the turns and fix the 1-sample errors (only if the pattern or the flag layout changed)
+            y_filling_pattern_full = self.filling_pattern_cache.getPattern(y_filling_pattern, self.time_vector, self.idx_flags_five_six, self.idx_flags_one_two)
 
             # scale the full sequence
             y_filling_pattern_full = ((self.data_turn_line_eq_params_1[3] - self.data_turn_line_eq_params_1[2]) /
                                 self.data_turn_line_eq_params_1[1]) * y_filling_pattern_full + self.data_turn_line_eq_params_1[2]
 
-            # fix 1-sample error in the interpolation curve
-
-            # case 1: perfect overlapping (no error) at the start of the slope
-            # case 2: perfect overlapping (no error) at the end of the slope
-            # case 3: slope starts too early
-            # case 4: slope ends too late
-            # case 5: slope starts too late (+1)
-            # case 6: slope ends too early (-1)
-            # case 7: slope starts too late (+2)
-            # case 8: slope ends too early (-2)
-            # case 9: slope starts too late (+3)
-            # case 10: slope ends too early (-3)
-
-            # iterate over bunches
-            for idx_bunch in self.idx_flags_one_two:
-
-                # skip over limits
-                if idx_bunch - 3 < 0:
-                    continue
-                elif idx_bunch + 3 >= len(self.flags_bunch1):
-                    continue
-
-                # cases 1,2,3 and 4
-                if y_filling_pattern_full[idx_bunch] == self.flags_bunch1[idx_bunch]:
-
-                    # cases 1 and 2 (no error)
-                    pass
-
-                    # possible case 3
-                    if y_filling_pattern_full[idx_bunch-1] == self.flags_bunch1[idx_bunch]:
-
-                        # case 3
-                        if y_filling_pattern_full[idx_bunch - 2] != self.flags_bunch1[idx_bunch]:
-                            y_filling_pattern_full[idx_bunch - 1] = y_filling_pattern_full[idx_bunch - 2]
-                            continue
-                        elif y_filling_pattern_full[idx_bunch - 3] != self.flags_bunch1[idx_bunch]:
-                            y_filling_pattern_full[idx_bunch - 2] = y_filling_pattern_full[idx_bunch - 3]
-                            y_filling_pattern_full[idx_bunch - 1] = y_filling_pattern_full[idx_bunch - 2]
-                            continue
-
-                    # possible case 4
-                    if y_filling_pattern_full[idx_bunch + 1] == self.flags_bunch1[idx_bunch]:
-
-                        # case 4
-                        if y_filling_pattern_full[idx_bunch + 2] != self.flags_bunch1[idx_bunch]:
-                            y_filling_pattern_full[idx_bunch + 1] = y_filling_pattern_full[idx_bunch + 2]
-                            continue
-                        elif y_filling_pattern_full[idx_bunch + 3] != self.flags_bunch1[idx_bunch]:
-                            y_filling_pattern_full[idx_bunch + 2] = y_filling_pattern_full[idx_bunch + 3]
-                            y_filling_pattern_full[idx_bunch + 1] = y_filling_pattern_full[idx_bunch + 2]
-                            continue
-
-                #  case 5
-                elif y_filling_pattern_full[idx_bunch + 1] == self.flags_bunch1[idx_bunch]:
-                    y_filling_pattern_full[idx_bunch] = self.flags_bunch1[idx_bunch]
-
-                # case 6
-                elif y_filling_pattern_full[idx_bunch - 1] == self.flags_bunch1[idx_bunch]:
-                    y_filling_pattern_full[idx_bunch] = self.flags_bunch1[idx_bunch]
-
-                # case 7
-                elif y_filling_pattern_full[idx_bunch + 2] == self.flags_bunch1[idx_bunch]:
-                    y_filling_pattern_full[idx_bunch] = self.flags_bunch1[idx_bunch]
-                    y_filling_pattern_full[idx_bunch + 1] = self.flags_bunch1[idx_bunch]
-
-                # case 8
-                elif y_filling_pattern_full[idx_bunch - 2] == self.flags_bunch1[idx_bunch]:
-                    y_filling_pattern_full[idx_bunch] = self.flags_bunch1[idx_bunch]
-                    y_filling_pattern_full[idx_bunch - 1] = self.flags_bunch1[idx_bunch]
-
-                # case 9
-                elif y_filling_pattern_full[idx_bunch + 3] == self.flags_bunch1[idx_bunch]:
-                    y_filling_pattern_full[idx_bunch] = self.flags_bunch1[idx_bunch]
-                    y_filling_pattern_full[idx_bunch + 1] = self.flags_bunch1[idx_bunch]
-                    y_filling_pattern_full[idx_bunch + 2] = self.flags_bunch1[idx_bunch]
-
-                # case 10
-                elif y_filling_pattern_full[idx_bunch - 3] == self.flags_bunch1[idx_bunch]:
-                    y_filling_pattern_full[idx_bunch] = self.flags_bunch1[idx_bunch]
-                    y_filling_pattern_full[idx_bunch - 1] = self.flags_bunch1[idx_bunch]
-                    y_filling_pattern_full[idx_bunch - 2] = self.flags_bunch1[idx_bunch]
-
             # save variables
             self.x_filling_pattern_full = x_filling_pattern_full
             self.y_filling_pattern_full = y_filling_pattern_full
@@ -2451,6 +2368,19 @@ class MyDisplay(CDisplay):
             if np.array_equal(self.data_rawBuf0, data['rawBuf0']) and np.array_equal(self.data_rawBuf1, data['rawBuf1']):
                 return
 
+        # store the capture in the history (nothing to do if it is the newest one again)
+        if self.capture_history.push(data) is None and not self.is_history_live:
+            return
+
+        # go back to live if the inspected capture was overwritten or the history was reallocated (the handle would be clamped without re-plotting)
+        if not self.is_history_live and self.capture_history.getCapture(self.history_sequence, copy = False) is None:
+            self.is_history_live = True
+        self.updateHistorySlider()
+
+        # keep plotting the capture that is being inspected
+        if not self.is_history_live:
+            return
+
         # first time init
         self.firstTimeCapture = True
 
@@ -2475,9 +2405,68 @@ class MyDisplay(CDisplay):
             self.data_rawBufFlags1 = data['rawBufFlags1']
             self.data_acqStamp = data['acqStamp']
             self.data_cycleName = data['cycleName']
+            self.history_sequence = self.capture_history.getLastSequence()
 
         # plot the data
         self.plotCaptureFunction()
+        self.updateHistoryLabel()
+
+        return
+
+    #----------------------------------------------#
+
+    # function that updates the range of the history scrubber
+    def updateHistorySlider(self):
+
+        # move the handle to the newest capture only when live (without plotting it twice)
+        self.slider_history.blockSignals(True)
+        self.slider_history.setRange(self.capture_history.getFirstSequence(), self.capture_history.getLastSequence())
+        if self.is_history_live:
+            self.slider_history.setValue(self.capture_history.getLastSequence())
+        self.slider_history.blockSignals(False)
+        self.slider_history.setEnabled(len(self.capture_history) > 1)
+        self.updateHistoryLabel()
+
+        return
+
+    #----------------------------------------------#
+
+    # function that shows which capture of the history is plotted
+    def updateHistoryLabel(self):
+
+        # live or how many captures ago
+        if self.history_sequence < 0:
+            self.label_history.setText("History: -")
+        elif self.history_sequence == self.capture_history.getLastSequence():
+            self.label_history.setText("History: live ({} stored)".format(len(self.capture_history)))
+        else:
+            self.label_history.setText("History: {} captures ago ({} stored)".format(self.capture_history.getLastSequence() - self.history_sequence, len(self.capture_history)))
+
+        return
+
+    #----------------------------------------------#
+
+    # function that re-plots a capture of the history
+    def scrubCaptureHistory(self, sequence):
+
+        # get the capture (it could have been overwritten)
+        capture_frame = self.capture_history.getCapture(sequence)
+        if capture_frame is None:
+            return
+
+        # new captures are plotted again when the handle reaches the right end
+        self.is_history_live = sequence == self.capture_history.getLastSequence()
+
+        # store the data and plot it
+        self.data_rawBuf0 = capture_frame['rawBuf0']
+        self.data_rawBuf1 = capture_frame['rawBuf1']
+        self.data_rawBufFlags0 = capture_frame['rawBufFlags0']
+        self.data_rawBufFlags1 = capture_frame['rawBufFlags1']
+        self.data_acqStamp = capture_frame['acqStamp']
+        self.data_cycleName = capture_frame['cycleName']
+        self.history_sequence = sequence
+        self.plotCaptureFunction()
+        self.updateHistoryLabel()
 
         return
 
@@ -2530,21 +2519,7 @@ class MyDisplay(CDisplay):
         if not self.freeze_everything:
 
             # plot the data for buf1
-            self.plot_rawbuf1.getPlotItem().clear()
-            if self.flags_bunch1.size != 0 and self.is_bunch1_checked:
-                self.plot_rawbuf1.plot(x=self.time_vector, y=self.flags_bunch1, pen=QColor("#EF476F"), name="rawBuf1_bunch_flags")
-            if self.y_filling_pattern_not_empty and self.bct_checked:
-                self.plot_rawbuf1.plot(x=self.x_filling_pattern_full, y=self.y_filling_pattern_full, pen=(0, 0, 255), name="filling_pattern_full")
-                self.plotted_bct_at_least_once = True
-            self.curve = self.plot_rawbuf1.plot(x=self.time_vector, y=self.data_rawBuf1, pen=(255, 255, 255), name="rawBuf1")
-            if self.flags_turn1.size != 0 and self.is_turn1_checked:
-                # self.plot_rawbuf1.plot(x=self.time_vector, y=self.flags_turn1, pen=(255, 255, 0), name="rawBuf1_turn_flags")
-                for line_pos in self.inf_lines_pos_1:
-                    infinite_line = pg.InfiniteLine(pos=line_pos, movable=False, angle=90, pen={'color': (255, 255, 0), 'width': 1.5}, label=None)
-                    self.plot_rawbuf1.addItem(infinite_line)
-            self.mouseHoverFirstTime = False
-            self.curve.scene().sigMouseMoved.connect(self.onMouseMoved)
-            self.plot_rawbuf1.show()
+            self.updatePlotItems()
 
             # set cycle information
             self.CLabel_acqStamp_Capture.setText("<b>acqStamp:</b> {} UTC  ".format(self.data_acqStamp))
@@ -2615,18 +2590,42 @@ class MyDisplay(CDisplay):
 
     #----------------------------------------------#
 
-    # function that loads the device from the aux txt file
-    def LoadDeviceFromTxt(self):
+    # function that loads the device published by premain
+    def LoadDeviceFromMain(self):
+
+        # load current device and accelerator
+        selection = self.message_bus.getRetained(TOPIC_SELECTION)
+        if selection:
+            self.current_device = selection["device"]
+            self.current_accelerator = selection["accelerator"]
 
-        # load current device
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "current_device.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "current_device.txt"), "r") as f:
-                self.current_device = f.read()
+        return
+
+    #----------------------------------------------#
 
-        # load current accelerator
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "current_accelerator.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "current_accelerator.txt"), "r") as f:
-                self.current_accelerator = f.read()
+    # function that updates the persistent plot items with the current data
+    def updatePlotItems(self):
+
+        # bunch flags
+        self.curve_bunch_flags1.setData(x=self.time_vector, y=self.flags_bunch1)
+        self.curve_bunch_flags1.setVisible(self.flags_bunch1.size != 0 and self.is_bunch1_checked)
+
+        # bct pattern
+        if self.y_filling_pattern_not_empty:
+            self.curve_filling_pattern.setData(x=self.x_filling_pattern_full, y=self.y_filling_pattern_full)
+        self.curve_filling_pattern.setVisible(self.y_filling_pattern_not_empty and self.bct_checked)
+        if self.y_filling_pattern_not_empty and self.bct_checked:
+            self.plotted_bct_at_least_once = True
+
+        # raw buffer
+        self.curve.setPyramidData(self.time_vector, self.data_rawBuf1)
+
+        # turn flags
+        self.turn_markers_1.setPositions(self.inf_lines_pos_1)
+        self.turn_markers_1.setVisible(self.flags_turn1.size != 0 and self.is_turn1_checked)
+
+        # show the plot
+        self.plot_rawbuf1.show()
 
         return
 
@@ -2635,56 +2634,26 @@ class MyDisplay(CDisplay):
     # function for drawing the bct plot
     def updateBCTPlot(self, state):
 
-        # reset clip to view to avoid errors
-        if self.y_filling_pattern_not_empty or self.plotted_bct_at_least_once:
-            self.plot_rawbuf1.getPlotItem().setClipToView(False)
-
         # if the button is checked
         if state == Qt.Checked:
 
-            # clear plot and add the new flags
+            # update the pattern and show it
             print("{} - BCT button checked...".format(UI_FILENAME))
             self.bct_checked = True
             if self.y_filling_pattern_not_empty or self.plotted_bct_at_least_once:
                 if self.bufferFirstPlotsPainted:
-                    self.plot_rawbuf1.getPlotItem().clear()
-                    if self.flags_bunch1.size != 0 and self.is_bunch1_checked:
-                        self.plot_rawbuf1.plot(x=self.time_vector, y=self.flags_bunch1, pen=QColor("#EF476F"), name="rawBuf1_bunch_flags")
-                    if self.y_filling_pattern_not_empty and self.bct_checked:
-                        self.plot_rawbuf1.plot(x=self.x_filling_pattern_full, y=self.y_filling_pattern_full, pen=(0, 0, 255), name="filling_pattern_full")
+                    if self.y_filling_pattern_not_empty:
+                        self.curve_filling_pattern.setData(x=self.x_filling_pattern_full, y=self.y_filling_pattern_full)
                         self.plotted_bct_at_least_once = True
-                    self.plot_rawbuf1.plot(x=self.time_vector, y=self.data_rawBuf1, pen=(255, 255, 255), name="rawBuf1")
-                    if self.flags_turn1.size != 0 and self.is_turn1_checked:
-                        # self.plot_rawbuf1.plot(x=self.time_vector, y=self.flags_turn1, pen=(255, 255, 0), name="rawBuf1_turn_flags")
-                        for line_pos in self.inf_lines_pos_1:
-                            infinite_line = pg.InfiniteLine(pos=line_pos, movable=False, angle=90, pen={'color': (255, 255, 0), 'width': 1.5}, label=None)
-                            self.plot_rawbuf1.addItem(infinite_line)
-                    self.mouseHoverFirstTime = False
-                    self.plot_rawbuf1.show()
+                    self.curve_filling_pattern.setVisible(self.y_filling_pattern_not_empty)
 
         # if not
         else:
 
-            # remove the flags
+            # hide the pattern
             print("{} - BCT button unchecked...".format(UI_FILENAME))
             self.bct_checked = False
-            if self.y_filling_pattern_not_empty or self.plotted_bct_at_least_once:
-                if self.bufferFirstPlotsPainted:
-                    self.plot_rawbuf1.getPlotItem().clear()
-                    if self.flags_bunch1.size != 0 and self.is_bunch1_checked:
-                        self.plot_rawbuf1.plot(x=self.time_vector, y=self.flags_bunch1, pen=QColor("#EF476F"), name="rawBuf1_bunch_flags")
-                    self.plot_rawbuf1.plot(x=self.time_vector, y=self.data_rawBuf1, pen=(255, 255, 255), name="rawBuf1")
-                    if self.flags_turn1.size != 0 and self.is_turn1_checked:
-                        # self.plot_rawbuf1.plot(x=self.time_vector, y=self.flags_turn1, pen=(255, 255, 0), name="rawBuf1_turn_flags")
-                        for line_pos in self.inf_lines_pos_1:
-                            infinite_line = pg.InfiniteLine(pos=line_pos, movable=False, angle=90, pen={'color': (255, 255, 0), 'width': 1.5}, label=None)
-                            self.plot_rawbuf1.addItem(infinite_line)
-                    self.mouseHoverFirstTime = False
-                    self.plot_rawbuf1.show()
-
-        # reset clip to view to avoid errors
-        if self.y_filling_pattern_not_empty or self.plotted_bct_at_least_once:
-            self.plot_rawbuf1.getPlotItem().setClipToView(True)
+            self.curve_filling_pattern.setVisible(False)
 
         return
 
@@ -2693,55 +2662,24 @@ class MyDisplay(CDisplay):
     # function for drawing flags 1 and 2
     def updateFlags_1_2(self, state):
 
-        # reset clip to view to avoid errors
-        self.plot_rawbuf1.getPlotItem().setClipToView(False)
-
         # if the button is checked
         if state == Qt.Checked:
 
-            # clear plot and add the new flags
+            # show the bunch flags
             print("{} - Bunchs1 button checked...".format(UI_FILENAME))
             self.current_flags_dict["1,2"] = True
             self.is_bunch1_checked = True
             if self.bufferFirstPlotsPainted:
-                self.plot_rawbuf1.getPlotItem().clear()
-                if self.flags_bunch1.size != 0 and self.is_bunch1_checked:
-                    self.plot_rawbuf1.plot(x=self.time_vector, y=self.flags_bunch1, pen=QColor("#EF476F"), name="rawBuf1_bunch_flags")
-                if self.y_filling_pattern_not_empty and self.bct_checked:
-                    self.plot_rawbuf1.plot(x=self.x_filling_pattern_full, y=self.y_filling_pattern_full, pen=(0, 0, 255), name="filling_pattern_full")
-                    self.plotted_bct_at_least_once = True
-                self.plot_rawbuf1.plot(x=self.time_vector, y=self.data_rawBuf1, pen=(255, 255, 255), name="rawBuf1")
-                if self.flags_turn1.size != 0 and self.is_turn1_checked:
-                    # self.plot_rawbuf1.plot(x=self.time_vector, y=self.flags_turn1, pen=(255, 255, 0), name="rawBuf1_turn_flags")
-                    for line_pos in self.inf_lines_pos_1:
-                        infinite_line = pg.InfiniteLine(pos=line_pos, movable=False, angle=90, pen={'color': (255, 255, 0), 'width': 1.5}, label=None)
-                        self.plot_rawbuf1.addItem(infinite_line)
-                self.mouseHoverFirstTime = False
-                self.plot_rawbuf1.show()
+                self.curve_bunch_flags1.setVisible(self.flags_bunch1.size != 0)
 
         # if not
         else:
 
-            # remove the flags
+            # hide the bunch flags
             print("{} - Bunchs1 button unchecked...".format(UI_FILENAME))
             self.current_flags_dict["1,2"] = False
             self.is_bunch1_checked = False
-            if self.bufferFirstPlotsPainted:
-                self.plot_rawbuf1.getPlotItem().clear()
-                if self.y_filling_pattern_not_empty and self.bct_checked:
-                    self.plot_rawbuf1.plot(x=self.x_filling_pattern_full, y=self.y_filling_pattern_full, pen=(0, 0, 255), name="filling_pattern_full")
-                    self.plotted_bct_at_least_once = True
-                self.plot_rawbuf1.plot(x=self.time_vector, y=self.data_rawBuf1, pen=(255, 255, 255), name="rawBuf1")
-                if self.flags_turn1.size != 0 and self.is_turn1_checked:
-                    # self.plot_rawbuf1.plot(x=self.time_vector, y=self.flags_turn1, pen=(255, 255, 0), name="rawBuf1_turn_flags")
-                    for line_pos in self.inf_lines_pos_1:
-                        infinite_line = pg.InfiniteLine(pos=line_pos, movable=False, angle=90, pen={'color': (255, 255, 0), 'width': 1.5}, label=None)
-                        self.plot_rawbuf1.addItem(infinite_line)
-                self.mouseHoverFirstTime = False
-                self.plot_rawbuf1.show()
-
-        # reset clip to view to avoid errors
-        self.plot_rawbuf1.plotItem.setClipToView(True)
+            self.curve_bunch_flags1.setVisible(False)
 
         return
 
@@ -2750,74 +2688,43 @@ class MyDisplay(CDisplay):
     # function for drawing flags 5 and 6
     def updateFlags_5_6(self, state):
 
-        # reset clip to view to avoid errors
-        self.plot_rawbuf1.getPlotItem().setClipToView(False)
-
         # if the button is checked
         if state == Qt.Checked:
 
-            # clear plot and add the new flags
+            # show the turn markers
             print("{} - Turns1 button checked...".format(UI_FILENAME))
             self.current_flags_dict["5,6"] = True
             self.is_turn1_checked = True
             if self.bufferFirstPlotsPainted:
-                self.plot_rawbuf1.getPlotItem().clear()
-                if self.flags_bunch1.size != 0 and self.is_bunch1_checked:
-                    self.plot_rawbuf1.plot(x=self.time_vector, y=self.flags_bunch1, pen=QColor("#EF476F"), name="rawBuf1_bunch_flags")
-                if self.y_filling_pattern_not_empty and self.bct_checked:
-                    self.plot_rawbuf1.plot(x=self.x_filling_pattern_full, y=self.y_filling_pattern_full, pen=(0, 0, 255), name="filling_pattern_full")
-                    self.plotted_bct_at_least_once = True
-                self.plot_rawbuf1.plot(x=self.time_vector, y=self.data_rawBuf1, pen=(255, 255, 255), name="rawBuf1")
-                if self.flags_turn1.size != 0 and self.is_turn1_checked:
-                    # self.plot_rawbuf1.plot(x=self.time_vector, y=self.flags_turn1, pen=(255, 255, 0), name="rawBuf1_turn_flags")
-                    for line_pos in self.inf_lines_pos_1:
-                        infinite_line = pg.InfiniteLine(pos=line_pos, movable=False, angle=90, pen={'color': (255, 255, 0), 'width': 1.5}, label=None)
-                        self.plot_rawbuf1.addItem(infinite_line)
-                self.mouseHoverFirstTime = False
-                self.plot_rawbuf1.show()
+                self.turn_markers_1.setVisible(self.flags_turn1.size != 0)
 
         else:
 
-            # remove the flags
+            # hide the turn markers
             print("{} - Turns1 button unchecked...".format(UI_FILENAME))
             self.current_flags_dict["5,6"] = False
             self.is_turn1_checked = False
-            self.plot_rawbuf1.getPlotItem().clear()
-            if self.bufferFirstPlotsPainted:
-                if self.flags_bunch1.size != 0 and self.is_bunch1_checked:
-                    self.plot_rawbuf1.plot(x=self.time_vector, y=self.flags_bunch1, pen=QColor("#EF476F"), name="rawBuf1_bunch_flags")
-                if self.y_filling_pattern_not_empty and self.bct_checked:
-                    self.plot_rawbuf1.plot(x=self.x_filling_pattern_full, y=self.y_filling_pattern_full, pen=(0, 0, 255), name="filling_pattern_full")
-                    self.plotted_bct_at_least_once = True
-                self.plot_rawbuf1.plot(x=self.time_vector, y=self.data_rawBuf1, pen=(255, 255, 255), name="rawBuf1")
-                self.mouseHoverFirstTime = False
-                self.plot_rawbuf1.show()
-
-        # reset clip to view to avoid errors
-        self.plot_rawbuf1.plotItem.setClipToView(True)
+            self.turn_markers_1.setVisible(False)
 
         return
 
     #----------------------------------------------#
 
-    # read aux txt
+    # read the plotted boolean of the main window
     def readAuxBufferFileForFullscreen(self):
 
         # if you want to sync the main with the fullscreen
         if self.sync_wrt_main:
 
-            # read buffer boolean
-            if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "is_buffer_plotted_1.txt")):
-                with open(os.path.join(self.app_temp_dir, "aux_txts", "is_buffer_plotted_1.txt"), "r") as f:
-                    self.is_buffer_plotted_in_the_main_window = f.read()
+            # read buffer boolean (published by the main window)
+            self.is_buffer_plotted_in_the_main_window = str(bool(self.message_bus.getRetained(TOPIC_BUFFER_PLOTTED, key = "1", default = False)))
 
             # call plot function if buffer is plotted in the main window and we received the data
             if self.is_buffer_plotted_in_the_main_window == "True":
 
-                # set the txt to false
+                # set the boolean to false
                 if self.bufferFirstPlotsPainted:
-                    with open(os.path.join(self.app_temp_dir, "aux_txts", "is_buffer_plotted_1.txt"), "w") as f:
-                        f.write("False")
+                    self.message_bus.publish(TOPIC_BUFFER_PLOTTED, False, key = "1")
 
                 # call the plot function
                 if self.data_save:
@@ -47,6 +47,18 @@ def getSystemTempDir():
 
     return tmp_dir
 
+def getPersistentCacheDir(dir_name):
+
+    try:
+        cache_root = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser('~'), ".cache"))
+        out_dir = os.path.join(cache_root, dir_name)
+        os.makedirs(out_dir, exist_ok=True)
+    except OSError:
+        out_dir = os.path.join(getSystemTempDir(), dir_name)
+        os.makedirs(out_dir, exist_ok=True)
+
+    return out_dir
+
 def readJSONConfigFile(path_of_file):
 
     if os.path.exists(path_of_file):
@@ -59,3 +71,44 @@ def readJSONConfigFile(path_of_file):
 
 ########################################################
 ########################################################
+
+def writeSnapshot(path, data, sequence = None):
+
+    # the sequence number goes on the first line so that readers can skip unchanged snapshots without parsing the data
+    if sequence is None:
+        last_sequence = readSnapshotSequence(path)
+        sequence = 1 if last_sequence is None else last_sequence + 1
+
+    # write to a temporary file first and rename it afterwards so that readers never see a half-written snapshot
+    with open(path + ".tmp", "w") as fp:
+        fp.write(json.dumps({"format": "snapshot", "version": 1, "sequence": sequence}, separators=(",", ":")) + "\n")
+        json.dump(data, fp, separators=(",", ":"))
+    os.replace(path + ".tmp", path)
+
+    return sequence
+
+def readSnapshotSequence(path):
+
+    try:
+        with open(path, "r") as fp:
+            header = json.loads(fp.readline())
+        sequence = int(header["sequence"])
+    except (OSError, ValueError, KeyError, TypeError):
+        sequence = None
+
+    return sequence
+
+def readSnapshot(path, last_sequence = None):
+
+    # only parse the data if the snapshot is newer than the last one that was read
+    try:
+        with open(path, "r") as fp:
+            header = json.loads(fp.readline())
+            sequence = int(header["sequence"])
+            if last_sequence is not None and sequence <= last_sequence:
+                return None, last_sequence
+            data = json.loads(fp.read())
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, last_sequence
+
+    return data, sequence
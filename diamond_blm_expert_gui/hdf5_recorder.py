@@ -0,0 +1,364 @@
+########################################################
+########################################################
+
+# GUI created by: martinja
+# Contact: javier.martinez.samblas@cern.ch
+
+########################################################
+########################################################
+
+# IMPORTS
+
+import time
+import queue
+import threading
+import numpy as np
+import h5py
+
+########################################################
+########################################################
+
+# GLOBALS
+
+# fields that identify each record (stored as strings)
+STAMP_FIELD_LIST = ["acqStamp", "cycleName"]
+
+# suffix of the datasets with the first sample of each record of an array field
+OFFSETS_SUFFIX = "_offsets"
+
+# group with the min and the max of each block of samples of the array fields (one dataset per field and level)
+DECIMATION_GROUP = "_decimation"
+DECIMATION_BLOCK_SIZE = 1024 # samples per block of the first level
+DECIMATION_FACTOR = 16 # blocks of a level per block of the next one
+DECIMATION_LEVELS = 4
+
+########################################################
+########################################################
+
+# CLASSES
+
+# appends the received acquisitions to an hdf5 file from a background thread
+# layout: /{device}/{property}/ with one row per record in acqStamp, cycleName, record_time and the scalar fields,
+# and every array field concatenated in a 1d dataset plus a {field}_offsets dataset (so that the length can change between records)
+# the min and the max of the blocks of each array field are kept in /{device}/{property}/_decimation/{field}/{level} for the zoomed-out windows
+class HDF5Recorder:
+
+    def __init__(self, path, compression = "gzip", chunk_size = 2**18, record_chunk_size = 1024, max_queue_size = 64, flush_period = 5.0):
+
+        # file and dataset options (the per-record datasets grow one row at a time, so they get small chunks that are cheap to rewrite)
+        self.path = path
+        self.compression = compression if compression else None
+        self.chunk_size = int(chunk_size)
+        self.record_chunk_size = int(record_chunk_size)
+        self.flush_period = flush_period
+
+        # the gui only puts the acquisitions in the queue (they are dropped if the writer cannot keep up)
+        self.queue = queue.Queue(maxsize = int(max_queue_size))
+        self.thread = None
+        self.n_dropped = 0
+        self.n_recorded = 0
+        self.last_exception = None
+
+        return
+
+    def start(self):
+
+        # start the writer thread
+        if self.thread is None:
+            self.thread = threading.Thread(target = self.run, name = "HDF5Recorder", daemon = True)
+            self.thread.start()
+
+        return
+
+    def stop(self, timeout = 10.0):
+
+        # write what is still in the queue and close the file
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join(timeout)
+            self.thread = None
+
+        return
+
+    def record(self, device, property, data):
+
+        # keep only the numeric arrays and scalars (copied, the caller can reuse its arrays)
+        record_dict = {"record_time": time.time()}
+        for field, value in data.items():
+            if field in STAMP_FIELD_LIST:
+                record_dict[field] = str(value)
+            elif isinstance(value, np.ndarray) and value.dtype.kind in "biuf":
+                record_dict[field] = value.copy()
+            elif isinstance(value, (bool, int, float, np.bool_, np.integer, np.floating)):
+                record_dict[field] = value
+
+        # never block the gui
+        try:
+            self.queue.put_nowait((device, property, record_dict))
+        except queue.Full:
+            self.n_dropped += 1
+            return False
+
+        return True
+
+    def run(self):
+
+        # open the file in append mode
+        with h5py.File(self.path, "a") as h5_file:
+            last_flush_time = time.time()
+            while True:
+
+                # wait for the next acquisition (the file is flushed when idle)
+                try:
+                    item = self.queue.get(timeout = self.flush_period)
+                except queue.Empty:
+                    h5_file.flush()
+                    last_flush_time = time.time()
+                    continue
+
+                # stop signal
+                if item is None:
+                    break
+
+                # append it (a broken record must not stop the recording)
+                try:
+                    self.append(h5_file, *item)
+                    self.n_recorded += 1
+                except Exception as xcp:
+                    self.last_exception = xcp
+                    print("HDF5Recorder - Unable to record {}/{}: {}".format(item[0], item[1], xcp))
+
+                # flush periodically
+                if time.time() - last_flush_time >= self.flush_period:
+                    h5_file.flush()
+                    last_flush_time = time.time()
+
+        return
+
+    def append(self, h5_file, device, property, record_dict):
+
+        # get the group of the property
+        group = h5_file.require_group("{}/{}".format(device, property))
+        n_records = group["record_time"].shape[0] if "record_time" in group else 0
+
+        # append one row to the per-record datasets
+        for field, value in record_dict.items():
+            if isinstance(value, np.ndarray):
+                continue
+            if field in STAMP_FIELD_LIST:
+                dtype = h5py.string_dtype()
+            else:
+                dtype = np.asarray(value).dtype
+            dataset = self.requireDataset(group, field, dtype, n_records, self.record_chunk_size)
+            dataset.resize((n_records + 1,))
+            dataset[n_records] = value
+
+        # append the arrays at the end of their 1d datasets
+        for field, value in record_dict.items():
+            if not isinstance(value, np.ndarray):
+                continue
+            value = value.ravel()
+            dataset = self.requireDataset(group, field, value.dtype, 0, self.chunk_size)
+            offsets = self.requireDataset(group, field + OFFSETS_SUFFIX, np.int64, n_records, self.record_chunk_size, fill_value = -1)
+            offset = dataset.shape[0]
+            value = value.astype(dataset.dtype, copy = False)
+            dataset.resize((offset + len(value),))
+            dataset[offset:] = value
+            offsets.resize((n_records + 1,))
+            offsets[n_records] = offset
+            self.appendDecimation(group, field, offset, value)
+
+        return
+
+    def appendDecimation(self, group, field, offset, value):
+
+        # nothing to add
+        if len(value) == 0:
+            return
+
+        # update the min and the max of the blocks that contain the new samples at every level
+        for level in range(0, DECIMATION_LEVELS):
+            block_size = DECIMATION_BLOCK_SIZE * DECIMATION_FACTOR ** level
+            name = "{}/{}/{}".format(DECIMATION_GROUP, field, level)
+            if name not in group:
+                group.create_dataset(name, shape = (0, 2), maxshape = (None, 2), dtype = value.dtype, chunks = (self.record_chunk_size, 2))
+                group[name].attrs["block_size"] = block_size
+            dataset = group[name]
+
+            # reduce the new samples block by block (the first block can be a continuation of the last stored one)
+            first_block = offset // block_size
+            n_blocks = (offset + len(value) - 1) // block_size + 1
+            block_starts = np.maximum(0, np.arange(first_block, n_blocks) * block_size - offset)
+            block_min = np.minimum.reduceat(value, block_starts)
+            block_max = np.maximum.reduceat(value, block_starts)
+            if first_block < dataset.shape[0]:
+                block_min[0] = min(block_min[0], dataset[first_block, 0])
+                block_max[0] = max(block_max[0], dataset[first_block, 1])
+
+            # write them
+            dataset.resize((n_blocks, 2))
+            dataset[first_block:n_blocks, 0] = block_min
+            dataset[first_block:n_blocks, 1] = block_max
+
+        return
+
+    def requireDataset(self, group, field, dtype, n_records, chunk_size, fill_value = None):
+
+        # create a resizable chunked dataset (records received before the field existed get the fill value)
+        if field not in group:
+            if dtype == h5py.string_dtype():
+                group.create_dataset(field, shape = (n_records,), maxshape = (None,), dtype = dtype, chunks = (chunk_size,))
+            else:
+                group.create_dataset(field, shape = (n_records,), maxshape = (None,), dtype = dtype, chunks = (chunk_size,), compression = self.compression, shuffle = self.compression is not None, fillvalue = fill_value)
+
+        return group[field]
+
+# reads recordings without loading them (only the requested records or the visible window of a field are read)
+class HDF5RecordingReader:
+
+    def __init__(self, path):
+
+        self.h5_file = h5py.File(path, "r")
+
+        return
+
+    def close(self):
+
+        self.h5_file.close()
+
+        return
+
+    def getDeviceList(self):
+
+        return list(self.h5_file.keys())
+
+    def getPropertyList(self, device):
+
+        return list(self.h5_file[device].keys())
+
+    def getRecordCount(self, device, property):
+
+        return self.h5_file[device][property]["record_time"].shape[0]
+
+    def getStamps(self, device, property):
+
+        # the stamps are small, so they are read at once
+        return [stamp.decode("utf-8") if isinstance(stamp, bytes) else stamp for stamp in self.h5_file[device][property]["acqStamp"][:]]
+
+    def findRecord(self, device, property, acq_stamp):
+
+        # index of the last record with the stamp (None if it was not recorded)
+        stamp_list = self.getStamps(device, property)
+        for index in range(len(stamp_list) - 1, -1, -1):
+            if stamp_list[index] == str(acq_stamp):
+                return index
+
+        return None
+
+    def getFieldLength(self, device, property, field):
+
+        return self.h5_file[device][property][field].shape[0]
+
+    def getRecordLimits(self, device, property, field, index):
+
+        # first and last (excluded) samples of a record in the 1d dataset of the field
+        offsets = self.h5_file[device][property][field + OFFSETS_SUFFIX]
+        start = int(offsets[index])
+        if start < 0:
+            return None
+        stop = self.getFieldLength(device, property, field)
+        for next_offset in offsets[index + 1:]:
+            if next_offset >= 0:
+                stop = int(next_offset)
+                break
+
+        return start, stop
+
+    def getRecord(self, device, property, index):
+
+        # read one record (the arrays are read only for their own samples)
+        group = self.h5_file[device][property]
+        record_dict = {}
+        for field in group.keys():
+            if field.endswith(OFFSETS_SUFFIX) or field == DECIMATION_GROUP:
+                continue
+            if field + OFFSETS_SUFFIX in group:
+                limits = self.getRecordLimits(device, property, field, index)
+                if limits is not None:
+                    record_dict[field] = group[field][limits[0]:limits[1]]
+            else:
+                value = group[field][index]
+                record_dict[field] = value.decode("utf-8") if isinstance(value, bytes) else value
+
+        return record_dict
+
+    def readWindow(self, device, property, field, start, stop, max_points = 2000, read_size = 2**20):
+
+        # clip the window
+        dataset = self.h5_file[device][property][field]
+        start = max(0, int(start))
+        stop = min(dataset.shape[0], int(stop))
+        if stop <= start:
+            return np.array([], dtype=np.int64), np.array([], dtype=dataset.dtype)
+
+        # read the samples as they are if they fit
+        n_blocks = max(1, int(max_points) // 2)
+        if stop - start <= 2 * n_blocks:
+            return np.arange(start, stop), dataset[start:stop]
+
+        # use the coarsest decimation level that still gives about n_blocks blocks (only a few rows are read instead of every sample)
+        block_size = int(np.ceil((stop - start) / n_blocks))
+        decimation = self.getDecimation(device, property, field, block_size)
+        if decimation is not None:
+            return self.readDecimatedWindow(decimation, start, stop, block_size)
+
+        # otherwise read pieces of whole blocks and keep the min and the max of each block (the peaks are not lost)
+        read_size = max(block_size, (int(read_size) // block_size) * block_size)
+        x_list = []
+        y_list = []
+        for read_start in range(start, stop, read_size):
+            chunk = dataset[read_start:min(stop, read_start + read_size)]
+            n_chunk_blocks = int(np.ceil(len(chunk) / block_size))
+            chunk = np.concatenate((chunk, np.repeat(chunk[-1:], n_chunk_blocks * block_size - len(chunk))))
+            chunk = chunk.reshape(n_chunk_blocks, block_size)
+            y_chunk = np.empty(2 * n_chunk_blocks, dtype=chunk.dtype)
+            y_chunk[0::2] = chunk.min(axis=1)
+            y_chunk[1::2] = chunk.max(axis=1)
+            x_list.append(np.repeat(read_start + np.arange(n_chunk_blocks) * block_size, 2))
+            y_list.append(y_chunk)
+
+        return np.concatenate(x_list), np.concatenate(y_list)
+
+    def getDecimation(self, device, property, field, block_size):
+
+        # coarsest level whose blocks are not larger than the requested ones (None for the recordings without decimation)
+        group = self.h5_file[device][property]
+        if DECIMATION_GROUP not in group or field not in group[DECIMATION_GROUP]:
+            return None
+        decimation = None
+        for dataset in group[DECIMATION_GROUP][field].values():
+            if dataset.attrs["block_size"] <= block_size and (decimation is None or dataset.attrs["block_size"] > decimation.attrs["block_size"]):
+                decimation = dataset
+
+        return decimation
+
+    def readDecimatedWindow(self, decimation, start, stop, block_size):
+
+        # rows of the level that cover the window
+        level_block_size = int(decimation.attrs["block_size"])
+        row_start = start // level_block_size
+        row_stop = min(decimation.shape[0], -(-stop // level_block_size))
+        rows = decimation[row_start:row_stop]
+
+        # merge groups of rows into blocks of about the requested size
+        rows_per_block = max(1, block_size // level_block_size)
+        block_starts = np.arange(0, len(rows), rows_per_block)
+        y = np.empty(2 * len(block_starts), dtype=rows.dtype)
+        y[0::2] = np.minimum.reduceat(rows[:, 0], block_starts)
+        y[1::2] = np.maximum.reduceat(rows[:, 1], block_starts)
+        x = np.repeat((row_start + block_starts) * level_block_size, 2)
+
+        return x, y
+
+########################################################
+########################################################
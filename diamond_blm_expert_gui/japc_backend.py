@@ -0,0 +1,84 @@
+########################################################
+########################################################
+
+# GUI created by: martinja
+# Contact: javier.martinez.samblas@cern.ch
+
+########################################################
+########################################################
+
+# IMPORTS
+
+import os
+from general_utils import readJSONConfigFile
+from simulator import SimulatedBackend, SimulatedJapc, SimulatedCernPackage
+
+########################################################
+########################################################
+
+# GLOBALS
+
+# get real path
+REAL_PATH = os.path.realpath(os.path.dirname(__file__))
+
+# backends
+BACKEND_JAPC = "japc"
+BACKEND_SIMULATOR = "simulator"
+
+# constants
+JSON_CONFIG_DICT = readJSONConfigFile(os.path.join(REAL_PATH, "config_file.json"))
+BACKEND = JSON_CONFIG_DICT["BACKEND"] # japc (live devices) or simulator (synthetic devices)
+SIMULATOR_N_DEVICES = int(JSON_CONFIG_DICT["SIMULATOR_N_DEVICES"]) # number of devices per accelerator
+SIMULATOR_RATE = float(JSON_CONFIG_DICT["SIMULATOR_RATE"]) # acquisitions per second
+SIMULATOR_CAPTURE_RATE = float(JSON_CONFIG_DICT["SIMULATOR_CAPTURE_RATE"]) # captures per second
+SIMULATOR_CAPTURE_TURNS = int(JSON_CONFIG_DICT["SIMULATOR_CAPTURE_TURNS"]) # turns in each capture
+SIMULATOR_LATENCY = float(JSON_CONFIG_DICT["SIMULATOR_LATENCY"]) # seconds
+SIMULATOR_FAILURE_RATE = float(JSON_CONFIG_DICT["SIMULATOR_FAILURE_RATE"]) # probability of a call failing
+SIMULATOR_SEED = int(JSON_CONFIG_DICT["SIMULATOR_SEED"]) # seed of the synthetic data
+
+# process-wide instance of the simulated devices
+SIMULATED_BACKEND = None
+
+########################################################
+########################################################
+
+# FUNCTIONS
+
+def isSimulatorBackend():
+
+    return BACKEND == BACKEND_SIMULATOR
+
+def getSimulatedBackend():
+
+    global SIMULATED_BACKEND
+
+    if SIMULATED_BACKEND is None:
+        SIMULATED_BACKEND = SimulatedBackend(n_devices = SIMULATOR_N_DEVICES, rate = SIMULATOR_RATE, capture_rate = SIMULATOR_CAPTURE_RATE, capture_turns = SIMULATOR_CAPTURE_TURNS,
+                                             latency = SIMULATOR_LATENCY, failure_rate = SIMULATOR_FAILURE_RATE, seed = SIMULATOR_SEED)
+
+    return SIMULATED_BACKEND
+
+def createJapc():
+
+    # pyjapc is only imported for the live devices (the simulator runs without the java stack)
+    if isSimulatorBackend():
+        return SimulatedJapc(getSimulatedBackend())
+    else:
+        import pyjapc
+        return pyjapc.PyJapc()
+
+def getCernPackage():
+
+    # java package used for catching the ParameterException of pyjapc
+    if isSimulatorBackend():
+        return SimulatedCernPackage()
+    else:
+        import jpype as jp
+        return jp.JPackage("cern")
+
+def getSimulatedPyCCDADictionary():
+
+    return getSimulatedBackend().pyccda_dictionary
+
+########################################################
+########################################################
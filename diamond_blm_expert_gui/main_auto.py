@@ -21,13 +21,20 @@ import sys
 import os
 import numpy as np
 from copy import deepcopy
-import jpype as jp
+from japc_backend import getCernPackage, isSimulatorBackend
 import time
 import json
 import math
 import numpy as np
 from time import sleep
-from general_utils import createCustomTempDir, getSystemTempDir
+from general_utils import createCustomTempDir, getSystemTempDir, readJSONConfigFile
+from message_bus import getMessageBus, TOPIC_SELECTION, TOPIC_FREEZE, TOPIC_BUFFER_PLOTTED, TOPIC_FFT_PLOTTED
+from plot_items import TurnMarkersItem, DecimatedCurveItem
+from concurrency_utils import AcqStampJoinBuffer
+from spectrum_utils import compareFFTFrames, FFT_SOURCE_LOCAL, FFT_SOURCE_UCAP, FFT_SOURCE_BOTH
+from spectrum_worker import LocalFFTRunner
+from hdf5_recorder import HDF5Recorder
+from simulator_feed import SimulatedChannelFeed
 
 ########################################################
 ########################################################
@@ -43,6 +50,20 @@ UI_FILENAME = "main_auto.ui"
 # paths
 TEMP_DIR_NAME = "temp_diamond_blm_expert_gui"
 
+# constants
+JSON_CONFIG_DICT = readJSONConfigFile(os.path.join(REAL_PATH, "config_file.json"))
+CAPTURE_JOIN_BUFFER_SIZE = int(JSON_CONFIG_DICT["CAPTURE_JOIN_BUFFER_SIZE"]) # number of captures and ffts waiting for their other half
+CAPTURE_JOIN_MAX_WAIT = float(JSON_CONFIG_DICT["CAPTURE_JOIN_MAX_WAIT"]) # seconds before painting a capture without its fft
+TURN_TIME_LHC = float(JSON_CONFIG_DICT["TURN_TIME_LHC"]) # microseconds
+TURN_TIME_SPS = float(JSON_CONFIG_DICT["TURN_TIME_SPS"]) # microseconds
+FFT_SOURCE = JSON_CONFIG_DICT["FFT_SOURCE"] # local, UCAP or both (both plots the first one that arrives and compares them)
+LOCAL_FFT_WINDOW = JSON_CONFIG_DICT["LOCAL_FFT_WINDOW"] # hann, hamming, blackman or rectangular
+LOCAL_FFT_SEGMENT_SIZE = int(JSON_CONFIG_DICT["LOCAL_FFT_SEGMENT_SIZE"]) # samples per welch segment (0 to use the whole buffer)
+RECORDING_ENABLED = JSON_CONFIG_DICT["RECORDING_ENABLED"] == "True" # append the received acquisitions to an hdf5 file
+RECORDING_DIR = JSON_CONFIG_DICT["RECORDING_DIR"] # folder of the hdf5 files (empty to use the temp dir)
+RECORDING_PROPERTIES = JSON_CONFIG_DICT["RECORDING_PROPERTIES"].split(",") # properties that are recorded
+RECORDING_COMPRESSION = JSON_CONFIG_DICT["RECORDING_COMPRESSION"] # gzip, lzf or empty
+
 # others
 CAPTURE_TAB = True
 
@@ -113,17 +134,11 @@ class MyDisplay(CDisplay):
         # get temp dir
         self.app_temp_dir = os.path.join(getSystemTempDir(), TEMP_DIR_NAME)
 
-        # clean up
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "is_buffer_plotted_0.txt")):
-            os.remove(os.path.join(self.app_temp_dir, "aux_txts", "is_buffer_plotted_0.txt"))
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "is_buffer_plotted_1.txt")):
-            os.remove(os.path.join(self.app_temp_dir, "aux_txts", "is_buffer_plotted_1.txt"))
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "is_fft_plotted_0.txt")):
-            os.remove(os.path.join(self.app_temp_dir, "aux_txts", "is_fft_plotted_0.txt"))
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "is_fft_plotted_1.txt")):
-            os.remove(os.path.join(self.app_temp_dir, "aux_txts", "is_fft_plotted_1.txt"))
-
-        # write boolean for fullscreens
+        # get the message bus (connect to the one of premain in case this window runs in another process)
+        self.message_bus = getMessageBus()
+        self.message_bus.connectToServer()
+
+        # publish boolean for fullscreens
         self.writeAuxFFTFileForFullscreen(is_fft_plotted = False)
         self.writeAuxBufferFileForFullscreen(is_buffer_plotted = False)
 
@@ -139,6 +154,8 @@ class MyDisplay(CDisplay):
         self.data_rawBuf1 = np.array([0])
         self.is_turn0_checked = True
         self.is_turn1_checked = True
+        self.turn_markers_0 = TurnMarkersItem(pen={'color': (255, 255, 0), 'width': 1.5})
+        self.turn_markers_1 = TurnMarkersItem(pen={'color': (255, 255, 0), 'width': 1.5})
         self.is_peaks0_checked = True
         self.is_peaks1_checked = True
         self.current_check_dict = {"ts0": True, "ts1": True, "peaks0": True, "peaks1": True}
@@ -148,7 +165,9 @@ class MyDisplay(CDisplay):
         self.current_data_rawBuffer1_FFT = np.array([])
         self.data_acqStamp_ucap = 0
         self.data_acqStamp = 1
-        self.freeze_everything = False
+        self.capture_join_buffer = AcqStampJoinBuffer(max_size = CAPTURE_JOIN_BUFFER_SIZE, max_wait = CAPTURE_JOIN_MAX_WAIT)
+        self.last_fft_frame_dict = {}
+        self.freeze_everything = bool(self.message_bus.getRetained(TOPIC_FREEZE, default = False))
         self.firstPlotPaintedDict = {}
         self.data_generic_dict = {}
 
@@ -159,12 +178,17 @@ class MyDisplay(CDisplay):
         self.app = CApplication.instance()
 
         # import cern package for handling exceptions
-        self.cern = jp.JPackage("cern")
+        self.cern = getCernPackage()
 
         # set current device
         self.current_device = "SP.BA1.BLMDIAMOND.2"
         self.current_accelerator = "SPS"
-        self.LoadDeviceFromTxtPremain()
+        self.LoadDeviceFromPremain()
+
+        # start the hdf5 recorder (one file per session)
+        self.hdf5_recorder = None
+        if RECORDING_ENABLED:
+            self.startRecording()
 
         # get the property list
         self.property_list = list(self.pyccda_dictionary[self.current_accelerator][self.current_device]["acquisition"].keys())
@@ -211,6 +235,10 @@ class MyDisplay(CDisplay):
         print("{} - Handling signals and slots...".format(UI_FILENAME))
         self.bindWidgets()
 
+        # feed the aggregators from the simulated devices (there are no control system channels to connect to)
+        if isSimulatorBackend():
+            self.startSimulatedChannelFeed()
+
         # load and set the channels
         print("{} - Setting all channels...".format(UI_FILENAME))
         # self.setChannels()
@@ -327,6 +355,7 @@ class MyDisplay(CDisplay):
         self.contextFrameDict = {}
         self.staticPlotDict = {}
         self.pyqtPlotDict = {}
+        self.pyqtCurveDict = {}
         self.cvalueAggregatorDict = {}
         self.frameDict = {}
         self.tableViewDict = {}
@@ -632,6 +661,7 @@ class MyDisplay(CDisplay):
                     self.pyqtPlotDict["{}_{}".format(property, field)].getPlotItem().setLabel(axis='left', text=y_label)
                     self.pyqtPlotDict["{}_{}".format(property, field)].getPlotItem().setLabel(axis='bottom', text=x_label)
                     self.layoutDict["vertical_layout_tab_CStaticplot_area_{}".format(property)].addWidget(self.pyqtPlotDict["{}_{}".format(property, field)])
+                    self.pyqtCurveDict["{}_{}".format(property, field)] = self.pyqtPlotDict["{}_{}".format(property, field)].plot(pen=(255, 255, 255), name="{}_{}".format(property, field))
 
                 # add the plotting area to the layout
                 self.layoutDict["horizontal_layout_tab_{}".format(property)].addWidget(self.contextFrameDict["CStaticPlot_area_{}".format(property)])
@@ -747,6 +777,9 @@ class MyDisplay(CDisplay):
         self.plot_rawbuf0.getPlotItem().setLabel(axis='bottom', text='time (microseconds)')
         self.verticalLayout_CContextFrame_CaptureTab_rawBuf0.addWidget(self.plot_rawbuf0)
         self.verticalLayout_CContextFrame_CaptureTab_rawBuf0.addItem(self.horizontalLayout_CaptureTab_rawBuf0)
+        self.curve_rawbuf0 = DecimatedCurveItem(pen=(255, 255, 255), name="rawBuf0")
+        self.plot_rawbuf0.addItem(self.curve_rawbuf0)
+        self.plot_rawbuf0.addItem(self.turn_markers_0)
 
         # pyqtgraph plot for rabuf1
         self.verticalLayout_CContextFrame_CaptureTab_rawBuf1.removeItem(self.horizontalLayout_CaptureTab_rawBuf1)
@@ -762,6 +795,9 @@ class MyDisplay(CDisplay):
         self.plot_rawbuf1.getPlotItem().setLabel(axis='bottom', text='time (microseconds)')
         self.verticalLayout_CContextFrame_CaptureTab_rawBuf1.addWidget(self.plot_rawbuf1)
         self.verticalLayout_CContextFrame_CaptureTab_rawBuf1.addItem(self.horizontalLayout_CaptureTab_rawBuf1)
+        self.curve_rawbuf1 = DecimatedCurveItem(pen=(255, 255, 255), name="rawBuf1")
+        self.plot_rawbuf1.addItem(self.curve_rawbuf1)
+        self.plot_rawbuf1.addItem(self.turn_markers_1)
 
         # pyqtgraph plot for rabuf0_fft
         self.verticalLayout_CContextFrame_CaptureTab_rawBuf0_FFT.removeItem(self.horizontalLayout_CaptureTab_rawBuf0_FFT)
@@ -775,6 +811,9 @@ class MyDisplay(CDisplay):
         self.plot_rawbuf0_fft.getPlotItem().setLabel(axis='bottom', text='frequency (kHz)')
         self.verticalLayout_CContextFrame_CaptureTab_rawBuf0_FFT.addWidget(self.plot_rawbuf0_fft)
         self.verticalLayout_CContextFrame_CaptureTab_rawBuf0_FFT.addItem(self.horizontalLayout_CaptureTab_rawBuf0_FFT)
+        self.scatter_peaks_rawbuf0_fft = self.plot_rawbuf0_fft.plot(pen=None, symbolBrush=(255,255,0), symbol='x', symbolPen=(255,255,0), symbolSize=8, name="rawBuf0_peaks")
+        self.curve_rawbuf0_fft = self.plot_rawbuf0_fft.plot(pen=(255, 255, 255), name="rawBuf0_FFT")
+        self.scatter_peaks_rawbuf0_fft.setVisible(False)
 
         # pyqtgraph plot for rabuf1_fft
         self.verticalLayout_CContextFrame_CaptureTab_rawBuf1_FFT.removeItem(self.horizontalLayout_CaptureTab_rawBuf1_FFT)
@@ -788,6 +827,9 @@ class MyDisplay(CDisplay):
         self.plot_rawbuf1_fft.getPlotItem().setLabel(axis='bottom', text='frequency (kHz)')
         self.verticalLayout_CContextFrame_CaptureTab_rawBuf1_FFT.addWidget(self.plot_rawbuf1_fft)
         self.verticalLayout_CContextFrame_CaptureTab_rawBuf1_FFT.addItem(self.horizontalLayout_CaptureTab_rawBuf1_FFT)
+        self.scatter_peaks_rawbuf1_fft = self.plot_rawbuf1_fft.plot(pen=None, symbolBrush=(255,255,0), symbol='x', symbolPen=(255,255,0), symbolSize=8, name="rawBuf1_peaks")
+        self.curve_rawbuf1_fft = self.plot_rawbuf1_fft.plot(pen=(255, 255, 255), name="rawBuf1_FFT")
+        self.scatter_peaks_rawbuf1_fft.setVisible(False)
 
         # aggregator for Capture
         self.CValueAggregator_Capture = CValueAggregator(self)
@@ -856,6 +898,10 @@ class MyDisplay(CDisplay):
         # rbac logout signal
         self.app._rbac.logout_finished.connect(self.rbacLogoutSucceeded)
 
+        # local fft of the captures
+        self.local_fft_runner = LocalFFTRunner(window = LOCAL_FFT_WINDOW, segment_size = LOCAL_FFT_SEGMENT_SIZE, parent = self)
+        self.local_fft_runner.processed.connect(self.receiveDataFromLocalFFT)
+
         # capture tab aggregator signals
         self.CValueAggregator_Capture.updateTriggered['PyQt_PyObject'].connect(self.receiveDataFromCapture)
         self.CValueAggregator_Capture_FFT.updateTriggered['PyQt_PyObject'].connect(self.receiveDataFromCaptureFFT)
@@ -866,19 +912,18 @@ class MyDisplay(CDisplay):
         # aggregator signal for general information
         self.cvalueAggregatorDict["{}".format("GeneralInformation")].updateTriggered['PyQt_PyObject'].connect(self.receiveDataFromGeneralInformation)
 
-        # singleshot qtimer for adding a delay to the timer_keep_calling_capture_function_until_stamps_are_the_same timer
-        self.single_shot_timer = QTimer(self)
+        # singleshot qtimer that fires when the oldest frame of the join buffer stops waiting for its other half
+        self.timer_capture_join_buffer = QTimer(self)
+        self.timer_capture_join_buffer.setSingleShot(True)
+        self.timer_capture_join_buffer.timeout.connect(self.captureJoinBufferExpired)
 
-        # init qtimer for capture
-        self.timer_keep_calling_capture_function_until_stamps_are_the_same = QTimer(self)
-        self.timer_keep_calling_capture_function_until_stamps_are_the_same.setInterval(250)
-        self.timer_keep_calling_capture_function_until_stamps_are_the_same.timeout.connect(self.plotCaptureFunction)
+        # singleshot qtimer that plots the joined frames once the aux_time of the ucap frame is reached
+        self.timer_capture_aux_time = QTimer(self)
+        self.timer_capture_aux_time.setSingleShot(True)
+        self.timer_capture_aux_time.timeout.connect(self.plotJoinedFramesAtAuxTime)
 
-        # set up a qtimer for the freezing events
-        self.timer_for_freezing_events = QTimer(self)
-        self.timer_for_freezing_events.setInterval(500)
-        self.timer_for_freezing_events.timeout.connect(self.readFreezeFile)
-        self.timer_for_freezing_events.start()
+        # receive the freezing events
+        self.message_bus.freezeChanged.connect(self.readFreezeFile)
 
         # signal that gets activated when the current tab changes
         self.tabWidget.currentChanged.connect(self.tabChanged)
@@ -887,6 +932,17 @@ class MyDisplay(CDisplay):
 
     #----------------------------------------------#
 
+    # function that updates the curve of an array field in place
+    def updateGenericCurve(self, property, field):
+
+        # update the data of the persistent curve
+        self.pyqtCurveDict["{}_{}".format(property, field)].setData(self.data_generic_dict[property][field])
+        self.pyqtPlotDict["{}_{}".format(property, field)].show()
+
+        return
+
+    #----------------------------------------------#
+
     # function to update tab name and index
     def tabChanged(self, tab_index):
 
@@ -926,9 +982,7 @@ class MyDisplay(CDisplay):
                     if field in self.data_generic_dict[self.current_tab_name].keys():
 
                         # update plots
-                        self.pyqtPlotDict["{}_{}".format(self.current_tab_name, field)].clear()
-                        self.pyqtPlotDict["{}_{}".format(self.current_tab_name, field)].plot(self.data_generic_dict[self.current_tab_name][field], pen=(255, 255, 255), name="{}_{}".format(self.current_tab_name, field))
-                        self.pyqtPlotDict["{}_{}".format(self.current_tab_name, field)].show()
+                        self.updateGenericCurve(self.current_tab_name, field)
 
                         # first plot boolean
                         self.firstPlotPaintedDict[self.current_tab_name][field] = True
@@ -1040,6 +1094,9 @@ class MyDisplay(CDisplay):
                     self.data_generic_dict[property]["acqStamp"] = data["acqStamp"]
                     self.data_generic_dict[property]["cycleName"] = data["cycleName"]
 
+                    # record it
+                    self.recordAcquisition(property, data)
+
                     # init new data model
                     new_table_data_model = []
 
@@ -1083,9 +1140,7 @@ class MyDisplay(CDisplay):
                             if self.current_tab_name == property:
 
                                 # update plots
-                                self.pyqtPlotDict["{}_{}".format(property, field)].clear()
-                                self.pyqtPlotDict["{}_{}".format(property, field)].plot(self.data_generic_dict[property][field], pen=(255, 255, 255), name="{}_{}".format(property, field))
-                                self.pyqtPlotDict["{}_{}".format(property, field)].show()
+                                self.updateGenericCurve(property, field)
 
                                 # first plot boolean
                                 self.firstPlotPaintedDict[property][field] = True
@@ -1114,45 +1169,260 @@ class MyDisplay(CDisplay):
             self.app.main_window.statusBar().repaint()
             return
 
-        # first time init
-        self.firstTimeCapture = True
-
         # print
         if verbose:
             print("{} - Received data from the Capture property!".format(UI_FILENAME))
-
-        # get acqStamp and cycleName
-        self.data_acqStamp = data['acqStamp']
-        self.data_cycleName = data['cycleName']
-
-        # print
-        if verbose:
-            print("{} - CAPTURE TIMESTAMP: {}".format(UI_FILENAME, self.data_acqStamp))
+            print("{} - CAPTURE TIMESTAMP: {}".format(UI_FILENAME, data['acqStamp']))
 
         # check that the arrays are different with respect to the previous iteration
         if self.bufferFirstPlotsPainted:
             if np.array_equal(self.data_rawBuf0, data['rawBuf0']) and np.array_equal(self.data_rawBuf1, data['rawBuf1']):
                 return
 
-        # store the rest of the data
-        self.data_rawBuf0 = data['rawBuf0']
-        self.data_rawBuf1= data['rawBuf1']
-        self.data_rawBufFlags0 = data['rawBufFlags0']
-        self.data_rawBufFlags1 = data['rawBufFlags1']
+        # record it
+        self.recordAcquisition("Capture", data)
+
+        # keep the capture until the fft with the same stamp is received
+        capture_frame = {"acqStamp": data['acqStamp'],
+                         "cycleName": data['cycleName'],
+                         "rawBuf0": data['rawBuf0'],
+                         "rawBuf1": data['rawBuf1'],
+                         "rawBufFlags0": data['rawBufFlags0'],
+                         "rawBufFlags1": data['rawBufFlags1']}
+        joined_frames = self.capture_join_buffer.addCapture(data['acqStamp'], capture_frame, time.monotonic())
+
+        # plot both as soon as the stamps are the same
+        if joined_frames is not None:
+            self.plotJoinedFrames(joined_frames[0], joined_frames[1])
+        self.startCaptureJoinBufferTimer()
 
-        # wait until data from UCAP is received AND stamps are the same
-        if self.timer_keep_calling_capture_function_until_stamps_are_the_same.isActive() == False:
-            self.single_shot_timer.singleShot(5000, self.singleShot)
+        # compute the fft locally too
+        if FFT_SOURCE != FFT_SOURCE_UCAP:
+            self.startLocalFFT(capture_frame)
 
         return
 
     #----------------------------------------------#
 
-    # delay function
-    def singleShot(self):
+    # function that computes the fft of a capture on a thread
+    def startLocalFFT(self, capture_frame):
 
-        # start the timer after a delay
-        self.timer_keep_calling_capture_function_until_stamps_are_the_same.start()
+        # the overtones are the harmonics of the revolution frequency (kHz)
+        if self.current_accelerator == "LHC":
+            fundamental = 1000 / TURN_TIME_LHC
+        else:
+            fundamental = 1000 / TURN_TIME_SPS
+
+        # only the last capture is kept while the previous one is being computed
+        self.local_fft_runner.compute(capture_frame, fundamental = fundamental)
+
+        return
+
+    #----------------------------------------------#
+
+    # connect function
+    def receiveDataFromLocalFFT(self, fft_frame, verbose = True):
+
+        # print
+        if verbose:
+            print("{} - Computed the local FFT!".format(UI_FILENAME))
+            print("{} - LOCAL FFT TIMESTAMP: {}".format(UI_FILENAME, fft_frame['acqStamp']))
+
+        # add it to the join buffer
+        self.addFFTFrame(fft_frame, FFT_SOURCE_LOCAL)
+
+        return
+
+    #----------------------------------------------#
+
+    # function that adds an fft frame (local or from ucap) to the join buffer
+    def addFFTFrame(self, fft_frame, source):
+
+        # compare both sources
+        if FFT_SOURCE == FFT_SOURCE_BOTH:
+            self.compareFFTSources(fft_frame, source)
+
+        # keep the fft until the capture with the same stamp is received
+        joined_frames = self.capture_join_buffer.addFFT(fft_frame['acqStamp'], fft_frame, time.monotonic())
+
+        # plot both as soon as the stamps are the same
+        if joined_frames is not None:
+            self.plotJoinedFrames(joined_frames[0], joined_frames[1])
+        self.startCaptureJoinBufferTimer()
+
+        return
+
+    #----------------------------------------------#
+
+    # function that compares the overtones of the local fft and the ucap node for the same stamp
+    def compareFFTSources(self, fft_frame, source):
+
+        # store the last frame of the source
+        self.last_fft_frame_dict[source] = fft_frame
+
+        # get the last frame of the other source
+        if source == FFT_SOURCE_LOCAL:
+            other_fft_frame = self.last_fft_frame_dict.get(FFT_SOURCE_UCAP)
+        else:
+            other_fft_frame = self.last_fft_frame_dict.get(FFT_SOURCE_LOCAL)
+
+        # print the difference if both computed the same stamp
+        if other_fft_frame is not None and other_fft_frame['acqStamp'] == fft_frame['acqStamp']:
+            max_diff_list = compareFFTFrames(fft_frame, other_fft_frame)
+            print("{} - LOCAL VS UCAP OVERTONES: max difference of {:.2f} kHz (buf0) and {:.2f} kHz (buf1)".format(UI_FILENAME, max_diff_list[0], max_diff_list[1]))
+
+        return
+
+    #----------------------------------------------#
+
+    # function that feeds all the aggregators from the simulated devices
+    def startSimulatedChannelFeed(self):
+
+        # one simulated channel per aggregator
+        self.simulated_channel_feed = SimulatedChannelFeed(parent = self)
+        self.simulated_channel_feed.addAggregator(self.CValueAggregator_Capture, "{}/Capture".format(self.current_device), selector = self.current_selector)
+        self.simulated_channel_feed.addAggregator(self.CValueAggregator_Capture_FFT, "UCAP.VD.{}/bufferFFT".format(self.current_device), selector = self.current_selector)
+        for property in self.cvalueAggregatorDict.keys():
+            self.simulated_channel_feed.addAggregator(self.cvalueAggregatorDict[property], "{}/{}".format(self.current_device, property), selector = self.current_selector)
+        self.simulated_channel_feed.start()
+
+        # print
+        print("{} - Using the simulated device {}".format(UI_FILENAME, self.current_device))
+
+        return
+
+    #----------------------------------------------#
+
+    # function that starts recording the acquisitions in an hdf5 file
+    def startRecording(self):
+
+        # get the folder
+        if RECORDING_DIR:
+            recording_dir = RECORDING_DIR
+        else:
+            recording_dir = os.path.join(self.app_temp_dir, "recordings")
+        if not os.path.exists(recording_dir):
+            os.makedirs(recording_dir)
+
+        # start the writer thread (and stop it when the app quits so that the file is closed properly)
+        recording_path = os.path.join(recording_dir, "{}_{}.h5".format(self.current_device, time.strftime("%Y%m%d_%H%M%S")))
+        self.hdf5_recorder = HDF5Recorder(recording_path, compression = RECORDING_COMPRESSION)
+        self.hdf5_recorder.start()
+        self.app.aboutToQuit.connect(self.hdf5_recorder.stop)
+
+        # print
+        print("{} - Recording {} in {}".format(UI_FILENAME, ", ".join(RECORDING_PROPERTIES), recording_path))
+
+        return
+
+    #----------------------------------------------#
+
+    # function that sends an acquisition to the hdf5 recorder
+    def recordAcquisition(self, property, data):
+
+        # only the selected properties
+        if self.hdf5_recorder is None or property not in RECORDING_PROPERTIES:
+            return
+
+        # it is dropped if the writer cannot keep up
+        if not self.hdf5_recorder.record(self.current_device, property, data):
+            print("{} - The recorder is busy, {} acquisition dropped ({} so far)".format(UI_FILENAME, property, self.hdf5_recorder.n_dropped))
+
+        return
+
+    #----------------------------------------------#
+
+    # function that stores the data of a capture frame
+    def loadCaptureFrame(self, capture_frame):
+
+        # first time init
+        self.firstTimeCapture = True
+
+        # store the data
+        self.data_acqStamp = capture_frame['acqStamp']
+        self.data_cycleName = capture_frame['cycleName']
+        self.data_rawBuf0 = capture_frame['rawBuf0']
+        self.data_rawBuf1 = capture_frame['rawBuf1']
+        self.data_rawBufFlags0 = capture_frame['rawBufFlags0']
+        self.data_rawBufFlags1 = capture_frame['rawBufFlags1']
+
+        return
+
+    #----------------------------------------------#
+
+    # function that stores the data of a ucap fft frame
+    def loadFFTFrame(self, fft_frame):
+
+        # first time init
+        self.firstTimeUcap = True
+
+        # store the data
+        self.data_aux_time = fft_frame['aux_time']
+        self.data_rawBuffer0_FFT = fft_frame['rawBuffer0_FFT']
+        self.data_rawBuffer1_FFT = fft_frame['rawBuffer1_FFT']
+        self.data_peaks_freq0 = fft_frame['peaks_freq0']
+        self.data_peaks_freq1 = fft_frame['peaks_freq1']
+        self.data_peaks_freq0_xplots = fft_frame['peaks_freq0_xplots']
+        self.data_peaks_freq1_xplots = fft_frame['peaks_freq1_xplots']
+        self.data_acqStamp_ucap = fft_frame['acqStamp']
+        self.data_cycleName_ucap = fft_frame['cycleName']
+
+        return
+
+    #----------------------------------------------#
+
+    # function that plots a capture and the fft with the same stamp
+    def plotJoinedFrames(self, capture_frame, fft_frame):
+
+        # store both and plot them (a newer pair replaces the one waiting for its aux_time)
+        self.loadCaptureFrame(capture_frame)
+        self.loadFFTFrame(fft_frame)
+        self.plotJoinedFramesAtAuxTime()
+
+        return
+
+    #----------------------------------------------#
+
+    # function that plots the stored frames or waits until the aux_time of the ucap frame is reached
+    def plotJoinedFramesAtAuxTime(self):
+
+        # the timer can fire a bit early, so re-arm it until the time is reached
+        remaining_time = self.data_aux_time - time.time()
+        if remaining_time > 0:
+            self.timer_capture_aux_time.start(max(1, int(math.ceil(remaining_time * 1000))))
+        else:
+            self.timer_capture_aux_time.stop()
+            self.plotCaptureFunction()
+
+        return
+
+    #----------------------------------------------#
+
+    # function that starts the timer until the next frame of the join buffer expires
+    def startCaptureJoinBufferTimer(self):
+
+        # stop it if there is nothing waiting
+        next_deadline = self.capture_join_buffer.getNextDeadline()
+        if next_deadline is None:
+            self.timer_capture_join_buffer.stop()
+        else:
+            self.timer_capture_join_buffer.start(max(0, int(math.ceil((next_deadline - time.monotonic()) * 1000))))
+
+        return
+
+    #----------------------------------------------#
+
+    # function that handles the frames that did not receive their other half in time
+    def captureJoinBufferExpired(self):
+
+        # plot only the buffer of the last capture that did not get its fft
+        expired_captures = self.capture_join_buffer.popExpired(time.monotonic())
+        if expired_captures:
+            self.loadCaptureFrame(expired_captures[-1])
+            self.plotCaptureFunction()
+
+        # wait for the next one
+        self.startCaptureJoinBufferTimer()
 
         return
 
@@ -1173,10 +1443,6 @@ class MyDisplay(CDisplay):
                 # check that both stamps are the same
                 if self.data_acqStamp == self.data_acqStamp_ucap:
 
-                    # disable the timer
-                    if self.timer_keep_calling_capture_function_until_stamps_are_the_same.isActive() == True:
-                        self.timer_keep_calling_capture_function_until_stamps_are_the_same.stop()
-
                     # double check
                     if time.time() >= self.data_aux_time:
 
@@ -1245,17 +1511,13 @@ class MyDisplay(CDisplay):
                                             self.data_turn_line_eq_params_1[1]) * flags_five_six + self.data_turn_line_eq_params_1[2]
 
                         # plot the data for buf0
-                        self.plot_rawbuf0.getPlotItem().clear()
-                        self.plot_rawbuf0_fft.getPlotItem().clear()
-                        self.plot_rawbuf0.plot(x=self.time_vector, y=self.data_rawBuf0, pen=(255, 255, 255), name="rawBuf0")
-                        if self.flags_turn0.size != 0 and self.is_turn0_checked:
-                            # self.plot_rawbuf0.plot(x=self.time_vector, y=self.flags_turn0, pen=(255, 255, 0), name="rawBuf0_turn_flags")
-                            for line_pos in self.inf_lines_pos_0:
-                                infinite_line = pg.InfiniteLine(pos=line_pos, movable=False, angle=90, pen={'color': (255, 255, 0), 'width': 1.5}, label=None)
-                                self.plot_rawbuf0.addItem(infinite_line)
-                        if self.data_peaks_freq0_xplots.size != 0 and self.is_peaks0_checked:
-                            self.plot_rawbuf0_fft.plot(x=self.data_peaks_freq0_xplots[1], y=self.data_peaks_freq0_xplots[0], pen=None, symbolBrush=(255,255,0), symbol='x', symbolPen=(255,255,0), symbolSize=8, name="rawBuf0_peaks")
-                        self.plot_rawbuf0_fft.plot(x=self.data_rawBuffer0_FFT[1, :], y=self.data_rawBuffer0_FFT[0, :], pen=(255, 255, 255), name="rawBuf0_FFT")
+                        self.curve_rawbuf0.setPyramidData(self.time_vector, self.data_rawBuf0)
+                        self.turn_markers_0.setPositions(self.inf_lines_pos_0)
+                        self.turn_markers_0.setVisible(self.flags_turn0.size != 0 and self.is_turn0_checked)
+                        if self.data_peaks_freq0_xplots.size != 0:
+                            self.scatter_peaks_rawbuf0_fft.setData(x=self.data_peaks_freq0_xplots[1], y=self.data_peaks_freq0_xplots[0])
+                        self.scatter_peaks_rawbuf0_fft.setVisible(self.data_peaks_freq0_xplots.size != 0 and self.is_peaks0_checked)
+                        self.curve_rawbuf0_fft.setData(x=self.data_rawBuffer0_FFT[1, :], y=self.data_rawBuffer0_FFT[0, :])
                         self.plot_rawbuf0.show()
                         self.plot_rawbuf0_fft.show()
 
@@ -1281,17 +1543,13 @@ class MyDisplay(CDisplay):
                         self.tableView_overtones_0.update()
 
                         # plot the data for buf1
-                        self.plot_rawbuf1.getPlotItem().clear()
-                        self.plot_rawbuf1_fft.getPlotItem().clear()
-                        self.plot_rawbuf1.plot(x=self.time_vector, y=self.data_rawBuf1, pen=(255, 255, 255), name="rawBuf1")
-                        if self.flags_turn1.size != 0 and self.is_turn1_checked:
-                            # self.plot_rawbuf1.plot(x=self.time_vector, y=self.flags_turn1, pen=(255, 255, 0), name="rawBuf1_turn_flags")
-                            for line_pos in self.inf_lines_pos_1:
-                                infinite_line = pg.InfiniteLine(pos=line_pos, movable=False, angle=90, pen={'color': (255, 255, 0), 'width': 1.5}, label=None)
-                                self.plot_rawbuf1.addItem(infinite_line)
-                        if self.data_peaks_freq1_xplots.size != 0 and self.is_peaks1_checked:
-                            self.plot_rawbuf1_fft.plot(x=self.data_peaks_freq1_xplots[1], y=self.data_peaks_freq1_xplots[0], pen=None, symbolBrush=(255,255,0), symbol='x', symbolPen=(255,255,0), symbolSize=8, name="rawBuf1_peaks")
-                        self.plot_rawbuf1_fft.plot(x=self.data_rawBuffer1_FFT[1, :], y=self.data_rawBuffer1_FFT[0, :], pen=(255, 255, 255), name="rawBuf1_FFT")
+                        self.curve_rawbuf1.setPyramidData(self.time_vector, self.data_rawBuf1)
+                        self.turn_markers_1.setPositions(self.inf_lines_pos_1)
+                        self.turn_markers_1.setVisible(self.flags_turn1.size != 0 and self.is_turn1_checked)
+                        if self.data_peaks_freq1_xplots.size != 0:
+                            self.scatter_peaks_rawbuf1_fft.setData(x=self.data_peaks_freq1_xplots[1], y=self.data_peaks_freq1_xplots[0])
+                        self.scatter_peaks_rawbuf1_fft.setVisible(self.data_peaks_freq1_xplots.size != 0 and self.is_peaks1_checked)
+                        self.curve_rawbuf1_fft.setData(x=self.data_rawBuffer1_FFT[1, :], y=self.data_rawBuffer1_FFT[0, :])
                         self.plot_rawbuf1.show()
                         self.plot_rawbuf1_fft.show()
 
@@ -1363,10 +1621,6 @@ class MyDisplay(CDisplay):
                 self.app.main_window.statusBar().showMessage("CaptureTab - Raw data was received! Waiting for UCAP to send FFT new data...", 0)
                 self.app.main_window.statusBar().repaint()
 
-                # disable the timer
-                if self.timer_keep_calling_capture_function_until_stamps_are_the_same.isActive() == True:
-                    self.timer_keep_calling_capture_function_until_stamps_are_the_same.stop()
-
                 # do not plot if data is just the same
                 if self.bufferFirstPlotsPainted:
                     if np.array_equal(self.data_rawBuf0, self.current_data_rawBuf0) and np.array_equal(self.data_rawBuf1, self.current_data_rawBuf1):
@@ -1420,13 +1674,9 @@ class MyDisplay(CDisplay):
                                     self.data_turn_line_eq_params_1[1]) * flags_five_six + self.data_turn_line_eq_params_1[2]
 
                 # plot the data for buf0
-                self.plot_rawbuf0.getPlotItem().clear()
-                self.plot_rawbuf0.plot(x=self.time_vector, y=self.data_rawBuf0, pen=(255, 255, 255), name="rawBuf0")
-                if self.flags_turn0.size != 0 and self.is_turn0_checked:
-                    # self.plot_rawbuf0.plot(x=self.time_vector, y=self.flags_turn0, pen=(255, 255, 0), name="rawBuf0_turn_flags")
-                    for line_pos in self.inf_lines_pos_0:
-                        infinite_line = pg.InfiniteLine(pos=line_pos, movable=False, angle=90, pen={'color':(255, 255, 0), 'width':1.5}, label=None)
-                        self.plot_rawbuf0.addItem(infinite_line)
+                self.curve_rawbuf0.setPyramidData(self.time_vector, self.data_rawBuf0)
+                self.turn_markers_0.setPositions(self.inf_lines_pos_0)
+                self.turn_markers_0.setVisible(self.flags_turn0.size != 0 and self.is_turn0_checked)
                 self.plot_rawbuf0.show()
 
                 # save current plotted data for checkbuttons
@@ -1436,13 +1686,9 @@ class MyDisplay(CDisplay):
                 self.current_inf_lines_pos_0 = self.inf_lines_pos_0
 
                 # plot the data for buf1
-                self.plot_rawbuf1.getPlotItem().clear()
-                self.plot_rawbuf1.plot(x=self.time_vector, y=self.data_rawBuf1, pen=(255, 255, 255), name="rawBuf1")
-                if self.flags_turn1.size != 0 and self.is_turn1_checked:
-                    # self.plot_rawbuf1.plot(x=self.time_vector, y=self.flags_turn1, pen=(255, 255, 0), name="rawBuf1_turn_flags")
-                    for line_pos in self.inf_lines_pos_1:
-                        infinite_line = pg.InfiniteLine(pos=line_pos, movable=False, angle=90, pen={'color':(255, 255, 0), 'width':1.5}, label=None)
-                        self.plot_rawbuf1.addItem(infinite_line)
+                self.curve_rawbuf1.setPyramidData(self.time_vector, self.data_rawBuf1)
+                self.turn_markers_1.setPositions(self.inf_lines_pos_1)
+                self.turn_markers_1.setVisible(self.flags_turn1.size != 0 and self.is_turn1_checked)
                 self.plot_rawbuf1.show()
 
                 # save current plotted data for checkbuttons
@@ -1479,37 +1725,32 @@ class MyDisplay(CDisplay):
     # connect function
     def receiveDataFromCaptureFFT(self, data, verbose = True):
 
+        # ignore the ucap node if only the local fft is used
+        if FFT_SOURCE == FFT_SOURCE_LOCAL:
+            return
+
         # if the arrays are empty just show a message and return
         if data['rawBuffer0_FFT'].size == 0 or data['rawBuffer1_FFT'].size == 0:
             self.app.main_window.statusBar().showMessage("CaptureTab - Data was received but buffers are empty...", 0)
             self.app.main_window.statusBar().repaint()
             return
 
-        # first time init
-        self.firstTimeUcap = True
-
         # print
         if verbose:
             print("{} - Received data from the UCAP node!".format(UI_FILENAME))
-
-        # store the data
-        self.data_aux_time = data['aux_time']
-        self.data_rawBuffer0_FFT = data['rawBuffer0_FFT']
-        self.data_rawBuffer1_FFT = data['rawBuffer1_FFT']
-        self.data_peaks_freq0 = data['peaks_freq0']
-        self.data_peaks_freq1 = data['peaks_freq1']
-        self.data_peaks_freq0_xplots = data['peaks_freq0_xplots']
-        self.data_peaks_freq1_xplots = data['peaks_freq1_xplots']
-        self.data_acqStamp_ucap = data['acqStamp']
-        self.data_cycleName_ucap = data['cycleName']
-
-        # print
-        if verbose:
-            print("{} - UCAP TIMESTAMP: {}".format(UI_FILENAME, self.data_acqStamp_ucap))
-
-        # wait until data from UCAP is received AND stamps are the same
-        if self.timer_keep_calling_capture_function_until_stamps_are_the_same.isActive() == False:
-            self.single_shot_timer.singleShot(5000, self.singleShot)
+            print("{} - UCAP TIMESTAMP: {}".format(UI_FILENAME, data['acqStamp']))
+
+        # keep the fft until the capture with the same stamp is received
+        fft_frame = {"acqStamp": data['acqStamp'],
+                     "cycleName": data['cycleName'],
+                     "aux_time": data['aux_time'],
+                     "rawBuffer0_FFT": data['rawBuffer0_FFT'],
+                     "rawBuffer1_FFT": data['rawBuffer1_FFT'],
+                     "peaks_freq0": data['peaks_freq0'],
+                     "peaks_freq1": data['peaks_freq1'],
+                     "peaks_freq0_xplots": data['peaks_freq0_xplots'],
+                     "peaks_freq1_xplots": data['peaks_freq1_xplots']}
+        self.addFFTFrame(fft_frame, FFT_SOURCE_UCAP)
 
         return
 
@@ -1582,38 +1823,25 @@ class MyDisplay(CDisplay):
 
     #----------------------------------------------#
 
-    # function that loads the device from the aux txt file
-    def LoadDeviceFromTxtPremain(self):
-
-        # read current device
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "current_device_premain.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "current_device_premain.txt"), "r") as f:
-                self.current_device = f.read()
+    # function that loads the device published by premain
+    def LoadDeviceFromPremain(self):
 
-        # read current accelerator
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "current_accelerator_premain.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "current_accelerator_premain.txt"), "r") as f:
-                self.current_accelerator = f.read()
+        # read current device and accelerator
+        selection = self.message_bus.getRetained(TOPIC_SELECTION)
+        if selection:
+            self.current_device = selection["device"]
+            self.current_accelerator = selection["accelerator"]
 
         return
 
     #----------------------------------------------#
 
-    # function that writes the device name into a txt file
+    # function that sends the device to the fullscreen windows
     def writeDeviceIntoTxtForFullScreen(self):
 
-        # create the dir in case it does not exist
-        if not os.path.exists(os.path.join(self.app_temp_dir, "aux_txts")):
-            os.mkdir(os.path.join(self.app_temp_dir, "aux_txts"))
-
-        # write the file
-        with open(os.path.join(self.app_temp_dir, "aux_txts", "current_device.txt"), "w") as f:
-            f.write(str(self.current_device))
-
-        with open(os.path.join(self.app_temp_dir, "aux_txts", "current_accelerator.txt"), "w") as f:
-            f.write(str(self.current_accelerator))
+        # the device and the accelerator are already published by premain (selection topic)
 
-        # write aux files to check if data is plotted in the main window
+        # publish the booleans to check if data is plotted in the main window
         if self.bufferFirstPlotsPainted:
             self.writeAuxBufferFileForFullscreen(is_buffer_plotted=True)
         if self.bufferUcapFirstPlotsPainted:
@@ -1623,11 +1851,11 @@ class MyDisplay(CDisplay):
 
     #----------------------------------------------#
 
-    # function that reads the freezing event txt
-    def readFreezeFile(self):
+    # function that receives the freezing events
+    def readFreezeFile(self, key, is_frozen):
 
         # check if we should freeze the plots
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "freeze.txt")):
+        if is_frozen:
             self.freeze_everything = True
         else:
             self.freeze_everything = False
@@ -1639,41 +1867,24 @@ class MyDisplay(CDisplay):
     # function to add or remove the turn flags from the plot of rawbuf0
     def pleaseShowTurns0(self, state):
 
-        # reset clip to view to avoid errors
-        self.plot_rawbuf0.getPlotItem().setClipToView(False)
-
         # if the button is checked
         if state == Qt.Checked:
 
-            # clear plot and add the new flags
+            # show the turn markers (a single item, so there is no need to clear and replot)
             print("{} - Turns0 button checked...".format(UI_FILENAME))
             self.current_check_dict["ts0"] = True
             self.is_turn0_checked = True
             if self.bufferFirstPlotsPainted:
-                self.plot_rawbuf0.getPlotItem().clear()
-                if self.current_check_dict["ts0"]:
-                    self.plot_rawbuf0.plot(x=self.current_time_vector, y=self.current_data_rawBuf0, pen=(255, 255, 255), name="rawBuf0")
-                if self.current_flags_turn0.size != 0:
-                    # self.plot_rawbuf0.plot(x=self.current_time_vector, y=self.current_flags_turn0, pen=(255, 255, 0), name="rawBuf0_turn_flags")
-                    for line_pos in self.inf_lines_pos_0:
-                        infinite_line = pg.InfiniteLine(pos=line_pos, movable=False, angle=90, pen={'color': (255, 255, 0), 'width': 1.5}, label=None)
-                        self.plot_rawbuf0.addItem(infinite_line)
-                self.plot_rawbuf0.show()
+                self.turn_markers_0.setVisible(self.current_flags_turn0.size != 0)
 
         # if it is not checked
         else:
 
-            # remove the flags
+            # hide the turn markers
             print("{} - Turns0 button unchecked...".format(UI_FILENAME))
             self.current_check_dict["ts0"] = False
             self.is_turn0_checked = False
-            if self.bufferFirstPlotsPainted:
-                self.plot_rawbuf0.getPlotItem().clear()
-                self.plot_rawbuf0.plot(x=self.current_time_vector, y=self.current_data_rawBuf0, pen=(255, 255, 255), name="rawBuf0")
-                self.plot_rawbuf0.show()
-
-        # reset clip to view to avoid errors
-        self.plot_rawbuf0.getPlotItem().setClipToView(True)
+            self.turn_markers_0.setVisible(False)
 
         return
 
@@ -1682,41 +1893,24 @@ class MyDisplay(CDisplay):
     # function to add or remove the turn flags from the plot of rawbuf1
     def pleaseShowTurns1(self, state):
 
-        # reset clip to view to avoid errors
-        self.plot_rawbuf1.getPlotItem().setClipToView(False)
-
         # if the button is checked
         if state == Qt.Checked:
 
-            # clear plot and add the new flags
+            # show the turn markers (a single item, so there is no need to clear and replot)
             print("{} - Turns1 button checked...".format(UI_FILENAME))
             self.current_check_dict["ts1"] = True
             self.is_turn1_checked = True
             if self.bufferFirstPlotsPainted:
-                self.plot_rawbuf1.getPlotItem().clear()
-                if self.current_check_dict["ts1"]:
-                    self.plot_rawbuf1.plot(x=self.current_time_vector, y=self.current_data_rawBuf1, pen=(255, 255, 255), name="rawBuf1")
-                if self.current_flags_turn1.size != 0:
-                    # self.plot_rawbuf1.plot(x=self.current_time_vector, y=self.current_flags_turn1, pen=(255, 255, 0), name="rawBuf1_turn_flags")
-                    for line_pos in self.inf_lines_pos_1:
-                        infinite_line = pg.InfiniteLine(pos=line_pos, movable=False, angle=90, pen={'color': (255, 255, 0), 'width': 1.5}, label=None)
-                        self.plot_rawbuf1.addItem(infinite_line)
-                self.plot_rawbuf1.show()
+                self.turn_markers_1.setVisible(self.current_flags_turn1.size != 0)
 
         # if it is not checked
         else:
 
-            # remove the flags
+            # hide the turn markers
             print("{} - Turns1 button unchecked...".format(UI_FILENAME))
             self.current_check_dict["ts1"] = False
             self.is_turn1_checked = False
-            if self.bufferFirstPlotsPainted:
-                self.plot_rawbuf1.getPlotItem().clear()
-                self.plot_rawbuf1.plot(x=self.current_time_vector, y=self.current_data_rawBuf1, pen=(255, 255, 255), name="rawBuf1")
-                self.plot_rawbuf1.show()
-
-        # reset clip to view to avoid errors
-        self.plot_rawbuf1.getPlotItem().setClipToView(True)
+            self.turn_markers_1.setVisible(False)
 
         return
 
@@ -1728,29 +1922,21 @@ class MyDisplay(CDisplay):
         # if the button is checked
         if state == Qt.Checked:
 
-            # clear plot and add the new peaks
+            # show the peaks
             print("{} - Peaks0 button checked...".format(UI_FILENAME))
             self.current_check_dict["peaks0"] = True
             self.is_peaks0_checked = True
             if self.bufferUcapFirstPlotsPainted:
-                self.plot_rawbuf0_fft.getPlotItem().clear()
-                if self.current_data_peaks_freq0_xplots.size != 0:
-                    self.plot_rawbuf0_fft.plot(x=self.current_data_peaks_freq0_xplots[1], y=self.current_data_peaks_freq0_xplots[0], pen=None, symbolBrush=(255, 255, 0), symbol='x', symbolPen=(255, 255, 0), symbolSize=8, name="rawBuf0_peaks")
-                if self.current_check_dict["peaks0"]:
-                    self.plot_rawbuf0_fft.plot(x=self.current_data_rawBuffer0_FFT[1, :], y=self.current_data_rawBuffer0_FFT[0, :], pen=(255, 255, 255), name="rawBuf0_FFT")
-                self.plot_rawbuf0_fft.show()
+                self.scatter_peaks_rawbuf0_fft.setVisible(self.current_data_peaks_freq0_xplots.size != 0)
 
         # if it is not checked
         else:
 
-            # remove the peaks
+            # hide the peaks
             print("{} - Peaks0 button unchecked...".format(UI_FILENAME))
             self.current_check_dict["peaks0"] = False
             self.is_peaks0_checked = False
-            if self.bufferUcapFirstPlotsPainted:
-                self.plot_rawbuf0_fft.getPlotItem().clear()
-                self.plot_rawbuf0_fft.plot(x=self.current_data_rawBuffer0_FFT[1, :], y=self.current_data_rawBuffer0_FFT[0, :], pen=(255, 255, 255), name="rawBuf0_FFT")
-                self.plot_rawbuf0_fft.show()
+            self.scatter_peaks_rawbuf0_fft.setVisible(False)
 
         return
 
@@ -1762,29 +1948,21 @@ class MyDisplay(CDisplay):
         # if the button is checked
         if state == Qt.Checked:
 
-            # clear plot and add the new peaks
+            # show the peaks
             print("{} - Peaks1 button checked...".format(UI_FILENAME))
             self.current_check_dict["peaks1"] = True
             self.is_peaks1_checked = True
             if self.bufferUcapFirstPlotsPainted:
-                self.plot_rawbuf1_fft.getPlotItem().clear()
-                if self.current_data_peaks_freq1_xplots.size != 0:
-                    self.plot_rawbuf1_fft.plot(x=self.current_data_peaks_freq1_xplots[1], y=self.current_data_peaks_freq1_xplots[0], pen=None, symbolBrush=(255, 255, 0), symbol='x', symbolPen=(255, 255, 0), symbolSize=8, name="rawBuf1_peaks")
-                if self.current_check_dict["peaks1"]:
-                    self.plot_rawbuf1_fft.plot(x=self.current_data_rawBuffer1_FFT[1, :], y=self.current_data_rawBuffer1_FFT[0, :], pen=(255, 255, 255), name="rawBuf1_FFT")
-                self.plot_rawbuf1_fft.show()
+                self.scatter_peaks_rawbuf1_fft.setVisible(self.current_data_peaks_freq1_xplots.size != 0)
 
         # if it is not checked
         else:
 
-            # remove the peaks
+            # hide the peaks
             print("{} - Peaks1 button unchecked...".format(UI_FILENAME))
             self.current_check_dict["peaks1"] = False
             self.is_peaks1_checked = False
-            if self.bufferUcapFirstPlotsPainted:
-                self.plot_rawbuf1_fft.getPlotItem().clear()
-                self.plot_rawbuf1_fft.plot(x=self.current_data_rawBuffer1_FFT[1, :], y=self.current_data_rawBuffer1_FFT[0, :], pen=(255, 255, 255), name="rawBuf1_FFT")
-                self.plot_rawbuf1_fft.show()
+            self.scatter_peaks_rawbuf1_fft.setVisible(False)
 
         return
 
@@ -1813,47 +1991,23 @@ class MyDisplay(CDisplay):
 
     #----------------------------------------------#
 
-    # function to write aux fft file
+    # function to publish the fft boolean
     def writeAuxFFTFileForFullscreen(self, is_fft_plotted = False):
 
-        # create the dir in case it does not exist
-        if not os.path.exists(os.path.join(self.app_temp_dir, "aux_txts")):
-            os.mkdir(os.path.join(self.app_temp_dir, "aux_txts"))
-
-        # write file
-        with open(os.path.join(self.app_temp_dir, "aux_txts", "is_fft_plotted_0.txt"), "w") as f:
-            if is_fft_plotted:
-                f.write("True")
-            else:
-                f.write("False")
-        with open(os.path.join(self.app_temp_dir, "aux_txts", "is_fft_plotted_1.txt"), "w") as f:
-            if is_fft_plotted:
-                f.write("True")
-            else:
-                f.write("False")
+        # publish it for both buffers
+        self.message_bus.publish(TOPIC_FFT_PLOTTED, bool(is_fft_plotted), key = "0")
+        self.message_bus.publish(TOPIC_FFT_PLOTTED, bool(is_fft_plotted), key = "1")
 
         return
 
     #----------------------------------------------#
 
-    # function to write aux buffer file
+    # function to publish the buffer boolean
     def writeAuxBufferFileForFullscreen(self, is_buffer_plotted = False):
 
-        # create the dir in case it does not exist
-        if not os.path.exists(os.path.join(self.app_temp_dir, "aux_txts")):
-            os.mkdir(os.path.join(self.app_temp_dir, "aux_txts"))
-
-        # write file
-        with open(os.path.join(self.app_temp_dir, "aux_txts", "is_buffer_plotted_0.txt"), "w") as f:
-            if is_buffer_plotted:
-                f.write("True")
-            else:
-                f.write("False")
-        with open(os.path.join(self.app_temp_dir, "aux_txts", "is_buffer_plotted_1.txt"), "w") as f:
-            if is_buffer_plotted:
-                f.write("True")
-            else:
-                f.write("False")
+        # publish it for both buffers
+        self.message_bus.publish(TOPIC_BUFFER_PLOTTED, bool(is_buffer_plotted), key = "0")
+        self.message_bus.publish(TOPIC_BUFFER_PLOTTED, bool(is_buffer_plotted), key = "1")
 
         return
 
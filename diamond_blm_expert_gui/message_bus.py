@@ -0,0 +1,328 @@
+########################################################
+########################################################
+
+# GUI created by: martinja
+# Contact: javier.martinez.samblas@cern.ch
+
+########################################################
+########################################################
+
+# PYQT IMPORTS
+
+from PyQt5.QtCore import (QObject, pyqtSignal)
+from PyQt5.QtNetwork import (QLocalServer, QLocalSocket)
+
+# OTHER IMPORTS
+
+import json
+import getpass
+
+########################################################
+########################################################
+
+# GLOBALS
+
+# name of the local socket (one per user so that two users on the same machine do not mix their messages)
+BUS_SERVER_NAME = "diamond_blm_expert_gui_bus_{}".format(getpass.getuser())
+
+# topics (payload in brackets, the key distinguishes the retained messages of the same topic)
+TOPIC_SELECTION = "selection" # (dict with device, accelerator, exception, device_list and preloaded_devices)
+TOPIC_SELECTOR = "selector" # (str)
+TOPIC_WORKING_DEVICES = "working_devices" # (list of devices)
+TOPIC_MODE_STATUS = "mode_status" # key = device (dict with modules_data and errors)
+TOPIC_MODE_STATUS_PREVIEW = "mode_status_preview" # (dict with modules_data and errors)
+TOPIC_FREEZE = "freeze" # (bool)
+TOPIC_BUFFER_PLOTTED = "buffer_plotted" # key = buffer index (bool)
+TOPIC_FFT_PLOTTED = "fft_plotted" # key = buffer index (bool)
+TOPIC_OPEN_DEVICE = "open_device" # (None, not retained)
+
+# signal that is emitted for every topic
+SIGNAL_NAME_DICT = {
+    TOPIC_SELECTION: "selectionChanged",
+    TOPIC_SELECTOR: "selectorChanged",
+    TOPIC_WORKING_DEVICES: "workingDevicesChanged",
+    TOPIC_MODE_STATUS: "modeStatusChanged",
+    TOPIC_MODE_STATUS_PREVIEW: "modeStatusPreviewChanged",
+    TOPIC_FREEZE: "freezeChanged",
+    TOPIC_BUFFER_PLOTTED: "bufferPlottedChanged",
+    TOPIC_FFT_PLOTTED: "fftPlottedChanged",
+    TOPIC_OPEN_DEVICE: "openDeviceRequested",
+}
+
+# topics whose last message is not kept (events)
+NOT_RETAINED_TOPICS = [TOPIC_OPEN_DEVICE]
+
+# special messages (sent by the server once all the retained messages were sent to a new client, and sent to forget the retained messages of a topic)
+SYNC_TOPIC = "__synced__"
+CLEAR_TOPIC = "__clear__"
+
+# process-wide instance of the bus
+MESSAGE_BUS = None
+
+########################################################
+########################################################
+
+# FUNCTIONS
+
+def getMessageBus():
+
+    global MESSAGE_BUS
+
+    if MESSAGE_BUS is None:
+        MESSAGE_BUS = MessageBus()
+
+    return MESSAGE_BUS
+
+########################################################
+########################################################
+
+class MessageBus(QObject):
+
+    #----------------------------------------------#
+
+    # signals (key, payload)
+    selectionChanged = pyqtSignal(str, object)
+    selectorChanged = pyqtSignal(str, object)
+    workingDevicesChanged = pyqtSignal(str, object)
+    modeStatusChanged = pyqtSignal(str, object)
+    modeStatusPreviewChanged = pyqtSignal(str, object)
+    freezeChanged = pyqtSignal(str, object)
+    bufferPlottedChanged = pyqtSignal(str, object)
+    fftPlottedChanged = pyqtSignal(str, object)
+    openDeviceRequested = pyqtSignal(str, object)
+
+    #----------------------------------------------#
+
+    # init function
+    def __init__(self):
+
+        # inherit from QObject
+        QObject.__init__(self)
+
+        # declare attributes
+        self.retained_dict = {}
+        self.server = None
+        self.client_socket_list = []
+        self.socket = None
+        self.is_synced = False
+        self.read_buffer_dict = {}
+
+        return
+
+    #----------------------------------------------#
+
+    # function that publishes a message in this process and in the connected processes
+    def publish(self, topic, payload = None, key = ""):
+
+        # deliver it locally
+        self.deliver(topic, key, payload)
+
+        # send it to the other processes
+        self.forward(topic, key, payload)
+
+        return
+
+    #----------------------------------------------#
+
+    # function that returns the last message of a topic
+    def getRetained(self, topic, key = "", default = None):
+
+        return self.retained_dict.get(topic, {}).get(key, default)
+
+    #----------------------------------------------#
+
+    # function that returns all the retained messages of a topic (key: payload)
+    def getRetainedDict(self, topic):
+
+        return dict(self.retained_dict.get(topic, {}))
+
+    #----------------------------------------------#
+
+    # function that forgets the retained messages of a topic (e.g. the mode status of the devices of a closed summary)
+    def clearRetained(self, topic):
+
+        # clear them here and in the other processes
+        self.retained_dict.pop(topic, None)
+        self.forward(CLEAR_TOPIC, "", topic)
+
+        return
+
+    #----------------------------------------------#
+
+    # function that stores the message and emits the signal of its topic
+    def deliver(self, topic, key, payload):
+
+        # ignore unknown topics
+        if topic not in SIGNAL_NAME_DICT.keys():
+            return
+
+        # store the last message
+        if topic not in NOT_RETAINED_TOPICS:
+            if topic not in self.retained_dict.keys():
+                self.retained_dict[topic] = {}
+            self.retained_dict[topic][key] = payload
+
+        # emit the signal
+        getattr(self, SIGNAL_NAME_DICT[topic]).emit(key, payload)
+
+        return
+
+    #----------------------------------------------#
+
+    # function that sends a message to the other processes (except the one that sent it)
+    def forward(self, topic, key, payload, sender_socket = None):
+
+        # encode the message (one json per line)
+        line = (json.dumps({"topic": topic, "key": key, "payload": payload}, separators=(",", ":")) + "\n").encode("utf-8")
+
+        # server: send it to all the clients
+        for client_socket in self.client_socket_list:
+            if client_socket is not sender_socket:
+                client_socket.write(line)
+
+        # client: send it to the server
+        if self.socket is not None and self.socket.state() == QLocalSocket.ConnectedState:
+            self.socket.write(line)
+
+        return
+
+    #----------------------------------------------#
+
+    # function that starts the local server so that other processes can publish and subscribe
+    def startServer(self, server_name = BUS_SERVER_NAME):
+
+        # do nothing if it is already running
+        if self.server is not None:
+            return True
+
+        # remove a dead socket file left by a crash and listen
+        QLocalServer.removeServer(server_name)
+        self.server = QLocalServer(self)
+        if not self.server.listen(server_name):
+            print("MessageBus - Unable to start the local server {}: {}".format(server_name, self.server.errorString()))
+            self.server = None
+            return False
+        self.server.newConnection.connect(self.acceptConnections)
+
+        return True
+
+    #----------------------------------------------#
+
+    # function that stops the local server
+    def stopServer(self):
+
+        # close the clients and the server
+        for client_socket in self.client_socket_list:
+            client_socket.disconnectFromServer()
+        self.client_socket_list = []
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+        return
+
+    #----------------------------------------------#
+
+    # function that accepts the new clients and sends them the retained messages
+    def acceptConnections(self):
+
+        # iterate over the pending connections
+        while self.server.hasPendingConnections():
+
+            # register the client
+            client_socket = self.server.nextPendingConnection()
+            self.client_socket_list.append(client_socket)
+            self.read_buffer_dict[client_socket] = b""
+            client_socket.readyRead.connect(lambda client_socket=client_socket: self.readSocket(client_socket))
+            client_socket.disconnected.connect(lambda client_socket=client_socket: self.removeClient(client_socket))
+
+            # send the retained messages
+            for topic in self.retained_dict.keys():
+                for key, payload in self.retained_dict[topic].items():
+                    client_socket.write((json.dumps({"topic": topic, "key": key, "payload": payload}, separators=(",", ":")) + "\n").encode("utf-8"))
+            client_socket.write((json.dumps({"topic": SYNC_TOPIC, "key": "", "payload": None}) + "\n").encode("utf-8"))
+
+        return
+
+    #----------------------------------------------#
+
+    # function that forgets a disconnected client
+    def removeClient(self, client_socket):
+
+        # remove it
+        if client_socket in self.client_socket_list:
+            self.client_socket_list.remove(client_socket)
+        self.read_buffer_dict.pop(client_socket, None)
+        client_socket.deleteLater()
+
+        return
+
+    #----------------------------------------------#
+
+    # function that connects to the bus of another process (returns False if there is no server)
+    def connectToServer(self, server_name = BUS_SERVER_NAME, timeout_ms = 1000):
+
+        # do nothing if this process is the server or is already connected
+        if self.server is not None or self.socket is not None:
+            return True
+
+        # connect
+        self.socket = QLocalSocket(self)
+        self.socket.connectToServer(server_name)
+        if not self.socket.waitForConnected(timeout_ms):
+            self.socket = None
+            return False
+        self.read_buffer_dict[self.socket] = b""
+
+        # wait until the retained messages are received so that the callers can read them right away
+        self.is_synced = False
+        while not self.is_synced and self.socket.waitForReadyRead(timeout_ms):
+            self.readSocket(self.socket)
+
+        # keep reading asynchronously
+        self.socket.readyRead.connect(lambda: self.readSocket(self.socket))
+
+        return True
+
+    #----------------------------------------------#
+
+    # function that reads the json lines of a socket
+    def readSocket(self, socket):
+
+        # split the received bytes into complete lines
+        self.read_buffer_dict[socket] = self.read_buffer_dict.get(socket, b"") + bytes(socket.readAll())
+        line_list = self.read_buffer_dict[socket].split(b"\n")
+        self.read_buffer_dict[socket] = line_list.pop()
+
+        # deliver the messages
+        for line in line_list:
+
+            # decode the message
+            try:
+                message = json.loads(line.decode("utf-8"))
+            except ValueError:
+                continue
+
+            # the retained messages were all received
+            if message["topic"] == SYNC_TOPIC:
+                self.is_synced = True
+                continue
+
+            # the retained messages of a topic have to be forgotten
+            if message["topic"] == CLEAR_TOPIC:
+                self.retained_dict.pop(message["payload"], None)
+                if self.server is not None:
+                    self.forward(CLEAR_TOPIC, "", message["payload"], sender_socket = socket)
+                continue
+
+            # deliver it and let the server relay it to the other clients
+            self.deliver(message["topic"], message["key"], message["payload"])
+            if self.server is not None:
+                self.forward(message["topic"], message["key"], message["payload"], sender_socket = socket)
+
+        return
+
+    #----------------------------------------------#
+
+########################################################
+########################################################
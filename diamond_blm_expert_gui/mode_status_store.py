@@ -0,0 +1,62 @@
+########################################################
+########################################################
+
+# GUI created by: martinja
+# Contact: javier.martinez.samblas@cern.ch
+
+########################################################
+########################################################
+
+# IMPORTS
+
+import copy
+import itertools
+
+########################################################
+########################################################
+
+# CLASSES
+
+# last mode status of every device, stamped with a global counter so that the readers only look at what changed since their last read
+class ModeStatusStore:
+
+    def __init__(self, status_dict = None):
+
+        self.counter = itertools.count(1)
+        self.status_dict = {}
+        self.stamp_dict = {}
+        self.last_stamp = 0
+
+        # seed the store (e.g. with the retained messages of the bus)
+        if status_dict:
+            for device, status in status_dict.items():
+                self.update(device, status)
+
+        return
+
+    def update(self, device, status):
+
+        # ignore the messages that do not change anything
+        if self.status_dict.get(device) == status:
+            return False
+
+        # store a copy of the status with a new stamp (the sender can keep changing its dicts in place)
+        self.last_stamp = next(self.counter)
+        self.status_dict[device] = copy.deepcopy(status)
+        self.stamp_dict[device] = self.last_stamp
+
+        return True
+
+    def getStatus(self, device, default = None):
+
+        return self.status_dict.get(device, default)
+
+    def getChangedSince(self, stamp):
+
+        # get the devices whose status changed after the stamp (and the stamp to use in the next read)
+        changed_dict = {device: self.status_dict[device] for device, device_stamp in self.stamp_dict.items() if device_stamp > stamp}
+
+        return changed_dict, self.last_stamp
+
+########################################################
+########################################################
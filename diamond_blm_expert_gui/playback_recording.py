@@ -0,0 +1,75 @@
+########################################################
+########################################################
+
+# GUI created by: martinja
+# Contact: javier.martinez.samblas@cern.ch
+
+########################################################
+########################################################
+
+# PYQT IMPORTS
+
+import pyqtgraph as pg
+
+# OTHER IMPORTS
+
+import sys
+from hdf5_recorder import HDF5RecordingReader
+from plot_items import HDF5CurveItem
+
+########################################################
+########################################################
+
+# GLOBALS
+
+# sampling frequency of the raw buffers (the x axis of the Capture buffers is shown in microseconds)
+FS = 0.65
+
+########################################################
+########################################################
+
+# main function (usage: python playback_recording.py <file.h5> <device> <property> <field> [<field> ...])
+if __name__ == "__main__":
+
+    # get the arguments
+    if len(sys.argv) < 5:
+        print("Usage: python playback_recording.py <file.h5> <device> <property> <field> [<field> ...]")
+        sys.exit(1)
+    path, device, property, field_list = sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4:]
+
+    # open the recording
+    reader = HDF5RecordingReader(path)
+    print("Playing back {} records of {}/{} from {}...".format(reader.getRecordCount(device, property), device, property, path))
+
+    # one plot per field (only the visible window is read from the file)
+    app = pg.mkQApp()
+    window = pg.GraphicsLayoutWidget(title="Playback - {}/{}".format(device, property))
+    for index_field, field in enumerate(field_list):
+
+        # use microseconds for the raw buffers and samples for the rest
+        if property == "Capture":
+            x_step = 1 / (FS * 1000)
+            x_label = "time (microseconds)"
+        else:
+            x_step = 1.0
+            x_label = "sample"
+
+        # the auto range would only see the window that was read (set the full range instead)
+        plot = window.addPlot(row=index_field, col=0, title=field)
+        plot.setLabel(axis='left', text='amplitude')
+        plot.setLabel(axis='bottom', text=x_label)
+        plot.enableAutoRange(False, False)
+        curve = HDF5CurveItem(pen=(255, 255, 255), name=field)
+        plot.addItem(curve)
+        plot.setXRange(0, reader.getFieldLength(device, property, field) * x_step)
+        curve.setRecording(reader, device, property, field, x_step = x_step)
+        plot.enableAutoRange(y=True)
+        plot.setAutoVisible(y=True)
+
+    # run it
+    window.show()
+    app.exec_()
+    reader.close()
+
+########################################################
+########################################################
@@ -0,0 +1,287 @@
+########################################################
+########################################################
+
+# GUI created by: martinja
+# Contact: javier.martinez.samblas@cern.ch
+
+########################################################
+########################################################
+
+# PYQT IMPORTS
+
+from PyQt5.QtCore import QRectF
+import pyqtgraph as pg
+
+# OTHER IMPORTS
+
+import numpy as np
+from signal_utils import MinMaxPyramid
+
+########################################################
+########################################################
+
+# curve that only draws about two points per pixel of the visible range (min and max of each block, taken from a pyramid built once per acquisition)
+class DecimatedCurveItem(pg.PlotCurveItem):
+
+    #----------------------------------------------#
+
+    # init function
+    def __init__(self, *args, **kwargs):
+
+        # declare attributes
+        self.pyramid = None
+        self.sample_key = None
+
+        # inherit from PlotCurveItem
+        pg.PlotCurveItem.__init__(self, *args, **kwargs)
+
+        return
+
+    #----------------------------------------------#
+
+    # function that replaces the full resolution data
+    def setPyramidData(self, x, y):
+
+        # build the pyramid and draw the visible range
+        self.pyramid = MinMaxPyramid(x, y)
+        self.sample_key = None
+        self.replot()
+
+        return
+
+    #----------------------------------------------#
+
+    # the visible range changed (zoom or pan)
+    def viewRangeChanged(self):
+
+        self.replot()
+
+        return
+
+    #----------------------------------------------#
+
+    # function that samples the pyramid for the visible range
+    def replot(self):
+
+        # nothing to draw yet
+        if self.pyramid is None or len(self.pyramid.y) == 0:
+            return
+
+        # use the whole curve until the item is inside a view box
+        view_box = self.getViewBox()
+        if view_box is None or view_box.width() <= 0:
+            x1, x2 = self.pyramid.x[0], self.pyramid.x[-1]
+            max_points = 2 * 1000
+        else:
+            x1, x2 = view_box.viewRange()[0]
+            max_points = 2 * int(view_box.width())
+
+        # update the curve only if the level or the blocks changed
+        x, y, sample_key = self.pyramid.sample(x1, x2, max_points)
+        if sample_key != self.sample_key:
+            self.sample_key = sample_key
+            self.setData(x=x, y=y)
+
+        return
+
+    #----------------------------------------------#
+
+    # the auto range must see the whole curve (the drawn data is only the decimated visible range)
+    def dataBounds(self, axis, frac = 1.0, orthoRange = None):
+
+        # no data yet
+        if self.pyramid is None:
+            return (None, None)
+
+        # bounds from the pyramid
+        bounds = self.pyramid.getBounds(axis, orthoRange = orthoRange)
+        if bounds is None:
+            return (None, None)
+
+        return bounds
+
+    #----------------------------------------------#
+
+########################################################
+########################################################
+
+# curve of a recorded field that only reads the visible window from the hdf5 file (recordings can be larger than the memory)
+class HDF5CurveItem(pg.PlotCurveItem):
+
+    #----------------------------------------------#
+
+    # init function
+    def __init__(self, *args, **kwargs):
+
+        # declare attributes
+        self.reader = None
+        self.dataset_info = None
+        self.x_step = 1.0
+        self.window_key = None
+
+        # inherit from PlotCurveItem
+        pg.PlotCurveItem.__init__(self, *args, **kwargs)
+
+        return
+
+    #----------------------------------------------#
+
+    # function that selects the recorded field (x is the sample index times x_step)
+    def setRecording(self, reader, device, property, field, x_step = 1.0):
+
+        # store it and draw the visible window
+        self.reader = reader
+        self.dataset_info = (device, property, field)
+        self.x_step = x_step
+        self.window_key = None
+        self.replot()
+
+        return
+
+    #----------------------------------------------#
+
+    # the visible range changed (zoom or pan)
+    def viewRangeChanged(self):
+
+        self.replot()
+
+        return
+
+    #----------------------------------------------#
+
+    # function that reads the visible window of the recording
+    def replot(self):
+
+        # nothing to draw yet
+        if self.reader is None:
+            return
+
+        # read the whole field until the item is inside a view box
+        n_samples = self.reader.getFieldLength(*self.dataset_info)
+        view_box = self.getViewBox()
+        if view_box is None or view_box.width() <= 0:
+            start, stop = 0, n_samples
+            max_points = 2 * 1000
+        else:
+            x1, x2 = view_box.viewRange()[0]
+            start = max(0, int(np.floor(x1 / self.x_step)) - 1)
+            stop = min(n_samples, int(np.ceil(x2 / self.x_step)) + 2)
+            max_points = 2 * int(view_box.width())
+
+        # read it only if the window changed
+        if (start, stop, max_points) != self.window_key:
+            self.window_key = (start, stop, max_points)
+            x, y = self.reader.readWindow(*self.dataset_info, start, stop, max_points = max_points)
+            self.setData(x=x * self.x_step, y=y)
+
+        return
+
+    #----------------------------------------------#
+
+########################################################
+########################################################
+
+# vertical markers (e.g. the turn flags) drawn in a single paint call instead of one pg.InfiniteLine per marker
+class TurnMarkersItem(pg.GraphicsObject):
+
+    #----------------------------------------------#
+
+    # init function
+    def __init__(self, positions = None, pen = None):
+
+        # inherit from GraphicsObject
+        pg.GraphicsObject.__init__(self)
+
+        # declare attributes
+        self.positions = np.array([])
+        self.pen = pg.mkPen(pen if pen is not None else {'color': (255, 255, 0), 'width': 1.5})
+        self.bounding_rect = None
+
+        # set the markers
+        if positions is not None:
+            self.setPositions(positions)
+
+        return
+
+    #----------------------------------------------#
+
+    # function that replaces the positions of the markers (x coordinates)
+    def setPositions(self, positions):
+
+        # keep them sorted to cull them with a binary search
+        self.prepareGeometryChange()
+        self.positions = np.sort(np.asarray(positions, dtype=float))
+        self.bounding_rect = None
+        self.update()
+
+        return
+
+    #----------------------------------------------#
+
+    # the markers span the whole visible height, so the view range changes the bounding rect
+    def viewTransformChanged(self):
+
+        self.prepareGeometryChange()
+        self.bounding_rect = None
+        pg.GraphicsObject.viewTransformChanged(self)
+
+        return
+
+    #----------------------------------------------#
+
+    # markers should never be taken into account for the auto range
+    def dataBounds(self, axis, frac = 1.0, orthoRange = None):
+
+        return None
+
+    #----------------------------------------------#
+
+    # function that returns the rect of the markers
+    def boundingRect(self):
+
+        # compute it only once per view change
+        if self.bounding_rect is None:
+            view_rect = self.viewRect()
+            if self.positions.size == 0 or view_rect is None:
+                self.bounding_rect = QRectF()
+            else:
+                pixel_width = self.pixelWidth() or 0
+                self.bounding_rect = QRectF(self.positions[0] - pixel_width, view_rect.top(), self.positions[-1] - self.positions[0] + 2 * pixel_width, view_rect.height())
+
+        return self.bounding_rect
+
+    #----------------------------------------------#
+
+    # function that draws all the visible markers at once
+    def paint(self, p, *args):
+
+        # get the visible range
+        view_rect = self.viewRect()
+        if self.positions.size == 0 or view_rect is None:
+            return
+
+        # cull the markers outside the view
+        visible_positions = self.positions[np.searchsorted(self.positions, view_rect.left(), side='left'):np.searchsorted(self.positions, view_rect.right(), side='right')]
+        if visible_positions.size == 0:
+            return
+
+        # draw only one marker per pixel column when zoomed out
+        pixel_width = self.pixelWidth()
+        if pixel_width:
+            visible_positions = visible_positions[np.unique(np.floor(visible_positions / pixel_width), return_index=True)[1]]
+
+        # build one path with a segment per marker
+        x = np.repeat(visible_positions, 2)
+        y = np.tile([view_rect.top(), view_rect.bottom()], visible_positions.size)
+        path = pg.arrayToQPath(x, y, connect='pairs')
+
+        # draw it
+        p.setPen(self.pen)
+        p.drawPath(path)
+
+        return
+
+    #----------------------------------------------#
+
+########################################################
+########################################################
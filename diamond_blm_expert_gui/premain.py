@@ -11,7 +11,7 @@
 
 from comrad import (CDisplay, CContextFrame, CApplication, PyDMChannelDataSource, CurveData, PointData, PlottingItemData, TimestampMarkerData, TimestampMarkerCollectionData, UpdateSource, rbac)
 from PyQt5.QtGui import (QIcon, QColor, QGuiApplication, QCursor, QStandardItemModel, QStandardItem, QBrush, QPixmap, QFont)
-from PyQt5.QtCore import (QSize, Qt, QTimer, QThread, pyqtSignal, QObject, QEventLoop, QCoreApplication, QRect, QAbstractTableModel)
+from PyQt5.QtCore import (QSize, Qt, QTimer, QThread, pyqtSignal, QObject, QEventLoop, QCoreApplication, QRect, QAbstractTableModel, QRunnable, QThreadPool)
 from PyQt5.QtWidgets import (QSplitter, QHeaderView, QTableView, QGroupBox, QSpacerItem, QFrame, QSizePolicy, QMessageBox, QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QWidget, QProgressDialog, QScrollArea, QPushButton, QAbstractItemView, QAbstractScrollArea)
 from PyQt5.Qt import QItemSelectionModel, QMenu
 
@@ -20,15 +20,17 @@ from PyQt5.Qt import QItemSelectionModel, QMenu
 import sys
 import os
 from time import sleep
-import pyccda
-import pyjapc
-import jpype as jp
-from create_pyccda_json_file import create_pyccda_json_file
+import time
+from japc_backend import createJapc, getCernPackage
+from create_pyccda_json_file import create_pyccda_json_file, load_pyccda_json_file, write_pyccda_cache_file
 import json
 import numpy as np
 import shutil
 import faulthandler
-from general_utils import createCustomTempDir, getSystemTempDir, removeAppDir, readJSONConfigFile
+from general_utils import createCustomTempDir, getSystemTempDir, removeAppDir, readJSONConfigFile, getPersistentCacheDir, writeSnapshot
+from concurrency_utils import iterProbeResults, DeadlineScheduler, callWithRetries, ProbeTimeoutError
+from settings_cache import getNTurnsSettingsCache, getTurnTimeInSeconds, NTURNS_SETTING_DICT
+from message_bus import getMessageBus, TOPIC_SELECTION, TOPIC_SELECTOR, TOPIC_WORKING_DEVICES, TOPIC_MODE_STATUS, TOPIC_MODE_STATUS_PREVIEW, TOPIC_FREEZE
 from datetime import datetime, timedelta, timezone
 import collections
 import random
@@ -92,19 +94,29 @@ UI_FILENAME = "premain.ui"
 
 # paths
 TEMP_DIR_NAME = "temp_diamond_blm_expert_gui"
+CACHE_DIR_NAME = "cache_diamond_blm_expert_gui"
 
 # constants
 JSON_CONFIG_DICT = readJSONConfigFile(os.path.join(REAL_PATH, "config_file.json"))
 RECHECK_DEVICES_PERIOD = float(JSON_CONFIG_DICT["RECHECK_DEVICES_PERIOD"]) # each 1 minute
+NTURNS_UNKNOWN_RECHECK_PERIOD = float(JSON_CONFIG_DICT["NTURNS_UNKNOWN_RECHECK_PERIOD"]) # seconds (modes whose nturns is not known yet)
 ACCEPTANCE_FACTOR = float(JSON_CONFIG_DICT["ACCEPTANCE_FACTOR"]) # larger than 1
 TURN_TIME_LHC = float(JSON_CONFIG_DICT["TURN_TIME_LHC"]) # microseconds
 TURN_TIME_SPS = float(JSON_CONFIG_DICT["TURN_TIME_SPS"]) # microseconds
+CCDA_CACHE_TTL = float(JSON_CONFIG_DICT["CCDA_CACHE_TTL"]) # seconds
+PROBE_MAX_WORKERS = int(JSON_CONFIG_DICT["PROBE_MAX_WORKERS"]) # number of devices probed at the same time
+PROBE_TIMEOUT = float(JSON_CONFIG_DICT["PROBE_TIMEOUT"]) # seconds
+COMMAND_MAX_WORKERS = int(JSON_CONFIG_DICT["COMMAND_MAX_WORKERS"]) # number of devices receiving a command at the same time
+COMMAND_TIMEOUT = float(JSON_CONFIG_DICT["COMMAND_TIMEOUT"]) # seconds (per device, retries included)
+COMMAND_RETRIES = int(JSON_CONFIG_DICT["COMMAND_RETRIES"]) # number of retries of a failed command
+PROGRESSIVE_STARTUP = JSON_CONFIG_DICT["PROGRESSIVE_STARTUP"] == "True" # show the gui before knowing which devices work
 
 # query for the devices
 QUERY = '((global==false) and (deviceClassInfo.name=="BLMDIAMONDVFC") and (timingDomain=="LHC" or timingDomain=="SPS")) or (name=="*dBLM.TEST*")'
 
 # others
 SHOW_COMMANDS_IN_SETTINGS = False
+DEVICE_AVAILABILITY_UNKNOWN = "custom.message.error: DEVICE_AVAILABILITY_UNKNOWN: The availability of the device is still being checked, please wait a few seconds"
 LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY = {}
 DATA_SUBS_SUMMARY = {}
 
@@ -119,6 +131,14 @@ def can_be_converted_to_float(value):
     except ValueError:
         return False
 
+# util function that keeps only the scalars needed to know if a mode is alive (the payload of the acquisition is dropped)
+def get_liveness_scalars(dictValues):
+    liveness_scalars = {}
+    if "rawBuf0" in dictValues.keys():
+        liveness_scalars["rawBuf0_size"] = int(np.size(dictValues["rawBuf0"]))
+        liveness_scalars["is_empty"] = liveness_scalars["rawBuf0_size"] == 0
+    return liveness_scalars
+
 ########################################################
 ########################################################
 
@@ -1400,13 +1420,11 @@ class SettingsDialogAuto(QDialog):
 
     #----------------------------------------------#
 
-    # function that loads the device from the aux txt file
+    # function that loads the selector published by premain
     def LoadSelector(self):
 
-        # read current device
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "current_selector.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "current_selector.txt"), "r") as f:
-                self.current_selector = f.read()
+        # read current selector
+        self.current_selector = getMessageBus().getRetained(TOPIC_SELECTOR, default = self.current_selector)
 
         return
 
@@ -1416,257 +1434,443 @@ class SettingsDialogAuto(QDialog):
 ########################################################
 ########################################################
 
-class GetFieldInfoThreadWorker1ShowUp(QObject):
+class GetFieldInfoSignals1ShowUp(QObject):
 
     #----------------------------------------------#
 
-    # signals
-    finished = pyqtSignal()
-    processed = pyqtSignal(int, list, dict, bool)
-    iterated = pyqtSignal()
+    # signals (show up id, row, column, value, error)
+    processed = pyqtSignal(int, int, int, str, str)
+
+    #----------------------------------------------#
+
+########################################################
+########################################################
+
+class GetGeneralInformationWorker1ShowUp(QRunnable):
 
     #----------------------------------------------#
 
     # init function
-    def __init__(self, r, device_list, property_list, field_list, working_devices, current_accelerator, pyccda_dictionary, japc, cern):
+    def __init__(self, show_up_id, c, device, field_list, japc, signals):
 
-        # inherit from QObject
-        QObject.__init__(self)
+        # inherit from QRunnable
+        QRunnable.__init__(self)
+
+        # declare attributes
+        self.show_up_id = show_up_id
+        self.c = c
+        self.device = device
+        self.field_list = field_list
+        self.japc = japc
+        self.signals = signals
+
+        return
+
+    #----------------------------------------------#
+
+    # run function (all the field cells of one device with a single acquisition)
+    def run(self):
+
+        # selectorOverride for GeneralInformation should be empty
+        selectorOverride = ""
+
+        # get the whole property via pyjapc (all fields arrive together in the same acquisition)
+        try:
+            field_values = self.japc.getParam("{}/{}".format(self.device, "GeneralInformation"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False)
+        except Exception as xcp:
+            field_values = None
+            error = str(xcp)
+
+        # fan the values out to every field row
+        for r, field in enumerate(self.field_list):
+            if field_values is None:
+                self.signals.processed.emit(self.show_up_id, r, self.c, "-", error)
+            elif field not in field_values:
+                self.signals.processed.emit(self.show_up_id, r, self.c, "-", "custom.message.error: FIELD_NOT_FOUND: The field {} is not part of the GeneralInformation property.".format(field))
+            else:
+                self.signals.processed.emit(self.show_up_id, r, self.c, str(field_values[field]), "")
+
+        return
+
+    #----------------------------------------------#
+
+########################################################
+########################################################
+
+class GetFieldInfoWorker1ShowUp(QRunnable):
+
+    #----------------------------------------------#
+
+    # init function
+    def __init__(self, show_up_id, r, c, device, property_list, field_list, current_accelerator, pyccda_dictionary, japc, cern, signals):
+
+        # inherit from QRunnable
+        QRunnable.__init__(self)
 
         # declare attributes
+        self.show_up_id = show_up_id
         self.r = r
-        self.device_list = device_list
+        self.c = c
+        self.device = device
         self.property_list = property_list
         self.field_list = field_list
-        self.working_devices = working_devices
         self.current_accelerator = current_accelerator
         self.pyccda_dictionary = pyccda_dictionary
         self.japc = japc
         self.cern = cern
+        self.signals = signals
 
         return
 
     #----------------------------------------------#
 
-    # start function
-    def start(self):
+    # run function (one cell of the summary table: one device and one mode)
+    def run(self):
+
+        # an unexpected exception should not leave the cell (and hence the whole table) unanswered
+        try:
+            value, error = self.getModeCell(self.property_list[self.r - len(self.field_list)])
 
-        # sleep the thread a bit in a random fashion
-        QThread.msleep(random.randint(250,750))
+        # show the exception in the cell
+        except Exception as xcp:
+            value, error = "-", str(xcp)
 
-        # get row
-        r = self.r
+        # emit the signal with the cell data
+        self.signals.processed.emit(self.show_up_id, self.r, self.c, value, error)
 
-        # boolean to skip general information
-        is_general_information = False
+        return
 
-        # init row list
-        row_list = []
+    #----------------------------------------------#
 
-        # init error dict for that row
-        row_error_dict = {}
+    # function that gets the status of a mode
+    def getModeCell(self, property):
 
-        # operate as a field
-        if r < len(self.field_list):
+        # get the device
+        device = self.device
 
-            # declare the field
-            field = self.field_list[r]
+        # selectorOverride for the working modules table has to be a specific selector
+        # use an empty selector for LHC devices
+        if self.current_accelerator == "LHC":
+            selectorOverride = ""
+        # use SPS.USER.ALL for SPS devices
+        elif self.current_accelerator == "SPS":
+            selectorOverride = "SPS.USER.SFTPRO1"
+        # use an empty selector for the others
+        else:
+            selectorOverride = ""
 
-            # append first element which is the field / mode
-            row_list.append(str(field))
-            row_error_dict[0] = ""
+        # get nturns (from the process-wide settings cache)
+        try:
+            nturns = getNTurnsSettingsCache().getNTurnsForProperty(device, property, self.current_accelerator, self.pyccda_dictionary)
 
-            # iterate over devices
-            for c, device in enumerate(self.device_list):
+        # if this does not work, then nothing should be working (NO_DATA_AVAILABLE_FOR_USER likely)
+        except Exception as xcp:
 
-                # if the device IS working
-                if device in self.working_devices:
+            # print the exception and fall back to nturns = 0 (same as the scheduler of the summary)
+            print("{} - Unable to get nturns of {}/{}: {}".format(UI_FILENAME, device, property, xcp))
+            nturns = 0
 
-                    # selectorOverride for GeneralInformation should be empty
-                    selectorOverride = ""
+        # get the turn time
+        turn_time_in_seconds = getTurnTimeInSeconds(nturns, self.current_accelerator)
 
-                    # get field values via pyjapc
-                    try:
-                        field_value = self.japc.getParam("{}/{}#{}".format(device, "GeneralInformation", field), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False)
-                        row_list.append(str(field_value))
-                        row_error_dict[c+1] = ""
-                    except:
-                        pass
+        # do a GET request via japc
+        try:
 
-                # if the device IS not working
+            # get the fields
+            field_values = self.japc.getParam("{}/{}".format(device, property), timingSelectorOverride=selectorOverride, getHeader=True, noPyConversion=False)
+
+            # get timestamps
+            get_ts = field_values[1]["acqStamp"]
+            current_ts = datetime.now(timezone.utc)
+
+            # for the capture do not care about timestamps
+            if property == "Capture":
+
+                # if the buffer is not empty
+                if field_values[0]["rawBuf0"].size > 0:
+
+                    # if the try did not give an error then it is working
+                    return str(field_values[1]["acqStamp"]), ""
+
+                # if buffers are empty show a custom error
+                else:
+
+                    # BUFFERS_ARE_EMPTY
+                    return "BUFFERS_ARE_EMPTY", "custom.message.error: BUFFERS_ARE_EMPTY: The buffers of the Capture property are empty arrays."
+
+            # for the others we should care about timestamps
+            else:
+
+                # show a custom error if nturns is 0
+                if nturns == 0:
+
+                    # NTURNS_IS_ZERO
+                    return "NTURNS_IS_ZERO", "custom.message.error: NTURNS_IS_ZERO: The field nturns is 0 and hence the mode is not working."
+
+                # normal procedure
                 else:
 
-                    # update the list with null information
-                    row_list.append("-")
-                    row_error_dict[c+1] = "NOT_WORKING_DEVICE"
+                    # compare timestamps
+                    if current_ts - get_ts < timedelta(seconds=turn_time_in_seconds * ACCEPTANCE_FACTOR):
+                        return "MODE_BEING_ANALYZED", "custom.message.error: MODE_BEING_ANALYZED: The mode {} is still being analyzed in a different thread. Wait a few seconds until a decision about its availability is made.".format(property)
+                    else:
+                        return "TIMESTAMP_TOO_OLD", "custom.message.error: TIMESTAMP_TOO_OLD: The ({}) timestamp of the GET call is at least {} seconds older than the current ({}) timestamp.".format(get_ts, turn_time_in_seconds * ACCEPTANCE_FACTOR, current_ts)
+
+        # this exception is usually NO_DATA_AVAILABLE_FOR_USER (happens when it is not initialized yet)
+        except self.cern.japc.core.ParameterException as xcp:
+
+            # NO_DATA_AVAILABLE_FOR_USER
+            return str(xcp.getMessage()).split(":")[0], str(xcp)
+
+    #----------------------------------------------#
+
+########################################################
+########################################################
+
+class workingModesSchedulerSummary(QObject):
+
+    #----------------------------------------------#
+
+    # signals
+    finished = pyqtSignal()
+    processed = pyqtSignal(dict, dict, str)
+
+    #----------------------------------------------#
+
+    # init function
+    def __init__(self, acc_device_list, working_devices, current_accelerator, japc, cern, pyccda_dictionary):
+
+        # inherit from QObject
+        QObject.__init__(self)
+
+        # declare the only timer (single shot, armed to the next deadline of the scheduler)
+        self.timer_next_deadline = QTimer(self)
+        self.timer_next_deadline.setSingleShot(True)
+
+        # declare attributes
+        self.device_list = [device for device in acc_device_list if device in working_devices]
+        self.current_accelerator = current_accelerator
+        self.japc = japc
+        self.cern = cern
+        self.exit_boolean = False
+        self.pyccda_dictionary = pyccda_dictionary
+        self.scheduler = DeadlineScheduler()
+        self.nturns_dict = {}
+        self.modules_data = {}
+        self.errors = {}
+
+        return
+
+    #----------------------------------------------#
+
+    # stop function
+    def stop(self):
+
+        # update stop variable
+        self.exit_boolean = True
+
+        # stop the timer
+        self.timer_next_deadline.stop()
+
+        # emit the finish signal
+        self.finished.emit()
+
+        return
+
+    #----------------------------------------------#
+
+    # function that compares the timestamps and determines if a mode of a device is running or not
+    def compareTimestamps(self, device, property):
+
+        # init check
+        if device not in LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY.keys():
+            return False
+        if property not in LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY[device].keys():
+            return False
 
-                # send signal to update the counter of the progress dialog
-                self.iterated.emit()
+        # get timestamps
+        get_ts = LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY[device][property]
+        current_ts = datetime.now(timezone.utc)
 
-        # operate as a mode
+        # the integral also tells whether the distributions are working
+        if property == "AcquisitionIntegral":
+            target_property_list = ["AcquisitionIntegral", "AcquisitionIntegralDist", "AcquisitionRawDist"]
         else:
+            target_property_list = [property]
 
-            # declare the property
-            property = self.property_list[r-len(self.field_list)]
+        # capture does not depend on nturns
+        if property == "Capture":
 
-            # skip general information property
-            if property == "GeneralInformation":
+            # if the buffer is not empty
+            if not DATA_SUBS_SUMMARY[device][property]["is_empty"]:
 
-                # update boolean
-                is_general_information = True
+                # if the try did not give an error then it is working
+                value = "{}".format(str(get_ts))
+                error = ""
 
-                # emit the signal with all the data
-                self.processed.emit(r, row_list, row_error_dict, is_general_information)
+            # if buffers are empty show a custom error
+            else:
 
-                return
+                # BUFFERS_ARE_EMPTY
+                value = "BUFFERS_ARE_EMPTY"
+                error = "custom.message.error: BUFFERS_ARE_EMPTY: The buffers of the Capture property are empty arrays."
 
-            # append first element which is the field / mode
-            row_list.append(str(property))
-            row_error_dict[0] = ""
+        # modes depending on nturns
+        else:
 
-            # iterate over devices
-            for c, device in enumerate(self.device_list):
+            # get nturns
+            nturns, turn_time_in_seconds = self.nturns_dict[(device, property)]
 
-                # if the device IS working
-                if device in self.working_devices:
+            # show a custom error if nturns is 0
+            if nturns == 0:
 
-                    # selectorOverride for the working modules table has to be a specific selector
-                    # use an empty selector for LHC devices
-                    if self.current_accelerator == "LHC":
-                        selectorOverride = ""
-                    # use SPS.USER.ALL for SPS devices
-                    elif self.current_accelerator == "SPS":
-                        selectorOverride = "SPS.USER.SFTPRO1"
-                    # use an empty selector for the others
-                    else:
-                        selectorOverride = ""
+                # NTURNS_IS_ZERO
+                value = "NTURNS_IS_ZERO"
+                error = "custom.message.error: NTURNS_IS_ZERO: The field nturns is 0 and hence the mode is not working."
 
-                    # get nturns
-                    try:
+            # compare timestamps
+            elif current_ts - get_ts < timedelta(seconds=turn_time_in_seconds * ACCEPTANCE_FACTOR):
 
-                        # in the LHC: 1 turn = 89 microseconds (updates each 1 second if nturn = 11245)
-                        # in the SPS: 1 turn = 23.0543 microseconds (updates each 0.1 second if nturn = 4338)
-                        if property == "AcquisitionHistogram":
-                            is_multiplexed = self.pyccda_dictionary[self.current_accelerator][device]["setting"]["BeamLossHistogramSetting"]["mux"]
-                            if is_multiplexed == "False":
-                                selectorOverride = ""
-                            nturns = float(self.japc.getParam("{}/{}#{}".format(device, "BeamLossHistogramSetting", "blmNTurn"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False))
-                        elif property == "AcquisitionIntegral" or property == "AcquisitionIntegralDist" or property == "AcquisitionRawDist":
-                            is_multiplexed = self.pyccda_dictionary[self.current_accelerator][device]["setting"]["BeamLossIntegralSetting"]["mux"]
-                            if is_multiplexed == "False":
-                                selectorOverride = ""
-                            nturns = float(self.japc.getParam("{}/{}#{}".format(device, "BeamLossIntegralSetting", "turnAvgCnt"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False))
-                        elif property == "AcquisitionTurnLoss":
-                            is_multiplexed = self.pyccda_dictionary[self.current_accelerator][device]["setting"]["TurnLossMeasurementSetting"]["mux"]
-                            if is_multiplexed == "False":
-                                selectorOverride = ""
-                            nturns = float(self.japc.getParam("{}/{}#{}".format(device, "TurnLossMeasurementSetting", "turnTrackCnt"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False))
-                        elif property == "Capture":
-                            nturns = 0
-                        else:
-                            print("{} - Error (unknown property {})".format(UI_FILENAME, property))
-                        if self.current_accelerator == "LHC":
-                            turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-                        elif self.current_accelerator == "SPS":
-                            turn_time_in_seconds = nturns * TURN_TIME_SPS / 1000000
-                        else:
-                            turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-
-                    # if this does not work, then nothing should be working (NO_DATA_AVAILABLE_FOR_USER likely)
-                    except Exception as xcp:
-
-                        # pass and print exception
-                        print(xcp)
-                        pass
-
-                    # selectorOverride for the working modules table has to be a specific selector
-                    # use an empty selector for LHC devices
-                    if self.current_accelerator == "LHC":
-                        selectorOverride = ""
-                    # use SPS.USER.ALL for SPS devices
-                    elif self.current_accelerator == "SPS":
-                        selectorOverride = "SPS.USER.SFTPRO1"
-                    # use an empty selector for the others
-                    else:
-                        selectorOverride = ""
+                # WORKING MODE
+                value = "{}".format(str(get_ts))
+                error = ""
 
-                    # do a GET request via japc
-                    try:
+            # ts is too old
+            else:
+
+                # TS_TOO_OLD
+                value = "TIMESTAMP_TOO_OLD"
+                error = "custom.message.error: TIMESTAMP_TOO_OLD: The ({}) timestamp of the GET call is at least {} seconds older than the current ({}) timestamp.".format(get_ts, turn_time_in_seconds * ACCEPTANCE_FACTOR, current_ts)
+
+        # update the dicts of the device
+        for target_property in target_property_list:
+            self.modules_data[device][target_property] = value
+            self.errors[device][target_property] = error
+
+        return True
 
-                        # get the fields
-                        field_values = self.japc.getParam("{}/{}".format(device, property), timingSelectorOverride=selectorOverride, getHeader=True, noPyConversion=False)
+    #----------------------------------------------#
 
-                        # get timestamps
-                        get_ts = field_values[1]["acqStamp"]
-                        current_ts = datetime.now(timezone.utc)
+    # processing function
+    def start(self, verbose = False):
 
-                        # for the capture do not care about timestamps
-                        if property == "Capture":
+        # print thread address
+        if verbose:
+            print("{} - Processing thread: {}".format(UI_FILENAME, QThread.currentThread()))
 
-                            # if the buffer is not empty
-                            if field_values[0]["rawBuf0"].size > 0:
+        # sleep a little bit to give some time to the subs callback
+        QThread.msleep(500)
 
-                                # if the try did not give an error then it is working
-                                row_list.append(str(field_values[1]["acqStamp"]))
-                                row_error_dict[c + 1] = ""
+        # schedule every (device, mode) pair
+        for device in self.device_list:
 
-                            # if buffers are empty show a custom error
-                            else:
+            # init dicts for the table
+            self.modules_data[device] = {}
+            self.errors[device] = {}
 
-                                # BUFFERS_ARE_EMPTY
-                                row_list.append("BUFFERS_ARE_EMPTY")
-                                row_error_dict[c + 1] = "custom.message.error: BUFFERS_ARE_EMPTY: The buffers of the Capture property are empty arrays."
+            # get nturns (from the process-wide settings cache) and schedule a check every Tnew * NumPeriods (number of periods in between checks)
+            for property in ["AcquisitionHistogram", "AcquisitionIntegral", "AcquisitionTurnLoss"]:
+                self.rescheduleMode(device, property)
 
-                        # for the others we should care about timestamps
-                        else:
+            # capture is checked every 2 seconds
+            self.scheduler.schedule((device, "Capture"), 2, time.monotonic())
 
-                            # show a custom error if nturns is 0
-                            if nturns == 0:
+        # wake up when the first deadline is due
+        self.timer_next_deadline.timeout.connect(self.processDueModes)
+        self.armTimer()
 
-                                # NTURNS_IS_ZERO
-                                row_list.append("NTURNS_IS_ZERO")
-                                row_error_dict[c + 1] = "custom.message.error: NTURNS_IS_ZERO: The field nturns is 0 and hence the mode is not working."
+        # reschedule the modes whenever the nturns settings change
+        getNTurnsSettingsCache().nturnsChanged.connect(self.updateNTurns)
 
-                            # normal procedure
-                            else:
+        return
 
-                                # compare timestamps
-                                if current_ts - get_ts < timedelta(seconds=turn_time_in_seconds * ACCEPTANCE_FACTOR):
-                                    row_list.append("MODE_BEING_ANALYZED")
-                                    row_error_dict[c + 1] = "custom.message.error: MODE_BEING_ANALYZED: The mode {} is still being analyzed in a different thread. Wait a few seconds until a decision about its availability is made.".format(property)
-                                else:
-                                    row_list.append("TIMESTAMP_TOO_OLD")
-                                    row_error_dict[c + 1] = "custom.message.error: TIMESTAMP_TOO_OLD: The ({}) timestamp of the GET call is at least {} seconds older than the current ({}) timestamp.".format(get_ts, turn_time_in_seconds * ACCEPTANCE_FACTOR, current_ts)
+    #----------------------------------------------#
 
-                    # this exception is usually NO_DATA_AVAILABLE_FOR_USER (happens when it is not initialized yet)
-                    except self.cern.japc.core.ParameterException as xcp:
+    # function that checks all the modes whose deadline is due and emits the results once per device
+    def processDueModes(self):
 
-                        # NO_DATA_AVAILABLE_FOR_USER
-                        row_list.append(str(xcp.getMessage()).split(":")[0])
-                        row_error_dict[c + 1] = str(xcp)
+        # do nothing if the thread is stopped
+        if self.exit_boolean:
+            return
 
-                # if the device IS not working
-                else:
+        # check the due modes
+        updated_device_list = []
+        for device, property in self.scheduler.popDue(time.monotonic()):
 
-                    # update the list with null information
-                    row_list.append("-")
-                    row_error_dict[c + 1] = "NOT_WORKING_DEVICE"
+            # the modes without nturns try to get it again (they are checked and rescheduled there)
+            if self.nturns_dict.get((device, property), (None, None))[0] == 0:
+                self.rescheduleMode(device, property)
+                continue
+
+            # check the mode
+            if self.compareTimestamps(device, property) and device not in updated_device_list:
+                updated_device_list.append(device)
 
-                # send signal to update the counter of the progress dialog
-                self.iterated.emit()
+        # emit the signals
+        for device in updated_device_list:
+            self.processed.emit(dict(self.modules_data[device]), dict(self.errors[device]), device)
 
-        # emit the signal with all the data
-        self.processed.emit(r, row_list, row_error_dict, is_general_information)
+        # wait for the next deadline
+        self.armTimer()
 
         return
 
     #----------------------------------------------#
 
-    # stop function
-    def stop(self):
+    # function that arms the timer to the next deadline of the scheduler
+    def armTimer(self):
 
-        # stop and emit the finish signal
-        self.finished.emit()
+        # get the next deadline
+        next_deadline = self.scheduler.getNextDeadline()
+        if next_deadline is None or self.exit_boolean:
+            self.timer_next_deadline.stop()
+            return
+
+        # start the timer
+        self.timer_next_deadline.start(max(0, int((next_deadline - time.monotonic()) * 1000)))
+
+        return
+
+    #----------------------------------------------#
+
+    # function that gets nturns of a mode from the process-wide settings cache and schedules its checks (modes with nturns = 0 are rechecked on a slow deadline until nturns is known)
+    def rescheduleMode(self, device, property):
+
+        # get nturns
+        try:
+            nturns = getNTurnsSettingsCache().getNTurnsForProperty(device, property, self.current_accelerator, self.pyccda_dictionary)
+        except Exception as xcp:
+            print(xcp)
+            nturns = 0
+        turn_time_in_seconds = getTurnTimeInSeconds(nturns, self.current_accelerator)
+        self.nturns_dict[(device, property)] = (nturns, turn_time_in_seconds)
+
+        # schedule the mode (nturns = 0 also means that the cache failed or has no value yet, so it is retried instead of unscheduled)
+        if nturns != 0:
+            self.scheduler.schedule((device, property), turn_time_in_seconds, time.monotonic())
+        else:
+            self.scheduler.schedule((device, property), NTURNS_UNKNOWN_RECHECK_PERIOD, time.monotonic())
+            if self.compareTimestamps(device, property):
+                self.processed.emit(dict(self.modules_data[device]), dict(self.errors[device]), device)
+
+        return
+
+    #----------------------------------------------#
+
+    # function that receives the changes of the nturns settings
+    def updateNTurns(self, device, setting_property, selector, nturns):
+
+        # ignore other devices
+        if device not in self.device_list or self.exit_boolean:
+            return
+
+        # reschedule the modes that depend on the setting
+        for property in ["AcquisitionHistogram", "AcquisitionIntegral", "AcquisitionTurnLoss"]:
+            if setting_property == NTURNS_SETTING_DICT[property][0]:
+                self.rescheduleMode(device, property)
+
+        # the next deadline could have changed
+        self.armTimer()
 
         return
 
@@ -1675,18 +1879,18 @@ class GetFieldInfoThreadWorker1ShowUp(QObject):
 ########################################################
 ########################################################
 
-class workingModesThreadWorkerSummary(QObject):
+class workingModesThreadWorkerPreview(QObject):
 
     #----------------------------------------------#
 
     # signals
     finished = pyqtSignal()
-    processed = pyqtSignal(dict, dict, str)
+    processed = pyqtSignal(dict, dict)
 
     #----------------------------------------------#
 
     # init function
-    def __init__(self, current_device, acc_device_list, current_accelerator, japc, property_list, cern, pyccda_dictionary):
+    def __init__(self, current_device, current_accelerator, japc, property_list, cern, pyccda_dictionary):
 
         # inherit from QObject
         QObject.__init__(self)
@@ -1701,7 +1905,6 @@ class workingModesThreadWorkerSummary(QObject):
 
         # declare attributes
         self.current_device = current_device
-        self.device_list = acc_device_list
         self.current_accelerator = current_accelerator
         self.japc = japc
         self.property_list = property_list
@@ -1740,6 +1943,44 @@ class workingModesThreadWorkerSummary(QObject):
 
     #----------------------------------------------#
 
+    # function that handles pyjapc exceptions
+    def onException(self, parameterName, description, exception, verbose = False):
+
+        # print
+        if verbose:
+            print("{} - Exception: {}".format(UI_FILENAME, exception))
+
+        # nothing
+        pass
+
+        return
+
+    #----------------------------------------------#
+
+    # function to receive pyjapc subs data
+    def subsCallback(self, parameterName, dictValues, headerInfo, verbose = False):
+
+        # get property name
+        prop_name = parameterName.split("/")[1]
+
+        # ignore GeneralInformation
+        if prop_name == "GeneralInformation":
+            return
+
+        # store only the liveness scalars (e.g. the buffer size) and not the payload
+        self.data_subs[prop_name] = get_liveness_scalars(dictValues)
+
+        # store last timestamp of the callback
+        self.LAST_TIMESTAMP_SUB_CALLBACK[prop_name] = headerInfo["acqStamp"]
+
+        # print
+        if verbose:
+            print("{} - Received {} values for {}...".format(UI_FILENAME, prop_name, self.current_device))
+
+        return
+
+    #----------------------------------------------#
+
     # function that compares the timestamps and determines if modes are running or not
     def compareTimestampsAcquisitionHistogram(self):
 
@@ -1747,13 +1988,11 @@ class workingModesThreadWorkerSummary(QObject):
         property = "AcquisitionHistogram"
 
         # init check
-        if self.current_device not in LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY.keys():
-            return
-        if property not in LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY[self.current_device].keys():
+        if property not in self.LAST_TIMESTAMP_SUB_CALLBACK.keys():
             return
 
         # get timestamps
-        get_ts = LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY[self.current_device][property]
+        get_ts = self.LAST_TIMESTAMP_SUB_CALLBACK[property]
         current_ts = datetime.now(timezone.utc)
 
         # get nturns
@@ -1764,7 +2003,7 @@ class workingModesThreadWorkerSummary(QObject):
         if nturns == 0:
 
             # NTURNS_IS_ZERO
-            self.modules_data[property] = "NTURNS_IS_ZERO"
+            self.modules_data[property] = [property, "No", "NTURNS_IS_ZERO", "{}".format(str(get_ts))]
             self.errors[property] = "custom.message.error: NTURNS_IS_ZERO: The field nturns is 0 and hence the mode is not working."
 
         # normal procedure
@@ -1774,18 +2013,18 @@ class workingModesThreadWorkerSummary(QObject):
             if current_ts - get_ts < timedelta(seconds=turn_time_in_seconds * ACCEPTANCE_FACTOR):
 
                 # WORKING MODE
-                self.modules_data[property] = "{}".format(str(get_ts))
-                self.errors[property] = ""
+                self.modules_data[property] = [property, "Yes", "-", "{}".format(str(get_ts))]
+                self.errors[property] = "-"
 
             # ts is too old
             else:
 
                 # TS_TOO_OLD
-                self.modules_data[property] = "TIMESTAMP_TOO_OLD"
+                self.modules_data[property] = [property, "No", "TIMESTAMP_TOO_OLD", "{}".format(str(get_ts))]
                 self.errors[property] = "custom.message.error: TIMESTAMP_TOO_OLD: The ({}) timestamp of the GET call is at least {} seconds older than the current ({}) timestamp.".format(get_ts, turn_time_in_seconds * ACCEPTANCE_FACTOR, current_ts)
 
         # emit the signal
-        self.processed.emit(self.modules_data, self.errors, self.current_device)
+        self.processed.emit(self.modules_data, self.errors)
 
         return
 
@@ -1798,13 +2037,11 @@ class workingModesThreadWorkerSummary(QObject):
         property = "AcquisitionIntegral"
 
         # init check
-        if self.current_device not in LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY.keys():
-            return
-        if property not in LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY[self.current_device].keys():
+        if property not in self.LAST_TIMESTAMP_SUB_CALLBACK.keys():
             return
 
         # get timestamps
-        get_ts = LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY[self.current_device][property]
+        get_ts = self.LAST_TIMESTAMP_SUB_CALLBACK[property]
         current_ts = datetime.now(timezone.utc)
 
         # get nturns
@@ -1815,11 +2052,11 @@ class workingModesThreadWorkerSummary(QObject):
         if nturns == 0:
 
             # NTURNS_IS_ZERO
-            self.modules_data[property] = "NTURNS_IS_ZERO"
+            self.modules_data[property] = [property, "No", "NTURNS_IS_ZERO", "{}".format(str(get_ts))]
             self.errors[property] = "custom.message.error: NTURNS_IS_ZERO: The field nturns is 0 and hence the mode is not working."
-            self.modules_data["AcquisitionIntegralDist"] = "NTURNS_IS_ZERO"
+            self.modules_data["AcquisitionIntegralDist"] = ["AcquisitionIntegralDist", "No", "NTURNS_IS_ZERO", "{}".format(str(get_ts))]
             self.errors["AcquisitionIntegralDist"] = "custom.message.error: NTURNS_IS_ZERO: The field nturns is 0 and hence the mode is not working."
-            self.modules_data["AcquisitionRawDist"] = "NTURNS_IS_ZERO"
+            self.modules_data["AcquisitionRawDist"] = ["AcquisitionRawDist", "No", "NTURNS_IS_ZERO", "{}".format(str(get_ts))]
             self.errors["AcquisitionRawDist"] = "custom.message.error: NTURNS_IS_ZERO: The field nturns is 0 and hence the mode is not working."
 
         # normal procedure
@@ -1829,452 +2066,27 @@ class workingModesThreadWorkerSummary(QObject):
             if current_ts - get_ts < timedelta(seconds=turn_time_in_seconds * ACCEPTANCE_FACTOR):
 
                 # WORKING MODE
-                self.modules_data[property] = "{}".format(str(get_ts))
-                self.errors[property] = ""
-                self.modules_data["AcquisitionIntegralDist"] = "{}".format(str(get_ts))
-                self.errors["AcquisitionIntegralDist"] = ""
-                self.modules_data["AcquisitionRawDist"] = "{}".format(str(get_ts))
-                self.errors["AcquisitionRawDist"] = ""
+                self.modules_data[property] = [property, "Yes", "-", "{}".format(str(get_ts))]
+                self.errors[property] = "-"
+                self.modules_data["AcquisitionIntegralDist"] = ["AcquisitionIntegralDist", "Yes", "-", "{}".format(str(get_ts))]
+                self.errors["AcquisitionIntegralDist"] = "-"
+                self.modules_data["AcquisitionRawDist"] = ["AcquisitionRawDist", "Yes", "-", "{}".format(str(get_ts))]
+                self.errors["AcquisitionRawDist"] = "-"
+
 
             # ts is too old
             else:
 
                 # TS_TOO_OLD
-                self.modules_data[property] = "TIMESTAMP_TOO_OLD"
+                self.modules_data[property] = [property, "No", "TIMESTAMP_TOO_OLD", "{}".format(str(get_ts))]
                 self.errors[property] = "custom.message.error: TIMESTAMP_TOO_OLD: The ({}) timestamp of the GET call is at least {} seconds older than the current ({}) timestamp.".format(get_ts, turn_time_in_seconds * ACCEPTANCE_FACTOR, current_ts)
-                self.modules_data["AcquisitionIntegralDist"] = "TIMESTAMP_TOO_OLD"
+                self.modules_data["AcquisitionIntegralDist"] = ["AcquisitionIntegralDist", "No", "TIMESTAMP_TOO_OLD", "{}".format(str(get_ts))]
                 self.errors["AcquisitionIntegralDist"] = "custom.message.error: TIMESTAMP_TOO_OLD: The ({}) timestamp of the GET call is at least {} seconds older than the current ({}) timestamp.".format(get_ts, turn_time_in_seconds * ACCEPTANCE_FACTOR, current_ts)
-                self.modules_data["AcquisitionRawDist"] = "TIMESTAMP_TOO_OLD"
+                self.modules_data["AcquisitionRawDist"] = ["AcquisitionRawDist", "No", "TIMESTAMP_TOO_OLD", "{}".format(str(get_ts))]
                 self.errors["AcquisitionRawDist"] = "custom.message.error: TIMESTAMP_TOO_OLD: The ({}) timestamp of the GET call is at least {} seconds older than the current ({}) timestamp.".format(get_ts, turn_time_in_seconds * ACCEPTANCE_FACTOR, current_ts)
 
         # emit the signal
-        self.processed.emit(self.modules_data, self.errors, self.current_device)
-
-        return
-
-    #----------------------------------------------#
-
-    # function that compares the timestamps and determines if modes are running or not
-    def compareTimestampsAcquisitionTurnLoss(self):
-
-        # declare the property
-        property = "AcquisitionTurnLoss"
-
-        # init check
-        if self.current_device not in LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY.keys():
-            return
-        if property not in LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY[self.current_device].keys():
-            return
-
-        # get timestamps
-        get_ts = LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY[self.current_device][property]
-        current_ts = datetime.now(timezone.utc)
-
-        # get nturns
-        nturns = self.nturns_AcquisitionTurnLoss
-        turn_time_in_seconds = self.turn_time_in_seconds_AcquisitionTurnLoss
-
-        # show a custom error if nturns is 0
-        if nturns == 0:
-
-            # NTURNS_IS_ZERO
-            self.modules_data[property] = "NTURNS_IS_ZERO"
-            self.errors[property] = "custom.message.error: NTURNS_IS_ZERO: The field nturns is 0 and hence the mode is not working."
-
-        # normal procedure
-        else:
-
-            # compare timestamps
-            if current_ts - get_ts < timedelta(seconds=turn_time_in_seconds * ACCEPTANCE_FACTOR):
-
-                # WORKING MODE
-                self.modules_data[property] = "{}".format(str(get_ts))
-                self.errors[property] = ""
-
-            # ts is too old
-            else:
-
-                # TS_TOO_OLD
-                self.modules_data[property] = "TIMESTAMP_TOO_OLD"
-                self.errors[property] = "custom.message.error: TIMESTAMP_TOO_OLD: The ({}) timestamp of the GET call is at least {} seconds older than the current ({}) timestamp.".format(get_ts, turn_time_in_seconds * ACCEPTANCE_FACTOR, current_ts)
-
-        # emit the signal
-        self.processed.emit(self.modules_data, self.errors, self.current_device)
-
-        return
-
-    #----------------------------------------------#
-
-    # function that compares the timestamps and determines if modes are running or not
-    def compareTimestampsCapture(self):
-
-        # declare the property
-        property = "Capture"
-
-        # init check
-        if self.current_device not in LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY.keys():
-            return
-        if property not in LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY[self.current_device].keys():
-            return
-
-        # get timestamps
-        get_ts = LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY[self.current_device][property]
-        current_ts = datetime.now(timezone.utc)
-
-        # if the buffer is not empty
-        if DATA_SUBS_SUMMARY[self.current_device][property]["rawBuf0"].size > 0:
-
-            # if the try did not give an error then it is working
-            self.modules_data[property] = "{}".format(str(get_ts))
-            self.errors[property] = ""
-
-        # if buffers are empty show a custom error
-        else:
-
-            # BUFFERS_ARE_EMPTY
-            self.modules_data[property] = "BUFFERS_ARE_EMPTY"
-            self.errors[property] = "custom.message.error: BUFFERS_ARE_EMPTY: The buffers of the Capture property are empty arrays."
-
-        # emit the signal
-        self.processed.emit(self.modules_data, self.errors, self.current_device)
-
-        return
-
-    #----------------------------------------------#
-
-    # processing function
-    def start(self, verbose = False):
-
-        # print thread address
-        if verbose:
-            print("{} - Processing thread: {}".format(UI_FILENAME, QThread.currentThread()))
-
-        # init dicts for the table
-        self.modules_data = {}
-        self.errors = {}
-
-        # selectorOverride for the working modules table has to be a specific selector
-        # use an empty selector for LHC devices
-        if self.current_accelerator == "LHC":
-            selectorOverride = ""
-        # use SPS.USER.ALL for SPS devices
-        elif self.current_accelerator == "SPS":
-            selectorOverride = "SPS.USER.SFTPRO1"
-        # use an empty selector for the others
-        else:
-            selectorOverride = ""
-
-        # sleep a little bit to give some time to the subs callback
-        QThread.msleep(500)
-
-        # ACQUISITION HISTOGRAM
-
-        # get nturns
-        try:
-            is_multiplexed = self.pyccda_dictionary[self.current_accelerator][self.current_device]["setting"]["BeamLossHistogramSetting"]["mux"]
-            if is_multiplexed == "False":
-                selectorOverride = ""
-            nturns = float(self.japc.getParam("{}/{}#{}".format(self.current_device, "BeamLossHistogramSetting", "blmNTurn"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False))
-            if self.current_accelerator == "LHC":
-                turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-            elif self.current_accelerator == "SPS":
-                turn_time_in_seconds = nturns * TURN_TIME_SPS / 1000000
-            else:
-                turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-            self.nturns_AcquisitionHistogram = nturns
-            self.turn_time_in_seconds_AcquisitionHistogram = turn_time_in_seconds
-        except Exception as xcp:
-            print(xcp)
-            pass
-
-        # init a timer that runs every Tnew * NumPeriods (number of periods in between checks)
-        if self.nturns_AcquisitionHistogram != 0:
-            self.timer_watchdog_AcquisitionHistogram.setInterval(turn_time_in_seconds * 1000)
-            self.timer_watchdog_AcquisitionHistogram.timeout.connect(self.compareTimestampsAcquisitionHistogram)
-            self.timer_watchdog_AcquisitionHistogram.start()
-
-        # ACQUISITION INTEGRAL
-
-        # get nturns
-        try:
-            is_multiplexed = self.pyccda_dictionary[self.current_accelerator][self.current_device]["setting"]["BeamLossIntegralSetting"]["mux"]
-            if is_multiplexed == "False":
-                selectorOverride = ""
-            nturns = float(self.japc.getParam("{}/{}#{}".format(self.current_device, "BeamLossIntegralSetting", "turnAvgCnt"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False))
-            if self.current_accelerator == "LHC":
-                turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-            elif self.current_accelerator == "SPS":
-                turn_time_in_seconds = nturns * TURN_TIME_SPS / 1000000
-            else:
-                turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-            self.nturns_AcquisitionIntegral = nturns
-            self.turn_time_in_seconds_AcquisitionIntegral = turn_time_in_seconds
-        except Exception as xcp:
-            print(xcp)
-            pass
-
-        # init a timer that runs every Tnew * NumPeriods (number of periods in between checks)
-        if self.nturns_AcquisitionIntegral != 0:
-            self.timer_watchdog_AcquisitionIntegral.setInterval(turn_time_in_seconds * 1000)
-            self.timer_watchdog_AcquisitionIntegral.timeout.connect(self.compareTimestampsAcquisitionIntegral)
-
-        # ACQUISITION TURN LOSS
-
-        # get nturns
-        try:
-            is_multiplexed = self.pyccda_dictionary[self.current_accelerator][self.current_device]["setting"]["TurnLossMeasurementSetting"]["mux"]
-            if is_multiplexed == "False":
-                selectorOverride = ""
-            nturns = float(self.japc.getParam("{}/{}#{}".format(self.current_device, "TurnLossMeasurementSetting", "turnTrackCnt"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False))
-            if self.current_accelerator == "LHC":
-                turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-            elif self.current_accelerator == "SPS":
-                turn_time_in_seconds = nturns * TURN_TIME_SPS / 1000000
-            else:
-                turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-            self.nturns_AcquisitionTurnLoss = nturns
-            self.turn_time_in_seconds_AcquisitionTurnLoss = turn_time_in_seconds
-        except Exception as xcp:
-            print(xcp)
-            pass
-
-        # init a timer that runs every Tnew * NumPeriods (number of periods in between checks)
-        if self.nturns_AcquisitionTurnLoss != 0:
-            self.timer_watchdog_AcquisitionTurnLoss.setInterval(turn_time_in_seconds * 1000)
-            self.timer_watchdog_AcquisitionTurnLoss.timeout.connect(self.compareTimestampsAcquisitionTurnLoss)
-
-        # CAPTURE
-
-        # init a timer that runs every Tnew * NumPeriods (number of periods in between checks)
-        self.timer_watchdog_Capture.setInterval(2 * 1000)
-        self.timer_watchdog_Capture.timeout.connect(self.compareTimestampsCapture)
-
-        # ALL TIMERS
-
-        # start all timers
-        if self.nturns_AcquisitionHistogram:
-            self.timer_watchdog_AcquisitionHistogram.start()
-        if self.nturns_AcquisitionIntegral:
-            self.timer_watchdog_AcquisitionIntegral.start()
-        if self.nturns_AcquisitionTurnLoss:
-            self.timer_watchdog_AcquisitionTurnLoss.start()
-        self.timer_watchdog_Capture.start()
-
-        return
-
-    #----------------------------------------------#
-
-########################################################
-########################################################
-
-class workingModesThreadWorkerPreview(QObject):
-
-    #----------------------------------------------#
-
-    # signals
-    finished = pyqtSignal()
-    processed = pyqtSignal(dict, dict)
-
-    #----------------------------------------------#
-
-    # init function
-    def __init__(self, current_device, current_accelerator, japc, property_list, cern, pyccda_dictionary):
-
-        # inherit from QObject
-        QObject.__init__(self)
-
-        # declare timers
-        self.timer_watchdog_AcquisitionHistogram = QTimer(self)
-        self.timer_watchdog_AcquisitionIntegral = QTimer(self)
-        # self.timer_watchdog_AcquisitionIntegralDist = QTimer(self)
-        # self.timer_watchdog_AcquisitionRawDist = QTimer(self)
-        self.timer_watchdog_AcquisitionTurnLoss = QTimer(self)
-        self.timer_watchdog_Capture = QTimer(self)
-
-        # declare attributes
-        self.current_device = current_device
-        self.current_accelerator = current_accelerator
-        self.japc = japc
-        self.property_list = property_list
-        self.cern = cern
-        self.exit_boolean = False
-        self.pyccda_dictionary = pyccda_dictionary
-
-        return
-
-    #----------------------------------------------#
-
-    # stop function
-    def stop(self):
-
-        # update stop variable
-        self.exit_boolean = True
-
-        # stop timers
-        # self.timer_watchdog_AcquisitionHistogram.stop()
-        # self.timer_watchdog_AcquisitionIntegral.stop()
-        # self.timer_watchdog_AcquisitionIntegralDist.stop()
-        # self.timer_watchdog_AcquisitionRawDist.stop()
-        # self.timer_watchdog_AcquisitionTurnLoss.stop()
-        # self.timer_watchdog_Capture.stop()
-        # del self.timer_watchdog_AcquisitionHistogram
-        # del self.timer_watchdog_AcquisitionIntegral
-        # del self.timer_watchdog_AcquisitionIntegralDist
-        # del self.timer_watchdog_AcquisitionRawDist
-        # del self.timer_watchdog_AcquisitionTurnLoss
-        # del self.timer_watchdog_Capture
-
-        # emit the finish signal
-        self.finished.emit()
-
-        return
-
-    #----------------------------------------------#
-
-    # function that handles pyjapc exceptions
-    def onException(self, parameterName, description, exception, verbose = False):
-
-        # print
-        if verbose:
-            print("{} - Exception: {}".format(UI_FILENAME, exception))
-
-        # nothing
-        pass
-
-        return
-
-    #----------------------------------------------#
-
-    # function to receive pyjapc subs data
-    def subsCallback(self, parameterName, dictValues, headerInfo, verbose = False):
-
-        # get property name
-        prop_name = parameterName.split("/")[1]
-
-        # ignore GeneralInformation
-        if prop_name == "GeneralInformation":
-            return
-
-        # store the data
-        self.data_subs[prop_name] = dictValues
-
-        # store last timestamp of the callback
-        self.LAST_TIMESTAMP_SUB_CALLBACK[prop_name] = headerInfo["acqStamp"]
-
-        # print
-        if verbose:
-            print("{} - Received {} values for {}...".format(UI_FILENAME, prop_name, self.current_device))
-
-        return
-
-    #----------------------------------------------#
-
-    # function that compares the timestamps and determines if modes are running or not
-    def compareTimestampsAcquisitionHistogram(self):
-
-        # declare the property
-        property = "AcquisitionHistogram"
-
-        # init check
-        if property not in self.LAST_TIMESTAMP_SUB_CALLBACK.keys():
-            return
-
-        # get timestamps
-        get_ts = self.LAST_TIMESTAMP_SUB_CALLBACK[property]
-        current_ts = datetime.now(timezone.utc)
-
-        # get nturns
-        nturns = self.nturns_AcquisitionHistogram
-        turn_time_in_seconds = self.turn_time_in_seconds_AcquisitionHistogram
-
-        # show a custom error if nturns is 0
-        if nturns == 0:
-
-            # NTURNS_IS_ZERO
-            self.modules_data[property] = [property, "No", "NTURNS_IS_ZERO", "{}".format(str(get_ts))]
-            self.errors[property] = "custom.message.error: NTURNS_IS_ZERO: The field nturns is 0 and hence the mode is not working."
-
-        # normal procedure
-        else:
-
-            # compare timestamps
-            if current_ts - get_ts < timedelta(seconds=turn_time_in_seconds * ACCEPTANCE_FACTOR):
-
-                # WORKING MODE
-                self.modules_data[property] = [property, "Yes", "-", "{}".format(str(get_ts))]
-                self.errors[property] = "-"
-
-            # ts is too old
-            else:
-
-                # TS_TOO_OLD
-                self.modules_data[property] = [property, "No", "TIMESTAMP_TOO_OLD", "{}".format(str(get_ts))]
-                self.errors[property] = "custom.message.error: TIMESTAMP_TOO_OLD: The ({}) timestamp of the GET call is at least {} seconds older than the current ({}) timestamp.".format(get_ts, turn_time_in_seconds * ACCEPTANCE_FACTOR, current_ts)
-
-        # emit the signal
-        self.processed.emit(self.modules_data, self.errors)
-
-        return
-
-    #----------------------------------------------#
-
-    # function that compares the timestamps and determines if modes are running or not
-    def compareTimestampsAcquisitionIntegral(self):
-
-        # declare the property
-        property = "AcquisitionIntegral"
-
-        # init check
-        if property not in self.LAST_TIMESTAMP_SUB_CALLBACK.keys():
-            return
-
-        # get timestamps
-        get_ts = self.LAST_TIMESTAMP_SUB_CALLBACK[property]
-        current_ts = datetime.now(timezone.utc)
-
-        # get nturns
-        nturns = self.nturns_AcquisitionIntegral
-        turn_time_in_seconds = self.turn_time_in_seconds_AcquisitionIntegral
-
-        # show a custom error if nturns is 0
-        if nturns == 0:
-
-            # NTURNS_IS_ZERO
-            self.modules_data[property] = [property, "No", "NTURNS_IS_ZERO", "{}".format(str(get_ts))]
-            self.errors[property] = "custom.message.error: NTURNS_IS_ZERO: The field nturns is 0 and hence the mode is not working."
-            self.modules_data["AcquisitionIntegralDist"] = ["AcquisitionIntegralDist", "No", "NTURNS_IS_ZERO", "{}".format(str(get_ts))]
-            self.errors["AcquisitionIntegralDist"] = "custom.message.error: NTURNS_IS_ZERO: The field nturns is 0 and hence the mode is not working."
-            self.modules_data["AcquisitionRawDist"] = ["AcquisitionRawDist", "No", "NTURNS_IS_ZERO", "{}".format(str(get_ts))]
-            self.errors["AcquisitionRawDist"] = "custom.message.error: NTURNS_IS_ZERO: The field nturns is 0 and hence the mode is not working."
-
-        # normal procedure
-        else:
-
-            # compare timestamps
-            if current_ts - get_ts < timedelta(seconds=turn_time_in_seconds * ACCEPTANCE_FACTOR):
-
-                # WORKING MODE
-                self.modules_data[property] = [property, "Yes", "-", "{}".format(str(get_ts))]
-                self.errors[property] = "-"
-                self.modules_data["AcquisitionIntegralDist"] = ["AcquisitionIntegralDist", "Yes", "-", "{}".format(str(get_ts))]
-                self.errors["AcquisitionIntegralDist"] = "-"
-                self.modules_data["AcquisitionRawDist"] = ["AcquisitionRawDist", "Yes", "-", "{}".format(str(get_ts))]
-                self.errors["AcquisitionRawDist"] = "-"
-
-
-            # ts is too old
-            else:
-
-                # TS_TOO_OLD
-                self.modules_data[property] = [property, "No", "TIMESTAMP_TOO_OLD", "{}".format(str(get_ts))]
-                self.errors[property] = "custom.message.error: TIMESTAMP_TOO_OLD: The ({}) timestamp of the GET call is at least {} seconds older than the current ({}) timestamp.".format(get_ts, turn_time_in_seconds * ACCEPTANCE_FACTOR, current_ts)
-                self.modules_data["AcquisitionIntegralDist"] = ["AcquisitionIntegralDist", "No", "TIMESTAMP_TOO_OLD", "{}".format(str(get_ts))]
-                self.errors["AcquisitionIntegralDist"] = "custom.message.error: TIMESTAMP_TOO_OLD: The ({}) timestamp of the GET call is at least {} seconds older than the current ({}) timestamp.".format(get_ts, turn_time_in_seconds * ACCEPTANCE_FACTOR, current_ts)
-                self.modules_data["AcquisitionRawDist"] = ["AcquisitionRawDist", "No", "TIMESTAMP_TOO_OLD", "{}".format(str(get_ts))]
-                self.errors["AcquisitionRawDist"] = "custom.message.error: TIMESTAMP_TOO_OLD: The ({}) timestamp of the GET call is at least {} seconds older than the current ({}) timestamp.".format(get_ts, turn_time_in_seconds * ACCEPTANCE_FACTOR, current_ts)
-
-        # emit the signal
-        self.processed.emit(self.modules_data, self.errors)
+        self.processed.emit(self.modules_data, self.errors)
 
         return
 
@@ -2439,7 +2251,7 @@ class workingModesThreadWorkerPreview(QObject):
         current_ts = datetime.now(timezone.utc)
 
         # if the buffer is not empty
-        if self.data_subs[property]["rawBuf0"].size > 0:
+        if not self.data_subs[property]["is_empty"]:
 
             # if the try did not give an error then it is working
             self.modules_data[property] = [property, "Yes", "-", "{}".format(str(get_ts))]
@@ -2473,7 +2285,7 @@ class workingModesThreadWorkerPreview(QObject):
         # use this to store the timestamps of the callback
         self.LAST_TIMESTAMP_SUB_CALLBACK = {}
 
-        # use this dict to store pyjapc subs data
+        # use this dict to store the liveness scalars of the pyjapc subs data
         self.data_subs = {}
 
         # selectorOverride for the working modules table has to be a specific selector
@@ -2493,155 +2305,94 @@ class workingModesThreadWorkerPreview(QObject):
                 self.japc.subscribeParam("{}/{}".format(self.current_device, property), onValueReceived=self.subsCallback, onException=self.onException, timingSelectorOverride=selectorOverride, getHeader=True)
                 self.japc.startSubscriptions()
 
-        # sleep a little bit to give some time to the subs callback
-        QThread.msleep(500)
+        # sleep a little bit to give some time to the subs callback
+        QThread.msleep(500)
+
+        # ACQUISITION HISTOGRAM
+
+        # get nturns (from the process-wide settings cache) and init a timer that runs every Tnew * NumPeriods (number of periods in between checks)
+        self.nturns_AcquisitionHistogram, self.turn_time_in_seconds_AcquisitionHistogram = self.getNTurns("AcquisitionHistogram")
+        self.timer_watchdog_AcquisitionHistogram.timeout.connect(self.compareTimestampsAcquisitionHistogram)
+
+        # ACQUISITION INTEGRAL
+
+        # get nturns (from the process-wide settings cache) and init a timer that runs every Tnew * NumPeriods (number of periods in between checks)
+        self.nturns_AcquisitionIntegral, self.turn_time_in_seconds_AcquisitionIntegral = self.getNTurns("AcquisitionIntegral")
+        self.timer_watchdog_AcquisitionIntegral.timeout.connect(self.compareTimestampsAcquisitionIntegral)
+
+        # ACQUISITION TURN LOSS
 
-        # ACQUISITION HISTOGRAM
+        # get nturns (from the process-wide settings cache) and init a timer that runs every Tnew * NumPeriods (number of periods in between checks)
+        self.nturns_AcquisitionTurnLoss, self.turn_time_in_seconds_AcquisitionTurnLoss = self.getNTurns("AcquisitionTurnLoss")
+        self.timer_watchdog_AcquisitionTurnLoss.timeout.connect(self.compareTimestampsAcquisitionTurnLoss)
 
-        # get nturns
-        try:
-            is_multiplexed = self.pyccda_dictionary[self.current_accelerator][self.current_device]["setting"]["BeamLossHistogramSetting"]["mux"]
-            if is_multiplexed == "False":
-                selectorOverride = ""
-            nturns = float(self.japc.getParam("{}/{}#{}".format(self.current_device, "BeamLossHistogramSetting", "blmNTurn"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False))
-            if self.current_accelerator == "LHC":
-                turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-            elif self.current_accelerator == "SPS":
-                turn_time_in_seconds = nturns * TURN_TIME_SPS / 1000000
-            else:
-                turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-            self.nturns_AcquisitionHistogram = nturns
-            self.turn_time_in_seconds_AcquisitionHistogram = turn_time_in_seconds
-        except Exception as xcp:
-            print(xcp)
-            pass
+        # CAPTURE
 
         # init a timer that runs every Tnew * NumPeriods (number of periods in between checks)
-        if self.nturns_AcquisitionHistogram != 0:
-            self.timer_watchdog_AcquisitionHistogram.setInterval(turn_time_in_seconds * 1000)
-            self.timer_watchdog_AcquisitionHistogram.timeout.connect(self.compareTimestampsAcquisitionHistogram)
-            self.timer_watchdog_AcquisitionHistogram.start()
+        self.timer_watchdog_Capture.setInterval(2 * 1000)
+        self.timer_watchdog_Capture.timeout.connect(self.compareTimestampsCapture)
 
-        # ACQUISITION INTEGRAL
+        # ALL TIMERS
+
+        # start all timers
+        self.rescaleTimers()
+        self.timer_watchdog_Capture.start()
+
+        # rescale the timers whenever the nturns settings change
+        getNTurnsSettingsCache().nturnsChanged.connect(self.updateNTurns)
+
+        return
+
+    #----------------------------------------------#
+
+    # function that gets nturns and the turn time of a property from the process-wide settings cache
+    def getNTurns(self, property):
 
         # get nturns
         try:
-            is_multiplexed = self.pyccda_dictionary[self.current_accelerator][self.current_device]["setting"]["BeamLossIntegralSetting"]["mux"]
-            if is_multiplexed == "False":
-                selectorOverride = ""
-            nturns = float(self.japc.getParam("{}/{}#{}".format(self.current_device, "BeamLossIntegralSetting", "turnAvgCnt"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False))
-            if self.current_accelerator == "LHC":
-                turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-            elif self.current_accelerator == "SPS":
-                turn_time_in_seconds = nturns * TURN_TIME_SPS / 1000000
-            else:
-                turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-            self.nturns_AcquisitionIntegral = nturns
-            self.turn_time_in_seconds_AcquisitionIntegral = turn_time_in_seconds
+            nturns = getNTurnsSettingsCache().getNTurnsForProperty(self.current_device, property, self.current_accelerator, self.pyccda_dictionary)
         except Exception as xcp:
             print(xcp)
-            pass
+            nturns = 0
 
-        # init a timer that runs every Tnew * NumPeriods (number of periods in between checks)
-        if self.nturns_AcquisitionIntegral != 0:
-            self.timer_watchdog_AcquisitionIntegral.setInterval(turn_time_in_seconds * 1000)
-            self.timer_watchdog_AcquisitionIntegral.timeout.connect(self.compareTimestampsAcquisitionIntegral)
-
-        # # ACQUISITION INTEGRAL DIST
-        #
-        # # get nturns
-        # try:
-        #     is_multiplexed = self.pyccda_dictionary[self.current_accelerator][self.current_device]["setting"]["BeamLossIntegralSetting"]["mux"]
-        #     if is_multiplexed == "False":
-        #         selectorOverride = ""
-        #     nturns = float(self.japc.getParam("{}/{}#{}".format(self.current_device, "BeamLossIntegralSetting", "turnAvgCnt"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False))
-        #     if self.current_accelerator == "LHC":
-        #         turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-        #     elif self.current_accelerator == "SPS":
-        #         turn_time_in_seconds = nturns * TURN_TIME_SPS / 1000000
-        #     else:
-        #         turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-        #     self.nturns_AcquisitionIntegralDist = nturns
-        #     self.turn_time_in_seconds_AcquisitionIntegralDist = turn_time_in_seconds
-        # except Exception as xcp:
-        #     print(xcp)
-        #     pass
-        #
-        # # init a timer that runs every Tnew * NumPeriods (number of periods in between checks)
-        # if self.nturns_AcquisitionIntegralDist != 0:
-        #     self.timer_watchdog_AcquisitionIntegralDist.setInterval(turn_time_in_seconds * 1000)
-        #     self.timer_watchdog_AcquisitionIntegralDist.timeout.connect(self.compareTimestampsAcquisitionIntegralDist)
-
-        # # ACQUISITION RAW DIST
-        #
-        # # get nturns
-        # try:
-        #     is_multiplexed = self.pyccda_dictionary[self.current_accelerator][self.current_device]["setting"]["BeamLossIntegralSetting"]["mux"]
-        #     if is_multiplexed == "False":
-        #         selectorOverride = ""
-        #     nturns = float(self.japc.getParam("{}/{}#{}".format(self.current_device, "BeamLossIntegralSetting", "turnAvgCnt"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False))
-        #     if self.current_accelerator == "LHC":
-        #         turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-        #     elif self.current_accelerator == "SPS":
-        #         turn_time_in_seconds = nturns * TURN_TIME_SPS / 1000000
-        #     else:
-        #         turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-        #     self.nturns_AcquisitionRawDist = nturns
-        #     self.turn_time_in_seconds_AcquisitionRawDist = turn_time_in_seconds
-        # except Exception as xcp:
-        #     print(xcp)
-        #     pass
-        #
-        # # init a timer that runs every Tnew * NumPeriods (number of periods in between checks)
-        # if self.nturns_AcquisitionRawDist != 0:
-        #     self.timer_watchdog_AcquisitionRawDist.setInterval(turn_time_in_seconds * 1000)
-        #     self.timer_watchdog_AcquisitionRawDist.timeout.connect(self.compareTimestampsAcquisitionRawDist)
+        return nturns, getTurnTimeInSeconds(nturns, self.current_accelerator)
 
-        # ACQUISITION TURN LOSS
+    #----------------------------------------------#
 
-        # get nturns
-        try:
-            is_multiplexed = self.pyccda_dictionary[self.current_accelerator][self.current_device]["setting"]["TurnLossMeasurementSetting"]["mux"]
-            if is_multiplexed == "False":
-                selectorOverride = ""
-            nturns = float(self.japc.getParam("{}/{}#{}".format(self.current_device, "TurnLossMeasurementSetting", "turnTrackCnt"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False))
-            if self.current_accelerator == "LHC":
-                turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-            elif self.current_accelerator == "SPS":
-                turn_time_in_seconds = nturns * TURN_TIME_SPS / 1000000
+    # function that (re)starts the timers according to the current turn times (timers with nturns = 0 do not run)
+    def rescaleTimers(self):
+
+        # iterate over the timers
+        for nturns, turn_time_in_seconds, timer in [(self.nturns_AcquisitionHistogram, self.turn_time_in_seconds_AcquisitionHistogram, self.timer_watchdog_AcquisitionHistogram),
+                                                    (self.nturns_AcquisitionIntegral, self.turn_time_in_seconds_AcquisitionIntegral, self.timer_watchdog_AcquisitionIntegral),
+                                                    (self.nturns_AcquisitionTurnLoss, self.turn_time_in_seconds_AcquisitionTurnLoss, self.timer_watchdog_AcquisitionTurnLoss)]:
+            if nturns != 0:
+                timer.setInterval(turn_time_in_seconds * 1000)
+                timer.start()
             else:
-                turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-            self.nturns_AcquisitionTurnLoss = nturns
-            self.turn_time_in_seconds_AcquisitionTurnLoss = turn_time_in_seconds
-        except Exception as xcp:
-            print(xcp)
-            pass
+                timer.stop()
 
-        # init a timer that runs every Tnew * NumPeriods (number of periods in between checks)
-        if self.nturns_AcquisitionTurnLoss != 0:
-            self.timer_watchdog_AcquisitionTurnLoss.setInterval(turn_time_in_seconds * 1000)
-            self.timer_watchdog_AcquisitionTurnLoss.timeout.connect(self.compareTimestampsAcquisitionTurnLoss)
+        return
 
-        # CAPTURE
+    #----------------------------------------------#
 
-        # init a timer that runs every Tnew * NumPeriods (number of periods in between checks)
-        self.timer_watchdog_Capture.setInterval(2 * 1000)
-        self.timer_watchdog_Capture.timeout.connect(self.compareTimestampsCapture)
+    # function that receives the changes of the nturns settings
+    def updateNTurns(self, device, setting_property, selector, nturns):
 
-        # ALL TIMERS
+        # ignore other devices
+        if device != self.current_device or self.exit_boolean:
+            return
 
-        # start all timers
-        if self.nturns_AcquisitionHistogram:
-            self.timer_watchdog_AcquisitionHistogram.start()
-        if self.nturns_AcquisitionIntegral:
-            self.timer_watchdog_AcquisitionIntegral.start()
-        # if self.nturns_AcquisitionIntegralDist:
-        #     self.timer_watchdog_AcquisitionIntegralDist.start()
-        # if self.nturns_AcquisitionRawDist:
-        #     self.timer_watchdog_AcquisitionRawDist.start()
-        if self.nturns_AcquisitionTurnLoss:
-            self.timer_watchdog_AcquisitionTurnLoss.start()
-        self.timer_watchdog_Capture.start()
+        # update the values from the cache
+        if setting_property == NTURNS_SETTING_DICT["AcquisitionHistogram"][0]:
+            self.nturns_AcquisitionHistogram, self.turn_time_in_seconds_AcquisitionHistogram = self.getNTurns("AcquisitionHistogram")
+        elif setting_property == NTURNS_SETTING_DICT["AcquisitionIntegral"][0]:
+            self.nturns_AcquisitionIntegral, self.turn_time_in_seconds_AcquisitionIntegral = self.getNTurns("AcquisitionIntegral")
+        elif setting_property == NTURNS_SETTING_DICT["AcquisitionTurnLoss"][0]:
+            self.nturns_AcquisitionTurnLoss, self.turn_time_in_seconds_AcquisitionTurnLoss = self.getNTurns("AcquisitionTurnLoss")
+
+        # rescale the timers
+        self.rescaleTimers()
 
         return
 
@@ -2851,6 +2602,153 @@ class workingModesThreadWorkerPreview(QObject):
 ########################################################
 ########################################################
 
+class RevalidatePyCCDACacheThreadWorker(QObject):
+
+    #----------------------------------------------#
+
+    # signals
+    finished = pyqtSignal()
+    processed = pyqtSignal(dict)
+
+    #----------------------------------------------#
+
+    # init function
+    def __init__(self, query, dir_json, dir_cache, old_pyccda_dictionary):
+
+        # inherit from QObject
+        QObject.__init__(self)
+
+        # declare attributes
+        self.query = query
+        self.dir_json = dir_json
+        self.dir_cache = dir_cache
+        self.old_pyccda_dictionary = old_pyccda_dictionary
+
+        return
+
+    #----------------------------------------------#
+
+    # start function
+    def start(self):
+
+        # print message
+        print("{} - Revalidating the CCDA cache in the background...".format(UI_FILENAME))
+
+        # query ccda and refresh the cache (keep working with the old cache if ccda is not reachable)
+        try:
+            pyccda_dictionary = create_pyccda_json_file(query = self.query, name_json_file = "pyccda_config.json", dir_json = self.dir_json, verbose = False)
+            write_pyccda_cache_file(pyccda_dictionary, query = self.query, dir_cache = self.dir_cache)
+        except Exception as xcp:
+            print("{} - Unable to revalidate the CCDA cache: {}".format(UI_FILENAME, xcp))
+            self.finished.emit()
+            return
+
+        # only emit the signal when the catalog changed
+        if pyccda_dictionary != self.old_pyccda_dictionary:
+            self.processed.emit(pyccda_dictionary)
+
+        # emit the finish signal
+        self.finished.emit()
+
+        return
+
+    #----------------------------------------------#
+
+########################################################
+########################################################
+
+class RunCommandsThreadWorker(QObject):
+
+    #----------------------------------------------#
+
+    # signals
+    finished = pyqtSignal()
+    processed = pyqtSignal(str, str)
+
+    #----------------------------------------------#
+
+    # init function
+    def __init__(self, device_list, commands, japc, cern):
+
+        # inherit from QObject
+        QObject.__init__(self)
+
+        # declare attributes
+        self.device_list = device_list
+        self.commands = commands
+        self.japc = japc
+        self.cern = cern
+
+        return
+
+    #----------------------------------------------#
+
+    # start function
+    def start(self):
+
+        # fan the commands out across the devices (a device that does not answer in time is reported as failed)
+        for device, xcp in iterProbeResults(self.device_list, self.runCommands, max_workers = COMMAND_MAX_WORKERS, timeout = COMMAND_TIMEOUT, timeout_error_name = "COMMAND_TIMEOUT", pool_name = "commands"):
+
+            # print the exception
+            if isinstance(xcp, Exception):
+                print("{} - Unable to run the command: {}".format(UI_FILENAME, xcp))
+
+            # emit the result of the device
+            self.processed.emit(device, str(xcp))
+
+        # emit the finish signal
+        self.finished.emit()
+
+        return
+
+    #----------------------------------------------#
+
+    # function that runs the commands on a device (stops at the first one that fails)
+    def runCommands(self, device):
+
+        # the sweep abandons the device after COMMAND_TIMEOUT, so its thread must stop sending and retrying by then
+        deadline = time.monotonic() + COMMAND_TIMEOUT
+
+        # iterate over commands
+        for command in self.commands:
+
+            # do not send the remaining commands of an abandoned device
+            if time.monotonic() >= deadline:
+                raise ProbeTimeoutError("custom.message.error: COMMAND_TIMEOUT: {} did not answer within {} seconds".format(device, COMMAND_TIMEOUT))
+
+            # retry only the command that failed (the previous ones were applied and are not idempotent)
+            callWithRetries(self.sendCommand, "{}/{}".format(device, command), retries = COMMAND_RETRIES, deadline = deadline, is_retryable = self.isRetryable)
+
+        return
+
+    #----------------------------------------------#
+
+    # function that sends one command
+    def sendCommand(self, parameter_name):
+
+        # send an empty dict to perform a COMMAND operation via pyjapc
+        self.japc.setParam(parameter_name, {}, timingSelectorOverride="")
+
+        return
+
+    #----------------------------------------------#
+
+    # function that decides if a failed command can be sent again
+    def isRetryable(self, xcp):
+
+        # only the commands rejected by the device are retried (a timeout or any other error may hide a command that was applied)
+        if not isinstance(xcp, self.cern.japc.core.ParameterException):
+            return False
+        if "TIMEOUT" in str(xcp.getMessage()).upper():
+            return False
+
+        return True
+
+    #----------------------------------------------#
+
+########################################################
+########################################################
+
 class GetWorkingDevicesThreadWorker(QObject):
 
     #----------------------------------------------#
@@ -2862,7 +2760,7 @@ class GetWorkingDevicesThreadWorker(QObject):
     #----------------------------------------------#
 
     # init function
-    def __init__(self, device_list, acc_dev_list, japc, cern, old_working_devices, old_exception_dict):
+    def __init__(self, device_list, acc_dev_list, japc, cern, old_working_devices, old_exception_dict, initial_sweep = False):
 
         # inherit from QObject
         QObject.__init__(self)
@@ -2874,6 +2772,7 @@ class GetWorkingDevicesThreadWorker(QObject):
         self.cern = cern
         self.old_working_devices = old_working_devices
         self.old_exception_dict = old_exception_dict
+        self.initial_sweep = initial_sweep
 
         return
 
@@ -2882,6 +2781,10 @@ class GetWorkingDevicesThreadWorker(QObject):
     # start function
     def start(self):
 
+        # check all the devices right away streaming the results (progressive startup)
+        if self.initial_sweep:
+            self.getWorkingDevices(stream_results = True)
+
         # init the timer in terms of the RECHECK_DEVICES_PERIOD input variable (in seconds)
         self._timer = QTimer(self)
         self._timer.timeout.connect(self.getWorkingDevices)
@@ -2902,8 +2805,18 @@ class GetWorkingDevicesThreadWorker(QObject):
 
     #----------------------------------------------#
 
+    # slot that replaces the device lists (it runs in the thread of the worker, so never in the middle of a sweep)
+    def setDeviceLists(self, device_list, acc_dev_list):
+
+        self.device_list = device_list
+        self.acc_dev_list = acc_dev_list
+
+        return
+
+    #----------------------------------------------#
+
     # processing function
-    def getWorkingDevices(self, verbose = False):
+    def getWorkingDevices(self, verbose = False, stream_results = False):
 
         # print thread address
         if verbose:
@@ -2915,58 +2828,57 @@ class GetWorkingDevicesThreadWorker(QObject):
         # save the exceptions in a dict
         self.exception_dict = {}
 
-        # iterate over the devices
-        for index_device, device in enumerate(self.device_list):
-
-            # print the device for logging and debugging
-            if verbose:
-                print("{} - Checking the availability of {}".format(UI_FILENAME, device))
-
-            # # use an empty selector for LHC devices
-            # if self.acc_dev_list[index_device] == "LHC":
-            #     selectorOverride = ""
-            # # use SPS.USER.ALL for SPS devices
-            # elif self.acc_dev_list[index_device] == "SPS":
-            #     selectorOverride = "SPS.USER.SFTPRO1"
-            # # use an empty selector for the others
-            # else:
-            #     selectorOverride = ""
-
-            # use empty selector for GeneralInformation
-            selectorOverride = ""
-
-            # try out if japc returns an error or not
-            try:
-
-                # try to acquire the data from pyjapc
-                all_data_from_pyjapc = self.japc.getParam("{}/{}#{}".format(device, "GeneralInformation", "AutoGain"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False)
+        # probe all the devices concurrently and process the results as soon as they arrive
+        for device, xcp in iterProbeResults(self.device_list, self.probeDevice, max_workers = PROBE_MAX_WORKERS, timeout = PROBE_TIMEOUT):
 
             # in case we get an exception, don't add the device to the working list
-            except self.cern.japc.core.ParameterException as xcp:
+            if isinstance(xcp, Exception):
 
                 # print the exception
                 if verbose:
-                    print("{} - Exception: cern.japc.core.ParameterException - {}".format(UI_FILENAME, xcp))
+                    print("{} - Exception: {} - {}".format(UI_FILENAME, type(xcp).__name__, xcp))
                     print("{} - Device {} is not working...".format(UI_FILENAME, device))
 
                 # save the exception as xcp
                 self.exception_dict[str(device)] = xcp
 
-                # continue to the next device
-                continue
+            # otherwise the device works
+            else:
 
-            # append the device
-            self.working_devices.append(device)
+                # append the device
+                self.working_devices.append(device)
 
-            # save the exception as empty
-            self.exception_dict[str(device)] = ""
+                # save the exception as empty
+                self.exception_dict[str(device)] = ""
+
+            # send the partial results (copies, since the lists keep growing in this thread)
+            if stream_results:
+                self.processed.emit([dev for dev in self.device_list if dev in self.working_devices], dict(self.exception_dict))
+
+        # keep the working devices in the same order as the device list
+        self.working_devices = [device for device in self.device_list if device in self.working_devices]
+
+        # sleep the thread a bit (not needed when streaming since the gui is waiting for the results)
+        if not stream_results:
+            QThread.sleep(5)
+
+        # emit the signal that stores the working devices ONLY IF there were any changes (always when streaming so that the gui knows the sweep is over)
+        if self.working_devices != self.old_working_devices or stream_results:
+            self.processed.emit(list(self.working_devices), dict(self.exception_dict))
+            self.old_working_devices = self.working_devices
+
+        return
+
+    #----------------------------------------------#
+
+    # function that checks if a device answers (it raises an exception otherwise)
+    def probeDevice(self, device):
 
-        # sleep the thread a bit
-        QThread.sleep(5)
+        # use empty selector for GeneralInformation
+        selectorOverride = ""
 
-        # emit the signal that stores the working devices ONLY IF there were any changes
-        if self.working_devices != self.old_working_devices:
-            self.processed.emit(self.working_devices, self.exception_dict)
+        # try to acquire the data from pyjapc
+        self.japc.getParam("{}/{}#{}".format(device, "GeneralInformation", "AutoGain"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False)
 
         return
 
@@ -2979,6 +2891,11 @@ class MyDisplay(CDisplay):
 
     #----------------------------------------------#
 
+    # signals (new device list and accelerator-device relation list for the recheck thread)
+    deviceListsChanged = pyqtSignal(list, list)
+
+    #----------------------------------------------#
+
     # function to read the ui file
     def ui_filename(self):
 
@@ -3040,20 +2957,23 @@ class MyDisplay(CDisplay):
         except:
             return
 
+        # drop the pending cells of the summary first show up
+        self.thread_pool_1_show_up.clear()
+
+        # stop the local server of the message bus
+        self.message_bus.stopServer()
+
         # stop old thread (preview_one_device)
         if type(self.aux_thread_for_preview_one_device) == QThread:
             if self.aux_thread_for_preview_one_device.isRunning():
                 self.aux_worker_for_preview_one_device.stop()
 
-        # stop old threads (summary)
+        # stop old thread (summary)
         were_threads_running = False
-        for device in self.acc_device_list_summary:
-            if device in self.working_devices:
-                if device in self.summary_thread_dict.keys():
-                    if type(self.summary_thread_dict[device]) == QThread:
-                        if self.summary_thread_dict[device].isRunning():
-                            self.summary_worker_dict[device].stop()
-                            were_threads_running = True
+        if type(self.summary_thread) == QThread:
+            if self.summary_thread.isRunning():
+                self.summary_worker.stop()
+                were_threads_running = True
 
         # stop japc subs (summary)
         if were_threads_running:
@@ -3076,18 +2996,26 @@ class MyDisplay(CDisplay):
 
         # init aux for qthread
         self.aux_thread_for_preview_one_device = 0
-        self.summary_thread_dict = {}
-        self.summary_worker_dict = {}
+        self.summary_thread = None
+        self.summary_worker = None
         self.acc_device_list_summary = []
 
+        # long-lived pool (sized to the host) for the first show up of the summary, its threads are reused every time the summary is opened
+        self.thread_pool_1_show_up = QThreadPool()
+        self.thread_pool_1_show_up.setMaxThreadCount(max(4, QThread.idealThreadCount()))
+        self.signals_1_show_up = GetFieldInfoSignals1ShowUp()
+        self.signals_1_show_up.processed.connect(self.updateModelDicts1ShowUp)
+        self.show_up_id_1_show_up = 0
+
         # create the temporary directory to store all the aux variables
         self.app_temp_dir = createCustomTempDir(TEMP_DIR_NAME)
 
         # init last index
         self.last_index_tree_view = 0
 
-        # obtain all info about the devices via pyccda
-        self.pyccda_dictionary = create_pyccda_json_file(query = QUERY, name_json_file = "pyccda_config.json", dir_json = self.app_temp_dir, verbose = False)
+        # obtain all info about the devices via pyccda (start from the persistent cache and revalidate it later if it is too old)
+        self.app_cache_dir = getPersistentCacheDir(CACHE_DIR_NAME)
+        self.pyccda_dictionary, self.is_pyccda_cache_outdated = load_pyccda_json_file(query = QUERY, name_json_file = "pyccda_config.json", dir_json = self.app_temp_dir, dir_cache = self.app_cache_dir, ttl = CCDA_CACHE_TTL, verbose = True)
 
         # retrieve the app CApplication variable
         self.app = CApplication.instance()
@@ -3107,25 +3035,13 @@ class MyDisplay(CDisplay):
         self.is_comrad_fully_loaded = False
 
         # import cern package for handling exceptions
-        self.cern = jp.JPackage("cern")
+        self.cern = getCernPackage()
 
         # set current accelerator
         self.current_accelerator = "SPS"
 
         # get the device list and the accelerator-device relation list
-        self.device_list = []
-        self.acc_dev_list = []
-        for acc_counter, acc_name in enumerate(self.pyccda_dictionary):
-            if acc_counter == 0:
-                self.device_list = list(self.pyccda_dictionary[acc_name].keys())
-                self.acc_dev_list = [acc_name]*len(list(self.pyccda_dictionary[acc_name].keys()))
-            else:
-                self.device_list += list(self.pyccda_dictionary[acc_name].keys())
-                self.acc_dev_list += [acc_name]*len(list(self.pyccda_dictionary[acc_name].keys()))
-
-        # order the device list
-        self.acc_dev_list = [x for _, x in sorted(zip(self.device_list, self.acc_dev_list))]
-        self.device_list.sort()
+        self.getDeviceListsFromPyCCDADictionary()
 
         # set current device
         self.current_device = "SP.BA1.BLMDIAMOND.2"
@@ -3134,10 +3050,23 @@ class MyDisplay(CDisplay):
         self.current_window = "premain"
 
         # create japc object
-        self.japc = pyjapc.PyJapc()
+        self.japc = createJapc()
+
+        # init the process-wide cache of the nturns settings (shared with the other windows)
+        self.nturns_settings_cache = getNTurnsSettingsCache()
 
-        # get the devices that work
-        self.getWorkingDevices(verbose = True)
+        # init the message bus that pushes the state to the other windows (and to other processes via a local socket)
+        self.message_bus = getMessageBus()
+        self.message_bus.startServer()
+
+        # get the devices that work (or leave them as unknown and check them in the background if the startup is progressive)
+        if PROGRESSIVE_STARTUP:
+            self.working_devices = []
+            self.exception_dict = {}
+            self.is_initial_probe_finished = False
+        else:
+            self.getWorkingDevices(verbose = True)
+            self.is_initial_probe_finished = True
 
         # init preloaded devices to show or not the progress dialog on preview_one_device.py
         self.preloaded_devices = set()
@@ -3265,78 +3194,16 @@ class MyDisplay(CDisplay):
 
         return
 
-    #----------------------------------------------#
-
-    # function that runs the selected command on all the acc devices
-    def commandActionAll(self, selected_accelerator):
-
-        # get command name
-        command = self.sender().text().split(" ")[1]
-
-        # print
-        print("{} - Running command {} on all {} devices...".format(UI_FILENAME, command, selected_accelerator))
-
-        # get device list
-        acc_device_list = list(np.array(self.device_list)[np.array(self.acc_dev_list) == selected_accelerator])
-
-        # save exceptions here
-        exception_dev_list = []
-        exception = ""
-
-        # init progress bar
-        counter_device = 0
-        self.progress_dialog_all_commands = QProgressDialog("Running command {} on all {} devices...".format(command, selected_accelerator), None, 0, len(acc_device_list))
-        # self.progress_dialog_all_commands.closeEvent = self.closeEventProgressDialogAllCommands
-        self.progress_dialog_all_commands_want_to_close = False
-        self.progress_dialog_all_commands.setWindowModality(Qt.ApplicationModal)
-        self.progress_dialog_all_commands.setAutoClose(False)
-        self.progress_dialog_all_commands.setWindowTitle("Progress")
-        self.progress_dialog_all_commands.setWindowIcon(QIcon(os.path.join(REAL_PATH, "icons/diamond_2.png")))
-        self.progress_dialog_all_commands.show()
-        self.progress_dialog_all_commands.repaint()
-
-        # iterate over devices
-        for counter_device, selected_device in enumerate(acc_device_list):
-
-            # update progress bar
-            self.progress_dialog_all_commands.setValue(counter_device)
-            self.progress_dialog_all_commands.repaint()
-            self.app.processEvents(QEventLoop.ExcludeUserInputEvents)
-
-            # status bar message
-            self.app.main_window.statusBar().showMessage("Running command {} on all {} devices ({}/{})...".format(command, selected_accelerator, counter_device+1, len(acc_device_list)), 0)
-            self.app.main_window.statusBar().repaint()
-
-            # send an empty dict to perform a COMMAND operation via pyjapc
-            try:
-                self.japc.setParam("{}/{}".format(selected_device, command), {}, timingSelectorOverride="")
-            except Exception as xcp:
-                exception = xcp
-                print("{} - Unable to run the command: {}".format(UI_FILENAME, exception))
-                exception_dev_list.append(selected_device)
-
-        # close progress bar
-        self.progress_dialog_all_commands_want_to_close = True
-        self.progress_dialog_all_commands.close()
+    #----------------------------------------------#
 
-        # status bar message
-        self.app.main_window.statusBar().showMessage("Finished running command {} on all {} devices!".format(command, selected_accelerator), 10*1000)
-        self.app.main_window.statusBar().repaint()
+    # function that runs the selected command on all the acc devices
+    def commandActionAll(self, selected_accelerator):
 
-        # show finish message
-        if not exception_dev_list:
-            message_title = "Command {}".format(command)
-            message_text = "Command {} ran successfully on all {} devices.".format(command, selected_accelerator)
-            self.message_box = QMessageBox.information(self, message_title, message_text)
-        else:
-            if len(exception_dev_list) == len(acc_device_list):
-                message_title = "Command {}".format(command)
-                message_text = "Unable to run command {} on any of the {} devices.".format(command, selected_accelerator)
-                self.message_box = QMessageBox.critical(self, message_title, message_text)
-            else:
-                message_title = "Command {}".format(command)
-                message_text = "Unable to run command {} on the following devices: {}. Command ran successfully in the others though.".format(command, ', '.join(exception_dev_list))
-                self.message_box = QMessageBox.critical(self, message_title, message_text)
+        # get command name
+        command = self.sender().text().split(" ")[1]
+
+        # run it in the background
+        self.runCommandsOnAllDevices(selected_accelerator, [command], "Command {}".format(command), "command {}".format(command))
 
         return
 
@@ -3350,80 +3217,13 @@ class MyDisplay(CDisplay):
         commands = full_string[full_string.find("(") + 1:full_string.find(")")]
         commands = commands.split(", ")
 
-        # print
-        print("{} - Running StartAll command on all {} devices...".format(UI_FILENAME, selected_accelerator))
-
-        # get device list
-        acc_device_list = list(np.array(self.device_list)[np.array(self.acc_dev_list) == selected_accelerator])
-
-        # save exceptions here
-        exception_dev_list = []
-        exception = ""
-
-        # init progress bar
-        counter_device = 0
-        self.progress_dialog_all_commands = QProgressDialog("Running StartAll command on all {} devices...".format(selected_accelerator), None, 0, len(acc_device_list))
-        # self.progress_dialog_all_commands.closeEvent = self.closeEventProgressDialogAllCommands
-        self.progress_dialog_all_commands_want_to_close = False
-        self.progress_dialog_all_commands.setWindowModality(Qt.ApplicationModal)
-        self.progress_dialog_all_commands.setAutoClose(False)
-        self.progress_dialog_all_commands.setWindowTitle("Progress")
-        self.progress_dialog_all_commands.setWindowIcon(QIcon(os.path.join(REAL_PATH, "icons/diamond_2.png")))
-        self.progress_dialog_all_commands.show()
-        self.progress_dialog_all_commands.repaint()
-
-        # iterate over devices
-        for counter_device, selected_device in enumerate(acc_device_list):
-
-            # update progress bar
-            self.progress_dialog_all_commands.setValue(counter_device)
-            self.progress_dialog_all_commands.repaint()
-            self.app.processEvents(QEventLoop.ExcludeUserInputEvents)
-
-            # status bar message
-            self.app.main_window.statusBar().showMessage("Running StartAll command on all {} devices ({}/{})...".format(selected_accelerator, counter_device + 1, len(acc_device_list)), 0)
-            self.app.main_window.statusBar().repaint()
-
-            # iterate over commands
-            for command in commands:
-
-                # send an empty dict to perform a COMMAND operation via pyjapc
-                try:
-                    self.japc.setParam("{}/{}".format(selected_device, command), {}, timingSelectorOverride="")
-                except Exception as xcp:
-                    exception = xcp
-                    print("{} - Unable to run the command: {}".format(UI_FILENAME, exception))
-                    exception_dev_list.append(selected_device)
-                    break
-
-        # close progress bar
-        self.progress_dialog_all_commands_want_to_close = True
-        self.progress_dialog_all_commands.close()
-
-        # status bar message
-        self.app.main_window.statusBar().showMessage("Finished running StartAll command on all {} devices!".format(selected_accelerator), 10 * 1000)
-        self.app.main_window.statusBar().repaint()
-
-        # show finish message
-        if not exception_dev_list:
-            message_title = "Command StartAll"
-            message_text = "Command StartAll ran successfully on all {} devices.".format(selected_accelerator)
-            self.message_box = QMessageBox.information(self, message_title, message_text)
-        else:
-            if len(exception_dev_list) == len(acc_device_list):
-                message_title = "Command StartAll".format(command)
-                message_text = "Unable to run StartAll command on any of the {} devices.".format(selected_accelerator)
-                self.message_box = QMessageBox.critical(self, message_title, message_text)
-            else:
-                message_title = "Command StartAll"
-                message_text = "Unable to run StartAll command on the following devices: {}. Command ran successfully in the others though.".format(', '.join(exception_dev_list))
-                self.message_box = QMessageBox.critical(self, message_title, message_text)
+        # run them in the background
+        self.runCommandsOnAllDevices(selected_accelerator, commands, "Command StartAll", "StartAll command")
 
         return
 
     #----------------------------------------------#
 
-
     # function that runs stop commands on all the acc devices
     def commandActionAllStopAll(self, selected_accelerator):
 
@@ -3432,19 +3232,28 @@ class MyDisplay(CDisplay):
         commands = full_string[full_string.find("(") + 1:full_string.find(")")]
         commands = commands.split(", ")
 
+        # run them in the background
+        self.runCommandsOnAllDevices(selected_accelerator, commands, "Command StopAll", "StopAll command")
+
+        return
+
+    #----------------------------------------------#
+
+    # function that fans the commands out across the acc devices on a background thread (bounded parallelism, per-device timeout and retries)
+    def runCommandsOnAllDevices(self, selected_accelerator, commands, message_title, command_label):
+
         # print
-        print("{} - Running StopAll command on all {} devices...".format(UI_FILENAME, selected_accelerator))
+        print("{} - Running {} on all {} devices...".format(UI_FILENAME, command_label, selected_accelerator))
 
         # get device list
         acc_device_list = list(np.array(self.device_list)[np.array(self.acc_dev_list) == selected_accelerator])
 
-        # save exceptions here
-        exception_dev_list = []
-        exception = ""
+        # save the results here
+        self.command_results_dict = {}
+        self.command_info = (selected_accelerator, acc_device_list, message_title, command_label)
 
         # init progress bar
-        counter_device = 0
-        self.progress_dialog_all_commands = QProgressDialog("Running StopAll command on all {} devices...".format(selected_accelerator), None, 0, len(acc_device_list))
+        self.progress_dialog_all_commands = QProgressDialog("Running {} on all {} devices...".format(command_label, selected_accelerator), None, 0, len(acc_device_list))
         # self.progress_dialog_all_commands.closeEvent = self.closeEventProgressDialogAllCommands
         self.progress_dialog_all_commands_want_to_close = False
         self.progress_dialog_all_commands.setWindowModality(Qt.ApplicationModal)
@@ -3454,51 +3263,71 @@ class MyDisplay(CDisplay):
         self.progress_dialog_all_commands.show()
         self.progress_dialog_all_commands.repaint()
 
-        # iterate over devices
-        for counter_device, selected_device in enumerate(acc_device_list):
+        # status bar message
+        self.app.main_window.statusBar().showMessage("Running {} on all {} devices (0/{})...".format(command_label, selected_accelerator, len(acc_device_list)), 0)
+        self.app.main_window.statusBar().repaint()
 
-            # update progress bar
-            self.progress_dialog_all_commands.setValue(counter_device)
-            self.progress_dialog_all_commands.repaint()
-            self.app.processEvents(QEventLoop.ExcludeUserInputEvents)
+        # run the commands on a thread so that the gui keeps responding
+        self.aux_thread_commands = QThread(parent=self)
+        self.aux_worker_commands = RunCommandsThreadWorker(acc_device_list, commands, self.japc, self.cern)
+        self.aux_worker_commands.moveToThread(self.aux_thread_commands)
+        self.aux_worker_commands.finished.connect(self.finishThreadCommands)
+        self.aux_worker_commands.processed.connect(self.updateCommandResults)
+        self.aux_thread_commands.started.connect(self.aux_worker_commands.start)
+        self.aux_thread_commands.start()
 
-            # status bar message
-            self.app.main_window.statusBar().showMessage("Running StopAll command on all {} devices ({}/{})...".format(selected_accelerator, counter_device + 1, len(acc_device_list)), 0)
-            self.app.main_window.statusBar().repaint()
+        return
+
+    #----------------------------------------------#
 
-            # iterate over commands
-            for command in commands:
+    # function that receives the result of the command on one device
+    def updateCommandResults(self, device, exception):
 
-                # send an empty dict to perform a COMMAND operation via pyjapc
-                try:
-                    self.japc.setParam("{}/{}".format(selected_device, command), {}, timingSelectorOverride="")
-                except Exception as xcp:
-                    exception = xcp
-                    print("{} - Unable to run the command: {}".format(UI_FILENAME, exception))
-                    exception_dev_list.append(selected_device)
-                    break
+        # store the result
+        self.command_results_dict[device] = exception
+        selected_accelerator, acc_device_list, message_title, command_label = self.command_info
+
+        # update progress bar
+        self.progress_dialog_all_commands.setValue(len(self.command_results_dict))
+        self.progress_dialog_all_commands.repaint()
+
+        # status bar message
+        self.app.main_window.statusBar().showMessage("Running {} on all {} devices ({}/{})...".format(command_label, selected_accelerator, len(self.command_results_dict), len(acc_device_list)), 0)
+        self.app.main_window.statusBar().repaint()
+
+        return
+
+    #----------------------------------------------#
+
+    # function that finishes the command thread and shows the aggregated results
+    def finishThreadCommands(self):
+
+        # quit the thread
+        self.aux_thread_commands.quit()
+        self.aux_thread_commands.wait()
+
+        # get the devices that failed (in the order of the tree)
+        selected_accelerator, acc_device_list, message_title, command_label = self.command_info
+        exception_dev_list = [device for device in acc_device_list if self.command_results_dict.get(device, "") != ""]
 
         # close progress bar
         self.progress_dialog_all_commands_want_to_close = True
         self.progress_dialog_all_commands.close()
 
         # status bar message
-        self.app.main_window.statusBar().showMessage("Finished running StopAll command on all {} devices!".format(selected_accelerator), 10 * 1000)
+        self.app.main_window.statusBar().showMessage("Finished running {} on all {} devices!".format(command_label, selected_accelerator), 10*1000)
         self.app.main_window.statusBar().repaint()
 
         # show finish message
         if not exception_dev_list:
-            message_title = "Command StopAll"
-            message_text = "Command StopAll ran successfully on all {} devices.".format(selected_accelerator)
+            message_text = "{} ran successfully on all {} devices.".format(message_title, selected_accelerator)
             self.message_box = QMessageBox.information(self, message_title, message_text)
         else:
             if len(exception_dev_list) == len(acc_device_list):
-                message_title = "Command StopAll".format(command)
-                message_text = "Unable to run StopAll command on any of the {} devices.".format(selected_accelerator)
+                message_text = "Unable to run {} on any of the {} devices.".format(command_label, selected_accelerator)
                 self.message_box = QMessageBox.critical(self, message_title, message_text)
             else:
-                message_title = "Command StopAll"
-                message_text = "Unable to run StopAll command on the following devices: {}. Command ran successfully in the others though.".format(', '.join(exception_dev_list))
+                message_text = "Unable to run {} on the following devices: {}. Command ran successfully in the others though.".format(command_label, ', '.join(exception_dev_list))
                 self.message_box = QMessageBox.critical(self, message_title, message_text)
 
         return
@@ -3664,11 +3493,8 @@ class MyDisplay(CDisplay):
         # send freeze information when pressing the freeze toolbutton
         self.toolButton_freeze.toggled.connect(self.sendFreezeText)
 
-        # set up a timer to open the devices when the OPEN DEVICE button is pressed
-        self.timer_open_device = QTimer(self)
-        self.timer_open_device.setInterval(1000)
-        self.timer_open_device.timeout.connect(self.isOpenDevicePushButtonPressed)
-        self.timer_open_device.start()
+        # open the devices when the OPEN DEVICE button of the preview is pressed
+        self.message_bus.openDeviceRequested.connect(self.openDeviceFromPreview, Qt.QueuedConnection)
 
         # set up a timer to HACK comrad after it is fully loaded
         self.timer_hack_operations_after_comrad_is_fully_loaded = QTimer(self)
@@ -3690,7 +3516,7 @@ class MyDisplay(CDisplay):
 
         # recheck if the devices keep working in another thread
         self.aux_thread = QThread(parent=self)
-        self.aux_worker = GetWorkingDevicesThreadWorker(self.device_list, self.acc_dev_list, self.japc, self.cern, self.working_devices, self.exception_dict)
+        self.aux_worker = GetWorkingDevicesThreadWorker(list(self.device_list), list(self.acc_dev_list), self.japc, self.cern, self.working_devices, self.exception_dict, initial_sweep = not self.is_initial_probe_finished)
         self.aux_worker.moveToThread(self.aux_thread)
         self.aux_worker.finished.connect(self.finishThread)
         self.aux_thread.started.connect(self.aux_worker.start)
@@ -3699,6 +3525,19 @@ class MyDisplay(CDisplay):
         # update the devices once the thread outputs the results
         self.aux_worker.processed.connect(self.updateWorkingDevices)
 
+        # the new device lists are queued to the recheck thread (they are only swapped between two sweeps)
+        self.deviceListsChanged.connect(self.aux_worker.setDeviceLists)
+
+        # revalidate the ccda cache in another thread in case it is too old
+        if self.is_pyccda_cache_outdated:
+            self.aux_thread_pyccda_cache = QThread(parent=self)
+            self.aux_worker_pyccda_cache = RevalidatePyCCDACacheThreadWorker(QUERY, self.app_temp_dir, self.app_cache_dir, self.pyccda_dictionary)
+            self.aux_worker_pyccda_cache.moveToThread(self.aux_thread_pyccda_cache)
+            self.aux_worker_pyccda_cache.finished.connect(self.finishThreadPyCCDACache)
+            self.aux_worker_pyccda_cache.processed.connect(self.updatePyCCDADictionary)
+            self.aux_thread_pyccda_cache.started.connect(self.aux_worker_pyccda_cache.start)
+            self.aux_thread_pyccda_cache.start()
+
         return
 
     #----------------------------------------------#
@@ -3713,33 +3552,30 @@ class MyDisplay(CDisplay):
         return
 
     # function to handle thread stops
-    def finishThreadPreviewOneDevice(self):
+    def finishThreadPyCCDACache(self):
 
         # quit the thread
-        self.aux_thread_for_preview_one_device.quit()
-        self.aux_thread_for_preview_one_device.wait()
+        self.aux_thread_pyccda_cache.quit()
+        self.aux_thread_pyccda_cache.wait()
 
         return
 
     # function to handle thread stops
-    def finishThreadSummary(self):
+    def finishThreadPreviewOneDevice(self):
 
-        # quit the threads
-        for device in self.acc_device_list_summary:
-            if device in self.summary_thread_dict.keys():
-                self.summary_thread_dict[device].quit()
-                self.summary_thread_dict[device].wait()
+        # quit the thread
+        self.aux_thread_for_preview_one_device.quit()
+        self.aux_thread_for_preview_one_device.wait()
 
         return
 
     # function to handle thread stops
-    def finishThread1ShowUp(self):
+    def finishThreadSummary(self):
 
-        # quit the threads
-        for r in range(0, self.len_iters_1_show_up):
-            if r in self.aux_thread_dict.keys():
-                self.aux_thread_dict[r].quit()
-                self.aux_thread_dict[r].wait()
+        # quit the thread
+        if type(self.summary_thread) == QThread:
+            self.summary_thread.quit()
+            self.summary_thread.wait()
 
         return
 
@@ -3759,12 +3595,7 @@ class MyDisplay(CDisplay):
 
         # update UI (tree icons and stuff like that)
         for item in self.iterItems(self.model.invisibleRootItem()):
-            if str(item.data(role=Qt.DisplayRole)) in self.working_devices:
-                item.setForeground(QBrush(Qt.black, Qt.SolidPattern))
-                item.setIcon(QIcon(os.path.join(REAL_PATH, "icons/green_tick.png")))
-            else:
-                item.setForeground(QBrush(Qt.red, Qt.SolidPattern))
-                item.setIcon(QIcon(os.path.join(REAL_PATH, "icons/red_cross.png")))
+            self.setTreeItemState(item, str(item.data(role=Qt.DisplayRole)))
 
         # update UI
         if self.current_window == "preview" or self.current_window == "summary" or self.current_window == "premain":
@@ -3822,12 +3653,7 @@ class MyDisplay(CDisplay):
 
         # update UI (tree icons and stuff like that)
         for item in self.iterItems(self.model.invisibleRootItem()):
-            if str(item.data(role=Qt.DisplayRole)) in self.working_devices:
-                item.setForeground(QBrush(Qt.black, Qt.SolidPattern))
-                item.setIcon(QIcon(os.path.join(REAL_PATH, "icons/green_tick.png")))
-            else:
-                item.setForeground(QBrush(Qt.red, Qt.SolidPattern))
-                item.setIcon(QIcon(os.path.join(REAL_PATH, "icons/red_cross.png")))
+            self.setTreeItemState(item, str(item.data(role=Qt.DisplayRole)))
 
         # close progress bar
         self.progress_dialog_after_rbac_want_to_close = True
@@ -3865,8 +3691,12 @@ class MyDisplay(CDisplay):
         # save the exceptions in a dict
         self.exception_dict = {}
 
-        # iterate over the devices
-        for index_device, device in enumerate(self.device_list):
+        # print the devices for logging and debugging
+        if verbose:
+            print("{} - Checking the availability of {} devices...".format(UI_FILENAME, len(self.device_list)))
+
+        # probe all the devices concurrently and process the results as soon as they arrive
+        for index_device, (device, xcp) in enumerate(iterProbeResults(self.device_list, self.probeDevice, max_workers = PROBE_MAX_WORKERS, timeout = PROBE_TIMEOUT)):
 
             # status bar message
             if from_rbac:
@@ -3876,35 +3706,12 @@ class MyDisplay(CDisplay):
                 self.progress_dialog_after_rbac.repaint()
                 self.app.processEvents(QEventLoop.ExcludeUserInputEvents)
 
-            # print the device for logging and debugging
-            if verbose:
-                print("{} - Checking the availability of {}".format(UI_FILENAME, device))
-
-            # # use an empty selector for LHC devices
-            # if self.acc_dev_list[index_device] == "LHC":
-            #     selectorOverride = ""
-            # # use SPS.USER.ALL for SPS devices
-            # elif self.acc_dev_list[index_device] == "SPS":
-            #     selectorOverride = "SPS.USER.SFTPRO1"
-            # # use an empty selector for the others
-            # else:
-            #     selectorOverride = ""
-
-            # use empty selector for GeneralInformation
-            selectorOverride = ""
-
-            # try out if japc returns an error or not
-            try:
-
-                # try to acquire the data from pyjapc
-                all_data_from_pyjapc = self.japc.getParam("{}/{}#{}".format(device, "GeneralInformation", "AutoGain"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False)
-
             # in case we get an exception, don't add the device to the working list
-            except self.cern.japc.core.ParameterException as xcp:
+            if isinstance(xcp, Exception):
 
                 # print the exception
                 if verbose:
-                    print("{} - Exception: cern.japc.core.ParameterException - {}".format(UI_FILENAME, xcp))
+                    print("{} - Exception: {} - {}".format(UI_FILENAME, type(xcp).__name__, xcp))
                     print("{} - Device {} is not working...".format(UI_FILENAME, device))
 
                 # save the exception as xcp
@@ -3919,6 +3726,9 @@ class MyDisplay(CDisplay):
             # save the exception as empty
             self.exception_dict[str(device)] = ""
 
+        # keep the working devices in the same order as the device list
+        self.working_devices = [device for device in self.device_list if device in self.working_devices]
+
         # status bar message
         if from_rbac:
             self.app.main_window.statusBar().showMessage("Device availability check finished! {}/{} devices working right now!".format(len(self.working_devices), len(self.device_list)), 10*1000)
@@ -3928,6 +3738,67 @@ class MyDisplay(CDisplay):
 
     #----------------------------------------------#
 
+    # function that checks if a device answers (it raises an exception otherwise)
+    def probeDevice(self, device):
+
+        # use empty selector for GeneralInformation
+        selectorOverride = ""
+
+        # try to acquire the data from pyjapc
+        self.japc.getParam("{}/{}#{}".format(device, "GeneralInformation", "AutoGain"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False)
+
+        return
+
+    #----------------------------------------------#
+
+    # function that builds the device list and the accelerator-device relation list from the pyccda dictionary
+    def getDeviceListsFromPyCCDADictionary(self):
+
+        # get the device list and the accelerator-device relation list
+        self.device_list = []
+        self.acc_dev_list = []
+        for acc_counter, acc_name in enumerate(self.pyccda_dictionary):
+            if acc_counter == 0:
+                self.device_list = list(self.pyccda_dictionary[acc_name].keys())
+                self.acc_dev_list = [acc_name]*len(list(self.pyccda_dictionary[acc_name].keys()))
+            else:
+                self.device_list += list(self.pyccda_dictionary[acc_name].keys())
+                self.acc_dev_list += [acc_name]*len(list(self.pyccda_dictionary[acc_name].keys()))
+
+        # order the device list
+        self.acc_dev_list = [x for _, x in sorted(zip(self.device_list, self.acc_dev_list))]
+        self.device_list.sort()
+
+        return
+
+    #----------------------------------------------#
+
+    # function that updates the device catalog once the ccda cache is revalidated (signal is only emitted when the catalog changed)
+    def updatePyCCDADictionary(self, pyccda_dictionary):
+
+        # print message
+        print("{} - The CCDA catalog changed since the last cache, updating the device list...".format(UI_FILENAME))
+
+        # update variables
+        self.pyccda_dictionary = pyccda_dictionary
+        self.getDeviceListsFromPyCCDADictionary()
+
+        # let the recheck thread know about the new devices (copies, the running sweep keeps its own lists)
+        self.deviceListsChanged.emit(list(self.device_list), list(self.acc_dev_list))
+
+        # rebuild the tree (old indexes are no longer valid)
+        self.createTreeFromDeviceList()
+        self.treeView.expandAll()
+        self.last_index_tree_view = 0
+
+        # status bar message
+        self.app.main_window.statusBar().showMessage("Device list updated from CCDA!", 10*1000)
+        self.app.main_window.statusBar().repaint()
+
+        return
+
+    #----------------------------------------------#
+
     # function that updates the working devices (remember signal is only emitted when there are changes in the list)
     def updateWorkingDevices(self, working_devices, exception_dict, verbose = False):
 
@@ -3935,18 +3806,30 @@ class MyDisplay(CDisplay):
         if verbose:
             print("{} - Updating working devices!".format(UI_FILENAME))
 
+        # check if the availability of the current device was unknown before this update
+        was_current_device_unknown = str(self.current_device) not in self.exception_dict
+
         # update variables
         self.working_devices = working_devices
         self.exception_dict = exception_dict
 
+        # push the working devices to the other windows
+        self.message_bus.publish(TOPIC_WORKING_DEVICES, [str(dev) for dev in self.working_devices])
+
         # update UI (tree icons and stuff like that)
         for item in self.iterItems(self.model.invisibleRootItem()):
-            if str(item.data(role=Qt.DisplayRole)) in self.working_devices:
-                item.setForeground(QBrush(Qt.black, Qt.SolidPattern))
-                item.setIcon(QIcon(os.path.join(REAL_PATH, "icons/green_tick.png")))
-            else:
-                item.setForeground(QBrush(Qt.red, Qt.SolidPattern))
-                item.setIcon(QIcon(os.path.join(REAL_PATH, "icons/red_cross.png")))
+            self.setTreeItemState(item, str(item.data(role=Qt.DisplayRole)))
+
+        # the initial check is over once all the devices are known (progressive startup)
+        if not self.is_initial_probe_finished and len(self.exception_dict) >= len(self.device_list):
+            self.is_initial_probe_finished = True
+            self.app.main_window.statusBar().showMessage("Device availability check finished! {}/{} devices working right now!".format(len(self.working_devices), len(self.device_list)), 10*1000)
+            self.app.main_window.statusBar().repaint()
+
+        # refresh the preview in case it was showing a device whose availability was still unknown
+        if was_current_device_unknown and str(self.current_device) in self.exception_dict:
+            if self.current_window == "preview" and self.last_index_tree_view != 0:
+                self.itemFromTreeviewClicked(index=self.last_index_tree_view, ignore_checking=True)
 
         # update UI (the preview panels)
         # if self.current_window == "preview" or self.current_window == "premain":
@@ -3979,13 +3862,8 @@ class MyDisplay(CDisplay):
                 # define the item to append
                 itemToAppend = QStandardItem("{}".format(device))
 
-                # determine the icon (working or not)
-                if device in self.working_devices:
-                    itemToAppend.setForeground(QBrush(Qt.black, Qt.SolidPattern))
-                    itemToAppend.setIcon(QIcon(os.path.join(REAL_PATH, "icons/green_tick.png")))
-                else:
-                    itemToAppend.setForeground(QBrush(Qt.red, Qt.SolidPattern))
-                    itemToAppend.setIcon(QIcon(os.path.join(REAL_PATH, "icons/red_cross.png")))
+                # determine the icon (working, not working or still unknown)
+                self.setTreeItemState(itemToAppend, device)
 
                 # append it to the tree
                 root.appendRow(itemToAppend)
@@ -4001,6 +3879,28 @@ class MyDisplay(CDisplay):
 
     #----------------------------------------------#
 
+    # function that sets the icon and the color of a tree item according to the availability of its device
+    def setTreeItemState(self, item, device):
+
+        # working device
+        if device in self.working_devices:
+            item.setForeground(QBrush(Qt.black, Qt.SolidPattern))
+            item.setIcon(QIcon(os.path.join(REAL_PATH, "icons/green_tick.png")))
+
+        # device that was not probed yet (progressive startup)
+        elif str(device) not in self.exception_dict:
+            item.setForeground(QBrush(Qt.gray, Qt.SolidPattern))
+            item.setIcon(QIcon(os.path.join(REAL_PATH, "icons/checkbox_false_disabled_2.png")))
+
+        # not working device
+        else:
+            item.setForeground(QBrush(Qt.red, Qt.SolidPattern))
+            item.setIcon(QIcon(os.path.join(REAL_PATH, "icons/red_cross.png")))
+
+        return
+
+    #----------------------------------------------#
+
     # function that selects and clicks the root (e.g. SPS) to init tshe summary
     def selectAndClickTheRoot(self):
 
@@ -4046,7 +3946,7 @@ class MyDisplay(CDisplay):
             self.current_device = selected_text
             self.current_accelerator = parent_text
             self.preloaded_devices.add(self.current_device)
-            self.writeDeviceIntoTxtForSubWindows(self.current_accelerator)
+            self.publishDeviceForSubWindows(self.current_accelerator)
 
             # status bar message
             self.app.main_window.statusBar().showMessage("Loading device preview...", 0)
@@ -4057,15 +3957,12 @@ class MyDisplay(CDisplay):
                 if self.aux_thread_for_preview_one_device.isRunning():
                     self.aux_worker_for_preview_one_device.stop()
 
-            # stop old threads (summary)
+            # stop old thread (summary)
             were_threads_running = False
-            for device in self.acc_device_list_summary:
-                if device in self.working_devices:
-                    if device in self.summary_thread_dict.keys():
-                        if type(self.summary_thread_dict[device]) == QThread:
-                            if self.summary_thread_dict[device].isRunning():
-                                self.summary_worker_dict[device].stop()
-                                were_threads_running = True
+            if type(self.summary_thread) == QThread:
+                if self.summary_thread.isRunning():
+                    self.summary_worker.stop()
+                    were_threads_running = True
 
             # stop japc subs (summary)
             if were_threads_running:
@@ -4073,8 +3970,8 @@ class MyDisplay(CDisplay):
                 self.japc.clearSubscriptions()
 
             # clear for new device
-            if os.path.exists(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates")):
-                shutil.rmtree(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates"))
+            self.message_bus.clearRetained(TOPIC_MODE_STATUS)
+            self.message_bus.clearRetained(TOPIC_MODE_STATUS_PREVIEW)
 
             # open main container
             self.CEmbeddedDisplay.filename = ""
@@ -4136,7 +4033,7 @@ class MyDisplay(CDisplay):
             self.current_accelerator = selected_text
             for pre_dev in list(np.array(self.device_list)[np.array(self.acc_dev_list) == self.current_accelerator]):
                 self.preloaded_devices.add(pre_dev)
-            self.writeDeviceIntoTxtForSubWindows(self.current_accelerator)
+            self.publishDeviceForSubWindows(self.current_accelerator)
 
             # status bar message
             self.app.main_window.statusBar().showMessage("Loading {} summary preview...".format(self.current_accelerator), 0)
@@ -4151,15 +4048,12 @@ class MyDisplay(CDisplay):
                 if self.aux_thread_for_preview_one_device.isRunning():
                     self.aux_worker_for_preview_one_device.stop()
 
-            # stop old threads (summary)
+            # stop old thread (summary)
             were_threads_running = False
-            for device in self.acc_device_list_summary:
-                if device in self.working_devices:
-                    if device in self.summary_thread_dict.keys():
-                        if type(self.summary_thread_dict[device]) == QThread:
-                            if self.summary_thread_dict[device].isRunning():
-                                self.summary_worker_dict[device].stop()
-                                were_threads_running = True
+            if type(self.summary_thread) == QThread:
+                if self.summary_thread.isRunning():
+                    self.summary_worker.stop()
+                    were_threads_running = True
 
             # stop japc subs (summary)
             if were_threads_running:
@@ -4167,8 +4061,8 @@ class MyDisplay(CDisplay):
                 self.japc.clearSubscriptions()
 
             # clear for new device
-            if os.path.exists(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates")):
-                shutil.rmtree(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates"))
+            self.message_bus.clearRetained(TOPIC_MODE_STATUS)
+            self.message_bus.clearRetained(TOPIC_MODE_STATUS_PREVIEW)
 
             # START the processing of the FIRST SHOW UP of the summary (e.g. progress bar)
 
@@ -4176,15 +4070,15 @@ class MyDisplay(CDisplay):
             if os.path.exists(os.path.join(self.app_temp_dir, "aux_jsons", "thread_1_show_up")):
                 shutil.rmtree(os.path.join(self.app_temp_dir, "aux_jsons", "thread_1_show_up"))
 
-            # init thread dicts
-            self.aux_thread_dict = {}
-            self.aux_worker_dict = {}
+            # drop the cells of any previous summary that were not processed yet and ignore the ones still running
+            self.thread_pool_1_show_up.clear()
+            self.show_up_id_1_show_up += 1
 
             # init model data list of lists
             self.summary_data_1_show_up = []
             self.error_dict_1_show_up = {}
             self.not_sort_summary_data_1_show_up = {}
-            self.received_rs = []
+            self.received_cells_1_show_up = 0
 
             # variables needed for the first show up
             field_list_1_show_up = ["BeamMomentum", "BstShift", "BunchSample", "FpgaCompilation", "FpgaFirmware", "FpgaStatus", "TurnBc", "TurnDropped", "TurnSample"]
@@ -4217,20 +4111,28 @@ class MyDisplay(CDisplay):
             self.app.processEvents(QEventLoop.ExcludeUserInputEvents)
             self.dialog_counter = 0
 
-            # iterate over fields and properties
+            # init the rows (general information is skipped) and count the cells to be received
+            self.expected_cells_1_show_up = 0
             for r in range(0, self.len_iters_1_show_up):
-
-                # create thread
-                self.aux_thread_dict[r] = QThread(parent=self)
-                self.aux_worker_dict[r] = GetFieldInfoThreadWorker1ShowUp(r, acc_device_list, property_list_1_show_up, field_list_1_show_up, self.working_devices, self.current_accelerator, self.pyccda_dictionary, self.japc, self.cern)
-                self.aux_worker_dict[r].moveToThread(self.aux_thread_dict[r])
-                self.aux_worker_dict[r].finished.connect(self.finishThread1ShowUp)
-                self.aux_thread_dict[r].started.connect(self.aux_worker_dict[r].start)
-                self.aux_thread_dict[r].start()
-
-                # bind thread
-                self.aux_worker_dict[r].processed.connect(self.updateModelDicts1ShowUp)
-                self.aux_worker_dict[r].iterated.connect(self.updateDialogCounter1ShowUp)
+                if r < len(field_list_1_show_up):
+                    row_name = field_list_1_show_up[r]
+                else:
+                    row_name = property_list_1_show_up[r - len(field_list_1_show_up)]
+                    if row_name == "GeneralInformation":
+                        continue
+                self.not_sort_summary_data_1_show_up[r] = [str(row_name)] + ["-"] * len(acc_device_list)
+                self.error_dict_1_show_up[r] = {0: ""}
+                self.expected_cells_1_show_up += len(acc_device_list)
+
+            # schedule the work items in the pool: one GeneralInformation acquisition per device for all the field rows and one item per (device, mode) (non-working devices are filled in right away)
+            for c, device in enumerate(acc_device_list):
+                if device in self.working_devices:
+                    self.thread_pool_1_show_up.start(GetGeneralInformationWorker1ShowUp(self.show_up_id_1_show_up, c, device, field_list_1_show_up, self.japc, self.signals_1_show_up))
+                for r in self.not_sort_summary_data_1_show_up.keys():
+                    if device not in self.working_devices:
+                        self.updateModelDicts1ShowUp(self.show_up_id_1_show_up, r, c, "-", "NOT_WORKING_DEVICE")
+                    elif r >= len(field_list_1_show_up):
+                        self.thread_pool_1_show_up.start(GetFieldInfoWorker1ShowUp(self.show_up_id_1_show_up, r, c, device, property_list_1_show_up, field_list_1_show_up, self.current_accelerator, self.pyccda_dictionary, self.japc, self.cern, self.signals_1_show_up))
 
             # open main container
             self.CEmbeddedDisplay.filename = ""
@@ -4249,9 +4151,9 @@ class MyDisplay(CDisplay):
 
             # START the processing of the SECOND SHOW UP of the summary (e.g. QThreads for updating the table each 1 second)
 
-            # init summary thread and worker dict
-            self.summary_thread_dict = {}
-            self.summary_worker_dict = {}
+            # init summary thread and worker
+            self.summary_thread = None
+            self.summary_worker = None
 
             # init subs aux variables
             DATA_SUBS_SUMMARY = {}
@@ -4303,16 +4205,16 @@ class MyDisplay(CDisplay):
                                 self.progress_dialog_1_show_up_want_to_close = True
                                 self.progress_dialog_1_show_up.close()
 
-                    # recheck if the modes are working each x seconds
-                    self.summary_thread_dict[device] = QThread(parent=self)
-                    self.summary_worker_dict[device] = workingModesThreadWorkerSummary(device, self.acc_device_list_summary, self.current_accelerator, self.japc, property_list, self.cern, self.pyccda_dictionary)
-                    self.summary_worker_dict[device].moveToThread(self.summary_thread_dict[device])
-                    self.summary_worker_dict[device].finished.connect(self.finishThreadSummary)
-                    self.summary_thread_dict[device].started.connect(self.summary_worker_dict[device].start)
-                    self.summary_thread_dict[device].start()
+            # recheck if the modes of all the devices are working (one thread that wakes up only when the next check is due)
+            self.summary_thread = QThread(parent=self)
+            self.summary_worker = workingModesSchedulerSummary(self.acc_device_list_summary, self.working_devices, self.current_accelerator, self.japc, self.cern, self.pyccda_dictionary)
+            self.summary_worker.moveToThread(self.summary_thread)
+            self.summary_worker.finished.connect(self.finishThreadSummary)
+            self.summary_thread.started.connect(self.summary_worker.start)
+            self.summary_thread.start()
 
-                    # update once the thread outputs the results
-                    self.summary_worker_dict[device].processed.connect(self.sendUpdatesWorkingModesSummary)
+            # update once the thread outputs the results
+            self.summary_worker.processed.connect(self.sendUpdatesWorkingModesSummary)
 
             # update text label
             self.label_device_panel.setText("DEVICE PANEL <font color=black>{}</font> : <font color=black>{}</font>".format(selected_text, "SUMMARY"))
@@ -4349,41 +4251,33 @@ class MyDisplay(CDisplay):
     #----------------------------------------------#
 
     # function that receives data from the threads and updates GUI on preview_summary.py
-    def updateModelDicts1ShowUp(self, r, row_list, row_error_dict, is_general_information):
+    def updateModelDicts1ShowUp(self, show_up_id, r, c, value, error):
 
-        # append r
-        self.received_rs.append(r)
+        # ignore the cells of a summary that is no longer shown
+        if show_up_id != self.show_up_id_1_show_up:
+            return
 
-        # skip general information
-        if not is_general_information:
+        # insert data and error
+        self.not_sort_summary_data_1_show_up[r][c+1] = value
+        self.error_dict_1_show_up[r][c+1] = error
+        self.received_cells_1_show_up += 1
 
-            # insert data and error
-            self.not_sort_summary_data_1_show_up[r] = row_list
-            self.error_dict_1_show_up[r] = row_error_dict
+        # update the progress dialog
+        self.updateDialogCounter1ShowUp()
 
-        # update the table when the last row is received
-        if len(self.received_rs) == self.len_iters_1_show_up:
+        # update the table when the last cell is received
+        if self.received_cells_1_show_up == self.expected_cells_1_show_up:
 
             # sort summary data
             sort_dict = collections.OrderedDict(sorted(self.not_sort_summary_data_1_show_up.items()))
             self.summary_data_1_show_up = [sort_dict[key] for key in sort_dict]
 
-            # stop all threads
-            for r in range(0, self.len_iters_1_show_up):
-                if r in self.aux_thread_dict.keys():
-                    if type(self.aux_thread_dict[r]) == QThread:
-                        if self.aux_thread_dict[r].isRunning():
-                            self.aux_worker_dict[r].stop()
-
-            # write all data to a json that preview_summary can read
+            # write all data to one atomic snapshot that preview_summary can read
             if not os.path.exists(os.path.join(self.app_temp_dir, "aux_jsons", "thread_1_show_up")):
                 os.mkdir(os.path.join(self.app_temp_dir, "aux_jsons", "thread_1_show_up"))
-            with open(os.path.join(self.app_temp_dir, "aux_jsons", "thread_1_show_up", "summary_data.json"), "w") as fp:
-                json.dump(self.summary_data_1_show_up, fp, sort_keys=True, indent=4)
-            with open(os.path.join(self.app_temp_dir, "aux_jsons", "thread_1_show_up", "error_dict.json"), "w") as fp:
-                json.dump(self.error_dict_1_show_up, fp, sort_keys=True, indent=4)
-            with open(os.path.join(self.app_temp_dir, "aux_jsons", "thread_1_show_up", "summary_header_labels_horizontal.json"), "w") as fp:
-                json.dump(self.summary_header_labels_horizontal_1_show_up, fp, sort_keys=True, indent=4)
+            writeSnapshot(os.path.join(self.app_temp_dir, "aux_jsons", "thread_1_show_up", "summary_snapshot.json"), {"summary_data": self.summary_data_1_show_up,
+                                                                                                                     "error_dict": self.error_dict_1_show_up,
+                                                                                                                     "summary_header_labels_horizontal": self.summary_header_labels_horizontal_1_show_up})
 
         return
 
@@ -4430,8 +4324,8 @@ class MyDisplay(CDisplay):
         if not dev_name in LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY.keys():
             LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY[dev_name] = {}
 
-        # store the data
-        DATA_SUBS_SUMMARY[dev_name][prop_name] = dictValues
+        # store only the liveness scalars (e.g. the buffer size) and not the payload
+        DATA_SUBS_SUMMARY[dev_name][prop_name] = get_liveness_scalars(dictValues)
 
         # store last timestamp of the callback
         LAST_TIMESTAMP_SUB_CALLBACK_SUMMARY[dev_name][prop_name] = headerInfo["acqStamp"]
@@ -4462,15 +4356,12 @@ class MyDisplay(CDisplay):
                 if self.aux_thread_for_preview_one_device.isRunning():
                     self.aux_worker_for_preview_one_device.stop()
 
-            # stop old threads (summary)
+            # stop old thread (summary)
             were_threads_running = False
-            for device in self.acc_device_list_summary:
-                if device in self.working_devices:
-                    if device in self.summary_thread_dict.keys():
-                        if type(self.summary_thread_dict[device]) == QThread:
-                            if self.summary_thread_dict[device].isRunning():
-                                self.summary_worker_dict[device].stop()
-                                were_threads_running = True
+            if type(self.summary_thread) == QThread:
+                if self.summary_thread.isRunning():
+                    self.summary_worker.stop()
+                    were_threads_running = True
 
             # stop japc subs (summary)
             if were_threads_running:
@@ -4508,7 +4399,7 @@ class MyDisplay(CDisplay):
         print("{} - Button SETTINGS pressed".format(UI_FILENAME))
 
         # write the selector
-        self.writeSelectorIntoTxt()
+        self.publishSelector()
 
         # open settings window
         if self.CEmbeddedDisplay.filename != "":
@@ -4547,6 +4438,9 @@ class MyDisplay(CDisplay):
         # print
         print("{} - The parameter nturn changed!".format(UI_FILENAME))
 
+        # make sure the next read does not come from the cache (the subscription might not have delivered the new value yet)
+        self.nturns_settings_cache.invalidate(self.current_device)
+
         # stop old thread and restart (preview_one_device)
         if type(self.aux_thread_for_preview_one_device) == QThread:
             if self.aux_thread_for_preview_one_device.isRunning():
@@ -4585,15 +4479,12 @@ class MyDisplay(CDisplay):
                     if self.aux_thread_for_preview_one_device.isRunning():
                         self.aux_worker_for_preview_one_device.stop()
 
-                # stop old threads (summary)
+                # stop old thread (summary)
                 were_threads_running = False
-                for device in self.acc_device_list_summary:
-                    if device in self.working_devices:
-                        if device in self.summary_thread_dict.keys():
-                            if type(self.summary_thread_dict[device]) == QThread:
-                                if self.summary_thread_dict[device].isRunning():
-                                    self.summary_worker_dict[device].stop()
-                                    were_threads_running = True
+                if type(self.summary_thread) == QThread:
+                    if self.summary_thread.isRunning():
+                        self.summary_worker.stop()
+                        were_threads_running = True
 
                 # stop japc subs (summary)
                 if were_threads_running:
@@ -4631,15 +4522,12 @@ class MyDisplay(CDisplay):
                     if self.aux_thread_for_preview_one_device.isRunning():
                         self.aux_worker_for_preview_one_device.stop()
 
-                # stop old threads (summary)
+                # stop old thread (summary)
                 were_threads_running = False
-                for device in self.acc_device_list_summary:
-                    if device in self.working_devices:
-                        if device in self.summary_thread_dict.keys():
-                            if type(self.summary_thread_dict[device]) == QThread:
-                                if self.summary_thread_dict[device].isRunning():
-                                    self.summary_worker_dict[device].stop()
-                                    were_threads_running = True
+                if type(self.summary_thread) == QThread:
+                    if self.summary_thread.isRunning():
+                        self.summary_worker.stop()
+                        were_threads_running = True
 
                 # stop japc subs (summary)
                 if were_threads_running:
@@ -4647,8 +4535,8 @@ class MyDisplay(CDisplay):
                     self.japc.clearSubscriptions()
 
                 # clear for new device
-                if os.path.exists(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates")):
-                    shutil.rmtree(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates"))
+                self.message_bus.clearRetained(TOPIC_MODE_STATUS)
+                self.message_bus.clearRetained(TOPIC_MODE_STATUS_PREVIEW)
 
                 # update main panel
                 self.CEmbeddedDisplay.filename = ""
@@ -4690,141 +4578,91 @@ class MyDisplay(CDisplay):
 
     #----------------------------------------------#
 
-    # function that checks if the OPEN DEVICE button was pressed and open the device in case it was
-    def isOpenDevicePushButtonPressed(self):
-
-        # check if txt exists
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "open_new_device.txt")):
-
-            # init the boolean
-            wasTheButtonPressed = "False"
-
-            # open it
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "open_new_device.txt"), "r") as f:
-                wasTheButtonPressed = f.read()
-
-            # if the button was pressed then open the device panel
-            if wasTheButtonPressed == "True":
-
-                # remove the file because we already know we have to open the device
-                os.remove(os.path.join(self.app_temp_dir, "aux_txts", "open_new_device.txt"))
+    # function that opens the device when the OPEN DEVICE button of the preview is pressed (queued, so the preview is not deleted inside its own click handler)
+    def openDeviceFromPreview(self, key, payload):
 
-                # status bar message
-                self.app.main_window.statusBar().showMessage("Loading device window...", 0)
-                self.app.main_window.statusBar().repaint()
+        # status bar message
+        self.app.main_window.statusBar().showMessage("Loading device window...", 0)
+        self.app.main_window.statusBar().repaint()
 
-                # stop old thread (preview_one_device)
-                if type(self.aux_thread_for_preview_one_device) == QThread:
-                    if self.aux_thread_for_preview_one_device.isRunning():
-                        self.aux_worker_for_preview_one_device.stop()
+        # stop old thread (preview_one_device)
+        if type(self.aux_thread_for_preview_one_device) == QThread:
+            if self.aux_thread_for_preview_one_device.isRunning():
+                self.aux_worker_for_preview_one_device.stop()
 
-                # stop old threads (summary)
-                were_threads_running = False
-                for device in self.acc_device_list_summary:
-                    if device in self.working_devices:
-                        if device in self.summary_thread_dict.keys():
-                            if type(self.summary_thread_dict[device]) == QThread:
-                                if self.summary_thread_dict[device].isRunning():
-                                    self.summary_worker_dict[device].stop()
-                                    were_threads_running = True
+        # stop old thread (summary)
+        were_threads_running = False
+        if type(self.summary_thread) == QThread:
+            if self.summary_thread.isRunning():
+                self.summary_worker.stop()
+                were_threads_running = True
 
-                # stop japc subs (summary)
-                if were_threads_running:
-                    self.japc.stopSubscriptions()
-                    self.japc.clearSubscriptions()
+        # stop japc subs (summary)
+        if were_threads_running:
+            self.japc.stopSubscriptions()
+            self.japc.clearSubscriptions()
 
-                # open main container
-                self.CEmbeddedDisplay.filename = ""
-                self.CEmbeddedDisplay.hide()
-                self.CEmbeddedDisplay.show()
-                self.CEmbeddedDisplay.filename = "main_auto.py"
-                self.CEmbeddedDisplay.open_file()
+        # open main container
+        self.CEmbeddedDisplay.filename = ""
+        self.CEmbeddedDisplay.hide()
+        self.CEmbeddedDisplay.show()
+        self.CEmbeddedDisplay.filename = "main_auto.py"
+        self.CEmbeddedDisplay.open_file()
 
-                # enable tool buttons
-                self.toolButton_main_settings.setEnabled(True)
-                self.toolButton_freeze.setEnabled(True)
-                self.toolButton_main_close.setEnabled(True)
-                self.toolButton_main_back.setEnabled(True)
+        # enable tool buttons
+        self.toolButton_main_settings.setEnabled(True)
+        self.toolButton_freeze.setEnabled(True)
+        self.toolButton_main_close.setEnabled(True)
+        self.toolButton_main_back.setEnabled(True)
 
-                # update the current window
-                self.current_window = "main"
+        # update the current window
+        self.current_window = "main"
 
         return
 
     #----------------------------------------------#
 
-    # function that writes the selector (for Settings)
-    def writeSelectorIntoTxt(self):
-
-        # create the dir in case it does not exist
-        if not os.path.exists(os.path.join(self.app_temp_dir, "aux_txts")):
-            os.mkdir(os.path.join(self.app_temp_dir, "aux_txts"))
+    # function that publishes the selector (for Settings)
+    def publishSelector(self):
 
-        # write the selector
-        with open(os.path.join(self.app_temp_dir, "aux_txts", "current_selector.txt"), "w") as f:
-            f.write(str(self.current_selector))
+        # publish the selector
+        self.message_bus.publish(TOPIC_SELECTOR, str(self.current_selector))
 
         return
 
     #----------------------------------------------#
 
-    # function that writes the device name into a txt file
-    def writeDeviceIntoTxtForSubWindows(self, acc_name):
+    # function that publishes the selected device for the sub windows
+    def publishDeviceForSubWindows(self, acc_name):
 
         # get accelerator specific devices
         acc_device_list = list(np.array(self.device_list)[np.array(self.acc_dev_list) == acc_name])
 
-        # create the dir in case it does not exist
-        if not os.path.exists(os.path.join(self.app_temp_dir, "aux_txts")):
-            os.mkdir(os.path.join(self.app_temp_dir, "aux_txts"))
-
-        # write the current device
-        with open(os.path.join(self.app_temp_dir, "aux_txts", "current_device_premain.txt"), "w") as f:
-            f.write(str(self.current_device))
-
-        # write the current accelerator
-        with open(os.path.join(self.app_temp_dir, "aux_txts", "current_accelerator_premain.txt"), "w") as f:
-            f.write(str(acc_name))
-
-        # write the exception of the current device
-        with open(os.path.join(self.app_temp_dir, "aux_txts", "exception_premain.txt"), "w") as f:
-            f.write("{}\n".format(self.exception_dict[str(self.current_device)]))
+        # publish the current device, its accelerator and its exception (if any)
+        self.message_bus.publish(TOPIC_SELECTION, {"device": str(self.current_device),
+                                                   "accelerator": str(acc_name),
+                                                   "exception": str(self.exception_dict.get(str(self.current_device), DEVICE_AVAILABILITY_UNKNOWN)),
+                                                   "device_list": [str(dev) for dev in acc_device_list],
+                                                   "preloaded_devices": [str(dev) for dev in self.preloaded_devices]})
 
-        # write the file: device_list_premain
-        with open(os.path.join(self.app_temp_dir, "aux_txts", "device_list_premain.txt"), "w") as f:
-            for dev in acc_device_list:
-                f.write("{}\n".format(dev))
-
-        # write the file: working_devices_premain
-        with open(os.path.join(self.app_temp_dir, "aux_txts", "working_devices_premain.txt"), "w") as f:
-            for dev in self.working_devices:
-                f.write("{}\n".format(dev))
-
-        # write the preloaded devices
-        with open(os.path.join(self.app_temp_dir, "aux_txts", "preloaded_devices_premain.txt"), "w") as f:
-            for dev in list(self.preloaded_devices):
-                f.write("{}\n".format(dev))
+        # publish the working devices
+        self.message_bus.publish(TOPIC_WORKING_DEVICES, [str(dev) for dev in self.working_devices])
 
         return
 
     #----------------------------------------------#
 
-    # function that writes a file whenever the freeze button is pressed
+    # function that publishes the freeze state whenever the freeze button is pressed
     def sendFreezeText(self):
 
-        # create the dir in case it does not exist
-        if not os.path.exists(os.path.join(self.app_temp_dir, "aux_txts")):
-            os.mkdir(os.path.join(self.app_temp_dir, "aux_txts"))
-
         # if it is pressed
         if self.toolButton_freeze.isChecked():
 
             # change icon
             self.toolButton_freeze.setIcon(QIcon(os.path.join(REAL_PATH, "icons/freezing_2.png")))
 
-            # write the file
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "freeze.txt"), "w") as f:
-                f.write("True")
+            # publish it
+            self.message_bus.publish(TOPIC_FREEZE, True)
 
         # if it is not pressed
         else:
@@ -4832,47 +4670,28 @@ class MyDisplay(CDisplay):
             # change icon
             self.toolButton_freeze.setIcon(QIcon(os.path.join(REAL_PATH, "icons/freezing_1.png")))
 
-            # remove the freeze txt
-            if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "freeze.txt")):
-                os.remove(os.path.join(self.app_temp_dir, "aux_txts", "freeze.txt"))
+            # publish it
+            self.message_bus.publish(TOPIC_FREEZE, False)
 
         return
 
     #----------------------------------------------#
 
-    # function that writes the mode updates to an aux json file
+    # function that publishes the mode updates of the preview
     def sendUpdatesWorkingModesPreview(self, modules_data, errors):
 
-        # create the saving dir in case it does not exist
-        if not os.path.exists(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates")):
-            os.mkdir(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates"))
-
-        # write the file: modules_data_for_preview_one_device
-        with open(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates", "modules_data_for_preview_one_device.json"), "w") as fp:
-            json.dump(modules_data, fp, sort_keys=True, indent=4)
-
-        # write the file: errors_for_preview_one_device
-        with open(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates", "errors_for_preview_one_device.json"), "w") as fp:
-            json.dump(errors, fp, sort_keys=True, indent=4)
+        # publish them
+        self.message_bus.publish(TOPIC_MODE_STATUS_PREVIEW, {"modules_data": modules_data, "errors": errors})
 
         return
 
     #----------------------------------------------#
 
-    # function that writes the mode updates to an aux json file
+    # function that publishes the mode updates of a device of the summary
     def sendUpdatesWorkingModesSummary(self, modules_data, errors, current_device):
 
-        # create the saving dir in case it does not exist
-        if not os.path.exists(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates")):
-            os.mkdir(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates"))
-
-        # write the file
-        with open(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates", "modules_data_{}.json".format(current_device)), "w") as fp:
-            json.dump(modules_data, fp, sort_keys=True, indent=4)
-
-        # write the file
-        with open(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates", "errors_{}.json".format(current_device)), "w") as fp:
-            json.dump(errors, fp, sort_keys=True, indent=4)
+        # publish copies (the bus delivers the same objects to the windows of this process and keeps them as the retained message)
+        self.message_bus.publish(TOPIC_MODE_STATUS, {"modules_data": dict(modules_data), "errors": dict(errors)}, key = current_device)
 
         return
 
@@ -4881,11 +4700,12 @@ class MyDisplay(CDisplay):
     # function that does all operations that are required after comrad is fully loaded
     def doOperationsAfterComradIsFullyLoaded(self):
 
-        # click the root and stop the timer when comrad is fully loaded
-        if self.is_comrad_fully_loaded:
+        # click the root and stop the timer when comrad is fully loaded (and the devices are known, otherwise the summary would be empty)
+        if self.is_comrad_fully_loaded and self.is_initial_probe_finished:
 
-            # click the root
-            self.selectAndClickTheRoot()
+            # click the root (unless the user already clicked something while the devices were being checked)
+            if self.last_index_tree_view == 0:
+                self.selectAndClickTheRoot()
 
             # change the title of the app
             self.app.main_window.setWindowTitle("DIAMOND BLM EXPERT GUI")
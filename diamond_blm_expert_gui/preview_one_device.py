@@ -19,11 +19,12 @@ from PyQt5.QtWidgets import (QTableView, QSizePolicy, QAbstractItemView, QTableW
 import sys
 import os
 from time import sleep
-import pyjapc
+from japc_backend import createJapc, getCernPackage
 from general_utils import createCustomTempDir, getSystemTempDir, readJSONConfigFile
+from settings_cache import getNTurnsSettingsCache, getTurnTimeInSeconds
+from message_bus import getMessageBus, TOPIC_SELECTION, TOPIC_WORKING_DEVICES, TOPIC_MODE_STATUS_PREVIEW, TOPIC_OPEN_DEVICE
 import collections
 import json
-import jpype as jp
 from datetime import datetime, timedelta, timezone
 
 ########################################################
@@ -116,14 +117,18 @@ class MyDisplay(CDisplay):
         self.app = CApplication.instance()
 
         # import cern package for handling exceptions
-        self.cern = jp.JPackage("cern")
+        self.cern = getCernPackage()
 
         # retrieve the pyccda json info file
         self.readPyCCDAJsonFile()
 
+        # get the message bus (connect to the one of premain in case this window runs in another process)
+        self.message_bus = getMessageBus()
+        self.message_bus.connectToServer()
+
         # set the device
         self.current_device = "dBLM.TEST4"
-        self.LoadDeviceFromTxtPremain()
+        self.LoadDeviceFromPremain()
 
         # get the property list
         self.property_list = list(self.pyccda_dictionary[self.current_accelerator][self.current_device]["acquisition"].keys())
@@ -133,7 +138,7 @@ class MyDisplay(CDisplay):
 
         # create japc object
         # self.japc = pyjapc.PyJapc(incaAcceleratorName = None) # use this line when launching the main application
-        self.japc = pyjapc.PyJapc() # use this line when launching the module for debugging
+        self.japc = createJapc() # use this line when launching the module for debugging
 
         # set japc selector
         self.japc.setSelector("")
@@ -372,36 +377,10 @@ class MyDisplay(CDisplay):
                     self.progress_dialog.repaint()
                     self.app.processEvents(QEventLoop.ExcludeUserInputEvents)
 
-                # get nturns
+                # get nturns (from the process-wide settings cache, which is kept fresh by a subscription)
                 try:
-
-                    # in the LHC: 1 turn = 89 microseconds (updates each 1 second if nturn = 11245)
-                    # in the SPS: 1 turn = 23.0543 microseconds (updates each 0.1 second if nturn = 4338)
-                    if property == "AcquisitionHistogram":
-                        is_multiplexed = self.pyccda_dictionary[self.current_accelerator][self.current_device]["setting"]["BeamLossHistogramSetting"]["mux"]
-                        if is_multiplexed == "False":
-                            selectorOverride = ""
-                        nturns = float(self.japc.getParam("{}/{}#{}".format(self.current_device, "BeamLossHistogramSetting", "blmNTurn"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False))
-                    elif property == "AcquisitionIntegral" or property == "AcquisitionIntegralDist" or property == "AcquisitionRawDist":
-                        is_multiplexed = self.pyccda_dictionary[self.current_accelerator][self.current_device]["setting"]["BeamLossIntegralSetting"]["mux"]
-                        if is_multiplexed == "False":
-                            selectorOverride = ""
-                        nturns = float(self.japc.getParam("{}/{}#{}".format(self.current_device, "BeamLossIntegralSetting", "turnAvgCnt"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False))
-                    elif property == "AcquisitionTurnLoss":
-                        is_multiplexed = self.pyccda_dictionary[self.current_accelerator][self.current_device]["setting"]["TurnLossMeasurementSetting"]["mux"]
-                        if is_multiplexed == "False":
-                            selectorOverride = ""
-                        nturns = float(self.japc.getParam("{}/{}#{}".format(self.current_device, "TurnLossMeasurementSetting", "turnTrackCnt"), timingSelectorOverride=selectorOverride, getHeader=False, noPyConversion=False))
-                    elif property == "Capture":
-                        pass
-                    else:
-                        print("{} - Error (unknown property {})".format(UI_FILENAME, property))
-                    if self.current_accelerator == "LHC":
-                        turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
-                    elif self.current_accelerator == "SPS":
-                        turn_time_in_seconds = nturns * TURN_TIME_SPS / 1000000
-                    else:
-                        turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
+                    nturns = getNTurnsSettingsCache().getNTurnsForProperty(self.current_device, property, self.current_accelerator, self.pyccda_dictionary)
+                    turn_time_in_seconds = getTurnTimeInSeconds(nturns, self.current_accelerator)
 
                 # if this does not work, then nothing should be working (NO_DATA_AVAILABLE_FOR_USER likely)
                 except:
@@ -536,30 +515,27 @@ class MyDisplay(CDisplay):
         # new device binding
         self.pushButton_open_device.clicked.connect(self.openNewDevice)
 
-        # set up a timer to load the QThread premain updates
-        self.timer_load_txt_with_qthread_premain_updates = QTimer(self)
-        self.timer_load_txt_with_qthread_premain_updates.setInterval(500)
-        self.timer_load_txt_with_qthread_premain_updates.timeout.connect(self.updateWorkingModes)
-        self.timer_load_txt_with_qthread_premain_updates.start()
+        # receive the QThread premain updates as soon as they are published
+        self.message_bus.modeStatusPreviewChanged.connect(self.updateWorkingModes)
+        if self.message_bus.getRetained(TOPIC_MODE_STATUS_PREVIEW) is not None:
+            self.updateWorkingModes("", self.message_bus.getRetained(TOPIC_MODE_STATUS_PREVIEW))
 
         return
 
     #----------------------------------------------#
 
     # function that updates the working modes
-    def updateWorkingModes(self):
+    def updateWorkingModes(self, key, payload):
 
         # check device is working
         if self.current_device in self.working_devices:
 
-            # check dirs exist
-            if os.path.exists(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates", "modules_data_for_preview_one_device.json")) and os.path.exists(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates", "errors_for_preview_one_device.json")):
+            # check the data exists
+            if payload:
 
-                # load the new data
-                with open(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates", "modules_data_for_preview_one_device.json")) as f:
-                    modules_data_new = json.load(f)
-                with open(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates", "errors_for_preview_one_device.json")) as f:
-                    errors_new = json.load(f)
+                # get the new data
+                modules_data_new = dict(payload["modules_data"])
+                errors_new = dict(payload["errors"])
 
                 # if there were no changes just skip
                 if self.modules_data == modules_data_new:
@@ -588,56 +564,34 @@ class MyDisplay(CDisplay):
 
     #----------------------------------------------#
 
-    # function that overwrites the txt file so that the premain.py can open the new device panel
+    # function that asks premain.py to open the new device panel
     def openNewDevice(self):
 
         # print the OPEN DEVICE action
         print("{} - Button OPEN DEVICE pressed".format(UI_FILENAME))
 
-        # create the dir in case it does not exist
-        if not os.path.exists(os.path.join(self.app_temp_dir, "aux_txts")):
-            os.mkdir(os.path.join(self.app_temp_dir, "aux_txts"))
-
-        # write the file
-        with open(os.path.join(self.app_temp_dir, "aux_txts", "open_new_device.txt"), "w") as f:
-            f.write("True")
+        # publish the request
+        self.message_bus.publish(TOPIC_OPEN_DEVICE, self.current_device)
 
         return
 
     #----------------------------------------------#
 
-    # function that loads the device from the aux txt file
-    def LoadDeviceFromTxtPremain(self):
-
-        # load the selected device
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "current_device_premain.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "current_device_premain.txt"), "r") as f:
-                self.current_device = f.read()
-
-        # load the acc
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "current_accelerator_premain.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "current_accelerator_premain.txt"), "r") as f:
-                self.current_accelerator = f.read()
+    # function that loads the device published by premain
+    def LoadDeviceFromPremain(self):
 
-        # load the exception if any
+        # load the selected device, the acc, the exception if any and the preloaded devices
         self.possible_exception = ""
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "exception_premain.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "exception_premain.txt"), "r") as f:
-                self.possible_exception = f.read()
+        selection = self.message_bus.getRetained(TOPIC_SELECTION)
+        if selection:
+            self.current_device = selection["device"]
+            self.current_accelerator = selection["accelerator"]
+            self.possible_exception = selection["exception"]
+            self.preloaded_devices = selection["preloaded_devices"]
 
         # load the working devices
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "working_devices_premain.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "working_devices_premain.txt"), "r") as f:
-                self.working_devices = []
-                for line in f:
-                    self.working_devices.append(line.strip())
-
-        # load the preloaded devices
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "preloaded_devices_premain.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "preloaded_devices_premain.txt"), "r") as f:
-                self.preloaded_devices = []
-                for line in f:
-                    self.preloaded_devices.append(line.strip())
+        if self.message_bus.getRetained(TOPIC_WORKING_DEVICES) is not None:
+            self.working_devices = list(self.message_bus.getRetained(TOPIC_WORKING_DEVICES))
 
         return
 
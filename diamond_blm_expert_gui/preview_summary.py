@@ -19,13 +19,13 @@ from PyQt5.QtWidgets import (QTableView, QSizePolicy, QAbstractItemView, QTableW
 import sys
 import os
 from time import sleep
-import pyjapc
+from japc_backend import createJapc, getCernPackage
 import numpy as np
-from general_utils import createCustomTempDir, getSystemTempDir, readJSONConfigFile
-import jpype as jp
+from general_utils import createCustomTempDir, getSystemTempDir, readJSONConfigFile, readSnapshot
+from message_bus import getMessageBus, TOPIC_SELECTION, TOPIC_WORKING_DEVICES, TOPIC_MODE_STATUS
+from mode_status_store import ModeStatusStore
 import json
 from datetime import datetime, timedelta, timezone
-from copy import deepcopy
 import collections
 
 ########################################################
@@ -102,6 +102,17 @@ class TableModel(QAbstractTableModel):
 
         return len(self._data[0])
 
+    def updateCell(self, row, col, value, error):
+
+        if self._data[row][col] == value and self.error_dict[row][col] == error:
+            return False
+
+        self._data[row][col] = value
+        self.error_dict[row][col] = error
+        self.dataChanged.emit(self.index(row, col), self.index(row, col))
+
+        return True
+
 ########################################################
 ########################################################
 
@@ -126,6 +137,7 @@ class MyDisplay(CDisplay):
         self.summary_data = None
         self.error_dict = None
         self.summary_header_labels_horizontal = None
+        self.sequence_1_show_up = None
 
         # get temp dir
         self.app_temp_dir = os.path.join(getSystemTempDir(), TEMP_DIR_NAME)
@@ -134,14 +146,18 @@ class MyDisplay(CDisplay):
         self.app = CApplication.instance()
 
         # import cern package for handling exceptions
-        self.cern = jp.JPackage("cern")
+        self.cern = getCernPackage()
 
         # retrieve the pyccda json info file
         self.readPyCCDAJsonFile()
 
+        # get the message bus (connect to the one of premain in case this window runs in another process)
+        self.message_bus = getMessageBus()
+        self.message_bus.connectToServer()
+
         # set the device list
         self.device_list = ["SP.BA1.BLMDIAMOND.2", "SP.BA2.BLMDIAMOND.2", "SP.BA4.BLMDIAMOND.2", "SP.BA6.BLMDIAMOND.2", "dBLM.TEST4"]
-        self.LoadDeviceListFromTxtPremain()
+        self.LoadDeviceListFromPremain()
 
         # order the device list
         self.device_list.sort()
@@ -160,7 +176,7 @@ class MyDisplay(CDisplay):
 
         # create japc object
         # self.japc = pyjapc.PyJapc(incaAcceleratorName = None) # use this line when launching the main application
-        self.japc = pyjapc.PyJapc() # use this line when launching the module for debugging
+        self.japc = createJapc() # use this line when launching the module for debugging
 
         # set japc selector
         self.japc.setSelector("")
@@ -259,12 +275,21 @@ class MyDisplay(CDisplay):
     # function that initializes signal-slot dependencies
     def bindWidgets(self):
 
-        # set up a timer to load the QThread premain updates
+        # set up a timer to refresh the table with the QThread premain updates (they are pushed to the message bus, the timer only limits the repaints)
         self.timer_load_txt_with_qthread_premain_updates = QTimer(self)
         self.timer_load_txt_with_qthread_premain_updates.setInterval(1000)
         self.timer_load_txt_with_qthread_premain_updates.timeout.connect(self.updateWorkingModes)
         self.timer_load_txt_with_qthread_premain_updates.start()
 
+        # keep the working devices up to date
+        self.are_working_devices_changed = False
+        self.message_bus.workingDevicesChanged.connect(self.updateWorkingDevices)
+
+        # store the mode status of every device (with a stamp so that each tick only reads the devices that changed)
+        self.mode_status_store = ModeStatusStore(self.message_bus.getRetainedDict(TOPIC_MODE_STATUS))
+        self.last_mode_status_stamp = 0
+        self.message_bus.modeStatusChanged.connect(self.receiveModeStatus)
+
         # set up a timer to load 1 SHOW UP table updates from premain
         self.timer_1_show_up = QTimer(self)
         self.timer_1_show_up.setInterval(100)
@@ -281,141 +306,83 @@ class MyDisplay(CDisplay):
         # only update if all threads from the preview_summary.py file finished their jobs
         if self.all_threads_finished:
 
-            # init new variables
-            error_dict_new = {}
-            summary_data_new = []
-
-            # iterate over fields and properties
-            for r in range(0, len(self.field_list) + len(self.property_list)):
-
-                # init row list
-                row_list = []
-
-                # init error dict for that row
-                error_dict_new[r] = {}
-
-                # operate as a field
-                if r < len(self.field_list):
-
-                    # declare the field
-                    field = self.field_list[r]
-
-                    # append first element which is the field / mode
-                    row_list.append(str(field))
-                    error_dict_new[r][0] = ""
-
-                    # iterate over devices
-                    for c, device in enumerate(self.device_list):
-
-                        # if the device IS working
-                        if device in self.working_devices:
-
-                            # copy existing table fields
-                            field_value = self.summary_data[r][c+1]
-                            row_list.append(str(field_value))
-                            error_dict_new[r][c+1] = self.error_dict[r][c+1]
+            # get the devices whose modes changed since the last tick
+            changed_dict, self.last_mode_status_stamp = self.mode_status_store.getChangedSince(self.last_mode_status_stamp)
 
-                        # if the device IS not working
-                        else:
+            # all the devices have to be rechecked if the working devices changed
+            if self.are_working_devices_changed:
+                column_list = [(c, device, self.mode_status_store.getStatus(device)) for c, device in enumerate(self.device_list)]
+                self.are_working_devices_changed = False
+            else:
+                column_list = [(c, device, changed_dict[device]) for c, device in enumerate(self.device_list) if device in changed_dict.keys()]
 
-                            # update the list with null information
-                            row_list.append("-")
-                            error_dict_new[r][c+1] = "NOT_WORKING_DEVICE"
+            # nothing to do
+            if not column_list:
+                return
 
-                # operate as a mode
-                else:
+            # iterate over the rows (fields and modes) of the persistent model
+            for r, row in enumerate(self.summary_data):
 
-                    # declare the property
-                    property = self.property_list[r - len(self.field_list)]
+                # check if the row is a mode
+                is_mode = row[0] in self.property_list
 
-                    # skip general information property
-                    if property == "GeneralInformation":
-                        continue
+                # iterate over the devices to update (their status was read once for all the rows)
+                for c, device, mode_status in column_list:
 
-                    # append first element which is the field / mode
-                    row_list.append(str(property))
-                    error_dict_new[r][0] = ""
+                    # if the device IS working
+                    if device in self.working_devices:
 
-                    # iterate over devices
-                    for c, device in enumerate(self.device_list):
+                        # fields keep the values of the first show up
+                        if not is_mode:
+                            continue
 
-                        # if the device IS working
-                        if device in self.working_devices:
+                        # update the cell with the new value (only the changed cells are repainted)
+                        if mode_status and row[0] in mode_status["modules_data"].keys():
+                            self.model_summary.updateCell(r, c+1, mode_status["modules_data"][row[0]], mode_status["errors"][row[0]])
 
-                            # check dirs exist
-                            if os.path.exists(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates", "modules_data_{}.json".format(device))) and os.path.exists(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates", "errors_{}.json".format(device))):
+                    # if the device IS not working
+                    else:
 
-                                # load the new data
-                                with open(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates", "modules_data_{}.json".format(device))) as f:
-                                    modules_data_new = json.load(f)
-                                with open(os.path.join(self.app_temp_dir, "aux_jsons", "thread_device_updates", "errors_{}.json".format(device))) as f:
-                                    errors_new = json.load(f)
+                        # update the cell with null information
+                        self.model_summary.updateCell(r, c+1, "-", "NOT_WORKING_DEVICE")
 
-                                # update with new json values
-                                if property in modules_data_new.keys():
-                                    row_list.append(modules_data_new[property])
-                                    error_dict_new[r][c+1] = errors_new[property]
-                                else:
-                                    row_list.append(self.summary_data[r][c+1])
-                                    error_dict_new[r][c+1] = self.error_dict[r][c+1]
+        return
 
-                            # dont get value from json (get it from previous table)
-                            else:
+    #----------------------------------------------#
 
-                                # copy existing table values
-                                row_list.append(self.summary_data[r][c+1])
-                                error_dict_new[r][c+1] = self.error_dict[r][c+1]
+    # function that loads the device list published by premain
+    def LoadDeviceListFromPremain(self):
 
-                        # if the device IS not working
-                        else:
+        # load the device list and the current accelerator
+        selection = self.message_bus.getRetained(TOPIC_SELECTION)
+        if selection:
+            self.device_list = list(selection["device_list"])
+            self.current_accelerator = selection["accelerator"]
 
-                            # update the list with null information
-                            row_list.append("-")
-                            error_dict_new[r][c+1] = "NOT_WORKING_DEVICE"
+        # load the working devices
+        if self.message_bus.getRetained(TOPIC_WORKING_DEVICES) is not None:
+            self.working_devices = list(self.message_bus.getRetained(TOPIC_WORKING_DEVICES))
 
-                # append the row to the full summary data
-                summary_data_new.append(row_list)
+        return
 
-            # if nothing changed just skip
-            if self.summary_data == summary_data_new:
-                return
+    #----------------------------------------------#
 
-            # update variables
-            self.summary_data = deepcopy(summary_data_new)
-            self.error_dict = deepcopy(error_dict_new)
-            del summary_data_new
-            del error_dict_new
+    # function that receives the working devices whenever premain rechecks them
+    def updateWorkingDevices(self, key, working_devices):
 
-            # update table
-            self.model_summary = TableModel(data=self.summary_data, header_labels_horizontal=self.summary_header_labels_horizontal, header_labels_vertical=[], error_dict=self.error_dict)
-            self.tableView_summary.setModel(self.model_summary)
-            self.tableView_summary.update()
+        # update the list (the table is refreshed on the next tick)
+        self.working_devices = list(working_devices)
+        self.are_working_devices_changed = True
 
         return
 
     #----------------------------------------------#
 
-    # function that loads the device list from the aux txt file
-    def LoadDeviceListFromTxtPremain(self):
+    # function that receives the mode status of a device whenever premain rechecks it
+    def receiveModeStatus(self, device, mode_status):
 
-        # load the device list
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "device_list_premain.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "device_list_premain.txt"), "r") as f:
-                self.device_list = []
-                for line in f:
-                    self.device_list.append(line.strip())
-
-        # load the working devices
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "working_devices_premain.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "working_devices_premain.txt"), "r") as f:
-                self.working_devices = []
-                for line in f:
-                    self.working_devices.append(line.strip())
-
-        # load the current accelerator
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "current_accelerator_premain.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "current_accelerator_premain.txt"), "r") as f:
-                self.current_accelerator = f.read()
+        # store it (the table is refreshed on the next tick)
+        self.mode_status_store.update(device, mode_status)
 
         return
 
@@ -433,20 +400,15 @@ class MyDisplay(CDisplay):
 
     #----------------------------------------------#
 
-    # function that reads from the json file generated by the pyccda script
+    # function that reads the snapshot of the first show up written by premain (only parsed when its sequence number changes)
     def read1ShowUpJsons(self):
 
-        # read all files
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_jsons", "thread_1_show_up")):
-            if os.path.exists(os.path.join(self.app_temp_dir, "aux_jsons", "thread_1_show_up", "summary_data.json")):
-                with open(os.path.join(self.app_temp_dir, "aux_jsons", "thread_1_show_up", "summary_data.json")) as f:
-                    self.summary_data = json.load(f)
-            if os.path.exists(os.path.join(self.app_temp_dir, "aux_jsons", "thread_1_show_up", "summary_header_labels_horizontal.json")):
-                with open(os.path.join(self.app_temp_dir, "aux_jsons", "thread_1_show_up", "summary_header_labels_horizontal.json")) as f:
-                    self.summary_header_labels_horizontal = json.load(f)
-            if os.path.exists(os.path.join(self.app_temp_dir, "aux_jsons", "thread_1_show_up", "error_dict.json")):
-                with open(os.path.join(self.app_temp_dir, "aux_jsons", "thread_1_show_up", "error_dict.json")) as f:
-                    self.error_dict = json.load(f)
+        # read the snapshot
+        snapshot, self.sequence_1_show_up = readSnapshot(os.path.join(self.app_temp_dir, "aux_jsons", "thread_1_show_up", "summary_snapshot.json"), self.sequence_1_show_up)
+        if snapshot:
+            self.summary_data = snapshot["summary_data"]
+            self.summary_header_labels_horizontal = snapshot["summary_header_labels_horizontal"]
+            self.error_dict = snapshot["error_dict"]
 
         return
 
@@ -0,0 +1,226 @@
+########################################################
+########################################################
+
+# GUI created by: martinja
+# Contact: javier.martinez.samblas@cern.ch
+
+########################################################
+########################################################
+
+# PYQT IMPORTS
+
+from PyQt5.QtCore import (QObject, pyqtSignal)
+
+# OTHER IMPORTS
+
+import os
+import threading
+from japc_backend import createJapc
+from general_utils import readJSONConfigFile
+
+########################################################
+########################################################
+
+# GLOBALS
+
+# get real path
+REAL_PATH = os.path.realpath(os.path.dirname(__file__))
+
+# constants
+JSON_CONFIG_DICT = readJSONConfigFile(os.path.join(REAL_PATH, "config_file.json"))
+TURN_TIME_LHC = float(JSON_CONFIG_DICT["TURN_TIME_LHC"]) # microseconds
+TURN_TIME_SPS = float(JSON_CONFIG_DICT["TURN_TIME_SPS"]) # microseconds
+
+# setting property and field that contain the number of turns of each acquisition property
+NTURNS_SETTING_DICT = {
+    "AcquisitionHistogram": ("BeamLossHistogramSetting", "blmNTurn"),
+    "AcquisitionIntegral": ("BeamLossIntegralSetting", "turnAvgCnt"),
+    "AcquisitionIntegralDist": ("BeamLossIntegralSetting", "turnAvgCnt"),
+    "AcquisitionRawDist": ("BeamLossIntegralSetting", "turnAvgCnt"),
+    "AcquisitionTurnLoss": ("TurnLossMeasurementSetting", "turnTrackCnt"),
+}
+
+# process-wide instance of the cache
+NTURNS_SETTINGS_CACHE = None
+
+########################################################
+########################################################
+
+# FUNCTIONS
+
+# in the LHC: 1 turn = 89 microseconds (updates each 1 second if nturn = 11245)
+# in the SPS: 1 turn = 23.0543 microseconds (updates each 0.1 second if nturn = 4338)
+def getTurnTimeInSeconds(nturns, current_accelerator):
+
+    if current_accelerator == "SPS":
+        turn_time_in_seconds = nturns * TURN_TIME_SPS / 1000000
+    else:
+        turn_time_in_seconds = nturns * TURN_TIME_LHC / 1000000
+
+    return turn_time_in_seconds
+
+def getNTurnsSelector(device, setting_property, current_accelerator, pyccda_dictionary):
+
+    # use an empty selector for non-multiplexed settings and for LHC devices
+    if pyccda_dictionary[current_accelerator][device]["setting"][setting_property]["mux"] == "False":
+        selectorOverride = ""
+    elif current_accelerator == "SPS":
+        selectorOverride = "SPS.USER.SFTPRO1"
+    else:
+        selectorOverride = ""
+
+    return selectorOverride
+
+def getNTurnsSettingsCache():
+
+    global NTURNS_SETTINGS_CACHE
+
+    if NTURNS_SETTINGS_CACHE is None:
+        NTURNS_SETTINGS_CACHE = NTurnsSettingsCache()
+
+    return NTURNS_SETTINGS_CACHE
+
+########################################################
+########################################################
+
+class NTurnsSettingsCache(QObject):
+
+    #----------------------------------------------#
+
+    # signals (device, setting property, selector, nturns)
+    nturnsChanged = pyqtSignal(str, str, str, float)
+
+    #----------------------------------------------#
+
+    # init function
+    def __init__(self, japc = None):
+
+        # inherit from QObject
+        QObject.__init__(self)
+
+        # use an own japc object so that the views clearing their subscriptions do not kill the ones of the cache
+        if japc is None:
+            japc = createJapc()
+            japc.setSelector("")
+
+        # declare attributes
+        self.japc = japc
+        self.nturns_dict = {}
+        self.subscription_dict = {}
+        self.lock = threading.Lock()
+
+        return
+
+    #----------------------------------------------#
+
+    # function that returns the nturns of a setting property (only the first call goes to the device, the subscription keeps the value fresh)
+    def getNTurns(self, device, setting_property, selector):
+
+        # check the cache
+        key = (device, setting_property, selector)
+        with self.lock:
+            if key in self.nturns_dict:
+                return self.nturns_dict[key]
+
+        # get the value via pyjapc
+        field = [value[1] for value in NTURNS_SETTING_DICT.values() if value[0] == setting_property][0]
+        nturns = float(self.japc.getParam("{}/{}#{}".format(device, setting_property, field), timingSelectorOverride=selector, getHeader=False, noPyConversion=False))
+
+        # store it and subscribe to the changes (only once per key)
+        with self.lock:
+            self.nturns_dict[key] = nturns
+            is_subscribed = key in self.subscription_dict
+            if not is_subscribed:
+                self.subscription_dict[key] = None
+        if not is_subscribed:
+            try:
+                subscription_handle = self.japc.subscribeParam("{}/{}#{}".format(device, setting_property, field), onValueReceived=lambda parameterName, newValue, key=key: self.subsCallback(key, newValue), onException=self.onException, timingSelectorOverride=selector, getHeader=False)
+                subscription_handle.startMonitoring()
+            except Exception as xcp:
+                print("NTurnsSettingsCache - Unable to subscribe to {}/{}: {}".format(device, setting_property, xcp))
+                with self.lock:
+                    if key in self.subscription_dict and self.subscription_dict[key] is None:
+                        del self.subscription_dict[key]
+                        self.nturns_dict.pop(key, None)
+                return nturns
+
+            # store the handle only if the key is still wanted (an invalidate may have removed it while subscribing)
+            with self.lock:
+                is_wanted = key in self.subscription_dict and self.subscription_dict[key] is None
+                if is_wanted:
+                    self.subscription_dict[key] = subscription_handle
+            if not is_wanted:
+                subscription_handle.stopMonitoring()
+
+        return nturns
+
+    #----------------------------------------------#
+
+    # function that returns the nturns of an acquisition property (0 for the ones not depending on nturns, e.g. Capture)
+    def getNTurnsForProperty(self, device, acquisition_property, current_accelerator, pyccda_dictionary):
+
+        # properties without nturns
+        if acquisition_property not in NTURNS_SETTING_DICT.keys():
+            return 0
+
+        # get the setting property and its selector
+        setting_property = NTURNS_SETTING_DICT[acquisition_property][0]
+        selector = getNTurnsSelector(device, setting_property, current_accelerator, pyccda_dictionary)
+
+        return self.getNTurns(device, setting_property, selector)
+
+    #----------------------------------------------#
+
+    # function that forgets the cached values of a device (e.g. after a SET from the settings dialog)
+    def invalidate(self, device):
+
+        # remove the values and the subscriptions (including the ones still being created)
+        subscription_handle_list = []
+        with self.lock:
+            key_list = [key for key in set(self.nturns_dict.keys()) | set(self.subscription_dict.keys()) if key[0] == device]
+            for key in key_list:
+                self.nturns_dict.pop(key, None)
+                subscription_handle = self.subscription_dict.pop(key, None)
+                if subscription_handle is not None:
+                    subscription_handle_list.append(subscription_handle)
+
+        # stop the subscriptions after releasing the lock (their callbacks take it)
+        for subscription_handle in subscription_handle_list:
+            subscription_handle.stopMonitoring()
+
+        return
+
+    #----------------------------------------------#
+
+    # function to receive pyjapc subs data
+    def subsCallback(self, key, newValue):
+
+        # update the value (ignore the late callbacks of the invalidated keys)
+        nturns = float(newValue)
+        with self.lock:
+            if key not in self.subscription_dict:
+                return
+            has_changed = self.nturns_dict.get(key) != nturns
+            self.nturns_dict[key] = nturns
+
+        # let the views rescale their timers
+        if has_changed:
+            self.nturnsChanged.emit(key[0], key[1], key[2], nturns)
+
+        return
+
+    #----------------------------------------------#
+
+    # function that handles pyjapc exceptions
+    def onException(self, parameterName, description, exception, verbose = False):
+
+        # print
+        if verbose:
+            print("NTurnsSettingsCache - Exception: {}".format(exception))
+
+        return
+
+    #----------------------------------------------#
+
+########################################################
+########################################################
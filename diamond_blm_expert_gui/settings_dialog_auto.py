@@ -19,9 +19,10 @@ from PyQt5.QtWidgets import (QTableView, QSizePolicy, QTableWidget, QAbstractIte
 import sys
 import os
 from time import sleep
-import pyjapc
+from japc_backend import createJapc
 import json
 from general_utils import createCustomTempDir, getSystemTempDir
+from message_bus import getMessageBus, TOPIC_SELECTION, TOPIC_SELECTOR
 
 ########################################################
 ########################################################
@@ -667,10 +668,14 @@ class MyDisplay(CDisplay):
         # retrieve the app CApplication variable
         self.app = CApplication.instance()
 
+        # get the message bus (connect to the one of premain in case this window runs in another process)
+        self.message_bus = getMessageBus()
+        self.message_bus.connectToServer()
+
         # set the device
         self.current_device = "dBLM.TEST4"
         self.current_accelerator = "LHC"
-        self.LoadDeviceFromTxtPremain()
+        self.LoadDeviceFromPremain()
 
         # set current selector
         if "dBLM.TEST" not in self.current_device:
@@ -697,7 +702,7 @@ class MyDisplay(CDisplay):
         self.field_dict = {}
 
         # create japc object
-        self.japc = pyjapc.PyJapc()
+        self.japc = createJapc()
 
         # set japc selector
         self.japc.setSelector(self.current_selector)
@@ -1137,30 +1142,24 @@ class MyDisplay(CDisplay):
 
     #----------------------------------------------#
 
-    # function that loads the device from the aux txt file
+    # function that loads the selector published by premain
     def LoadSelector(self):
 
-        # read current device
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "current_selector.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "current_selector.txt"), "r") as f:
-                self.current_selector = f.read()
+        # read current selector
+        self.current_selector = self.message_bus.getRetained(TOPIC_SELECTOR, default = self.current_selector)
 
         return
 
     #----------------------------------------------#
 
-    # function that loads the device from the aux txt file
-    def LoadDeviceFromTxtPremain(self):
-
-        # read current device
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "current_device_premain.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "current_device_premain.txt"), "r") as f:
-                self.current_device = f.read()
+    # function that loads the device published by premain
+    def LoadDeviceFromPremain(self):
 
-        # read current accelerator
-        if os.path.exists(os.path.join(self.app_temp_dir, "aux_txts", "current_accelerator_premain.txt")):
-            with open(os.path.join(self.app_temp_dir, "aux_txts", "current_accelerator_premain.txt"), "r") as f:
-                self.current_accelerator = f.read()
+        # read current device and accelerator
+        selection = self.message_bus.getRetained(TOPIC_SELECTION)
+        if selection:
+            self.current_device = selection["device"]
+            self.current_accelerator = selection["accelerator"]
 
         return
 
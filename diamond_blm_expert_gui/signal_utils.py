@@ -0,0 +1,272 @@
+########################################################
+########################################################
+
+# GUI created by: martinja
+# Contact: javier.martinez.samblas@cern.ch
+
+########################################################
+########################################################
+
+# IMPORTS
+
+import numpy as np
+import math
+from collections import deque
+
+########################################################
+########################################################
+
+# CLASSES
+
+# z-score peak detector that keeps the mean and the std of the last lag filtered samples with a sliding welford update (O(1) per sample)
+class ZScorePeakDetector:
+
+    def __init__(self, lag, threshold, influence, is_integer = False):
+
+        # hyperparams
+        self.lag = int(lag)
+        self.threshold = threshold
+        self.influence = influence
+
+        # integer signals store the filtered samples truncated (as numpy does when writing floats into an int array)
+        self.is_integer = is_integer
+
+        # state
+        self.window = deque()
+        self.avg = 0
+        self.std = 0
+        self.m2 = 0
+        self.n_updates_since_resync = 0
+
+        return
+
+    def resync(self):
+
+        # recompute the statistics of the window from scratch to drop the accumulated rounding errors
+        window = np.array(self.window)
+        self.avg = float(np.mean(window))
+        self.std = float(np.std(window))
+        self.m2 = self.std * self.std * self.lag
+        self.n_updates_since_resync = 0
+
+        return
+
+    def update(self, value):
+
+        # fill the first window (no signal until lag samples are received)
+        if len(self.window) < self.lag:
+            self.window.append(value)
+            if len(self.window) == self.lag:
+                self.resync()
+                return 0, self.avg, self.std
+            return 0, 0, 0
+
+        # compare the sample against the statistics of the previous window
+        if abs(value - self.avg) > self.threshold * self.std:
+            if value > self.avg:
+                signal = 1
+            else:
+                signal = -1
+            filtered_value = self.influence * value + (1 - self.influence) * self.window[-1]
+            if self.is_integer:
+                filtered_value = int(filtered_value)
+        else:
+            signal = 0
+            filtered_value = value
+
+        # slide the window
+        old_value = self.window.popleft()
+        self.window.append(filtered_value)
+        self.n_updates_since_resync += 1
+        if self.n_updates_since_resync >= self.lag:
+            self.resync()
+        else:
+            old_avg = self.avg
+            self.avg = old_avg + (filtered_value - old_value) / self.lag
+            self.m2 += (filtered_value - old_value) * (filtered_value - self.avg + old_value - old_avg)
+            self.std = math.sqrt(max(self.m2, 0) / self.lag)
+
+        return signal, self.avg, self.std
+
+# multi-resolution min/max pyramid of a curve (level k keeps the min and the max of blocks of 2^k samples, so the peaks survive the decimation)
+class MinMaxPyramid:
+
+    def __init__(self, x, y, min_level_size = 2):
+
+        # raw data
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+
+        # build the levels from the previous one (the whole pyramid costs less than 2 passes over the data)
+        self.min_list = []
+        self.max_list = []
+        level_min = self.y
+        level_max = self.y
+        while len(level_min) >= 2 * min_level_size:
+            if len(level_min) % 2 != 0:
+                level_min = np.append(level_min, level_min[-1])
+                level_max = np.append(level_max, level_max[-1])
+            level_min = np.minimum(level_min[0::2], level_min[1::2])
+            level_max = np.maximum(level_max[0::2], level_max[1::2])
+            self.min_list.append(level_min)
+            self.max_list.append(level_max)
+
+        return
+
+    def sample(self, x1, x2, max_points):
+
+        # get the visible samples (plus one at each side so that the curve does not end before the borders)
+        n = len(self.y)
+        i1 = max(0, int(np.searchsorted(self.x, x1, side='left')) - 1)
+        i2 = min(n, int(np.searchsorted(self.x, x2, side='right')) + 1)
+
+        # use the raw data if there are few samples
+        n_blocks = max(1, int(max_points) // 2)
+        if i2 - i1 <= 2 * n_blocks or not self.min_list:
+            return self.x[i1:i2], self.y[i1:i2], (0, i1, i2)
+
+        # use the finest level that gives at most two points (min and max) per block
+        level = min(int(math.ceil(math.log2((i2 - i1) / n_blocks))), len(self.min_list))
+        block_size = 2 ** level
+        b1 = i1 // block_size
+        b2 = min(-(-i2 // block_size), len(self.min_list[level - 1]))
+
+        # interleave the min and the max of each block at its first sample
+        x_blocks = self.x[np.arange(b1, b2) * block_size]
+        y_blocks = np.empty(2 * (b2 - b1), dtype=self.min_list[level - 1].dtype)
+        y_blocks[0::2] = self.min_list[level - 1][b1:b2]
+        y_blocks[1::2] = self.max_list[level - 1][b1:b2]
+
+        return np.repeat(x_blocks, 2), y_blocks, (level, b1, b2)
+
+    def getBounds(self, axis, orthoRange = None):
+
+        # nothing to bound
+        if len(self.y) == 0:
+            return None
+
+        # x bounds (of the samples whose y is inside orthoRange)
+        if axis == 0:
+            if orthoRange is None:
+                return self.x[0], self.x[-1]
+            x_inside = self.x[(self.y >= orthoRange[0]) & (self.y <= orthoRange[1])]
+            if len(x_inside) == 0:
+                return None
+            return x_inside[0], x_inside[-1]
+
+        # y bounds (of the samples whose x is inside orthoRange)
+        if orthoRange is None:
+            i1, i2 = 0, len(self.y)
+        else:
+            i1 = int(np.searchsorted(self.x, orthoRange[0], side='left'))
+            i2 = int(np.searchsorted(self.x, orthoRange[1], side='right'))
+
+        return self.getRange(i1, i2)
+
+    def getRange(self, i1, i2):
+
+        # min and max of y[i1:i2]
+        i2 = min(len(self.y), i2)
+        if i2 <= i1:
+            return None
+
+        # the whole data is the top level
+        if i1 == 0 and i2 == len(self.y) and self.min_list:
+            return self.min_list[-1].min(), self.max_list[-1].max()
+
+        # whole blocks of about sqrt(n) samples plus the raw samples at the edges (about sqrt(n) reads instead of n)
+        level = min(int(math.log2(i2 - i1)) // 2, len(self.min_list))
+        block_size = 2 ** level
+        b1 = -(-i1 // block_size)
+        b2 = i2 // block_size
+        if level == 0 or b2 <= b1:
+            return self.y[i1:i2].min(), self.y[i1:i2].max()
+        min_list = [self.min_list[level - 1][b1:b2].min()]
+        max_list = [self.max_list[level - 1][b1:b2].max()]
+        for y_edge in [self.y[i1:b1 * block_size], self.y[b2 * block_size:i2]]:
+            if len(y_edge) > 0:
+                min_list.append(y_edge.min())
+                max_list.append(y_edge.max())
+
+        return min(min_list), max(max_list)
+
+########################################################
+########################################################
+
+# FUNCTIONS
+
+# peak detector (batch version of ZScorePeakDetector)
+def thresholding_algo(y, lag, threshold, influence):
+
+    # init detector
+    y = np.asarray(y)
+    detector = ZScorePeakDetector(lag, threshold, influence, is_integer = np.issubdtype(y.dtype, np.integer))
+
+    # run it over all the samples
+    signals = np.zeros(len(y))
+    avgFilter = np.zeros(len(y))
+    stdFilter = np.zeros(len(y))
+    for i, value in enumerate(y.tolist()):
+        signals[i], avgFilter[i], stdFilter[i] = detector.update(value)
+
+    return dict(signals=np.asarray(signals),
+                avgFilter=np.asarray(avgFilter),
+                stdFilter=np.asarray(stdFilter))
+
+########################################################
+########################################################
+
+# benchmark against the previous implementation (mean and std of the whole window on every sample)
+if __name__ == "__main__":
+
+    import time
+
+    def thresholding_algo_windowed(y, lag, threshold, influence):
+
+        signals = np.zeros(len(y))
+        filteredY = np.array(y)
+        avgFilter = [0] * len(y)
+        stdFilter = [0] * len(y)
+        avgFilter[lag - 1] = np.mean(y[0:lag])
+        stdFilter[lag - 1] = np.std(y[0:lag])
+
+        for i in range(lag, len(y)):
+            if abs(y[i] - avgFilter[i - 1]) > threshold * stdFilter[i - 1]:
+                if y[i] > avgFilter[i - 1]:
+                    signals[i] = 1
+                else:
+                    signals[i] = -1
+                filteredY[i] = influence * y[i] + (1 - influence) * filteredY[i - 1]
+            else:
+                signals[i] = 0
+                filteredY[i] = y[i]
+            avgFilter[i] = np.mean(filteredY[(i - lag + 1):i + 1])
+            stdFilter[i] = np.std(filteredY[(i - lag + 1):i + 1])
+
+        return dict(signals=np.asarray(signals), avgFilter=np.asarray(avgFilter), stdFilter=np.asarray(stdFilter))
+
+    # same hyperparams as the phase auto-tuning
+    lag = 1000
+    threshold = 20
+    influence = 0.2
+
+    # noisy signal with some losses
+    np.random.seed(0)
+    y = np.random.normal(100, 5, 20000).astype(np.int16)
+    y[np.random.choice(np.arange(lag, len(y)), 50)] += 1000
+
+    # run both
+    start_time = time.time()
+    result_windowed = thresholding_algo_windowed(y, lag, threshold, influence)
+    time_windowed = time.time() - start_time
+    start_time = time.time()
+    result = thresholding_algo(y, lag, threshold, influence)
+    time_streaming = time.time() - start_time
+
+    # print
+    print("windowed: {:.3f} s - streaming: {:.3f} s - speedup: x{:.1f}".format(time_windowed, time_streaming, time_windowed / time_streaming))
+    print("same signals: {} - max avg error: {:.2e} - max std error: {:.2e}".format(np.array_equal(result["signals"], result_windowed["signals"]),
+          np.max(np.abs(result["avgFilter"] - result_windowed["avgFilter"])), np.max(np.abs(result["stdFilter"] - result_windowed["stdFilter"]))))
+
+########################################################
+########################################################
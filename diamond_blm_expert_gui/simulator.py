@@ -0,0 +1,708 @@
+########################################################
+########################################################
+
+# GUI created by: martinja
+# Contact: javier.martinez.samblas@cern.ch
+
+########################################################
+########################################################
+
+# IMPORTS
+
+import time
+import heapq
+import random
+import threading
+import zlib
+import numpy as np
+from datetime import datetime, timezone
+
+########################################################
+########################################################
+
+# GLOBALS
+
+# turn time of each accelerator (microseconds)
+TURN_TIME_DICT = {"LHC": 89.0, "SPS": 23.0543}
+
+# samples of the raw buffers per microsecond (0.65 GHz) and samples between two 25 ns bunch slots
+SAMPLES_PER_MICROSECOND = 650.0
+SAMPLES_PER_SLOT = 16.25
+
+# filling scheme of each accelerator (number of trains, bunches per train, empty slots between trains) and slot of the first bunch after the turn clock
+BUNCH_PATTERN_DICT = {"LHC": (20, 48, 30), "SPS": (4, 72, 9)}
+FIRST_SLOT = 4
+
+# flags of the capture buffers (the turn flags are the ones drawn as turn markers)
+FLAG_BUNCH = 1
+FLAG_FIRST_BUNCH = 2
+FLAG_TURN = 5
+FLAG_TURN_BUNCH = 6
+
+# shape of the loss pulse of a bunch in the raw buffers (samples)
+PULSE_SHAPE = np.exp(-np.arange(16) / 3.0)
+
+# devices that are known to exist (the rest of the simulated devices get numbered names)
+SPS_DEVICE_LIST = ["SP.BA1.BLMDIAMOND.2", "SP.BA2.BLMDIAMOND.2", "SP.BA4.BLMDIAMOND.2", "SP.BA6.BLMDIAMOND.2", "SP.UA23.BLMDIAMOND.3", "SP.UA87.BLMDIAMOND.3"]
+
+# selector of the cycle-bound devices
+SPS_SELECTOR = "SPS.USER.SFTPRO1"
+
+# properties of the BLMDIAMONDVFC class (property type, array fields, scalar fields, other fields, multiplexed)
+SIMULATED_PROPERTY_LIST = [
+    ("acquisition", "Capture", ["rawBuf0", "rawBuf1", "rawBufFlags0", "rawBufFlags1"], ["nbOfTurns"], [], True),
+    ("acquisition", "AcquisitionHistogram", ["blmbuf0", "blmbuf1", "blmbuf0_compressed", "blmbuf1_compressed", "blmbuf0_indexes", "blmbuf1_indexes"], ["blmNTurn", "nbOfBunches"], [], True),
+    ("acquisition", "AcquisitionIntegral", [], ["integral0", "integral1", "turnAvgCnt"], [], True),
+    ("acquisition", "AcquisitionIntegralDist", ["integralDist0", "integralDist1"], ["turnAvgCnt"], [], True),
+    ("acquisition", "AcquisitionRawDist", ["rawDist0", "rawDist1"], ["turnAvgCnt"], [], True),
+    ("acquisition", "AcquisitionTurnLoss", ["turnLossBuf0", "turnLossBuf1", "turnLossBuf0_compressed", "turnLossBuf1_compressed", "turnLossBuf0_indexes", "turnLossBuf1_indexes"], ["turnTrackCnt", "turnTrackBunch"], [], True),
+    ("acquisition", "GeneralInformation", [], ["AutoGain", "boardTemperature", "firmwareVersion"], ["monitorNames"], False),
+    ("setting", "ExpertSetting", [], ["FBDEPTH", "SYNCDELDEPTH", "FBEXTRADEPTH0"], [], False),
+    ("setting", "BeamLossHistogramSetting", [], ["blmNTurn"], [], True),
+    ("setting", "BeamLossIntegralSetting", [], ["turnAvgCnt"], [], True),
+    ("setting", "TurnLossMeasurementSetting", [], ["turnTrackCnt", "turnTrackBunch"], [], True),
+    ("command", "ResetCapture", [], [], [], False),
+    ("command", "TriggerCapture", [], [], [], False),
+    ("command", "Reset", [], [], [], False),
+]
+
+# default settings of each accelerator (the nturns give 1 second in the LHC and 0.1 seconds in the SPS)
+DEFAULT_SETTING_DICT = {
+    "LHC": {"ExpertSetting": {"FBDEPTH": 0, "SYNCDELDEPTH": 0, "FBEXTRADEPTH0": 0},
+            "BeamLossHistogramSetting": {"blmNTurn": 11245},
+            "BeamLossIntegralSetting": {"turnAvgCnt": 11245},
+            "TurnLossMeasurementSetting": {"turnTrackCnt": 11245, "turnTrackBunch": 1}},
+    "SPS": {"ExpertSetting": {"FBDEPTH": 0, "SYNCDELDEPTH": 0, "FBEXTRADEPTH0": 0},
+            "BeamLossHistogramSetting": {"blmNTurn": 4338},
+            "BeamLossIntegralSetting": {"turnAvgCnt": 4338},
+            "TurnLossMeasurementSetting": {"turnTrackCnt": 4338, "turnTrackBunch": 1}},
+}
+
+########################################################
+########################################################
+
+# FUNCTIONS
+
+def getSimulatedDeviceNames(n_devices):
+
+    # the known sps devices first and then numbered ones (the lhc devices match the test devices of the query)
+    sps_device_list = SPS_DEVICE_LIST[:n_devices] + ["SP.SIM{}.BLMDIAMOND.2".format(index) for index in range(1, n_devices - len(SPS_DEVICE_LIST) + 1)]
+    lhc_device_list = ["dBLM.TEST{}".format(index) for index in range(1, n_devices + 1)]
+
+    return {"LHC": lhc_device_list, "SPS": sps_device_list}
+
+def createSimulatedPyCCDADictionary(n_devices = 4):
+
+    # same structure as parse_fesa_class_property (the property dictionaries are shared between all devices)
+    dict_class_info = {"acquisition": {}, "command": {}, "setting": {}}
+    for property_type, property, array_list, scalar_list, other_list, is_multiplexed in SIMULATED_PROPERTY_LIST:
+        dict_class_info[property_type][property] = {"array": {field: {} for field in array_list},
+                                                    "scalar": {field: {} for field in scalar_list},
+                                                    "other": {field: {} for field in other_list},
+                                                    "mux": "True" if is_multiplexed else "False"}
+
+    # same structure as create_pyccda_json_file (only the sps devices are cycle bound)
+    output_dict = {}
+    for accelerator, device_list in getSimulatedDeviceNames(n_devices).items():
+        output_dict[accelerator] = {}
+        for device in device_list:
+            output_dict[accelerator][device] = {"acquisition": dict_class_info["acquisition"],
+                                                "command": dict_class_info["command"],
+                                                "setting": dict_class_info["setting"],
+                                                "cycle_bound": "True" if accelerator == "SPS" else "False"}
+
+    return output_dict
+
+def getFilledSlots(accelerator):
+
+    # slots of the bunches in one turn and whether they are the first bunch of a train
+    n_trains, n_bunches, n_gap = BUNCH_PATTERN_DICT[accelerator]
+    slot_list = []
+    is_first_list = []
+    for index_train in range(n_trains):
+        for index_bunch in range(n_bunches):
+            slot_list.append(FIRST_SLOT + index_train * (n_bunches + n_gap) + index_bunch)
+            is_first_list.append(index_bunch == 0)
+
+    return np.array(slot_list), np.array(is_first_list)
+
+def getSlotsPerTurn(accelerator):
+
+    return int(round(TURN_TIME_DICT[accelerator] * 1000 / 25))
+
+def createCaptureData(accelerator, n_turns, rng, loss_level = 200.0, noise_level = 8.0, baseline = 100):
+
+    # length of the buffers
+    samples_per_turn = TURN_TIME_DICT[accelerator] * SAMPLES_PER_MICROSECOND
+    n_samples = int(round(n_turns * samples_per_turn))
+
+    # samples of the turns and of the bunches (the first turn starts a bit after the start of the buffer)
+    slot_array, is_first_array = getFilledSlots(accelerator)
+    turn_starts = 20 + np.arange(n_turns) * samples_per_turn
+    bunch_positions = np.round(turn_starts[:, None] + slot_array[None, :] * SAMPLES_PER_SLOT).astype(np.int64).ravel()
+    is_first_bunch = np.tile(is_first_array, n_turns)
+    is_first_bunch = is_first_bunch[bunch_positions < n_samples]
+    bunch_positions = bunch_positions[bunch_positions < n_samples]
+    turn_positions = np.round(turn_starts).astype(np.int64)
+
+    # flags (bunches first so that the turns falling on a bunch get the combined flag)
+    flags = np.zeros(n_samples, dtype=np.int16)
+    flags[bunch_positions] = FLAG_BUNCH
+    flags[bunch_positions[is_first_bunch]] = FLAG_FIRST_BUNCH
+    flags[turn_positions] = np.where(flags[turn_positions] != 0, FLAG_TURN_BUNCH, FLAG_TURN)
+
+    # one loss pulse per bunch on top of the baseline and the noise (one buffer per diamond)
+    capture_dict = {}
+    for buffer_index in ["0", "1"]:
+        signal = np.zeros(n_samples)
+        signal[bunch_positions] = rng.exponential(loss_level, len(bunch_positions))
+        signal = np.convolve(signal, PULSE_SHAPE)[:n_samples]
+        signal += baseline + rng.normal(0, noise_level, n_samples)
+        capture_dict["rawBuf{}".format(buffer_index)] = np.clip(signal, -32768, 32767).astype(np.int16)
+        capture_dict["rawBufFlags{}".format(buffer_index)] = flags.copy()
+    capture_dict["nbOfTurns"] = n_turns
+
+    return capture_dict
+
+def createEmptyCaptureData():
+
+    # what the device returns after a ResetCapture
+    capture_dict = {}
+    for buffer_index in ["0", "1"]:
+        capture_dict["rawBuf{}".format(buffer_index)] = np.array([], dtype=np.int16)
+        capture_dict["rawBufFlags{}".format(buffer_index)] = np.array([], dtype=np.int16)
+    capture_dict["nbOfTurns"] = 0
+
+    return capture_dict
+
+def compressBuffer(buffer):
+
+    # keep the non-zero values and their indexes
+    indexes = np.flatnonzero(buffer).astype(np.int32)
+
+    return buffer[indexes], indexes
+
+def createHistogramData(accelerator, n_turns, rng, loss_rate = 1e-3):
+
+    # losses per bunch slot counted over the turns (only the filled slots lose particles)
+    slot_array, is_first_array = getFilledSlots(accelerator)
+    histogram_dict = {"blmNTurn": n_turns, "nbOfBunches": len(slot_array)}
+    for buffer_index in ["0", "1"]:
+        blmbuf = np.zeros(getSlotsPerTurn(accelerator), dtype=np.int32)
+        blmbuf[slot_array] = rng.poisson(loss_rate * n_turns, len(slot_array))
+        histogram_dict["blmbuf{}".format(buffer_index)] = blmbuf
+        histogram_dict["blmbuf{}_compressed".format(buffer_index)], histogram_dict["blmbuf{}_indexes".format(buffer_index)] = compressBuffer(blmbuf)
+
+    return histogram_dict
+
+def createIntegralData(accelerator, n_turns, rng, loss_level = 200.0):
+
+    # sum of the losses of all the bunches over the turns
+    n_bunches = len(getFilledSlots(accelerator)[0])
+    integral_dict = {"turnAvgCnt": n_turns}
+    for buffer_index in ["0", "1"]:
+        integral_dict["integral{}".format(buffer_index)] = float(rng.normal(loss_level * n_bunches * n_turns, np.sqrt(loss_level * n_bunches * n_turns)))
+
+    return integral_dict
+
+def createDistributionData(n_turns, rng, prefix, n_bins = 256, center = 100.0, width = 10.0):
+
+    # histogram of the values over the turns (gaussian around the baseline)
+    bins = np.arange(n_bins)
+    pmf = np.exp(-0.5 * ((bins - center * rng.uniform(0.95, 1.05)) / width) ** 2)
+    pmf /= np.sum(pmf)
+    distribution_dict = {"turnAvgCnt": n_turns}
+    for buffer_index in ["0", "1"]:
+        distribution_dict["{}{}".format(prefix, buffer_index)] = rng.multinomial(n_turns, pmf).astype(np.int32)
+
+    return distribution_dict
+
+def createTurnLossData(n_turns, rng, bunch = 1, loss_rate = 0.05):
+
+    # losses of one bunch turn by turn
+    turn_loss_dict = {"turnTrackCnt": n_turns, "turnTrackBunch": bunch}
+    for buffer_index in ["0", "1"]:
+        turn_loss_buf = rng.poisson(loss_rate, n_turns).astype(np.int32)
+        turn_loss_dict["turnLossBuf{}".format(buffer_index)] = turn_loss_buf
+        turn_loss_dict["turnLossBuf{}_compressed".format(buffer_index)], turn_loss_dict["turnLossBuf{}_indexes".format(buffer_index)] = compressBuffer(turn_loss_buf)
+
+    return turn_loss_dict
+
+def createGeneralInformationData(device, rng, auto_gain = True):
+
+    return {"AutoGain": auto_gain,
+            "boardTemperature": float(np.round(rng.normal(42.0, 0.5), 1)),
+            "firmwareVersion": "2.3.0",
+            "monitorNames": np.array(["{}.CH0".format(device), "{}.CH1".format(device)])}
+
+def parseParameterName(parameter_name):
+
+    # device/property#field (the field is optional)
+    device, property_field = parameter_name.split("/", 1)
+    if "#" in property_field:
+        property, field = property_field.split("#", 1)
+    else:
+        property, field = property_field, None
+
+    return device, property, field
+
+########################################################
+########################################################
+
+# CLASSES
+
+# exception raised by the simulated devices (same methods as the java ParameterException used by the gui)
+class SimulatedParameterException(Exception):
+
+    def getMessage(self):
+
+        return str(self)
+
+# stand-in of the java package so that "except self.cern.japc.core.ParameterException" keeps working
+class SimulatedCernPackage:
+
+    def __init__(self):
+
+        core = type("core", (), {"ParameterException": SimulatedParameterException})
+        self.japc = type("japc", (), {"core": core})
+
+        return
+
+# synthetic BLMDIAMONDVFC device (acquisitions are generated lazily, once per publication)
+class SimulatedDevice:
+
+    def __init__(self, name, accelerator, seed = 0, capture_turns = 10):
+
+        # attributes
+        self.name = name
+        self.accelerator = accelerator
+        self.capture_turns = int(capture_turns)
+        self.rng = np.random.default_rng([seed, zlib.crc32(name.encode("utf-8"))])
+        self.lock = threading.Lock()
+
+        # settings (copied so that every device can be changed on its own)
+        self.setting_dict = {property: dict(field_dict) for property, field_dict in DEFAULT_SETTING_DICT[accelerator].items()}
+        self.setting_version = 0
+
+        # last publication of each acquisition property
+        self.acquisition_dict = {}
+        self.is_capture_reset = False
+        self.capture_trigger_count = 0
+
+        return
+
+    def getSelector(self, selector):
+
+        # the sps devices are cycle bound
+        if self.accelerator == "SPS":
+            return selector if selector else SPS_SELECTOR
+
+        return ""
+
+    def createAcquisition(self, property):
+
+        # generate the fields of the property
+        if property == "Capture":
+            if self.is_capture_reset:
+                return createEmptyCaptureData()
+            return createCaptureData(self.accelerator, self.capture_turns, self.rng)
+        elif property == "AcquisitionHistogram":
+            return createHistogramData(self.accelerator, self.setting_dict["BeamLossHistogramSetting"]["blmNTurn"], self.rng)
+        elif property == "AcquisitionIntegral":
+            return createIntegralData(self.accelerator, self.setting_dict["BeamLossIntegralSetting"]["turnAvgCnt"], self.rng)
+        elif property == "AcquisitionIntegralDist":
+            return createDistributionData(self.setting_dict["BeamLossIntegralSetting"]["turnAvgCnt"], self.rng, "integralDist")
+        elif property == "AcquisitionRawDist":
+            return createDistributionData(self.setting_dict["BeamLossIntegralSetting"]["turnAvgCnt"], self.rng, "rawDist")
+        elif property == "AcquisitionTurnLoss":
+            return createTurnLossData(self.setting_dict["TurnLossMeasurementSetting"]["turnTrackCnt"], self.rng, bunch = self.setting_dict["TurnLossMeasurementSetting"]["turnTrackBunch"])
+        elif property == "GeneralInformation":
+            return createGeneralInformationData(self.name, self.rng)
+        else:
+            raise SimulatedParameterException("NO_SUCH_PROPERTY: The property {} does not exist in the device {}".format(property, self.name))
+
+    def getAcquisition(self, property, publication, rate, selector):
+
+        # generate the acquisition only once per publication (every get and every subscription of the same publication sees the same values)
+        with self.lock:
+            key = (property, self.capture_trigger_count if property == "Capture" else 0)
+            if key not in self.acquisition_dict or self.acquisition_dict[key][0] != publication:
+                stamp = datetime.fromtimestamp(publication / rate, timezone.utc)
+                value = self.createAcquisition(property)
+                value["acqStamp"] = stamp
+                value["cycleStamp"] = stamp
+                value["cycleName"] = self.getSelector(selector)
+                self.acquisition_dict = {cached_key: cached for cached_key, cached in self.acquisition_dict.items() if cached_key[0] != property}
+                self.acquisition_dict[key] = (publication, value)
+            value = self.acquisition_dict[key][1]
+
+        # header of the publication
+        header = {"acqStamp": value["acqStamp"], "cycleStamp": value["cycleStamp"], "selector": value["cycleName"], "isFirstUpdate": False, "isImmediateUpdate": False}
+
+        return value, header
+
+    def getSetting(self, property, selector):
+
+        # settings are not published periodically (the stamp is the one of the last change)
+        with self.lock:
+            value = dict(self.setting_dict[property])
+        stamp = datetime.now(timezone.utc)
+        header = {"acqStamp": stamp, "cycleStamp": stamp, "selector": self.getSelector(selector), "isFirstUpdate": False, "isImmediateUpdate": False}
+
+        return value, header
+
+    def setSetting(self, property, value):
+
+        # only the known fields can be set
+        with self.lock:
+            for field, field_value in value.items():
+                if field not in self.setting_dict[property]:
+                    raise SimulatedParameterException("NO_SUCH_FIELD: The field {} does not exist in the property {}".format(field, property))
+            for field, field_value in value.items():
+                self.setting_dict[property][field] = type(self.setting_dict[property][field])(field_value)
+            self.setting_version += 1
+
+        return
+
+    def runCommand(self, command):
+
+        # ResetCapture empties the buffers until the next TriggerCapture, which publishes a new capture straight away
+        with self.lock:
+            if command == "ResetCapture":
+                self.is_capture_reset = True
+                self.capture_trigger_count += 1
+            elif command == "TriggerCapture":
+                self.is_capture_reset = False
+                self.capture_trigger_count += 1
+            elif command == "Reset":
+                self.setting_dict = {property: dict(field_dict) for property, field_dict in DEFAULT_SETTING_DICT[self.accelerator].items()}
+                self.setting_version += 1
+
+        return
+
+# synthetic catalog plus devices, with the publication rates, the latency and the failures injected in every call
+class SimulatedBackend:
+
+    def __init__(self, n_devices = 4, rate = 10.0, capture_rate = 1.0, capture_turns = 10, latency = 0.0, failure_rate = 0.0, seed = 0):
+
+        # attributes
+        self.rate = float(rate)
+        self.capture_rate = float(capture_rate)
+        self.latency = float(latency)
+        self.failure_rate = float(failure_rate)
+        self.random = random.Random(seed)
+
+        # catalog and devices
+        self.pyccda_dictionary = createSimulatedPyCCDADictionary(n_devices = n_devices)
+        self.device_dict = {}
+        for accelerator, device_list in getSimulatedDeviceNames(n_devices).items():
+            for device in device_list:
+                self.device_dict[device] = SimulatedDevice(device, accelerator, seed = seed, capture_turns = capture_turns)
+
+        return
+
+    def getDevice(self, device):
+
+        if device not in self.device_dict:
+            raise SimulatedParameterException("NO_SUCH_DEVICE: The device {} does not exist".format(device))
+
+        return self.device_dict[device]
+
+    def getPropertyType(self, device, property):
+
+        # look the property up in the catalog
+        simulated_device = self.getDevice(device)
+        for property_type in ["acquisition", "setting", "command"]:
+            if property in self.pyccda_dictionary[simulated_device.accelerator][device][property_type]:
+                return property_type
+
+        raise SimulatedParameterException("NO_SUCH_PROPERTY: The property {} does not exist in the device {}".format(property, device))
+
+    def getRate(self, property):
+
+        # the captures are published at their own rate
+        if property == "Capture":
+            return self.capture_rate
+
+        return self.rate
+
+    def getNextPublicationTime(self, parameter_name, now = None):
+
+        # publications are aligned to multiples of the period
+        if now is None:
+            now = time.time()
+        rate = self.getRate(parseParameterName(parameter_name)[1])
+
+        return (np.floor(now * rate) + 1) / rate
+
+    def getLatency(self):
+
+        # random latency around the configured one
+        if self.latency <= 0:
+            return 0.0
+
+        return self.latency * self.random.uniform(0.5, 1.5)
+
+    def checkFailure(self, parameter_name):
+
+        # inject a random failure
+        if self.failure_rate > 0 and self.random.random() < self.failure_rate:
+            raise SimulatedParameterException("SIMULATED_FAILURE: Injected failure while accessing {}".format(parameter_name))
+
+        return
+
+    def getSettingVersion(self, parameter_name):
+
+        return self.getDevice(parseParameterName(parameter_name)[0]).setting_version
+
+    def get(self, parameter_name, selector = "", now = None):
+
+        # parse the name
+        device, property, field = parseParameterName(parameter_name)
+        property_type = self.getPropertyType(device, property)
+
+        # get the last publication (or the current settings)
+        if property_type == "acquisition":
+            if now is None:
+                now = time.time()
+            rate = self.getRate(property)
+            publication = int(np.floor(now * rate))
+            value, header = self.getDevice(device).getAcquisition(property, publication, rate, selector)
+        elif property_type == "setting":
+            value, header = self.getDevice(device).getSetting(property, selector)
+        else:
+            raise SimulatedParameterException("NOT_READABLE: The command {} cannot be read".format(property))
+
+        # return a single field if asked
+        if field is not None:
+            if field not in value:
+                raise SimulatedParameterException("NO_SUCH_FIELD: The field {} does not exist in the property {}".format(field, property))
+            value = value[field]
+
+        return value, header
+
+    def set(self, parameter_name, value, selector = ""):
+
+        # parse the name
+        device, property, field = parseParameterName(parameter_name)
+        property_type = self.getPropertyType(device, property)
+
+        # set the settings or run the commands
+        if property_type == "setting":
+            if field is not None:
+                value = {field: value}
+            self.getDevice(device).setSetting(property, value)
+        elif property_type == "command":
+            self.getDevice(device).runCommand(property)
+        else:
+            raise SimulatedParameterException("NOT_WRITABLE: The acquisition property {} cannot be set".format(property))
+
+        return
+
+# subscription handle (same methods as the pyjapc ones used by the gui)
+class SimulatedSubscription:
+
+    def __init__(self, japc, parameter_name, on_value_received, on_exception, selector, get_header):
+
+        # attributes
+        self.japc = japc
+        self.parameter_name = parameter_name
+        self.on_value_received = on_value_received
+        self.on_exception = on_exception
+        self.selector = selector
+        self.get_header = get_header
+        self.is_monitoring = False
+        self.last_setting_version = None
+
+        return
+
+    def startMonitoring(self):
+
+        self.japc.startSubscription(self)
+
+        return
+
+    def stopMonitoring(self):
+
+        self.is_monitoring = False
+
+        return
+
+    def isMonitoring(self):
+
+        return self.is_monitoring
+
+# stand-in of pyjapc.PyJapc (a single thread delivers the subscriptions of the object, each one at its publication time plus the latency)
+class SimulatedJapc:
+
+    def __init__(self, backend, selector = ""):
+
+        # attributes
+        self.backend = backend
+        self.selector = selector
+        self.subscription_list = []
+        self.heap = []
+        self.heap_counter = 0
+        self.condition = threading.Condition()
+        self.thread = None
+
+        return
+
+    def setSelector(self, selector):
+
+        self.selector = selector
+
+        return
+
+    def rbacLogin(self, *args, **kwargs):
+
+        return
+
+    def rbacLogout(self):
+
+        return
+
+    def getSelector(self, timingSelectorOverride):
+
+        return self.selector if timingSelectorOverride is None else timingSelectorOverride
+
+    def getParam(self, parameterName, timingSelectorOverride = None, getHeader = False, noPyConversion = False):
+
+        # the caller waits for the latency
+        time.sleep(self.backend.getLatency())
+        self.backend.checkFailure(parameterName)
+        value, header = self.backend.get(parameterName, selector = self.getSelector(timingSelectorOverride))
+
+        if getHeader:
+            return value, header
+
+        return value
+
+    def setParam(self, parameterName, parameterValue, timingSelectorOverride = None, checkDims = True):
+
+        # the caller waits for the latency
+        time.sleep(self.backend.getLatency())
+        self.backend.checkFailure(parameterName)
+        self.backend.set(parameterName, parameterValue, selector = self.getSelector(timingSelectorOverride))
+
+        return
+
+    def subscribeParam(self, parameterName, onValueReceived = None, onException = None, timingSelectorOverride = None, getHeader = False):
+
+        # the subscription does not start until startSubscriptions or startMonitoring is called
+        subscription = SimulatedSubscription(self, parameterName, onValueReceived, onException, self.getSelector(timingSelectorOverride), getHeader)
+        self.subscription_list.append(subscription)
+
+        return subscription
+
+    def startSubscriptions(self):
+
+        for subscription in self.subscription_list:
+            if not subscription.is_monitoring:
+                subscription.startMonitoring()
+
+        return
+
+    def stopSubscriptions(self):
+
+        for subscription in self.subscription_list:
+            subscription.stopMonitoring()
+
+        return
+
+    def clearSubscriptions(self):
+
+        self.stopSubscriptions()
+        self.subscription_list = []
+
+        return
+
+    def startSubscription(self, subscription):
+
+        # schedule the first delivery straight away (start the delivery thread if needed)
+        with self.condition:
+            subscription.is_monitoring = True
+            subscription.last_setting_version = None
+            self.schedule(subscription, time.time())
+            if self.thread is None:
+                self.thread = threading.Thread(target = self.run, name = "SimulatedJapc", daemon = True)
+                self.thread.start()
+            self.condition.notify()
+
+        return
+
+    def schedule(self, subscription, delivery_time):
+
+        # the counter keeps the order of the subscriptions with the same delivery time
+        heapq.heappush(self.heap, (delivery_time, self.heap_counter, subscription))
+        self.heap_counter += 1
+
+        return
+
+    def run(self):
+
+        while True:
+
+            # wait for the next delivery
+            with self.condition:
+                while not self.heap or self.heap[0][0] > time.time():
+                    self.condition.wait(None if not self.heap else self.heap[0][0] - time.time())
+                delivery_time, counter, subscription = heapq.heappop(self.heap)
+                if not subscription.is_monitoring:
+                    continue
+
+            # deliver it and schedule the next one
+            now = time.time()
+            try:
+                property_type = self.backend.getPropertyType(parseParameterName(subscription.parameter_name)[0], parseParameterName(subscription.parameter_name)[1])
+            except SimulatedParameterException as xcp:
+                self.deliverException(subscription, xcp)
+                continue
+            if property_type == "acquisition":
+                self.deliver(subscription, now)
+                next_time = self.backend.getNextPublicationTime(subscription.parameter_name, now = now) + self.backend.getLatency()
+            else:
+                setting_version = self.backend.getSettingVersion(subscription.parameter_name)
+                if setting_version != subscription.last_setting_version:
+                    subscription.last_setting_version = setting_version
+                    self.deliver(subscription, now)
+                next_time = now + 1 / self.backend.rate
+            with self.condition:
+                if subscription.is_monitoring:
+                    self.schedule(subscription, next_time)
+
+    def deliver(self, subscription, now):
+
+        # get the values of the publication (or the injected failure)
+        try:
+            self.backend.checkFailure(subscription.parameter_name)
+            value, header = self.backend.get(subscription.parameter_name, selector = subscription.selector, now = now)
+        except SimulatedParameterException as xcp:
+            self.deliverException(subscription, xcp)
+            return
+
+        # call the callback (a broken callback must not stop the other subscriptions)
+        if subscription.on_value_received is not None:
+            try:
+                if subscription.get_header:
+                    subscription.on_value_received(subscription.parameter_name, value, header)
+                else:
+                    subscription.on_value_received(subscription.parameter_name, value)
+            except Exception as xcp:
+                print("SimulatedJapc - Exception in the callback of {}: {}".format(subscription.parameter_name, xcp))
+
+        return
+
+    def deliverException(self, subscription, xcp):
+
+        # same arguments as the pyjapc exception callbacks
+        if subscription.on_exception is not None:
+            try:
+                subscription.on_exception(subscription.parameter_name, str(xcp), xcp)
+            except Exception as xcp_callback:
+                print("SimulatedJapc - Exception in the exception callback of {}: {}".format(subscription.parameter_name, xcp_callback))
+
+        return
+
+########################################################
+########################################################
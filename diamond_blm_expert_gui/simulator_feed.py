@@ -0,0 +1,141 @@
+########################################################
+########################################################
+
+# GUI created by: martinja
+# Contact: javier.martinez.samblas@cern.ch
+
+########################################################
+########################################################
+
+# PYQT IMPORTS
+
+from PyQt5.QtCore import (QObject, pyqtSignal)
+
+# OTHER IMPORTS
+
+from japc_backend import createJapc
+from spectrum_utils import computeFFTFrame
+
+########################################################
+########################################################
+
+# GLOBALS
+
+# prefix of the ucap devices that publish the fft of the captures
+UCAP_PREFIX = "UCAP.VD."
+
+########################################################
+########################################################
+
+# feeds the CValueAggregators from the simulated devices (same data as the aggregators would output, emitted through their own signal)
+# the ucap fft channels are simulated by computing the fft frames of the simulated captures in the delivery thread
+class SimulatedChannelFeed(QObject):
+
+    #----------------------------------------------#
+
+    # signals (aggregator, data)
+    received = pyqtSignal(object, object)
+
+    #----------------------------------------------#
+
+    # init function
+    def __init__(self, parent = None):
+
+        # inherit from QObject
+        QObject.__init__(self, parent)
+
+        # declare attributes
+        self.japc = createJapc()
+
+        # the subscription callbacks run in the delivery thread, so the data goes through a signal to reach the gui thread
+        self.received.connect(self.emitAggregatorUpdate)
+
+        # stop the deliveries together with the window
+        if parent is not None:
+            parent.destroyed.connect(self.japc.clearSubscriptions)
+
+        return
+
+    #----------------------------------------------#
+
+    # function that replaces the control system channel of an aggregator by a simulated one
+    def addAggregator(self, aggregator, channel, selector = ""):
+
+        # the aggregator must not connect to the real device
+        aggregator.setProperty("inputChannels", [])
+
+        # the ucap channels are computed from the captures of the device
+        if channel.startswith(UCAP_PREFIX):
+            channel = "{}/Capture".format(channel[len(UCAP_PREFIX):].split("/")[0])
+            transformation = computeFFTFrame
+        else:
+            transformation = None
+
+        # subscribe to the simulated device
+        self.japc.subscribeParam(channel, onValueReceived=lambda parameterName, dictValues, headerInfo, aggregator=aggregator, transformation=transformation: self.subsCallback(aggregator, transformation, dictValues, headerInfo),
+                                 onException=self.onException, timingSelectorOverride=selector, getHeader=True)
+
+        return
+
+    #----------------------------------------------#
+
+    # start function
+    def start(self):
+
+        self.japc.startSubscriptions()
+
+        return
+
+    #----------------------------------------------#
+
+    # stop function
+    def stop(self):
+
+        self.japc.clearSubscriptions()
+
+        return
+
+    #----------------------------------------------#
+
+    # function to receive the simulated subs data
+    def subsCallback(self, aggregator, transformation, dictValues, headerInfo):
+
+        # the aggregators output the fields plus the stamp and the cycle name
+        data = dict(dictValues)
+        data["acqStamp"] = headerInfo["acqStamp"]
+        data["cycleName"] = headerInfo["selector"]
+
+        # compute the fft frame (ucap does not publish anything for empty captures)
+        if transformation is not None:
+            if data["rawBuf0"].size == 0:
+                return
+            data = transformation(data)
+
+        self.received.emit(aggregator, data)
+
+        return
+
+    #----------------------------------------------#
+
+    # function that handles the simulated exceptions
+    def onException(self, parameterName, description, exception, verbose = True):
+
+        # print
+        if verbose:
+            print("SimulatedChannelFeed - Exception: {}".format(exception))
+
+        return
+
+    #----------------------------------------------#
+
+    # function that emits the data as if it came from the aggregator
+    def emitAggregatorUpdate(self, aggregator, data):
+
+        aggregator.updateTriggered['PyQt_PyObject'].emit(data)
+
+        return
+
+    #----------------------------------------------#
+
+########################################################
+########################################################
@@ -0,0 +1,128 @@
+########################################################
+########################################################
+
+# GUI created by: martinja
+# Contact: javier.martinez.samblas@cern.ch
+
+########################################################
+########################################################
+
+# IMPORTS
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+########################################################
+########################################################
+
+# GLOBALS
+
+# sampling frequency of the raw buffers (0.65 GHz, same Fs used for the time vector)
+SAMPLING_FREQUENCY_KHZ = 0.65 * 1e6
+
+# number of overtones shown in the capture tab
+N_OVERTONES = 7
+
+# fft sources
+FFT_SOURCE_LOCAL = "local"
+FFT_SOURCE_UCAP = "UCAP"
+FFT_SOURCE_BOTH = "both"
+
+########################################################
+########################################################
+
+# FUNCTIONS
+
+def getWindow(window, size):
+
+    # get the window function
+    if window == "hann":
+        return np.hanning(size)
+    elif window == "hamming":
+        return np.hamming(size)
+    elif window == "blackman":
+        return np.blackman(size)
+    elif window == "rectangular":
+        return np.ones(size)
+    else:
+        raise ValueError("unknown window: {}".format(window))
+
+def computeSpectrum(y, fs = SAMPLING_FREQUENCY_KHZ, window = "hann", segment_size = 0):
+
+    # use the whole buffer as a single segment unless welch averaging is requested (segments overlapping by 50%)
+    y = np.asarray(y, dtype=np.float64)
+    if not segment_size or segment_size >= len(y):
+        segments = y[None, :]
+    else:
+        segments = sliding_window_view(y, int(segment_size))[::max(1, int(segment_size) // 2)]
+
+    # remove the offset of each segment and apply the window
+    window_values = getWindow(window, segments.shape[1])
+    segments = (segments - np.mean(segments, axis=1, keepdims=True)) * window_values
+
+    # average the power of the segments and scale it to the amplitude of a sine
+    power = np.mean(np.abs(np.fft.rfft(segments, axis=1)) ** 2, axis=0)
+    amplitude = np.sqrt(power) * 2 / np.sum(window_values)
+    freq = np.fft.rfftfreq(segments.shape[1], d = 1 / fs)
+
+    return freq, amplitude
+
+def findHarmonicPeaks(freq, amplitude, fundamental = None, n_harmonics = N_OVERTONES):
+
+    # use the strongest line as the fundamental if it is not given (skipping the dc leakage of the window)
+    if fundamental is None:
+        idx_start = min(3, len(amplitude) - 1)
+        fundamental = freq[idx_start + np.argmax(amplitude[idx_start:])]
+
+    # strongest bin within half a fundamental of each harmonic (nan if the harmonic is above the nyquist frequency)
+    peaks_freq = np.full(n_harmonics, np.nan)
+    peaks_amplitude = np.full(n_harmonics, np.nan)
+    for harmonic in range(1, n_harmonics + 1):
+        idx_1 = np.searchsorted(freq, (harmonic - 0.5) * fundamental, side='left')
+        idx_2 = np.searchsorted(freq, (harmonic + 0.5) * fundamental, side='left')
+        if idx_2 > idx_1:
+            idx_peak = idx_1 + np.argmax(amplitude[idx_1:idx_2])
+            peaks_freq[harmonic - 1] = freq[idx_peak]
+            peaks_amplitude[harmonic - 1] = amplitude[idx_peak]
+
+    # same layout as the ucap node (amplitudes in the first row and frequencies in the second one)
+    is_found = ~np.isnan(peaks_freq)
+    peaks_xplots = np.vstack((peaks_amplitude[is_found], peaks_freq[is_found]))
+
+    return peaks_freq, peaks_xplots
+
+def computeFFTFrame(capture_frame, fundamental = None, window = "hann", segment_size = 0):
+
+    # same fields as the frames of the ucap node (aux_time is 0 so that the frame can be plotted straight away)
+    fft_frame = {"acqStamp": capture_frame['acqStamp'],
+                 "cycleName": capture_frame['cycleName'],
+                 "aux_time": 0}
+
+    # compute the spectrum and the overtones of both buffers
+    for buffer_index in ["0", "1"]:
+        freq, amplitude = computeSpectrum(capture_frame['rawBuf{}'.format(buffer_index)], window = window, segment_size = segment_size)
+        peaks_freq, peaks_xplots = findHarmonicPeaks(freq, amplitude, fundamental = fundamental)
+        fft_frame['rawBuffer{}_FFT'.format(buffer_index)] = np.vstack((amplitude, freq))
+        fft_frame['peaks_freq{}'.format(buffer_index)] = peaks_freq
+        fft_frame['peaks_freq{}_xplots'.format(buffer_index)] = peaks_xplots
+
+    return fft_frame
+
+def compareFFTFrames(fft_frame_a, fft_frame_b):
+
+    # maximum difference (kHz) between the overtones of each buffer
+    max_diff_list = []
+    for buffer_index in ["0", "1"]:
+        peaks_freq_a = np.asarray(fft_frame_a['peaks_freq{}'.format(buffer_index)], dtype=np.float64)
+        peaks_freq_b = np.asarray(fft_frame_b['peaks_freq{}'.format(buffer_index)], dtype=np.float64)
+        n_peaks = min(len(peaks_freq_a), len(peaks_freq_b))
+        diff = np.abs(peaks_freq_a[:n_peaks] - peaks_freq_b[:n_peaks])
+        if n_peaks == 0 or np.all(np.isnan(diff)):
+            max_diff_list.append(np.nan)
+        else:
+            max_diff_list.append(float(np.nanmax(diff)))
+
+    return max_diff_list
+
+########################################################
+########################################################
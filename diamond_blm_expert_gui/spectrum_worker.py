@@ -0,0 +1,137 @@
+########################################################
+########################################################
+
+# GUI created by: martinja
+# Contact: javier.martinez.samblas@cern.ch
+
+########################################################
+########################################################
+
+# PYQT IMPORTS
+
+from PyQt5.QtCore import (QObject, QThread, pyqtSignal)
+
+# OTHER IMPORTS
+
+from spectrum_utils import computeFFTFrame
+
+########################################################
+########################################################
+
+# worker that computes the fft frame of a capture off the gui thread (same fields as the frames of the ucap node)
+class LocalFFTThreadWorker(QObject):
+
+    #----------------------------------------------#
+
+    # signals
+    finished = pyqtSignal()
+    processed = pyqtSignal(dict)
+
+    #----------------------------------------------#
+
+    # init function
+    def __init__(self, capture_frame, fundamental = None, window = "hann", segment_size = 0):
+
+        # inherit from QObject
+        QObject.__init__(self)
+
+        # declare attributes
+        self.capture_frame = capture_frame
+        self.fundamental = fundamental
+        self.window = window
+        self.segment_size = segment_size
+
+        return
+
+    #----------------------------------------------#
+
+    # start function
+    def start(self):
+
+        # compute the spectrum and the overtones
+        try:
+            fft_frame = computeFFTFrame(self.capture_frame, fundamental = self.fundamental, window = self.window, segment_size = self.segment_size)
+            self.processed.emit(fft_frame)
+        except Exception as xcp:
+            print("LocalFFTThreadWorker - Unable to compute the local FFT: {}".format(xcp))
+
+        # emit the finish signal
+        self.finished.emit()
+
+        return
+
+    #----------------------------------------------#
+
+########################################################
+########################################################
+
+# runs the local fft of the captures one at a time (only the last capture received while computing is kept) and deletes each thread once it finishes
+class LocalFFTRunner(QObject):
+
+    #----------------------------------------------#
+
+    # signals
+    processed = pyqtSignal(dict)
+
+    #----------------------------------------------#
+
+    # init function
+    def __init__(self, window = "hann", segment_size = 0, parent = None):
+
+        # inherit from QObject
+        QObject.__init__(self, parent)
+
+        # declare attributes
+        self.window = window
+        self.segment_size = segment_size
+        self.aux_thread = None
+        self.aux_worker = None
+        self.pending_request = None
+
+        return
+
+    #----------------------------------------------#
+
+    # function that computes the fft of a capture on a thread
+    def compute(self, capture_frame, fundamental = None):
+
+        # only keep the last capture while the previous one is being computed
+        if self.aux_thread is not None:
+            self.pending_request = (capture_frame, fundamental)
+            return
+
+        # start the thread
+        self.aux_thread = QThread(parent=self)
+        self.aux_worker = LocalFFTThreadWorker(capture_frame, fundamental = fundamental, window = self.window, segment_size = self.segment_size)
+        self.aux_worker.moveToThread(self.aux_thread)
+        self.aux_worker.finished.connect(self.finishThread)
+        self.aux_worker.processed.connect(self.processed)
+        self.aux_thread.started.connect(self.aux_worker.start)
+        self.aux_thread.start()
+
+        return
+
+    #----------------------------------------------#
+
+    # function that finishes the thread
+    def finishThread(self):
+
+        # quit the thread and release it (the worker has no parent, dropping the reference deletes it)
+        self.aux_thread.quit()
+        self.aux_thread.wait()
+        self.aux_thread.deleteLater()
+        self.aux_thread = None
+        self.aux_worker = None
+
+        # compute the capture that was received in the meantime
+        if self.pending_request is not None:
+            capture_frame, fundamental = self.pending_request
+            self.pending_request = None
+            self.compute(capture_frame, fundamental = fundamental)
+
+        return
+
+    #----------------------------------------------#
+
+########################################################
+########################################################
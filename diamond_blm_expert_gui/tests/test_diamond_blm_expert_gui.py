@@ -8,3 +8,462 @@ import diamond_blm_expert_gui
 
 def test_version():
     assert diamond_blm_expert_gui.__version__ is not None
+
+
+def test_probe_results_are_streamed_and_timed_out():
+    import time
+    from diamond_blm_expert_gui.concurrency_utils import iterProbeResults, ProbeTimeoutError
+
+    def probe(device):
+        if device == "broken":
+            raise ValueError(device)
+        if device == "hung":
+            time.sleep(1.0)
+
+    results = list(iterProbeResults(["ok", "broken", "hung"], probe, max_workers=3, timeout=0.2, poll_period=0.01, pool_name="test_streamed"))
+
+    assert dict(results)["ok"] == ""
+    assert isinstance(dict(results)["broken"], ValueError)
+    assert isinstance(dict(results)["hung"], ProbeTimeoutError)
+    assert results[-1][0] == "hung"
+
+
+def test_hung_probes_hold_one_thread_of_the_shared_pool():
+    import time
+    import threading
+    from diamond_blm_expert_gui.concurrency_utils import iterProbeResults, ProbeTimeoutError, getProbePool
+
+    # the hung device stays busy across the sweeps instead of taking a new thread each time
+    release = threading.Event()
+    probed = []
+
+    def probe(device):
+        probed.append(device)
+        if device == "hung":
+            release.wait(10)
+
+    for index_sweep in range(5):
+        results = dict(iterProbeResults(["ok1", "hung", "ok2"], probe, max_workers=2, timeout=0.1, poll_period=0.01, pool_name="test_hung"))
+        assert results["ok1"] == "" and results["ok2"] == "" and isinstance(results["hung"], ProbeTimeoutError)
+    pool = getProbePool("test_hung")
+    assert probed.count("hung") == 1 and probed.count("ok1") == 5
+    assert len(pool.thread_list) <= 2
+
+    # once it answers it is probed again
+    release.set()
+    while "hung" in pool.busy_dict:
+        time.sleep(0.01)
+    assert dict(iterProbeResults(["hung"], probe, timeout=1.0, poll_period=0.01, pool_name="test_hung"))["hung"] == ""
+    assert probed.count("hung") == 2
+
+
+def test_abandoned_probes_do_not_block_the_interpreter_exit():
+    import os
+    import sys
+    import subprocess
+
+    # a probe that never answers is abandoned and the process still exits straight away
+    code = ("import time\n"
+            "from diamond_blm_expert_gui.concurrency_utils import iterProbeResults\n"
+            "print(list(iterProbeResults(['hung'], lambda device: time.sleep(60), timeout=0.1, poll_period=0.01))[0][0])\n")
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(diamond_blm_expert_gui.__file__)))
+    output = subprocess.run([sys.executable, "-c", code], cwd=package_dir, capture_output=True, text=True, timeout=20)
+    assert output.returncode == 0 and output.stdout.strip() == "hung"
+
+
+def test_deadline_scheduler_orders_and_reschedules():
+    from diamond_blm_expert_gui.concurrency_utils import DeadlineScheduler
+
+    scheduler = DeadlineScheduler()
+    scheduler.schedule(("dev1", "Capture"), 2.0, now=0.0)
+    scheduler.schedule(("dev2", "AcquisitionHistogram"), 0.5, now=0.0)
+    scheduler.schedule(("dev3", "AcquisitionTurnLoss"), 1.0, now=0.0)
+
+    assert scheduler.getNextDeadline() == 0.5
+    assert scheduler.popDue(1.0) == [("dev2", "AcquisitionHistogram"), ("dev3", "AcquisitionTurnLoss")]
+    assert scheduler.getNextDeadline() == 1.5
+
+    scheduler.schedule(("dev1", "Capture"), 0.25, now=1.0)
+    scheduler.unschedule(("dev3", "AcquisitionTurnLoss"))
+    assert scheduler.popDue(1.25) == [("dev1", "Capture")]
+    assert len(scheduler) == 2
+
+
+def test_mode_status_store_only_returns_changed_devices():
+    from diamond_blm_expert_gui.mode_status_store import ModeStatusStore
+
+    store = ModeStatusStore({"dev1": {"modules_data": {"Capture": "BUFFERS_ARE_EMPTY"}}})
+    changed_dict, stamp = store.getChangedSince(0)
+    assert list(changed_dict.keys()) == ["dev1"]
+
+    assert not store.update("dev1", {"modules_data": {"Capture": "BUFFERS_ARE_EMPTY"}})
+    assert store.update("dev2", {"modules_data": {"Capture": "2026-01-01"}})
+    changed_dict, new_stamp = store.getChangedSince(stamp)
+    assert list(changed_dict.keys()) == ["dev2"]
+    assert store.getChangedSince(new_stamp)[0] == {}
+
+
+def test_mode_status_store_detects_changes_of_dicts_mutated_in_place():
+    from diamond_blm_expert_gui.mode_status_store import ModeStatusStore
+
+    # the scheduler keeps updating the same dicts it already sent
+    store = ModeStatusStore()
+    modules_data = {"Capture": "BUFFERS_ARE_EMPTY"}
+    errors = {"Capture": ""}
+    assert store.update("dev1", {"modules_data": modules_data, "errors": errors})
+    stamp = store.getChangedSince(0)[1]
+    modules_data["Capture"] = "2026-01-01"
+    errors["Capture"] = "custom.message.error: TIMESTAMP_TOO_OLD"
+    assert store.update("dev1", {"modules_data": modules_data, "errors": errors})
+    assert store.getChangedSince(stamp)[0]["dev1"]["modules_data"] == {"Capture": "2026-01-01"}
+
+
+def test_snapshots_are_versioned_and_skipped_when_unchanged(tmp_path):
+    from diamond_blm_expert_gui.general_utils import writeSnapshot, readSnapshot, readSnapshotSequence
+
+    path = str(tmp_path / "summary_snapshot.json")
+    assert readSnapshot(path) == (None, None)
+
+    assert writeSnapshot(path, {"summary_data": [["Capture", "-"]]}) == 1
+    data, sequence = readSnapshot(path)
+    assert data == {"summary_data": [["Capture", "-"]]}
+    assert readSnapshot(path, last_sequence=sequence) == (None, sequence)
+
+    assert writeSnapshot(path, {"summary_data": []}) == 2
+    assert readSnapshotSequence(path) == 2
+    assert readSnapshot(path, last_sequence=sequence) == ({"summary_data": []}, 2)
+
+
+def test_call_with_retries_gives_up_after_the_last_attempt():
+    import pytest
+    from diamond_blm_expert_gui.concurrency_utils import callWithRetries
+
+    attempts = []
+
+    def flaky(device):
+        attempts.append(device)
+        if len(attempts) < 2:
+            raise RuntimeError(device)
+        return device
+
+    def always_fails(device):
+        attempts.append(device)
+        raise RuntimeError(device)
+
+    assert callWithRetries(flaky, "dev1", retries=1, retry_delay=0) == "dev1"
+    with pytest.raises(RuntimeError):
+        callWithRetries(always_fails, "dev2", retries=2, retry_delay=0)
+    assert attempts.count("dev2") == 3
+
+    # the rejected exceptions and the expired deadlines are not retried
+    with pytest.raises(RuntimeError):
+        callWithRetries(always_fails, "dev3", retries=2, retry_delay=0, is_retryable=lambda xcp: False)
+    with pytest.raises(RuntimeError):
+        callWithRetries(always_fails, "dev4", retries=2, retry_delay=0, deadline=0)
+    assert attempts.count("dev3") == 1 and attempts.count("dev4") == 1
+
+
+def test_vectorized_bct_pattern_matches_the_turn_by_turn_loop():
+    import numpy as np
+    from scipy.interpolate import interp1d
+    from diamond_blm_expert_gui.bct_utils import mapPatternOnTurns, fixPatternEdges
+
+    rng = np.random.RandomState(0)
+    time_vector = np.linspace(0, (5000 - 1) * (1 / (0.65 * 1000)), num=5000)
+    idx_turns = np.sort(rng.choice(np.arange(10, 4990), 90, replace=False))
+    idx_bunches = np.sort(rng.choice(np.arange(0, 5000), 1500, replace=False))
+    y_filling_pattern = np.append(rng.choice(2, 3564), 0)
+    flags_bunch = np.full(5000, -2.0)
+    flags_bunch[idx_bunches] = 7.0
+
+    # reference: the original turn-by-turn interpolation and bunch-by-bunch edge correction
+    expected = np.array([0] * len(time_vector))
+    for idx_turn in range(0, len(idx_turns) - 1):
+        first_turn_ms, second_turn_ms = time_vector[idx_turns[idx_turn]], time_vector[idx_turns[idx_turn + 1]]
+        interpolation_function = interp1d(np.linspace(first_turn_ms, second_turn_ms, num=3565), y_filling_pattern, kind='previous')
+        expected[idx_turns[idx_turn]:idx_turns[idx_turn + 1]] = interpolation_function(np.linspace(first_turn_ms, second_turn_ms, num=idx_turns[idx_turn + 1] - idx_turns[idx_turn]))
+    assert np.array_equal(mapPatternOnTurns(time_vector, idx_turns, y_filling_pattern), expected)
+
+    expected = 9.0 * expected - 2.0
+    actual = fixPatternEdges(expected.copy(), idx_bunches, flags_bunch)
+    y = expected
+    for i in idx_bunches:
+        if i - 3 < 0 or i + 3 >= len(flags_bunch):
+            continue
+        f = flags_bunch[i]
+        if y[i] == f:
+            if y[i - 1] == f:
+                if y[i - 2] != f:
+                    y[i - 1] = y[i - 2]
+                    continue
+                elif y[i - 3] != f:
+                    y[i - 2] = y[i - 1] = y[i - 3]
+                    continue
+            if y[i + 1] == f:
+                if y[i + 2] != f:
+                    y[i + 1] = y[i + 2]
+                    continue
+                elif y[i + 3] != f:
+                    y[i + 2] = y[i + 1] = y[i + 3]
+                    continue
+        else:
+            for offsets in [[1], [-1], [2, 1], [-2, -1], [3, 2, 1], [-3, -2, -1]]:
+                if y[i + offsets[0]] == f:
+                    y[i] = f
+                    for offset in offsets[1:]:
+                        y[i + offset] = f
+                    break
+    assert np.array_equal(actual, y)
+
+
+def test_filling_pattern_cache_is_only_invalidated_by_changed_inputs():
+    import numpy as np
+    from diamond_blm_expert_gui.bct_utils import FillingPatternCache, mapPatternOnTurns, fixPatternEdges
+
+    rng = np.random.RandomState(1)
+    time_vector = np.linspace(0, 10, num=2000)
+    idx_turns = np.arange(3, 2000, 58)
+    idx_bunches = np.sort(rng.choice(np.arange(0, 2000), 400, replace=False))
+    y_filling_pattern = np.append(rng.choice(2, 3564), 0)
+    flags_one_two = np.zeros(2000)
+    flags_one_two[idx_bunches] = 1
+
+    cache = FillingPatternCache()
+    cached = cache.getPattern(y_filling_pattern, time_vector, idx_turns, idx_bunches)
+    assert cache.getPattern(y_filling_pattern.copy(), time_vector, idx_turns.copy(), idx_bunches) is cached
+
+    # scaling the cached pattern gives the same curve as fixing the edges of the scaled pattern
+    expected = fixPatternEdges(3.5 * mapPatternOnTurns(time_vector, idx_turns, y_filling_pattern) - 1.25, idx_bunches, 3.5 * flags_one_two - 1.25)
+    assert np.array_equal(3.5 * cached - 1.25, expected)
+
+    assert cache.getPattern(y_filling_pattern, time_vector, idx_turns[1:], idx_bunches) is not cached
+
+
+def test_streaming_thresholding_algo_matches_the_windowed_statistics():
+    import numpy as np
+    from diamond_blm_expert_gui.signal_utils import thresholding_algo, ZScorePeakDetector
+
+    np.random.seed(2)
+    y = np.random.normal(100, 5, 3000).astype(np.int16)
+    y[[400, 1200, 1201, 2500]] += 500
+    result = thresholding_algo(y, lag=100, threshold=8, influence=0.2)
+
+    filtered = np.array(y)
+    for i in range(100, len(y)):
+        window = filtered[(i - 100):i]
+        assert np.isclose(result["avgFilter"][i - 1], np.mean(window)) and np.isclose(result["stdFilter"][i - 1], np.std(window))
+        if abs(y[i] - np.mean(window)) > 8 * np.std(window):
+            assert result["signals"][i] == np.sign(y[i] - np.mean(window))
+            filtered[i] = 0.2 * y[i] + 0.8 * filtered[i - 1]
+        else:
+            assert result["signals"][i] == 0
+    assert list(np.nonzero(result["signals"])[0]) == [400, 1200, 1201, 2500]
+
+    # incremental use gives the same result as the batch one
+    detector = ZScorePeakDetector(lag=100, threshold=8, influence=0.2, is_integer=True)
+    assert [detector.update(value)[0] for value in y.tolist()] == list(result["signals"])
+
+
+def test_min_max_pyramid_keeps_the_peaks_and_bounds_the_points():
+    import numpy as np
+    from diamond_blm_expert_gui.signal_utils import MinMaxPyramid
+
+    np.random.seed(3)
+    x = np.linspace(0, 1000, num=300001)
+    y = np.random.normal(0, 1, len(x))
+    y[123457] = 50
+    y[250001] = -40
+    pyramid = MinMaxPyramid(x, y)
+
+    # full zoom-out: about 2 points per pixel and the peaks are still there
+    x_plot, y_plot, key = pyramid.sample(0, 1000, max_points=2 * 800)
+    assert key[0] > 0 and len(x_plot) <= 2 * 800
+    assert y_plot.max() == 50 and y_plot.min() == -40
+
+    # zoom-in: the raw samples are used
+    x_plot, y_plot, key = pyramid.sample(100, 101, max_points=2 * 800)
+    assert key[0] == 0 and np.array_equal(y_plot, y[key[1]:key[2]])
+
+    # the bounds cover the whole curve (or the samples inside the orthogonal range)
+    assert pyramid.getBounds(0) == (0, 1000)
+    assert pyramid.getBounds(1) == (-40, 50)
+    for x1, x2 in [(100, 900), (411.5, 412.5), (0, 1000)]:
+        inside = (x >= x1) & (x <= x2)
+        assert pyramid.getBounds(1, orthoRange=(x1, x2)) == (y[inside].min(), y[inside].max())
+    assert pyramid.getBounds(0, orthoRange=(45, 55)) == (x[123457], x[123457])
+
+
+def test_acq_stamp_join_buffer_pairs_stamps_and_expires_lonely_captures():
+    from diamond_blm_expert_gui.concurrency_utils import AcqStampJoinBuffer
+
+    join_buffer = AcqStampJoinBuffer(max_size=2, max_wait=5.0)
+
+    # the pair is returned as soon as both halves are received (in any order)
+    assert join_buffer.addCapture("t1", "capture1", now=0.0) is None
+    assert join_buffer.addFFT("t1", "fft1", now=0.5) == ("capture1", "fft1")
+    assert join_buffer.addFFT("t2", "fft2", now=1.0) is None
+    assert join_buffer.addCapture("t2", "capture2", now=1.2) == ("capture2", "fft2")
+    assert join_buffer.getNextDeadline() is None
+
+    # old frames are evicted and the captures without fft expire
+    for index, stamp in enumerate(["t3", "t4", "t5"]):
+        join_buffer.addCapture(stamp, "capture_" + stamp, now=2.0 + index)
+    assert join_buffer.getNextDeadline() == 8.0
+    assert join_buffer.popExpired(now=8.0) == ["capture_t4"]
+    assert join_buffer.popExpired(now=9.0) == ["capture_t5"]
+
+
+def test_local_fft_finds_the_overtones_of_the_revolution_frequency():
+    import numpy as np
+    from diamond_blm_expert_gui.spectrum_utils import computeFFTFrame, computeSpectrum, compareFFTFrames, SAMPLING_FREQUENCY_KHZ
+
+    np.random.seed(4)
+    fundamental = 1000 / 23.0543
+    t = np.arange(2 ** 18) / SAMPLING_FREQUENCY_KHZ
+    y = 100 + sum((20 / harmonic) * np.sin(2 * np.pi * harmonic * fundamental * t) for harmonic in range(1, 8))
+    y = (y + np.random.normal(0, 1, len(t))).astype(np.int16)
+    fft_frame = computeFFTFrame({"acqStamp": 1, "cycleName": "SPS.USER.SFTPRO1", "rawBuf0": y, "rawBuf1": y}, fundamental=fundamental)
+
+    # the overtones are found within one frequency bin and keep the ucap layout
+    bin_width = SAMPLING_FREQUENCY_KHZ / len(t)
+    assert np.all(np.abs(fft_frame["peaks_freq0"] - fundamental * np.arange(1, 8)) <= bin_width)
+    assert fft_frame["rawBuffer0_FFT"].shape == (2, len(t) // 2 + 1)
+    assert fft_frame["peaks_freq0_xplots"].shape == (2, 7)
+    assert compareFFTFrames(fft_frame, fft_frame) == [0.0, 0.0]
+
+    # welch averaging gives a coarser spectrum with the same amplitude scale
+    freq, amplitude = computeSpectrum(y, segment_size=2 ** 16)
+    assert len(freq) == 2 ** 15 + 1
+    assert abs(amplitude.max() - fft_frame["rawBuffer0_FFT"][0].max()) < 0.1 * fft_frame["rawBuffer0_FFT"][0].max()
+
+
+def test_capture_ring_buffer_keeps_the_last_captures_within_the_budget():
+    import numpy as np
+    from diamond_blm_expert_gui.capture_history import CaptureRingBuffer
+
+    def getCapture(index, length=1000):
+        return {"acqStamp": index, "cycleName": "SPS.USER.SFTPRO1",
+                "rawBuf0": np.full(length, index, dtype=np.int16), "rawBuf1": np.full(length, -index, dtype=np.int16),
+                "rawBufFlags0": np.zeros(length, dtype=np.int8), "rawBufFlags1": np.zeros(length, dtype=np.int8)}
+
+    # 6000 bytes per capture, so only 3 fit in the budget
+    capture_history = CaptureRingBuffer(max_bytes=20000, max_captures=10)
+    for index in range(5):
+        assert capture_history.push(getCapture(index)) == index
+    assert capture_history.push(getCapture(4)) is None
+    assert len(capture_history) == 3 and capture_history.getFirstSequence() == 2
+    assert capture_history.getCapture(1) is None
+    assert capture_history.getCapture(3)["acqStamp"] == 3 and np.all(capture_history.getCapture(3)["rawBuf1"] == -3)
+
+    # a capture with another length starts the history again
+    assert capture_history.push(getCapture(5, length=2000)) == 5
+    assert len(capture_history) == 1 and capture_history.getCapture(4) is None
+
+
+def test_hdf5_recording_is_read_back_by_record_and_by_window(tmp_path):
+    import numpy as np
+    from diamond_blm_expert_gui.hdf5_recorder import HDF5Recorder, HDF5RecordingReader
+
+    # record captures whose length changes
+    recorder = HDF5Recorder(str(tmp_path / "recording.h5"), chunk_size=1024)
+    recorder.start()
+    for index in range(4):
+        rawBuf0 = np.arange(1000 + index, dtype=np.int16)
+        rawBuf0[500] = 10000 + index
+        assert recorder.record("SP.BA1.BLMDIAMOND.2", "Capture", {"acqStamp": "stamp{}".format(index), "cycleName": "SPS.USER.SFTPRO1", "rawBuf0": rawBuf0, "nturns": index})
+    recorder.stop()
+    assert recorder.n_recorded == 4 and recorder.last_exception is None
+
+    # one record is read back by stamp
+    reader = HDF5RecordingReader(str(tmp_path / "recording.h5"))
+    index = reader.findRecord("SP.BA1.BLMDIAMOND.2", "Capture", "stamp2")
+    record = reader.getRecord("SP.BA1.BLMDIAMOND.2", "Capture", index)
+    assert index == 2 and record["nturns"] == 2 and len(record["rawBuf0"]) == 1002 and record["rawBuf0"][500] == 10002
+
+    # the window of the whole recording is decimated in pieces without losing the peaks
+    n_samples = reader.getFieldLength("SP.BA1.BLMDIAMOND.2", "Capture", "rawBuf0")
+    x, y = reader.readWindow("SP.BA1.BLMDIAMOND.2", "Capture", "rawBuf0", 0, n_samples, max_points=200, read_size=700)
+    assert n_samples == 4006 and len(y) <= 200
+    assert y.max() == 10003 and y.min() == 0
+    reader.close()
+
+
+def test_hdf5_recording_zoomed_out_windows_are_read_from_the_decimation_levels(tmp_path):
+    import numpy as np
+    from diamond_blm_expert_gui.hdf5_recorder import HDF5Recorder, HDF5RecordingReader
+
+    # records whose lengths do not match the blocks of the levels
+    np.random.seed(5)
+    lengths = [3000 + 777 * index for index in range(20)]
+    samples = np.random.randint(-1000, 1000, size=sum(lengths)).astype(np.int16)
+    samples[123456] = 30000
+    recorder = HDF5Recorder(str(tmp_path / "recording.h5"), chunk_size=4096)
+    recorder.start()
+    for index, rawBuf0 in enumerate(np.split(samples, np.cumsum(lengths)[:-1])):
+        assert recorder.record("SP.BA1.BLMDIAMOND.2", "Capture", {"acqStamp": "stamp{}".format(index), "rawBuf0": rawBuf0})
+    recorder.stop()
+
+    # the blocks of every level are the min and the max of their samples
+    reader = HDF5RecordingReader(str(tmp_path / "recording.h5"))
+    decimation = reader.getDecimation("SP.BA1.BLMDIAMOND.2", "Capture", "rawBuf0", 20000)
+    assert decimation.attrs["block_size"] == 16384
+    for row, block_size in [(3, 1024), (120, 1024), (5, 16384)]:
+        level = reader.getDecimation("SP.BA1.BLMDIAMOND.2", "Capture", "rawBuf0", block_size)
+        block = samples[row * block_size:(row + 1) * block_size]
+        assert tuple(level[row]) == (block.min(), block.max())
+
+    # the zoomed-out window keeps the peaks and starts its blocks at the level blocks
+    x, y = reader.readWindow("SP.BA1.BLMDIAMOND.2", "Capture", "rawBuf0", 1000, len(samples), max_points=40)
+    assert len(y) <= 2 * 20 + 2 and y.max() == 30000 and y.min() == samples.min()
+    assert x[0] == 0 and np.all(x % 1024 == 0)
+    reader.close()
+
+
+def test_simulated_devices_serve_catalog_acquisitions_settings_and_failures():
+    import time
+    import numpy as np
+    from diamond_blm_expert_gui.simulator import SimulatedBackend, SimulatedJapc, SimulatedCernPackage, FLAG_TURN, FLAG_BUNCH, FLAG_FIRST_BUNCH
+
+    # the catalog has the structure of the ccda one
+    backend = SimulatedBackend(n_devices=2, rate=50.0, capture_rate=50.0, capture_turns=3, seed=1)
+    japc = SimulatedJapc(backend)
+    assert sorted(backend.pyccda_dictionary["SPS"]) == ["SP.BA1.BLMDIAMOND.2", "SP.BA2.BLMDIAMOND.2"]
+    assert backend.pyccda_dictionary["SPS"]["SP.BA1.BLMDIAMOND.2"]["cycle_bound"] == "True"
+    assert "monitorNames" in backend.pyccda_dictionary["LHC"]["dBLM.TEST1"]["acquisition"]["GeneralInformation"]["other"]
+
+    # one turn flag per turn and one bunch flag per bunch (288 bunches per sps turn)
+    capture, header = japc.getParam("SP.BA1.BLMDIAMOND.2/Capture", getHeader=True)
+    flags = capture["rawBufFlags0"]
+    assert capture["rawBuf0"].dtype == np.int16 and len(capture["rawBuf0"]) == round(3 * 23.0543 * 650)
+    assert np.sum(flags == FLAG_TURN) == 3 and np.sum((flags == FLAG_BUNCH) | (flags == FLAG_FIRST_BUNCH)) == 3 * 288
+    assert header["acqStamp"] == capture["acqStamp"] and capture["cycleName"] == "SPS.USER.SFTPRO1"
+
+    # the settings change the acquisitions and the subscriptions deliver the changes
+    received = []
+    japc.subscribeParam("SP.BA1.BLMDIAMOND.2/BeamLossHistogramSetting#blmNTurn", onValueReceived=lambda name, value: received.append(value))
+    japc.subscribeParam("SP.BA1.BLMDIAMOND.2/AcquisitionHistogram", onValueReceived=lambda name, value, header: received.append(header["acqStamp"]), getHeader=True)
+    japc.startSubscriptions()
+    time.sleep(0.1)
+    japc.setParam("SP.BA1.BLMDIAMOND.2/BeamLossHistogramSetting", {"blmNTurn": 100})
+    time.sleep(0.1)
+    japc.clearSubscriptions()
+    assert [value for value in received if not hasattr(value, "tzinfo")] == [4338, 100]
+    assert len([value for value in received if hasattr(value, "tzinfo")]) >= 3
+    assert japc.getParam("SP.BA1.BLMDIAMOND.2/AcquisitionHistogram")["blmNTurn"] == 100
+
+    # ResetCapture empties the buffers until the next TriggerCapture
+    japc.setParam("SP.BA1.BLMDIAMOND.2/ResetCapture", {})
+    assert japc.getParam("SP.BA1.BLMDIAMOND.2/Capture")["rawBuf0"].size == 0
+    japc.setParam("SP.BA1.BLMDIAMOND.2/TriggerCapture", {})
+    assert japc.getParam("SP.BA1.BLMDIAMOND.2/Capture")["rawBuf0"].size > 0
+
+    # the injected failures are caught like the java exceptions
+    cern = SimulatedCernPackage()
+    failing_japc = SimulatedJapc(SimulatedBackend(n_devices=1, failure_rate=1.0, latency=0.02))
+    start_time = time.time()
+    try:
+        failing_japc.getParam("SP.BA1.BLMDIAMOND.2/Capture")
+        assert False
+    except cern.japc.core.ParameterException as xcp:
+        assert str(xcp.getMessage()).split(":")[0] == "SIMULATED_FAILURE"
+    assert time.time() - start_time >= 0.01